@@ -0,0 +1,60 @@
+"""
+Binary AST benchmark, compares loading a parsed project from JSON with opening
+the binary format and reading a single module lazily or in full
+
+usage: python -m benchmarks.bench_binary_ast [module count]
+"""
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_project import write_project
+from binary_ast import BinaryAst, write_binary
+from project import find_modules, parse_modules
+
+
+def main(module_count: int) -> None:
+    """
+    Writes a parsed project in both formats and times what a downstream tool does
+    """
+    with tempfile.TemporaryDirectory() as folder:
+        write_project(folder, module_count)
+        with contextlib.redirect_stdout(io.StringIO()):
+            modules = parse_modules(folder, find_modules(folder), 1)
+        json_path = os.path.join(folder, 'project.json')
+        binary_path = os.path.join(folder, 'project.past')
+        with open(json_path, 'w') as output:
+            json.dump({module: node.to_dict() if node else None for module, node in modules.items()}, output)
+        with open(binary_path, 'wb') as binary_output:
+            write_binary(binary_output, modules)
+        print(f'json: {os.path.getsize(json_path)} bytes, binary: {os.path.getsize(binary_path)} bytes')
+        target = f'module{module_count // 2}.purist'
+
+        start = time.perf_counter()
+        with open(json_path) as f:
+            loaded = json.load(f)[target]
+        print(f'json load, one module: {(time.perf_counter() - start) * 1000:.2f}ms')
+
+        start = time.perf_counter()
+        with BinaryAst(binary_path) as ast:
+            view = ast.root(target)
+            assert view is not None
+            names = [child.value for child in view.children or []]
+        print(f'binary open, one module lazily: {(time.perf_counter() - start) * 1000:.2f}ms')
+
+        start = time.perf_counter()
+        with BinaryAst(binary_path) as ast:
+            nodes = [ast.root(module) for module in ast.modules]
+            for view in nodes:
+                if view is not None:
+                    view.to_node()
+        print(f'binary open, every module in full: {(time.perf_counter() - start) * 1000:.2f}ms')
+        assert loaded is not None and names
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
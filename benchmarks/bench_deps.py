@@ -0,0 +1,37 @@
+"""
+Dependency graph benchmark, scans the import headers of a generated project written
+to disk and computes the strongly connected components, then checks the component
+computation on a long import chain closed into a single cycle
+
+usage: python -m benchmarks.bench_deps [file count]
+"""
+import sys
+import tempfile
+import time
+
+from benchmarks.corpus import CorpusConfig, write_corpus
+from dependencies import DependencyGraph, build_graph
+
+
+def main(files: int) -> None:
+    """
+    Runs the benchmark on a project of the given size
+    """
+    with tempfile.TemporaryDirectory() as folder:
+        write_corpus(folder, CorpusConfig(files=files))
+        start = time.perf_counter()
+        graph = build_graph(folder)
+        scanned = time.perf_counter()
+        order = graph.order
+        end = time.perf_counter()
+    edges = sum(len(graph.imports(module)) for module in graph.modules)
+    print(f'{len(graph.modules)} modules, {edges} imports, {len(graph.cycles)} cycles')
+    print(f'scan {scanned - start:.3f}s, components and order {end - scanned:.3f}s, {len(order)} ordered')
+    chain = {f'm{index}.purist': [f'm{(index + 1) % files}.purist'] for index in range(files)}
+    start = time.perf_counter()
+    cycles = DependencyGraph(chain).cycles
+    print(f'a cycle through {len(cycles[0])} modules found in {time.perf_counter() - start:.3f}s')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -0,0 +1,152 @@
+"""
+Type hierarchy benchmark, checks generated hierarchies of growing size and fixed
+depth where every class extends a class of the layer above and implements an
+interface extending one or two interfaces of the layer above, and compares the
+memoized check with walking the supertypes again for every class
+
+usage: python -m benchmarks.bench_hierarchy [--types 1000,2000,4000,8000] [--layers N]
+"""
+import argparse
+import contextlib
+import io
+import random
+import time
+
+from typing import Dict, List, Set
+
+from hierarchy import TypeDeclaration, TypeHierarchy, build_hierarchy
+from parser import Node, Parser
+from symbols import SymbolKind
+
+TYPES_PER_MODULE = 10
+LAYERS = 8
+
+
+def module_of(index: int) -> str:
+    """
+    Returns the name of the module declaring the class and interface of an index
+    """
+    return f'module{index // TYPES_PER_MODULE}'
+
+
+def generate_hierarchy(types: int, layers: int = LAYERS, seed: int = 1) -> Dict[str, str]:
+    """
+    Returns the sources of a project with the given number of classes and as many
+    interfaces, the supertypes declared by other modules are required from them.
+    Every class declares the methods of its interfaces its superclasses do not, so
+    the project checks without errors
+    """
+    rng = random.Random(seed)
+    layer_size = max(1, types // layers)
+    # the methods every interface requires and every class provides, with inherited ones
+    required: List[Set[int]] = []
+    provided: List[Set[int]] = []
+    sources: Dict[str, str] = {}
+    for first in range(0, types, TYPES_PER_MODULE):
+        lines: List[str] = []
+        requires: Dict[str, Set[str]] = {}
+        for index in range(first, min(types, first + TYPES_PER_MODULE)):
+            above = index // layer_size * layer_size - layer_size
+            parents: List[int] = []
+            superclass: int | None = None
+            if above >= 0:
+                superclass = above + rng.randrange(layer_size)
+                parents = sorted({superclass, above + rng.randrange(layer_size)})
+            for name, parent in [(f'I{parent}', parent) for parent in parents] + (
+                [(f'C{superclass}', superclass)] if superclass is not None else []
+            ):
+                if parent < first:
+                    requires.setdefault(module_of(parent), set()).add(name)
+            required.append({index}.union(*[required[parent] for parent in parents]))
+            inherited = provided[superclass] if superclass is not None else set()
+            methods = sorted(required[index] - inherited)
+            provided.append(inherited | required[index])
+            extends = f' extends {", ".join(f"I{parent}" for parent in parents)}' if parents else ''
+            lines.append(f'interface I{index}{extends} {{')
+            lines.append(f'    run{index}(value: string, count: integer): integer')
+            lines.append('}')
+            lines.append(f'class C{index}{f" extends C{superclass}" if superclass is not None else ""} implements I{index} {{')
+            for method in methods:
+                lines.append(f'    run{method}(value: string, count: integer): integer {{')
+                lines.append('        return count')
+                lines.append('    }')
+            lines.append('}')
+        imports = [f'from {module} require [{", ".join(sorted(names))}]' for module, names in sorted(requires.items())]
+        sources[f'{module_of(first)}.purist'] = '\n'.join(imports + lines) + '\n'
+    return sources
+
+
+def parse_sources(sources: Dict[str, str]) -> Dict[str, Node | None]:
+    """
+    Parses the generated modules without following their imports
+    """
+    parser = Parser('bench', None, follow_imports=False)
+    modules: Dict[str, Node | None] = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        for file_path, code in sources.items():
+            modules[file_path] = parser.parse_stream(file_path, io.StringIO(code))
+    return modules
+
+
+def naive_check(hierarchy: TypeHierarchy, names: List[str]) -> int:
+    """
+    Counts the missing and mismatched interface methods walking the supertypes of
+    every class again, every interface once per class
+    """
+    errors = 0
+    for name in names:
+        declaration = hierarchy.declaration(name)
+        if declaration is None or declaration.kind is not SymbolKind.CLASS:
+            continue
+        provided: Dict[str, str] = {}
+        current: TypeDeclaration | None = declaration
+        while current is not None:
+            for method, signature in current.methods.items():
+                provided.setdefault(method, signature)
+            current = hierarchy.declaration(current.superclass) if current.superclass else None
+        visited: Set[str] = set()
+        pending = list(declaration.interfaces)
+        while pending:
+            interface_name = pending.pop()
+            interface = hierarchy.declaration(interface_name)
+            if interface is not None and interface_name not in visited:
+                visited.add(interface_name)
+                for method, signature in interface.methods.items():
+                    if provided.get(method) != signature:
+                        errors += 1
+                pending.extend(interface.interfaces)
+    return errors
+
+
+def main(sizes: List[int], layers: int) -> None:
+    """
+    Runs the benchmark for every hierarchy size
+    """
+    print(f'{"types":>7} {"declarations":>13} {"errors":>7} {"check ms":>9} {"us/decl":>8} {"naive ms":>9}')
+    for types in sizes:
+        modules = parse_sources(generate_hierarchy(types, layers))
+        names = [f'{module_of(index)}.{kind}{index}' for index in range(types) for kind in 'IC']
+        best = float('inf')
+        errors = 0
+        hierarchy = TypeHierarchy()
+        for _ in range(3):
+            hierarchy = build_hierarchy(modules)
+            start = time.perf_counter()
+            errors = len(hierarchy.check())
+            best = min(best, time.perf_counter() - start)
+        declarations = sum(len(hierarchy.declaration(name).methods) + 1 for name in names)  # type: ignore[union-attr]
+        start = time.perf_counter()
+        naive_check(hierarchy, names)
+        naive = time.perf_counter() - start
+        print(
+            f'{len(names):>7} {declarations:>13} {errors:>7} {best * 1e3:>9.1f} '
+            f'{best * 1e6 / declarations:>8.2f} {naive * 1e3:>9.1f}'
+        )
+
+
+if __name__ == '__main__':
+    argument_parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    argument_parser.add_argument('--types', default='1000,2000,4000,8000')
+    argument_parser.add_argument('--layers', type=int, default=LAYERS)
+    arguments = argument_parser.parse_args()
+    main([int(size) for size in arguments.types.split(',')], arguments.layers)
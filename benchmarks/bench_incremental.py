@@ -0,0 +1,54 @@
+"""
+Incremental parsing benchmark, measures the latency of a single keystroke in a
+large module against parsing the whole module again
+
+usage: python -m benchmarks.bench_incremental [line count]
+"""
+import contextlib
+import io
+import sys
+import time
+
+from incremental import Document
+
+CLASS = '''// generated class {index}
+class Generated{index} extends Base implements Generated {{
+{attributes}}}
+
+'''
+
+ATTRIBUTE = '    attribute{index}: integer\n'
+
+
+def build_module(line_count: int) -> str:
+    """
+    Builds a module of classes with 20 attributes each, about line_count lines long
+    """
+    attributes = ''.join(ATTRIBUTE.format(index=index) for index in range(20))
+    class_count = max(1, line_count // 24)
+    return ''.join(CLASS.format(index=index, attributes=attributes) for index in range(class_count))
+
+
+def main(line_count: int, keystrokes: int = 200) -> None:
+    """
+    Types characters into an attribute name in the middle of the module
+    """
+    text = build_module(line_count)
+    print(f'lines: {text.count(chr(10))}')
+    start = time.perf_counter()
+    document = Document('generated.purist', text)
+    full = time.perf_counter() - start
+    print(f'full parse: {full * 1000:.2f}ms')
+
+    offset = text.index('attribute7', len(text) // 2) + len('attribute7')
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for keystroke in range(keystrokes):
+            document.edit(offset + keystroke, offset + keystroke, 'x')
+    elapsed = (time.perf_counter() - start) / keystrokes
+    assert document.ast is not None
+    print(f'keystroke: {elapsed * 1000:.3f}ms, {full / elapsed:.0f}x faster')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
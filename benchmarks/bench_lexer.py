@@ -0,0 +1,71 @@
+"""
+Lexer throughput benchmark, compares the character lexer with the compiled pattern lexer
+
+usage: python -m benchmarks.bench_lexer [size in MB]
+"""
+import sys
+import time
+
+from typing import Type
+
+from lexer import BaseLexer, Lexer, RegexLexer
+
+SAMPLE = '''from Builtin require [Strategy, Stateless, Logger]
+
+from strategies.sampleStrategy require [SampleStrategy]
+from sampleType require [MyCustomType]
+
+// there is no stateful attribute so the Stateless implementation is already implied
+class SampleInstanceStrategy extends Strategy implements SampleStrategy, Stateless {
+    logging: Logger
+    counter: integer = -12
+    ratio: number = 1.25
+
+    constructor() {
+        super("a123")
+    }
+
+    // method from SampleStrategy
+    process(value: MyCustomType): void {
+        logging.info("you have reached the process method: ${value.name}")
+    }
+}
+'''
+
+
+def build_source(size_mb: float) -> str:
+    """
+    Builds a generated source text of roughly the requested size
+    """
+    repeat = max(1, int(size_mb * 1024 * 1024 / len(SAMPLE)))
+    return SAMPLE * repeat
+
+
+def measure(lexer_type: Type[BaseLexer], text: str) -> tuple[int, float]:
+    """
+    Lexes the whole text and returns the number of values and the elapsed seconds
+    """
+    start = time.perf_counter()
+    count = 0
+    for value, _, _, _ in lexer_type('benchmark', text):
+        if value is not None:
+            count += 1
+    return count, time.perf_counter() - start
+
+
+def main(size_mb: float) -> None:
+    """
+    Runs the benchmark for every lexer backend
+    """
+    text = build_source(size_mb)
+    print(f'source size: {len(text) / (1024 * 1024):.2f} MB')
+    results = {}
+    for lexer_type in [Lexer, RegexLexer]:
+        count, elapsed = measure(lexer_type, text)
+        results[lexer_type.__name__] = count / elapsed
+        print(f'{lexer_type.__name__:>12}: {count} tokens in {elapsed:.3f}s, {count / elapsed:,.0f} tokens/s')
+    print(f'speedup: {results["RegexLexer"] / results["Lexer"]:.1f}x')
+
+
+if __name__ == '__main__':
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 4)
@@ -0,0 +1,67 @@
+"""
+File reader memory benchmark, compares reading and decoding a source file for the
+regex lexer with scanning the memory mapped file with the bytes lexer
+
+usage: python -m benchmarks.bench_mmap [size in MB]
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from typing import Callable
+
+from benchmarks.bench_lexer import build_source
+from lexer import BytesLexer, RegexLexer
+from parser import FileReader, MmapFileReader
+from tokenizer import Tokenizer
+
+
+def measure(run: Callable[[], int]) -> tuple[float, int, int]:
+    """
+    Returns the elapsed seconds, the count the run returned and the peak memory
+    allocated meanwhile in bytes, memory mapped pages are not allocations
+    """
+    start = time.perf_counter()
+    count = run()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, count, peak
+
+
+def main(size_mb: float) -> None:
+    """
+    Runs the benchmark for both readers on a generated file
+    """
+    text = build_source(size_mb)
+    tokenizer = Tokenizer()
+    with tempfile.TemporaryDirectory() as folder:
+        filename = os.path.join(folder, 'benchmark.purist')
+        with open(filename, 'w') as f:
+            f.write(text)
+        size = os.path.getsize(filename)
+        del text
+        print(f'file: {size / (1024 * 1024):.2f}MB')
+        readers = [('FileReader', FileReader(), RegexLexer), ('MmapFileReader', MmapFileReader(), BytesLexer)]
+        for name, reader, lexer_type in readers:
+            def lex() -> int:
+                return sum(1 for _ in lexer_type('benchmark', reader.read(filename)))
+
+            def tokenize() -> int:
+                return len(tokenizer.tokenize_to_buffer('benchmark', reader.read(filename)))
+
+            lex_seconds, values, lex_peak = measure(lex)
+            tokenize_seconds, tokens, tokenize_peak = measure(tokenize)
+            print(
+                f'{name:<16} read+lex {lex_seconds:.3f}s, peak {lex_peak / size:.2f}x the file, '
+                f'{values} values; read+tokenize {tokenize_seconds:.3f}s, peak {tokenize_peak / size:.2f}x '
+                f'the file, {tokens} tokens'
+            )
+
+
+if __name__ == '__main__':
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 8)
@@ -0,0 +1,49 @@
+"""
+Naming validation benchmark, compares checking every identifier occurrence with
+re.match against the memoized validation pass
+
+usage: python -m benchmarks.bench_naming [occurrence count]
+"""
+import re
+import sys
+import time
+
+from naming import ROLE_PATTERNS, NameOccurrences, NameRole, NamingValidator
+
+NAMES = [
+    (NameRole.CLASS, 'Logger'),
+    (NameRole.CLASS, 'SampleBusiness'),
+    (NameRole.INTERFACE, 'Stateless'),
+    (NameRole.VARIABLE, 'logging'),
+    (NameRole.VARIABLE, 'counter'),
+    (NameRole.METHOD, 'process'),
+]
+
+
+def main(occurrence_count: int) -> None:
+    """
+    Validates the same identifiers over and over, as happens across the files of a project
+    """
+    occurrences: NameOccurrences = {}
+    for index in range(occurrence_count):
+        occurrences.setdefault(NAMES[index % len(NAMES)], []).append(('sample.purist', index, 1))
+    patterns = {role: ROLE_PATTERNS[role].pattern for role in NameRole}
+
+    start = time.perf_counter()
+    for index in range(occurrence_count):
+        role, name = NAMES[index % len(NAMES)]
+        re.match(patterns[role], name)
+    per_occurrence = time.perf_counter() - start
+
+    validator = NamingValidator()
+    start = time.perf_counter()
+    validator.validate(occurrences)
+    memoized = time.perf_counter() - start
+
+    print(f'occurrences: {occurrence_count}, distinct names: {len(NAMES)}')
+    print(f're.match per occurrence: {per_occurrence * 1000:8.2f}ms')
+    print(f'memoized pass:           {memoized * 1000:8.2f}ms ({per_occurrence / memoized:.1f}x)')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
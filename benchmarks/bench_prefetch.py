@@ -0,0 +1,69 @@
+"""
+Import prefetching benchmark, parses a generated project through a reader with an
+artificial per file latency, like a network mount or a cold cache, with and
+without reading the imported files ahead of the parser
+
+usage: python -m benchmarks.bench_prefetch [latency in ms] [file count]
+"""
+import sys
+import time
+
+from typing import Dict
+
+from benchmarks.bench_suite import SRC_FOLDER, CorpusReader
+from benchmarks.corpus import CorpusConfig, generate_corpus
+from lexer import Source
+from parser import FileReader, Parser
+from prefetch import PrefetchingFileReader
+
+
+class SlowReader(CorpusReader):
+    """
+    Serves the generated sources after sleeping, the sleep releases the GIL like blocking I/O
+    """
+
+    def __init__(self, sources: Dict[str, str], latency: float) -> None:
+        super().__init__(sources)
+        self._latency = latency
+
+    def read(self, filename: str) -> Source:
+        time.sleep(self._latency)
+        return super().read(filename)
+
+
+def run(reader: FileReader, roots: list) -> float:
+    """
+    Returns the seconds taken to parse the root modules and everything they import
+    """
+    parser = Parser(SRC_FOLDER, reader)
+    start = time.perf_counter()
+    if isinstance(reader, PrefetchingFileReader):
+        for root in roots:
+            reader.prefetch(f'{SRC_FOLDER}/{root}')
+    for root in roots:
+        parser.parse(root)
+    return time.perf_counter() - start
+
+
+def main(latency_ms: float, files: int) -> None:
+    """
+    Runs the benchmark with growing numbers of background reads
+    """
+    sources = generate_corpus(CorpusConfig(files=files))
+    # the modules of the first level import, directly or not, the rest of the project
+    roots = [file_path for file_path in sources if file_path.startswith('level0/')]
+    latency = latency_ms / 1000
+    baseline = run(SlowReader(sources, latency), roots)
+    print(f'{len(sources)} modules, {latency_ms}ms per read')
+    print(f'{"no prefetch":<16} {baseline:.3f}s')
+    for max_in_flight in [1, 2, 4, 8, 16]:
+        with PrefetchingFileReader(SRC_FOLDER, SlowReader(sources, latency), max_in_flight) as reader:
+            elapsed = run(reader, roots)
+        print(f'{f"prefetch {max_in_flight}":<16} {elapsed:.3f}s {baseline / elapsed:>6.2f}x  {reader.stats.report()}')
+
+
+if __name__ == '__main__':
+    main(
+        float(sys.argv[1]) if len(sys.argv) > 1 else 5,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    )
@@ -0,0 +1,67 @@
+"""
+Project mode scaling benchmark, parses a generated project with an increasing number of workers
+
+usage: python -m benchmarks.bench_project [module count]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from project import parse_project
+
+MODULE = '''from module{previous} require [Module{previous}]
+from module{other} require [Module{other}]
+
+// generated module {index}
+class Module{index} extends Module{previous} implements Generated, Stateless {{
+    logging: Logger
+{attributes}
+}}
+'''
+
+ATTRIBUTE = '''    counter{index}: integer
+    ratio{index}: number
+    name{index}: string
+'''
+
+
+def write_project(folder: str, module_count: int) -> None:
+    """
+    Writes a generated project where every module imports two earlier modules
+    """
+    attributes = ''.join(ATTRIBUTE.format(index=index) for index in range(50))
+    for index in range(module_count):
+        code = MODULE.format(
+            index=index,
+            previous=max(index - 1, 0),
+            other=index // 2,
+            attributes=attributes
+        )
+        if index == 0:
+            code = code.split('\n', 3)[3].replace(' extends Module0', '')
+        with open(os.path.join(folder, f'module{index}.purist'), 'w') as f:
+            f.write(code)
+
+
+def main(module_count: int) -> None:
+    """
+    Runs the project benchmark in the current process, which is what 1 worker
+    means, then with pools of 2, 4 and 8 workers. The speedups are against the
+    in-process run, which pays no pool start up and no result transfer
+    """
+    print(f'modules: {module_count}, cpus: {os.cpu_count()}')
+    with tempfile.TemporaryDirectory() as folder:
+        write_project(folder, module_count)
+        start = time.perf_counter()
+        parse_project(folder, 1)
+        baseline = time.perf_counter() - start
+        print(f'in-process: {baseline:.3f}s')
+        for workers in [2, 4, 8]:
+            start = time.perf_counter()
+            parse_project(folder, workers)
+            elapsed = time.perf_counter() - start
+            print(f'{workers} workers: {elapsed:.3f}s, {baseline / elapsed:.2f}x the in-process run')
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,91 @@
+"""
+AST serialization benchmark, compares the previous json round-trip per level with
+the single pass writer on trees of increasing depth
+
+usage: python -m benchmarks.bench_serializer [max depth]
+"""
+import json
+import sys
+import time
+
+from typing import Any, Dict, List
+
+from parser import Node
+
+
+def legacy_repr(node: Node) -> str:
+    """
+    The Node.__repr__ used before write_json, dumps and loads every subtree
+    """
+    response: Dict[str, Any] = {'type': node.name}
+    if node.value is not None:
+        response['value'] = node.value
+    if node.children is not None:
+        children: List[Dict[str, Any]] = []
+        for child in node.children:
+            children.append(json.loads(legacy_repr(child)))
+        response['children'] = children
+    return json.dumps(response, indent=4)
+
+
+def build_tree(depth: int) -> Node:
+    """
+    Builds a chain of nodes depth levels deep, every level with a leaf sibling
+    """
+    root = Node('source', 'deep')
+    node = root
+    for level in range(depth):
+        child = Node('class', f'Level{level}')
+        node.add_child(Node('attribute', f'leaf{level}'))
+        node.add_child(child)
+        node = child
+    return root
+
+
+class CountingSink():
+    """
+    Text stream discarding the output, only counting the characters written
+    """
+
+    def __init__(self) -> None:
+        self.size = 0
+
+    def write(self, text: str) -> int:
+        self.size += len(text)
+        return len(text)
+
+
+def measure(function: Any, *args: Any) -> float:
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def main(max_depth: int) -> None:
+    """
+    Times both serializers for doubling depths. The indented output itself grows
+    quadratically with the depth of a chain, so its cost is reported per character
+    written, the legacy serializer is only run on small depths
+    """
+    depth = 50
+    while depth <= max_depth:
+        tree = build_tree(depth)
+        indented = CountingSink()
+        compact = CountingSink()
+        indented_time = measure(tree.write_json, indented, 4)
+        compact_time = measure(tree.write_json, compact)
+        line = (
+            f'depth {depth:5}: compact {compact_time * 1000:8.2f}ms '
+            f'({compact_time * 1e9 / compact.size:5.1f}ns/char), '
+            f'indented {indented_time * 1000:8.2f}ms '
+            f'({indented_time * 1e9 / indented.size:5.1f}ns/char)'
+        )
+        if depth <= 200:
+            legacy_time = measure(legacy_repr, tree)
+            line += f', legacy {legacy_time * 1000:8.2f}ms ({legacy_time * 1e9 / indented.size:7.1f}ns/char)'
+        print(line)
+        depth *= 2
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 6400)
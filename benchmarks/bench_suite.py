@@ -0,0 +1,244 @@
+"""
+Throughput benchmark suite, measures the lexers, the tokenizer, the parser and the
+JSON serializer separately on a generated project and saves the results as JSON
+so runs can be compared over time
+
+usage: python -m benchmarks.bench_suite [--files N] [--output results.json] [--compare baseline.json]
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+
+from typing import Any, Callable, Dict, List, Tuple, Type
+
+from benchmarks.corpus import CorpusConfig, generate_corpus
+from lexer import BaseLexer, Lexer, RegexLexer
+from parser import FileReader, ModuleRegistry, Node, Parser
+from tokenizer import Tokenizer
+
+SRC_FOLDER = 'corpus'
+
+
+class CorpusReader(FileReader):
+    """
+    Serves the generated sources from memory so the parser is not measured against the disk
+    """
+
+    def __init__(self, sources: Dict[str, str]) -> None:
+        self._sources = {f'{SRC_FOLDER}/{file_path}': code for file_path, code in sources.items()}
+
+    def read(self, filename: str) -> str:
+        return self._sources[filename]
+
+
+class CountingSink():
+    """
+    Text stream counting the written characters without keeping them
+    """
+
+    def __init__(self) -> None:
+        self.characters = 0
+
+    def write(self, text: str) -> int:
+        self.characters += len(text)
+        return len(text)
+
+
+def count_nodes(roots: List[Node]) -> int:
+    """
+    Returns the number of distinct nodes, modules shared by linked ASTs are counted once
+    """
+    seen = set()
+    stack = list(roots)
+    while stack:
+        node = stack.pop()
+        if id(node) in seen:
+            continue
+        seen.add(id(node))
+        stack.extend(node.children or [])
+    return len(seen)
+
+
+def _lex(lexer_type: Type[BaseLexer], sources: Dict[str, str]) -> Callable[[], int]:
+    def run() -> int:
+        count = 0
+        for file_path, code in sources.items():
+            for _ in lexer_type(file_path, code):
+                count += 1
+        return count
+    return run
+
+
+def _tokenize(sources: Dict[str, str]) -> Callable[[], int]:
+    tokenizer = Tokenizer()
+
+    def run() -> int:
+        return sum(len(tokenizer.tokenize(file_path, code)) for file_path, code in sources.items())
+    return run
+
+
+def _parse(sources: Dict[str, str], results: Dict[str, Node | None]) -> Callable[[], int]:
+    reader = CorpusReader(sources)
+
+    def run() -> int:
+        registry = ModuleRegistry()
+        # every method body is parsed in the timed run, none is left for the serializer
+        parser = Parser(SRC_FOLDER, reader, registry, lazy_bodies=False)
+        for file_path in sources:
+            parser.parse(file_path)
+        results.clear()
+        results.update(registry.modules)
+        return len(results)
+    return run
+
+
+def _serialize(roots: Dict[str, Node | None]) -> Callable[[], int]:
+    def run() -> int:
+        sink = CountingSink()
+        for node in roots.values():
+            if node is not None:
+                node.write_json(sink)
+        return sink.characters
+    return run
+
+
+def measure(run: Callable[[], int], repeat: int) -> Tuple[float, int]:
+    """
+    Returns the best elapsed seconds of the repeated runs and the count the run returned
+    """
+    best = float('inf')
+    count = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        count = run()
+        best = min(best, time.perf_counter() - start)
+    return best, count
+
+
+def run_suite(config: CorpusConfig, repeat: int = 3) -> Dict[str, Any]:
+    """
+    Generates a project and measures every phase on it
+
+    Args:
+        config: the size and shape of the generated project
+        repeat: the number of runs per phase, the fastest run is reported
+
+    Returns:
+        Dict[str, Any]: the configuration, corpus totals and per phase throughput
+    """
+    sources = generate_corpus(config)
+    size_mb = sum(len(code.encode('utf-8')) for code in sources.values()) / (1024 * 1024)
+    roots: Dict[str, Node | None] = {}
+    timings: Dict[str, float] = {}
+    counts: Dict[str, int] = {}
+    phases: List[Tuple[str, Callable[[], int]]] = [
+        ('lexer', _lex(Lexer, sources)),
+        ('regex_lexer', _lex(RegexLexer, sources)),
+        ('tokenizer', _tokenize(sources)),
+        ('parser', _parse(sources, roots)),
+        ('serializer', _serialize(roots)),
+    ]
+    for name, run in phases:
+        timings[name], counts[name] = measure(run, repeat)
+    tokens = counts['tokenizer']
+    # counted after the timed runs
+    nodes = count_nodes([node for node in roots.values() if node is not None])
+    invalid = sorted(file_path for file_path, node in roots.items() if node is None)
+    results: Dict[str, Dict[str, float]] = {}
+    for name, seconds in timings.items():
+        results[name] = {
+            'seconds': seconds,
+            'mb_per_second': size_mb / seconds,
+            'tokens_per_second': tokens / seconds,
+            'nodes_per_second': nodes / seconds,
+        }
+    results['serializer']['characters_per_second'] = counts['serializer'] / timings['serializer']
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': config.to_dict(),
+        'corpus': {
+            'files': len(sources),
+            'megabytes': size_mb,
+            'lexer_values': counts['regex_lexer'],
+            'tokens': tokens,
+            'nodes': nodes,
+            'invalid_modules': invalid,
+        },
+        'phases': results,
+    }
+
+
+def report(results: Dict[str, Any], baseline: Dict[str, Any] | None = None) -> str:
+    """
+    Formats the results as a table, with the speedup against a baseline run when given
+    """
+    corpus = results['corpus']
+    lines = [
+        f'files: {corpus["files"]}, {corpus["megabytes"]:.2f}MB, '
+        f'tokens: {corpus["tokens"]}, nodes: {corpus["nodes"]}'
+    ]
+    if corpus['invalid_modules']:
+        lines.append(f'invalid modules: {", ".join(corpus["invalid_modules"])}')
+    if baseline is not None and baseline['config'] != results['config']:
+        lines.append('the baseline was measured on a differently configured corpus')
+    lines.append(f'{"phase":<12} {"seconds":>9} {"MB/s":>8} {"tokens/s":>12} {"nodes/s":>12}')
+    for name, phase in results['phases'].items():
+        line = (
+            f'{name:<12} {phase["seconds"]:>9.4f} {phase["mb_per_second"]:>8.2f} '
+            f'{phase["tokens_per_second"]:>12.0f} {phase["nodes_per_second"]:>12.0f}'
+        )
+        if baseline is not None and name in baseline['phases']:
+            line = f'{line} {baseline["phases"][name]["seconds"] / phase["seconds"]:>6.2f}x'
+        lines.append(line)
+    return '\n'.join(lines)
+
+
+def main(argv: List[str]) -> None:
+    """
+    Runs the suite from the command line
+    """
+    defaults = CorpusConfig()
+    arguments = argparse.ArgumentParser(description='Purist throughput benchmark suite')
+    arguments.add_argument('--files', type=int, default=defaults.files)
+    arguments.add_argument('--classes', type=int, default=defaults.classes_per_file)
+    arguments.add_argument('--attributes', type=int, default=defaults.attributes_per_class)
+    arguments.add_argument('--methods', type=int, default=defaults.methods_per_class)
+    arguments.add_argument('--statements', type=int, default=defaults.statements_per_method)
+    arguments.add_argument('--fan-out', type=int, default=defaults.import_fan_out)
+    arguments.add_argument('--depth', type=int, default=defaults.import_depth)
+    arguments.add_argument('--comments', type=float, default=defaults.comment_density)
+    arguments.add_argument('--strings', type=float, default=defaults.string_density)
+    arguments.add_argument('--seed', type=int, default=defaults.seed)
+    arguments.add_argument('--repeat', type=int, default=3)
+    arguments.add_argument('--output', help='write the results as JSON to this file')
+    arguments.add_argument('--compare', help='a results file of an earlier run to compare with')
+    args = arguments.parse_args(argv)
+    config = CorpusConfig(
+        files=args.files,
+        classes_per_file=args.classes,
+        attributes_per_class=args.attributes,
+        methods_per_class=args.methods,
+        statements_per_method=args.statements,
+        import_fan_out=args.fan_out,
+        import_depth=args.depth,
+        comment_density=args.comments,
+        string_density=args.strings,
+        seed=args.seed
+    )
+    results = run_suite(config, args.repeat)
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+    print(report(results, baseline))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=4)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,67 @@
+"""
+Symbol index benchmark, indexes the unlinked modules of a generated project and
+measures the declaration, reference and simple name lookups and the update of a
+single module
+
+usage: python -m benchmarks.bench_symbols [file count]
+"""
+import contextlib
+import io
+import random
+import sys
+import time
+
+from typing import Dict
+
+from benchmarks.bench_suite import SRC_FOLDER, CorpusReader
+from benchmarks.corpus import CorpusConfig, generate_corpus
+from parser import Node, Parser
+from symbols import SymbolKind, build_index
+
+LOOKUPS = 100000
+
+
+def main(files: int) -> None:
+    """
+    Runs the benchmark on a project of the given size
+    """
+    sources = generate_corpus(CorpusConfig(files=files))
+    parser = Parser(SRC_FOLDER, CorpusReader(sources), follow_imports=False)
+    modules: Dict[str, Node | None] = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        for file_path in sources:
+            modules[file_path] = parser.parse(file_path)
+    start = time.perf_counter()
+    index = build_index(modules)
+    built = time.perf_counter() - start
+    names = [declaration.name for module in index.modules for declaration in index.declarations(module)]
+    print(f'{len(modules)} modules, {len(names)} declarations, indexed in {built:.3f}s')
+
+    rng = random.Random(1)
+    queries = [rng.choice(names) for _ in range(LOOKUPS)]
+    # attribute and method names repeat in every class, simple names are looked up for classes
+    classes = [
+        declaration.name.rsplit('.', 1)[-1] for module in index.modules
+        for declaration in index.declarations(module) if declaration.kind is SymbolKind.CLASS
+    ]
+    simple_names = [rng.choice(classes) for _ in range(LOOKUPS)]
+    for label, lookup, arguments in [
+        ('declaration', index.declaration, queries),
+        ('references', index.references, queries),
+        ('qualified_names', index.qualified_names, simple_names),
+    ]:
+        start = time.perf_counter()
+        for argument in arguments:
+            lookup(argument)
+        elapsed = time.perf_counter() - start
+        print(f'{label:<16} {elapsed * 1e6 / len(arguments):8.2f}us per lookup')
+
+    file_path = rng.choice(sorted(modules))
+    start = time.perf_counter()
+    for _ in range(100):
+        index.update(file_path, modules[file_path])
+    print(f'{"update":<16} {(time.perf_counter() - start) * 1e6 / 100:8.2f}us per module')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
@@ -0,0 +1,43 @@
+"""
+Token storage memory benchmark, compares a list of Token objects with the columnar TokenBuffer
+
+usage: python -m benchmarks.bench_token_memory [size in MB]
+"""
+import sys
+import tracemalloc
+
+from typing import Any, Callable
+
+from benchmarks.bench_lexer import build_source
+from tokenizer import Tokenizer
+
+
+def measure(build: Callable[[], Any]) -> tuple[Any, int]:
+    """
+    Returns the built object and the memory it retains in bytes
+    """
+    tracemalloc.start()
+    result = build()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, retained
+
+
+def main(size_mb: float) -> None:
+    """
+    Runs the memory benchmark for both storages
+    """
+    text = build_source(size_mb)
+    tokenizer = Tokenizer()
+    tokens, list_bytes = measure(lambda: tokenizer.tokenize('benchmark', text))
+    count = len(tokens)
+    del tokens
+    _, buffer_bytes = measure(lambda: tokenizer.tokenize_to_buffer('benchmark', text))
+    print(f'tokens: {count}')
+    print(f'List[Token]: {list_bytes / count:.1f} bytes per token')
+    print(f'TokenBuffer: {buffer_bytes / count:.1f} bytes per token')
+    print(f'reduction: {list_bytes / buffer_bytes:.1f}x')
+
+
+if __name__ == '__main__':
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 1)
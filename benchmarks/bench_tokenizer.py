@@ -0,0 +1,148 @@
+"""
+Token classification benchmark, compares the previous if/elif chain with the
+keyword and punctuation tables on values lexed up front
+
+usage: python -m benchmarks.bench_tokenizer [size in MB]
+"""
+import sys
+import time
+
+from typing import Iterator, List
+
+from benchmarks.bench_lexer import build_source
+from lexer import BaseLexer, LexerResult, RegexLexer
+from tokenizer import Token, TokenType, Tokenizer
+
+
+class ReplayLexer(BaseLexer):
+    """
+    Lexer replaying values discovered up front so only the classification is measured
+    """
+    results: List[LexerResult] = []
+
+    def __init__(self, filepath: str, text: str) -> None:
+        self._results = iter(self.results)
+
+    def next(self) -> LexerResult:
+        return next(self._results)
+
+    def __iter__(self) -> Iterator[LexerResult]:
+        return iter(self.results)
+
+
+def _is_number(value: str, convert: type) -> bool:
+    if value[0] not in ['-', '0', '1', '2', '3', '4', '5', '6', '7', '8', '9']:
+        return False
+    try:
+        convert(value)
+        return True
+    except ValueError:
+        return False
+
+
+def legacy_classify(filepath: str, results: List[LexerResult]) -> List[Token]:
+    """
+    The classification chain the tokenizer used before the lookup tables
+    """
+    response: List[Token] = []
+    for next_value, _, line, column in results:
+        if next_value is None:
+            break
+        if next_value == 'from':
+            response.append(Token(TokenType.FROM, filepath, line, column, next_value))
+        elif next_value == 'Builtin':
+            response.append(Token(TokenType.BUILTIN, filepath, line, column, next_value))
+        elif next_value == 'require':
+            response.append(Token(TokenType.REQUIRE, filepath, line, column, next_value))
+        elif next_value == 'class':
+            response.append(Token(TokenType.CLASS, filepath, line, column, next_value))
+        elif next_value == 'interface':
+            response.append(Token(TokenType.INTERFACE, filepath, line, column, next_value))
+        elif next_value == 'type':
+            response.append(Token(TokenType.TYPE, filepath, line, column, next_value))
+        elif next_value == 'enumeration':
+            response.append(Token(TokenType.ENUMERATION, filepath, line, column, next_value))
+        elif next_value == 'extends':
+            response.append(Token(TokenType.EXTENDS, filepath, line, column, next_value))
+        elif next_value == 'implements':
+            response.append(Token(TokenType.IMPLEMENTS, filepath, line, column, next_value))
+        elif next_value == 'string':
+            response.append(Token(TokenType.STRING_TYPE, filepath, line, column, next_value))
+        elif next_value == 'boolean':
+            response.append(Token(TokenType.BOOLEAN_TYPE, filepath, line, column, next_value))
+        elif next_value == 'integer':
+            response.append(Token(TokenType.INTEGER_TYPE, filepath, line, column, next_value))
+        elif next_value == 'number':
+            response.append(Token(TokenType.DECIMAL_TYPE, filepath, line, column, next_value))
+        elif next_value == 'false' or next_value == 'true':
+            response.append(Token(TokenType.BOOLEAN_VALUE, filepath, line, column, next_value))
+        elif next_value == 'null':
+            response.append(Token(TokenType.NULL, filepath, line, column, next_value))
+        elif next_value.startswith('"'):
+            response.append(Token(TokenType.STRING_VALUE, filepath, line, column, next_value))
+        elif next_value == ',':
+            response.append(Token(TokenType.COMMA, filepath, line, column, next_value))
+        elif next_value == '[':
+            response.append(Token(TokenType.LEFT_SQUARE_BRACKET, filepath, line, column, next_value))
+        elif next_value == ']':
+            response.append(Token(TokenType.RIGHT_SQUARE_BRACKET, filepath, line, column, next_value))
+        elif next_value == '(':
+            response.append(Token(TokenType.LEFT_BRACKET, filepath, line, column, next_value))
+        elif next_value == ')':
+            response.append(Token(TokenType.RIGHT_BRACKET, filepath, line, column, next_value))
+        elif next_value == '{':
+            response.append(Token(TokenType.LEFT_CURLY_BRACKET, filepath, line, column, next_value))
+        elif next_value == '}':
+            response.append(Token(TokenType.RIGHT_CURLY_BRACKET, filepath, line, column, next_value))
+        elif next_value == ':':
+            response.append(Token(TokenType.COLON, filepath, line, column, next_value))
+        elif next_value == '=':
+            response.append(Token(TokenType.EQUALS, filepath, line, column, next_value))
+        elif next_value == '<':
+            response.append(Token(TokenType.LEFT_ANGLE_BRACKET, filepath, line, column, next_value))
+        elif next_value == '>':
+            response.append(Token(TokenType.RIGHT_ANGLE_BRACKET, filepath, line, column, next_value))
+        elif next_value == '.':
+            response.append(Token(TokenType.FULL_STOP, filepath, line, column, next_value))
+        elif next_value == '!':
+            response.append(Token(TokenType.NOT, filepath, line, column, next_value))
+        elif next_value == 'constructor':
+            response.append(Token(TokenType.CONSTRUCTOR, filepath, line, column, next_value))
+        elif next_value == 'destructor':
+            response.append(Token(TokenType.DESTRUCTOR, filepath, line, column, next_value))
+        elif next_value == '|':
+            response.append(Token(TokenType.LOGICAL_OR, filepath, line, column, next_value))
+        elif next_value.startswith('//'):
+            response.append(Token(TokenType.COMMENT, filepath, line, column, next_value))
+        elif _is_number(next_value, int):
+            response.append(Token(TokenType.INTEGER_VALUE, filepath, line, column, int(next_value)))
+        elif _is_number(next_value, float) and next_value.count('.') == 1:
+            response.append(Token(TokenType.DECIMAL_VALUE, filepath, line, column, float(next_value)))
+        else:
+            response.append(Token(TokenType.IDENTIFIER, filepath, line, column, next_value))
+    return response
+
+
+def main(size_mb: float) -> None:
+    """
+    Runs the classification benchmark for both implementations
+    """
+    ReplayLexer.results = list(RegexLexer('benchmark', build_source(size_mb)))
+    count = len(ReplayLexer.results) - 1
+    print(f'values: {count}')
+
+    start = time.perf_counter()
+    legacy_classify('benchmark', ReplayLexer.results)
+    legacy = time.perf_counter() - start
+
+    start = time.perf_counter()
+    Tokenizer(ReplayLexer).tokenize('benchmark', '')
+    tables = time.perf_counter() - start
+
+    print(f'if/elif chain: {legacy * 1e9 / count:.0f} ns per token')
+    print(f'lookup tables: {tables * 1e9 / count:.0f} ns per token')
+    print(f'speedup: {legacy / tables:.1f}x')
+
+
+if __name__ == '__main__':
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 4)
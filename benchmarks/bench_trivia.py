@@ -0,0 +1,70 @@
+"""
+Comment density benchmark, parses the same generated project with every comment
+repeated into ever longer comment blocks and compares the parse phase per
+significant token, comments are trivia so it should not change with the density
+
+usage: python -m benchmarks.bench_trivia [--files N] [--blocks 0,1,10,100,1000]
+"""
+import argparse
+import contextlib
+import io
+
+from typing import Dict, List
+
+from benchmarks.bench_suite import SRC_FOLDER, CorpusReader
+from benchmarks.corpus import CorpusConfig, generate_corpus
+from parser import ModuleRegistry, Parser
+from profiling import Phase, Profiler
+from tokenizer import Tokenizer
+
+
+def with_comment_blocks(sources: Dict[str, str], lines_per_block: int) -> Dict[str, str]:
+    """
+    Returns the sources with every comment line repeated into a block of comment lines
+    """
+    blocks: Dict[str, str] = {}
+    for file_path, code in sources.items():
+        lines: List[str] = []
+        for line in code.split('\n'):
+            if line.lstrip().startswith('//'):
+                lines.extend([line] * lines_per_block)
+            else:
+                lines.append(line)
+        blocks[file_path] = '\n'.join(lines)
+    return blocks
+
+
+def main(files: int, blocks: List[int]) -> None:
+    """
+    Runs the benchmark for every comment block length
+    """
+    sources = generate_corpus(CorpusConfig(files=files, comment_density=0.5))
+    tokenizer = Tokenizer()
+    print(f'{"comment lines":>13} {"comments":>9} {"tokens":>8} {"lex ms":>8} {"parse ms":>9} {"parse us/ktoken":>16}')
+    for lines_per_block in blocks:
+        code = with_comment_blocks(sources, lines_per_block)
+        buffers = [tokenizer.tokenize_to_buffer(file_path, text) for file_path, text in code.items()]
+        tokens = sum(len(buffer) for buffer in buffers)
+        comments = sum(len(buffer.trivia()) for buffer in buffers)
+        best: Dict[Phase, float] = {}
+        for _ in range(3):
+            profiler = Profiler()
+            parser = Parser(SRC_FOLDER, CorpusReader(code), ModuleRegistry(), profiler=profiler)
+            with contextlib.redirect_stdout(io.StringIO()):
+                for file_path in code:
+                    parser.parse(file_path)
+            for phase in [Phase.LEX, Phase.PARSE]:
+                elapsed = sum(profile.timings.get(phase, 0) for profile in profiler.profiles) / 1e6
+                best[phase] = min(best.get(phase, elapsed), elapsed)
+        print(
+            f'{lines_per_block:>13} {comments:>9} {tokens:>8} {best[Phase.LEX]:>8.1f} '
+            f'{best[Phase.PARSE]:>9.1f} {best[Phase.PARSE] * 1e6 / tokens:>16.1f}'
+        )
+
+
+if __name__ == '__main__':
+    argument_parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    argument_parser.add_argument('--files', type=int, default=100)
+    argument_parser.add_argument('--blocks', default='0,1,10,100,1000')
+    arguments = argument_parser.parse_args()
+    main(arguments.files, [int(block) for block in arguments.blocks.split(',')])
@@ -0,0 +1,293 @@
+"""
+Virtual machine benchmark, runs the recursive binary search tree of the Builtin
+sample, building a tree from a sorted list and searching every item, and a
+recursive Fibonacci, once compiled to bytecode and once walking the method body
+nodes with a naive interpreter resolving every name and method on each use
+
+usage: python -m benchmarks.bench_vm [--items 1000,4000,16000] [--fib 20]
+"""
+import argparse
+import time
+
+from typing import Any, Callable, Dict, List
+
+from compiler import compile_modules
+from parser import FileReader, Node, Parser, Source
+from vm import BUILTIN_FUNCTIONS, VirtualMachine
+
+SOURCE = '''from Builtin require [EntryPoint]
+
+class TreeNode {
+    data: integer
+    left: TreeNode|null = null
+    right: TreeNode|null = null
+}
+
+class BinarySearchTree {
+    head: TreeNode|null = null
+
+    private process(items: List<integer>): TreeNode|null {
+        count: integer = len(items)
+        if count <= 0 {
+            return null
+        }
+        middle: integer = count / 2
+        parent: TreeNode = new TreeNode(data=items[middle])
+        parent.left = process(items[:middle])
+        parent.right = process(items[middle + 1:])
+        return parent
+    }
+
+    private search(currentNode: TreeNode|null, searchValue: integer): TreeNode|null {
+        if currentNode == null {
+            return null
+        }
+        if currentNode.data == searchValue {
+            return currentNode
+        }
+        if searchValue < currentNode.data {
+            return search(currentNode.left, searchValue)
+        } else {
+            return search(currentNode.right, searchValue)
+        }
+    }
+
+    find(item: integer): TreeNode|null {
+        return search(head, item)
+    }
+
+    sortedListToBST(items: List<integer>): void {
+        head = process(items)
+    }
+}
+
+class Main implements EntryPoint {
+    tree: BinarySearchTree
+
+    public run(args: List<integer>): integer {
+        tree = new BinarySearchTree()
+        tree.sortedListToBST(args)
+        found: integer = 0
+        for item in args {
+            if tree.find(item) != null && tree.find(item + 1) == null || item == -1 {
+                found = found + 1
+            }
+        }
+        return found
+    }
+
+    fib(n: integer): integer {
+        if n < 2 {
+            return n
+        }
+        return fib(n -1) + fib(n - 2)
+    }
+}
+'''
+
+
+class SourceReader(FileReader):
+    """
+    Reads the benchmark program for any file
+    """
+
+    def read(self, filename: str) -> Source:
+        return SOURCE
+
+
+class AstObject():
+    """
+    An instance of the naive interpreter, its fields by name
+    """
+
+    def __init__(self, class_node: Node) -> None:
+        self.class_node = class_node
+        self.fields: Dict[str, Any] = {}
+
+
+class _Return(Exception):
+    def __init__(self, value: Any) -> None:
+        super().__init__()
+        self.value = value
+
+
+class AstInterpreter():
+    """
+    Walks the method body nodes, the evaluator the virtual machine replaces: names
+    are looked up in a dictionary of variables then in the fields, and methods and
+    classes by scanning the class nodes on every call
+    """
+
+    def __init__(self, module: Node) -> None:
+        self._module = module
+
+    def _class(self, name: str) -> Node:
+        for child in self._module.children or []:
+            if child.name == 'class' and child.value == name.split('<')[0]:
+                return child
+        raise NameError(name)
+
+    def instantiate(self, name: str, keywords: Dict[str, Any]) -> AstObject:
+        """
+        Returns a new instance with its initial field values and the keyword arguments
+        """
+        instance = AstObject(self._class(name))
+        for child in instance.class_node.children or []:
+            if child.name == 'attribute':
+                values = [value.value for value in child.children or [] if value.name == 'value']
+                instance.fields[str(child.value)] = None if not values or values[0] == 'null' else values[0]
+        instance.fields.update(keywords)
+        return instance
+
+    def call(self, instance: AstObject, name: str, arguments: List[Any]) -> Any:
+        """
+        Runs a method of an instance and returns its result
+        """
+        for child in instance.class_node.children or []:
+            if child.name == 'method' and child.value == name:
+                variables: Dict[str, Any] = {}
+                for method_child in child.children or []:
+                    if method_child.name == 'parameters':
+                        for parameter, argument in zip(method_child.children or [], arguments):
+                            variables[str(parameter.value)] = argument
+                    elif method_child.name == 'body':
+                        try:
+                            self._block(method_child.children or [], variables, instance)
+                        except _Return as returned:
+                            return returned.value
+                return None
+        raise NameError(name)
+
+    def _block(self, statements: List[Node], variables: Dict[str, Any], this: AstObject) -> None:
+        for statement in statements:
+            children = statement.children or []
+            if statement.name == 'expression':
+                self._evaluate(children[0], variables, this)
+            elif statement.name == 'variable':
+                variables[str(statement.value)] = self._evaluate(children[1], variables, this) if len(children) > 1 else None
+            elif statement.name == 'assign':
+                value = self._evaluate(children[1], variables, this)
+                target = children[0]
+                if target.name == 'member':
+                    self._evaluate((target.children or [])[0], variables, this).fields[str(target.value)] = value
+                elif str(target.value) not in variables and str(target.value) in this.fields:
+                    this.fields[str(target.value)] = value
+                else:
+                    variables[str(target.value)] = value
+            elif statement.name == 'if':
+                if self._evaluate(children[0], variables, this):
+                    self._block(children[1].children or [], variables, this)
+                elif len(children) > 2:
+                    self._block(children[2].children or [], variables, this)
+            elif statement.name == 'for':
+                for item in self._evaluate(children[0], variables, this):
+                    variables[str(statement.value)] = item
+                    self._block(children[1].children or [], variables, this)
+            elif statement.name == 'return':
+                raise _Return(self._evaluate(children[0], variables, this) if children else None)
+
+    def _evaluate(self, node: Node, variables: Dict[str, Any], this: AstObject) -> Any:
+        children = node.children or []
+        if node.name == 'name':
+            if node.value in variables:
+                return variables[str(node.value)]
+            if node.value == 'this':
+                return this
+            if node.value in this.fields:
+                return this.fields[str(node.value)]
+            return BUILTIN_FUNCTIONS[str(node.value)]
+        if node.name in ('integer', 'decimal', 'string'):
+            return node.value
+        if node.name == 'null':
+            return None
+        if node.name == 'binary':
+            left = self._evaluate(children[0], variables, this)
+            if node.value == '&&':
+                return left and self._evaluate(children[1], variables, this)
+            if node.value == '||':
+                return left or self._evaluate(children[1], variables, this)
+            return BINARY[str(node.value)](left, self._evaluate(children[1], variables, this))
+        if node.name == 'member':
+            return self._evaluate(children[0], variables, this).fields[str(node.value)]
+        if node.name == 'index':
+            return self._evaluate(children[0], variables, this)[self._evaluate(children[1], variables, this)]
+        if node.name == 'slice':
+            bounds = {bound.name: self._evaluate((bound.children or [])[0], variables, this) for bound in children[1:]}
+            return self._evaluate(children[0], variables, this)[bounds.get('start'):bounds.get('end')]
+        if node.name == 'call':
+            arguments = [self._evaluate(child, variables, this) for child in children]
+            for child in this.class_node.children or []:
+                if child.name == 'method' and child.value == node.value:
+                    return self.call(this, str(node.value), arguments)
+            return BUILTIN_FUNCTIONS[str(node.value)](*arguments)
+        if node.name == 'invoke':
+            target = self._evaluate(children[0], variables, this)
+            return self.call(target, str(node.value), [self._evaluate(child, variables, this) for child in children[1:]])
+        if node.name == 'new':
+            keywords = {
+                str(child.value): self._evaluate((child.children or [])[0], variables, this)
+                for child in children if child.name == 'argument'
+            }
+            return self.instantiate(str(node.value), keywords)
+        raise ValueError(node.name)
+
+
+BINARY: Dict[str, Callable[[Any, Any], Any]] = {
+    '+': lambda left, right: left + right,
+    '-': lambda left, right: left - right,
+    '*': lambda left, right: left * right,
+    '/': lambda left, right: left // right,
+    '%': lambda left, right: left % right,
+    '==': lambda left, right: left == right,
+    '!=': lambda left, right: left != right,
+    '<': lambda left, right: left < right,
+    '<=': lambda left, right: left <= right,
+    '>': lambda left, right: left > right,
+    '>=': lambda left, right: left >= right,
+}
+
+
+def timed(function: Callable[[], Any]) -> tuple:
+    """
+    Returns the result of a function and the seconds it took
+    """
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+def main(sizes: List[int], fib: int) -> None:
+    """
+    Runs the benchmark for every tree size and the Fibonacci number
+    """
+    parser = Parser('bench', SourceReader(), follow_imports=False)
+    module = parser.parse('bst.purist')
+    assert module is not None
+    classes, compiled_in = timed(lambda: compile_modules({'bst.purist': module}))
+    instructions = sum(
+        len(code.code) // 2 for class_code in classes.values()
+        for code in list(class_code.methods.values()) + [class_code.constructor] if code is not None
+    )
+    print(f'compiled {instructions} instructions in {compiled_in * 1e3:.1f} ms')
+    machine = VirtualMachine(classes)
+    interpreter = AstInterpreter(module)
+
+    print(f'{"program":>12} {"ast ms":>9} {"vm ms":>9} {"speedup":>8}')
+    for items in sizes:
+        values = list(range(0, items * 2, 2))
+        found, ast_seconds = timed(lambda: interpreter.call(interpreter.instantiate('Main', {}), 'run', [values]))
+        vm_found, vm_seconds = timed(lambda: machine.run('bst.Main', values))
+        assert found == vm_found == items, (found, vm_found)
+        print(f'{f"bst {items}":>12} {ast_seconds * 1e3:>9.1f} {vm_seconds * 1e3:>9.1f} {ast_seconds / vm_seconds:>7.1f}x')
+    result, ast_seconds = timed(lambda: interpreter.call(interpreter.instantiate('Main', {}), 'fib', [fib]))
+    vm_result, vm_seconds = timed(lambda: machine.call(machine.instantiate('bst.Main'), 'fib', fib))
+    assert result == vm_result
+    print(f'{f"fib {fib}":>12} {ast_seconds * 1e3:>9.1f} {vm_seconds * 1e3:>9.1f} {ast_seconds / vm_seconds:>7.1f}x')
+
+
+if __name__ == '__main__':
+    argument_parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    argument_parser.add_argument('--items', default='1000,4000,16000')
+    argument_parser.add_argument('--fib', type=int, default=20)
+    arguments = argument_parser.parse_args()
+    main([int(size) for size in arguments.items.split(',')], arguments.fib)
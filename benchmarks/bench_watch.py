@@ -0,0 +1,46 @@
+"""
+Watch mode latency benchmark, measures the time from a single-file edit to the
+relinked module graph in a generated project
+
+usage: python -m benchmarks.bench_watch [module count]
+"""
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_project import write_project
+from watch import Watcher
+
+
+def main(module_count: int, edits: int = 20) -> None:
+    """
+    Edits a module in the middle of the import graph and times poll plus update
+    """
+    with tempfile.TemporaryDirectory() as folder:
+        write_project(folder, module_count)
+        watcher = Watcher(folder)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            watcher.start()
+        print(f'modules: {module_count}, start: {(time.perf_counter() - start) * 1000:.1f}ms')
+
+        edited = os.path.join(folder, f'module{module_count // 2}.purist')
+        with open(edited) as f:
+            code = f.read()
+        total = 0.0
+        affected = 0
+        for edit in range(edits):
+            with open(edited, 'w') as f:
+                f.write(code.replace('logging: Logger', f'logging{edit}: Logger'))
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                affected = len(watcher.update(watcher.poll()))
+            total += time.perf_counter() - start
+        print(f'edit: {total / edits * 1000:.1f}ms, {affected} modules relinked')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
@@ -0,0 +1,174 @@
+"""
+Injection wiring benchmark, plans the injections of a generated project and
+constructs every class with a simulated runtime, once resolving the injected
+attributes from the class nodes on every construction and once looking them up
+in the plan
+
+usage: python -m benchmarks.bench_wiring [--classes 1000,2000,4000,8000]
+"""
+import argparse
+import contextlib
+import io
+import random
+import time
+
+from typing import Any, Dict, List, Set
+
+from hierarchy import build_hierarchy
+from parser import Node, Parser
+from symbols import module_scope
+from wiring import STATELESS, Lifetime, WiringPlan, injected_type, plan_wiring
+
+CLASSES_PER_MODULE = 10
+ATTRIBUTES_PER_CLASS = 3
+STATELESS_RATIO = 0.8
+
+
+def module_of(index: int) -> str:
+    """
+    Returns the name of the module declaring the class of an index
+    """
+    return f'module{index // CLASSES_PER_MODULE}'
+
+
+def generate_project(classes: int, seed: int = 1) -> Dict[str, str]:
+    """
+    Returns the sources of a project where every class injects a Logger, classes
+    declared before it and a value it is not injected with
+    """
+    rng = random.Random(seed)
+    sources: Dict[str, str] = {}
+    for first in range(0, classes, CLASSES_PER_MODULE):
+        lines: List[str] = []
+        requires: Dict[str, Set[str]] = {'Builtin': {'Logger', 'Stateless'}}
+        for index in range(first, min(classes, first + CLASSES_PER_MODULE)):
+            dependencies = sorted({rng.randrange(index) for _ in range(ATTRIBUTES_PER_CLASS)}) if index else []
+            for dependency in dependencies:
+                if dependency < first:
+                    requires.setdefault(module_of(dependency), set()).add(f'C{dependency}')
+            stateless = ' implements Stateless' if rng.random() < STATELESS_RATIO else ''
+            lines.append(f'class C{index}{stateless} {{')
+            lines.append('    logging: Logger')
+            for dependency in dependencies:
+                lines.append(f'    service{dependency}: C{dependency}')
+            lines.append('    name: string = "service"')
+            lines.append('}')
+        imports = [f'from {module} require [{", ".join(sorted(names))}]' for module, names in sorted(requires.items())]
+        sources[f'{module_of(first)}.purist'] = '\n'.join(imports + lines) + '\n'
+    return sources
+
+
+class ReflectiveRuntime():
+    """
+    Constructs classes resolving their injected attributes from the class nodes on
+    every construction, the resolver the plan replaces
+    """
+
+    def __init__(self, modules: Dict[str, Node | None]) -> None:
+        self._hierarchy = build_hierarchy(modules)
+        self._classes: Dict[str, Node] = {}
+        self._scopes: Dict[str, Dict[str, str]] = {}
+        for file_path, node in modules.items():
+            if node is None:
+                continue
+            scope = module_scope(file_path, node)
+            for child in node.children or []:
+                if child.name == 'class':
+                    self._classes[scope[str(child.value)]] = child
+                    self._scopes[scope[str(child.value)]] = scope
+        self.singletons: Dict[str, Dict[str, Any]] = {}
+
+    def construct(self, name: str) -> Dict[str, Any]:
+        """
+        Returns a new instance, or the shared instance of a Stateless class
+        """
+        ancestors = self._hierarchy.ancestors(name)
+        stateless = any(stateless_name in ancestors for stateless_name in STATELESS)
+        if stateless and name in self.singletons:
+            return self.singletons[name]
+        instance: Dict[str, Any] = {}
+        for child in self._classes[name].children or []:
+            if child.name != 'attribute':
+                continue
+            dependency = injected_type(child, self._scopes[name])
+            if dependency is None:
+                continue
+            if dependency in self._classes:
+                instance[str(child.value)] = self.construct(dependency)
+            else:
+                instance[str(child.value)] = dependency
+        if stateless:
+            self.singletons[name] = instance
+        return instance
+
+
+class PlannedRuntime():
+    """
+    Constructs classes from the injection table of a plan
+    """
+
+    def __init__(self, plan: WiringPlan) -> None:
+        self._table = {
+            name: [(injection.attribute, injection.dependency, injection.lifetime) for injection in plan.injections(name)]
+            for name in plan.classes
+        }
+        self._lifetimes = {name: plan.lifetime(name) for name in plan.classes}
+        self.singletons: Dict[str, Dict[str, Any]] = {}
+        for name in plan.order:
+            if self._lifetimes[name] is Lifetime.SINGLETON:
+                self.singletons[name] = self._build(name)
+
+    def construct(self, name: str) -> Dict[str, Any]:
+        """
+        Returns a new instance, or the shared instance of a Stateless class
+        """
+        singleton = self.singletons.get(name)
+        return singleton if singleton is not None else self._build(name)
+
+    def _build(self, name: str) -> Dict[str, Any]:
+        instance: Dict[str, Any] = {}
+        for attribute, dependency, lifetime in self._table[name]:
+            if lifetime is Lifetime.EXTERNAL:
+                instance[attribute] = dependency
+            elif lifetime is Lifetime.SINGLETON:
+                instance[attribute] = self.singletons[dependency]
+            else:
+                instance[attribute] = self._build(dependency)
+        return instance
+
+
+def main(sizes: List[int]) -> None:
+    """
+    Runs the benchmark for every project size
+    """
+    print(f'{"classes":>8} {"plan ms":>8} {"reflective us":>14} {"planned us":>11}')
+    for classes in sizes:
+        parser = Parser('bench', None, follow_imports=False)
+        with contextlib.redirect_stdout(io.StringIO()):
+            modules = {
+                file_path: parser.parse_stream(file_path, io.StringIO(code))
+                for file_path, code in generate_project(classes).items()
+            }
+        start = time.perf_counter()
+        plan = plan_wiring(modules)
+        planned_in = time.perf_counter() - start
+        names = plan.classes
+        timings: List[float] = []
+        for runtime in [ReflectiveRuntime(modules), PlannedRuntime(plan)]:
+            for name in names:
+                runtime.construct(name)
+            start = time.perf_counter()
+            for name in names:
+                runtime.construct(name)
+            timings.append(time.perf_counter() - start)
+        print(
+            f'{len(names):>8} {planned_in * 1e3:>8.1f} {timings[0] * 1e6 / len(names):>14.2f} '
+            f'{timings[1] * 1e6 / len(names):>11.2f}'
+        )
+
+
+if __name__ == '__main__':
+    argument_parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    argument_parser.add_argument('--classes', default='1000,2000,4000,8000')
+    arguments = argument_parser.parse_args()
+    main([int(size) for size in arguments.classes.split(',')])
@@ -0,0 +1,188 @@
+"""
+Deterministic generator of synthetic purist projects for the benchmarks, the same
+configuration and seed always produce the same sources
+
+usage: python -m benchmarks.corpus <folder> [file count]
+"""
+import os
+import random
+import sys
+
+from typing import Any, Dict, List
+
+TYPES = ['integer', 'number', 'string', 'boolean', 'Logger', 'List<String>', 'string|null']
+WORDS = ['alpha', 'bravo', 'charlie', 'delta', 'echo', 'foxtrot', 'golf', 'hotel', 'india']
+
+
+class CorpusConfig():
+    """
+    Size and shape of a generated project
+    """
+
+    def __init__(
+            self,
+            files: int = 200,
+            classes_per_file: int = 2,
+            attributes_per_class: int = 6,
+            methods_per_class: int = 4,
+            statements_per_method: int = 6,
+            import_fan_out: int = 3,
+            import_depth: int = 4,
+            comment_density: float = 0.2,
+            string_density: float = 0.3,
+            seed: int = 1
+        ) -> None:
+        """
+        Args:
+            files: the number of modules
+            classes_per_file: the number of classes in every module
+            attributes_per_class: the number of attributes of every class
+            methods_per_class: the number of methods of every class, besides the constructor
+            statements_per_method: the number of statements in every method body
+            import_fan_out: the number of modules every module imports from the next level
+            import_depth: the number of levels modules are spread over, modules only
+                import from the level below their own so there are no cycles
+            comment_density: the chance of a comment before a member or statement
+            string_density: the chance of a statement using a string literal
+            seed: the random seed
+        """
+        self.files = files
+        self.classes_per_file = classes_per_file
+        self.attributes_per_class = attributes_per_class
+        self.methods_per_class = methods_per_class
+        self.statements_per_method = statements_per_method
+        self.import_fan_out = import_fan_out
+        self.import_depth = import_depth
+        self.comment_density = comment_density
+        self.string_density = string_density
+        self.seed = seed
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Returns the configuration as a JSON serializable dictionary
+        """
+        return dict(vars(self))
+
+
+def module_path(level: int, index: int) -> str:
+    """
+    Returns the path of a generated module relative to the source folder
+    """
+    return f'level{level}/module{index}.purist'
+
+
+def _class_name(index: int, position: int) -> str:
+    return f'Module{index}Class{position}'
+
+
+def _modules_by_level(config: CorpusConfig) -> List[List[int]]:
+    depth = max(1, config.import_depth)
+    levels: List[List[int]] = [[] for _ in range(depth)]
+    for index in range(config.files):
+        levels[index % depth].append(index)
+    return levels
+
+
+def _comment(rng: random.Random, config: CorpusConfig, indent: str, lines: List[str]) -> None:
+    if rng.random() < config.comment_density:
+        lines.append(f'{indent}// {" ".join(rng.choices(WORDS, k=6))}')
+
+
+def _statement(rng: random.Random, config: CorpusConfig, position: int) -> str:
+    if rng.random() < config.string_density:
+        return f'logging.info("{" ".join(rng.choices(WORDS, k=5))} {position}")'
+    if position % 3 == 0:
+        return f'value{position}: integer = {rng.randint(-1000, 1000)}'
+    if position % 3 == 1:
+        return f'ratio{position}: number = {rng.randint(0, 1000) / 8}'
+    return f'if value{position - 2} > ratio{position - 1} {{ this.counter0 = {position} }}'
+
+
+def _module(
+        rng: random.Random,
+        config: CorpusConfig,
+        index: int,
+        imports: List[int],
+        levels: Dict[int, int]
+    ) -> str:
+    lines: List[str] = ['from Builtin require [Logger, Generated]']
+    for imported in imports:
+        module = module_path(levels[imported], imported)[:-7].replace('/', '.')
+        lines.append(f'from {module} require [{_class_name(imported, 0)}]')
+    lines.append('')
+    for position in range(config.classes_per_file):
+        _comment(rng, config, '', lines)
+        header = f'class {_class_name(index, position)}'
+        if imports:
+            header = f'{header} extends {_class_name(imports[position % len(imports)], 0)}'
+        lines.append(f'{header} implements Generated {{')
+        lines.append('    logging: Logger')
+        for attribute in range(config.attributes_per_class):
+            _comment(rng, config, '    ', lines)
+            attribute_type = TYPES[attribute % len(TYPES)]
+            lines.append(f'    counter{attribute}: {attribute_type}')
+        lines.append('')
+        lines.append('    constructor(logging: Logger) {')
+        lines.append('        this.logging = logging')
+        lines.append('    }')
+        for method in range(config.methods_per_class):
+            lines.append('')
+            _comment(rng, config, '    ', lines)
+            visibility = 'public ' if method % 2 == 0 else ''
+            lines.append(f'    {visibility}process{method}(name: string, count: integer): integer {{')
+            for statement in range(config.statements_per_method):
+                _comment(rng, config, '        ', lines)
+                lines.append(f'        {_statement(rng, config, statement)}')
+            lines.append(f'        return {method}')
+            lines.append('    }')
+        lines.append('}')
+        lines.append('')
+    return '\n'.join(lines)
+
+
+def generate_corpus(config: CorpusConfig) -> Dict[str, str]:
+    """
+    Generates the sources of a project
+
+    Args:
+        config: the size and shape of the project
+
+    Returns:
+        Dict[str, str]: the module sources by module path relative to the source folder
+    """
+    rng = random.Random(config.seed)
+    by_level = _modules_by_level(config)
+    levels = {index: level for level, indexes in enumerate(by_level) for index in indexes}
+    sources: Dict[str, str] = {}
+    for index in range(config.files):
+        level = levels[index]
+        candidates = by_level[level + 1] if level + 1 < len(by_level) else []
+        fan_out = min(config.import_fan_out, len(candidates))
+        imports = rng.sample(candidates, fan_out)
+        sources[module_path(level, index)] = _module(rng, config, index, imports, levels)
+    return sources
+
+
+def write_corpus(folder: str, config: CorpusConfig) -> Dict[str, str]:
+    """
+    Generates a project and writes it to a source folder
+
+    Args:
+        folder: the source folder
+        config: the size and shape of the project
+
+    Returns:
+        Dict[str, str]: the module sources by module path relative to the source folder
+    """
+    sources = generate_corpus(config)
+    for file_path, code in sources.items():
+        full_path = os.path.join(folder, file_path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, 'w') as f:
+            f.write(code)
+    return sources
+
+
+if __name__ == '__main__':
+    written = write_corpus(sys.argv[1], CorpusConfig(files=int(sys.argv[2]) if len(sys.argv) > 2 else 200))
+    print(f'{len(written)} modules, {sum(len(code) for code in written.values())} characters')
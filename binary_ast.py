@@ -0,0 +1,331 @@
+"""
+Compact binary AST format, a string table followed by flat node records which can
+be memory-mapped and walked lazily without deserializing the whole tree
+
+Layout, all integers little endian:
+    header: magic, version, string count, node count, module count and the
+        offsets of the node and module sections
+    string table: string count + 1 offsets into the UTF-8 string data, then the data
+    node records: name string, value kind, 8 value bytes, first child, child count,
+        the children of a node are stored next to each other
+    module records: module path string and root node, NO_NODE for invalid modules
+"""
+import mmap
+import struct
+
+from collections import deque
+from typing import BinaryIO, Deque, Dict, List, Tuple
+
+from parser import Node
+
+MAGIC = b'PAST'
+FORMAT_VERSION = 1
+NO_NODE = 0xFFFFFFFF
+
+HEADER = struct.Struct('<4sHHIIIII')
+OFFSET = struct.Struct('<I')
+NODE = struct.Struct('<IB3x8sII')
+MODULE = struct.Struct('<II')
+INTEGER = struct.Struct('<q')
+FLOAT = struct.Struct('<d')
+INDEX = struct.Struct('<Q')
+
+VALUE_NONE = 0
+VALUE_STRING = 1
+VALUE_INTEGER = 2
+VALUE_FLOAT = 3
+VALUE_BIG_INTEGER = 4
+# the record stands for a node already written elsewhere, shared by linked modules
+VALUE_REFERENCE = 5
+
+EMPTY_VALUE = bytes(8)
+
+
+class _StringTable():
+    """
+    Interns the strings of the written nodes
+    """
+
+    def __init__(self) -> None:
+        self.indexes: Dict[str, int] = {}
+        self.strings: List[str] = []
+
+    def add(self, text: str) -> int:
+        index = self.indexes.get(text)
+        if index is None:
+            index = len(self.strings)
+            self.indexes[text] = index
+            self.strings.append(text)
+        return index
+
+
+def _encode_value(strings: _StringTable, value: str | int | float | None) -> Tuple[int, bytes]:
+    if value is None:
+        return VALUE_NONE, EMPTY_VALUE
+    if isinstance(value, str):
+        return VALUE_STRING, INDEX.pack(strings.add(value))
+    if isinstance(value, float):
+        return VALUE_FLOAT, FLOAT.pack(value)
+    if -2 ** 63 <= value < 2 ** 63:
+        return VALUE_INTEGER, INTEGER.pack(value)
+    return VALUE_BIG_INTEGER, INDEX.pack(strings.add(str(value)))
+
+
+def write_binary(stream: BinaryIO, modules: Dict[str, Node | None]) -> None:
+    """
+    Writes module ASTs in the binary format, nodes shared between modules, such as
+    imported modules in linked ASTs, are written once
+
+    Args:
+        stream: the binary stream to write to
+        modules: the module ASTs by module path, None for invalid modules
+    """
+    strings = _StringTable()
+    records: List[bytes] = []
+    written: Dict[int, int] = {}
+    module_records: List[bytes] = []
+    for module, root in modules.items():
+        if root is None:
+            module_records.append(MODULE.pack(strings.add(module), NO_NODE))
+            continue
+        if id(root) in written:
+            module_records.append(MODULE.pack(strings.add(module), written[id(root)]))
+            continue
+        written[id(root)] = len(records)
+        module_records.append(MODULE.pack(strings.add(module), len(records)))
+        records.append(b'')
+        # breadth first, so the children of every node get consecutive records
+        queue: Deque[Tuple[Node, int]] = deque([(root, written[id(root)])])
+        while queue:
+            node, index = queue.popleft()
+            children = node.children or []
+            first_child = len(records)
+            for child in children:
+                target = written.get(id(child))
+                if target is not None:
+                    records.append(NODE.pack(0, VALUE_REFERENCE, INDEX.pack(target), 0, 0))
+                    continue
+                written[id(child)] = len(records)
+                records.append(b'')
+                queue.append((child, len(records) - 1))
+            kind, value = _encode_value(strings, node.value)
+            records[index] = NODE.pack(strings.add(node.name), kind, value, first_child, len(children))
+
+    encoded = [text.encode('utf-8') for text in strings.strings]
+    offsets = [0]
+    for data in encoded:
+        offsets.append(offsets[-1] + len(data))
+    nodes_offset = HEADER.size + OFFSET.size * len(offsets) + offsets[-1]
+    modules_offset = nodes_offset + NODE.size * len(records)
+    stream.write(HEADER.pack(
+        MAGIC,
+        FORMAT_VERSION,
+        0,
+        len(encoded),
+        len(records),
+        len(module_records),
+        nodes_offset,
+        modules_offset
+    ))
+    stream.write(struct.pack(f'<{len(offsets)}I', *offsets))
+    stream.write(b''.join(encoded))
+    stream.write(b''.join(records))
+    stream.write(b''.join(module_records))
+
+
+class NodeView():
+    """
+    Read only view of a node record, the name, value and children are only decoded
+    when accessed
+    """
+
+    def __init__(self, ast: 'BinaryAst', index: int) -> None:
+        self._ast = ast
+        self._index = index
+
+    @property
+    def name(self) -> str:
+        """
+        Returns the name of the node
+        """
+        return self._ast._node_name(self._index)
+
+    @property
+    def value(self) -> str | int | float | None:
+        """
+        Returns the value of the node
+        """
+        return self._ast._node_value(self._index)
+
+    @property
+    def child_count(self) -> int:
+        """
+        Returns the number of children of the node
+        """
+        return self._ast._node_children(self._index)[1]
+
+    @property
+    def children(self) -> 'List[NodeView] | None':
+        """
+        Returns views of the children of the node, None when it has none
+        """
+        first_child, child_count = self._ast._node_children(self._index)
+        if child_count == 0:
+            return None
+        return [self._ast._view(first_child + position) for position in range(child_count)]
+
+    def to_node(self) -> Node:
+        """
+        Deserializes the node and all of its descendants
+        """
+        return self._ast._to_node(self._index)
+
+
+class BinaryAst():
+    """
+    Memory-mapped binary AST file, modules are looked up by path and their nodes are
+    decoded on access
+    """
+
+    def __init__(self, file_path: str) -> None:
+        """
+        Args:
+            file_path: the path of a file written by write_binary
+
+        Raises:
+            ValueError: when the file is not a binary AST of a supported version
+        """
+        with open(file_path, 'rb') as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._data) < HEADER.size:
+            self._data.close()
+            raise ValueError(f'not a binary AST file: {file_path}')
+        (
+            magic,
+            version,
+            _,
+            self._string_count,
+            self._node_count,
+            module_count,
+            self._nodes_offset,
+            modules_offset
+        ) = HEADER.unpack_from(self._data, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self._data.close()
+            raise ValueError(f'not a binary AST file: {file_path}')
+        self._strings_offset = HEADER.size + OFFSET.size * (self._string_count + 1)
+        self._strings: Dict[int, str] = {}
+        self._modules: Dict[str, int] = {}
+        for position in range(module_count):
+            name, root = MODULE.unpack_from(self._data, modules_offset + MODULE.size * position)
+            self._modules[self._string(name)] = root
+
+    def __enter__(self) -> 'BinaryAst':
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Unmaps the file
+        """
+        self._data.close()
+
+    @property
+    def modules(self) -> List[str]:
+        """
+        Returns the module paths in the file
+        """
+        return list(self._modules)
+
+    @property
+    def node_count(self) -> int:
+        """
+        Returns the number of node records in the file
+        """
+        return self._node_count
+
+    def root(self, module: str) -> NodeView | None:
+        """
+        Returns the root node of a module, None for invalid modules
+
+        Args:
+            module: the module path
+
+        Raises:
+            KeyError: when the module is not in the file
+        """
+        root = self._modules[module]
+        if root == NO_NODE:
+            return None
+        return NodeView(self, root)
+
+    def _string(self, index: int) -> str:
+        text = self._strings.get(index)
+        if text is None:
+            start, end = struct.unpack_from('<2I', self._data, HEADER.size + OFFSET.size * index)
+            offset = self._strings_offset
+            text = self._data[offset + start:offset + end].decode('utf-8')
+            self._strings[index] = text
+        return text
+
+    def _record(self, index: int) -> Tuple[int, int, bytes, int, int]:
+        record = NODE.unpack_from(self._data, self._nodes_offset + NODE.size * index)
+        if record[1] == VALUE_REFERENCE:
+            return self._record(INDEX.unpack(record[2])[0])
+        return record
+
+    def _view(self, index: int) -> NodeView:
+        record = NODE.unpack_from(self._data, self._nodes_offset + NODE.size * index)
+        if record[1] == VALUE_REFERENCE:
+            index = INDEX.unpack(record[2])[0]
+        return NodeView(self, index)
+
+    def _node_name(self, index: int) -> str:
+        return self._string(self._record(index)[0])
+
+    def _decode_value(self, kind: int, value: bytes) -> str | int | float | None:
+        if kind == VALUE_STRING:
+            return self._string(INDEX.unpack(value)[0])
+        if kind == VALUE_INTEGER:
+            return INTEGER.unpack(value)[0]
+        if kind == VALUE_FLOAT:
+            return FLOAT.unpack(value)[0]
+        if kind == VALUE_BIG_INTEGER:
+            return int(self._string(INDEX.unpack(value)[0]))
+        return None
+
+    def _node_value(self, index: int) -> str | int | float | None:
+        record = self._record(index)
+        return self._decode_value(record[1], record[2])
+
+    def _node_children(self, index: int) -> Tuple[int, int]:
+        record = self._record(index)
+        return record[3], record[4]
+
+    def _to_node(self, index: int) -> Node:
+        nodes: Dict[int, Node] = {}
+        root: Node | None = None
+        stack: List[Tuple[int, Node | None]] = [(index, None)]
+        while stack:
+            position, parent = stack.pop()
+            record = NODE.unpack_from(self._data, self._nodes_offset + NODE.size * position)
+            if record[1] == VALUE_REFERENCE:
+                position = INDEX.unpack(record[2])[0]
+                record = self._record(position)
+            node = nodes.get(position)
+            shared = node is not None
+            if node is None:
+                node = Node(self._string(record[0]), self._decode_value(record[1], record[2]))
+                nodes[position] = node
+            if parent is None:
+                root = node
+            else:
+                parent.add_child(node)
+            if not shared:
+                first_child, child_count = record[3], record[4]
+                for child in range(first_child + child_count - 1, first_child - 1, -1):
+                    stack.append((child, node))
+        assert root is not None
+        return root
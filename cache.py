@@ -0,0 +1,170 @@
+"""
+Persistent AST cache, parsed modules are stored on disk keyed by a hash of their
+source code so unchanged modules are not tokenized and parsed again
+"""
+import hashlib
+import marshal
+import os
+import re
+import shutil
+import tempfile
+
+from os.path import join as path
+from mmap import mmap
+from typing import List, Tuple
+
+CACHE_EXTENSION = '.ast'
+MAX_ENTRIES = 4096
+# the folder names AstCache gives the entries of a parser version, see AstCache.__init__
+VERSION_FOLDER_PATTERN = re.compile(r'[0-9A-Za-z._]+-m[0-9]+')
+
+CompactNode = Tuple[str, str | int | float | None, 'Tuple[CompactNode, ...] | None']
+
+
+class AstCache():
+    """
+    Content addressed store of compact ASTs, every parser version writes to its own
+    folder and entries are published with an atomic rename so concurrent writers
+    never expose a partially written entry
+    """
+
+    def __init__(self, folder: str, version: str, max_entries: int = MAX_ENTRIES) -> None:
+        """
+        Args:
+            folder: the cache folder, created on the first write
+            version: the parser version stamp, entries of other versions are never read
+            max_entries: the number of entries kept by prune
+        """
+        self._folder = folder
+        self._version = f'{version}-m{marshal.version}'
+        self._entries_folder = path(folder, self._version)
+        self._max_entries = max_entries
+
+    @property
+    def folder(self) -> str:
+        """
+        Returns the folder holding the entries of the current parser version
+        """
+        return self._entries_folder
+
+    def key(self, file_path: str, source: str | bytes | mmap) -> str:
+        """
+        Returns the cache key of a module, the module path is part of the key
+        because the root node is named after it
+
+        Args:
+            file_path: the module path relative to the source folder
+            source: the source code of the module, or its UTF-8 encoded bytes
+        """
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(file_path.encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(source.encode('utf-8') if isinstance(source, str) else source)
+        return digest.hexdigest()
+
+    def load(self, key: str) -> CompactNode | None:
+        """
+        Returns the cached AST, None on a cache miss or an unreadable entry, a hit
+        touches the entry so prune evicts the least recently used entries
+
+        Args:
+            key: the cache key returned by key
+        """
+        entry_path = path(self._entries_folder, key + CACHE_EXTENSION)
+        try:
+            with open(entry_path, 'rb') as f:
+                compact_node = marshal.loads(f.read())
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        if not isinstance(compact_node, tuple) or len(compact_node) != 3:
+            return None
+        # the access time is not kept up to date on most file systems
+        try:
+            os.utime(entry_path)
+        except OSError:
+            pass
+        return compact_node
+
+    def store(self, key: str, compact_node: CompactNode) -> None:
+        """
+        Writes an AST to the cache, failures are ignored as the cache is only an
+        optimisation
+
+        Args:
+            key: the cache key returned by key
+            compact_node: the AST as nested tuples
+        """
+        try:
+            os.makedirs(self._entries_folder, exist_ok=True)
+            descriptor, temporary_path = tempfile.mkstemp(
+                prefix=f'.{key}.',
+                suffix='.tmp',
+                dir=self._entries_folder
+            )
+        except OSError:
+            return
+        try:
+            with os.fdopen(descriptor, 'wb') as f:
+                f.write(marshal.dumps(compact_node))
+            os.replace(temporary_path, path(self._entries_folder, key + CACHE_EXTENSION))
+        except (OSError, ValueError):
+            try:
+                os.remove(temporary_path)
+            except OSError:
+                pass
+
+    def prune(self) -> int:
+        """
+        Evicts stale entries, the folders of other parser versions are removed and
+        the least recently used entries are removed once there are more than
+        max_entries. Only folders named like a version folder and holding nothing but
+        cache entries are removed, so pointing the cache at another folder never
+        deletes its files
+
+        Returns:
+            int: the number of evicted entries
+        """
+        evicted = 0
+        try:
+            versions = os.listdir(self._folder)
+        except OSError:
+            return evicted
+        for version in versions:
+            version_folder = path(self._folder, version)
+            if version == self._version or not VERSION_FOLDER_PATTERN.fullmatch(version):
+                continue
+            try:
+                with os.scandir(version_folder) as scan:
+                    stale = list(scan)
+            except OSError:
+                continue
+            if not all(entry.is_file(follow_symlinks=False) and _is_cache_file(entry.name) for entry in stale):
+                continue
+            evicted += len(stale)
+            shutil.rmtree(version_folder, ignore_errors=True)
+        entries: List[Tuple[float, str]] = []
+        try:
+            with os.scandir(self._entries_folder) as scan:
+                for entry in scan:
+                    if entry.name.endswith(CACHE_EXTENSION):
+                        try:
+                            entries.append((entry.stat().st_mtime, entry.path))
+                        except OSError:
+                            pass
+        except OSError:
+            return evicted
+        if len(entries) <= self._max_entries:
+            return evicted
+        entries.sort()
+        for _, entry_path in entries[:len(entries) - self._max_entries]:
+            try:
+                os.remove(entry_path)
+                evicted += 1
+            except OSError:
+                pass
+        return evicted
+
+
+def _is_cache_file(name: str) -> bool:
+    # an entry, or a temporary file store left behind
+    return name.endswith(CACHE_EXTENSION) or name.startswith('.') and name.endswith('.tmp')
@@ -0,0 +1,505 @@
+"""
+Bytecode compiler, compiles the method bodies of parsed modules into compact code
+objects the virtual machine executes, see vm.py. Names are resolved once at compile
+time: parameters and variables to local slots, attributes to field loads on this and
+literals to a constant pool, so executing a method walks a flat array of integers
+instead of the nodes of its body
+"""
+from array import array
+from enum import IntEnum
+from typing import Any, Dict, List, Set, Tuple
+
+from hierarchy import TypeHierarchy, build_hierarchy
+from parser import Node
+from symbols import module_scope, qualify_type
+
+# a call site constant: the method, function or class name, the number of
+# positional arguments and the names of the keyword arguments following them
+CallSite = Tuple[str, int, Tuple[str, ...]]
+
+
+class Opcode(IntEnum):
+    """
+    The instructions of the virtual machine, every instruction is an opcode and
+    one integer argument, unused by the instructions without one
+    """
+    # push the constant at the argument index of the constant pool
+    LOAD_CONST = 0
+    # push or pop the local slot of the argument
+    LOAD_LOCAL = 1
+    STORE_LOCAL = 2
+    # push the instance the method runs on
+    LOAD_THIS = 3
+    # replace the instance on the stack with its field named by the constant of the argument
+    LOAD_FIELD = 4
+    # pop a value and an instance, set the field named by the constant of the argument
+    STORE_FIELD = 5
+    # push the function or service named by the constant of the argument
+    LOAD_GLOBAL = 6
+    POP = 7
+    ADD = 8
+    SUBTRACT = 9
+    MULTIPLY = 10
+    DIVIDE = 11
+    MODULO = 12
+    EQUAL = 13
+    NOT_EQUAL = 14
+    LESS = 15
+    LESS_EQUAL = 16
+    GREATER = 17
+    GREATER_EQUAL = 18
+    NEGATE = 19
+    NOT = 20
+    # continue at the instruction of the argument
+    JUMP = 21
+    # pop a value, continue at the argument when it is false
+    JUMP_IF_FALSE = 22
+    # keep the value and continue at the argument when it decides a && or ||, pop it otherwise
+    JUMP_IF_FALSE_OR_POP = 23
+    JUMP_IF_TRUE_OR_POP = 24
+    # pop an index and a value, push the item
+    INDEX = 25
+    # pop a value, the index and the value, set the item
+    STORE_INDEX = 26
+    # pop the bounds present in the argument, 1 the start and 2 the end, and a value, push the slice
+    SLICE = 27
+    # call a method of this, a builtin function, a method of a popped object or the
+    # constructor of the superclass with the call site constant of the argument
+    CALL_SELF = 28
+    CALL_FUNCTION = 29
+    INVOKE = 30
+    CALL_SUPER = 31
+    # construct the class of the call site constant of the argument
+    NEW = 32
+    # replace the value on the stack with an iterator over it
+    GET_ITER = 33
+    # push the next item of the iterator on the stack, pop it and continue at the argument when exhausted
+    FOR_ITER = 34
+    RETURN = 35
+
+
+BINARY_OPCODES: Dict[str, Opcode] = {
+    '+': Opcode.ADD,
+    '-': Opcode.SUBTRACT,
+    '*': Opcode.MULTIPLY,
+    '/': Opcode.DIVIDE,
+    '%': Opcode.MODULO,
+    '==': Opcode.EQUAL,
+    '!=': Opcode.NOT_EQUAL,
+    '<': Opcode.LESS,
+    '<=': Opcode.LESS_EQUAL,
+    '>': Opcode.GREATER,
+    '>=': Opcode.GREATER_EQUAL,
+}
+
+
+class CodeObject():
+    """
+    The compiled body of a method or constructor
+    """
+
+    def __init__(
+            self,
+            name: str,
+            owner: str,
+            parameters: int,
+            local_names: List[str],
+            code: array,
+            constants: List[Any]
+        ) -> None:
+        """
+        Args:
+            name: the method name, 'constructor' for constructors
+            owner: the fully qualified name of the declaring class
+            parameters: the number of parameters, held by the first local slots
+            local_names: the parameter and variable name of every local slot
+            code: the opcode and argument of every instruction
+            constants: the constant pool, literals, names and call sites
+        """
+        self.name = name
+        self.owner = owner
+        self.parameters = parameters
+        self.local_names = local_names
+        self.code = code
+        self.constants = constants
+
+    @property
+    def locals(self) -> int:
+        """
+        Returns the number of local slots
+        """
+        return len(self.local_names)
+
+    def disassemble(self) -> str:
+        """
+        Returns the instructions one per line with their resolved argument
+        """
+        lines: List[str] = []
+        for offset in range(0, len(self.code), 2):
+            opcode = Opcode(self.code[offset])
+            argument = self.code[offset + 1]
+            if opcode in (Opcode.LOAD_LOCAL, Opcode.STORE_LOCAL):
+                detail = f' ({self.local_names[argument]})'
+            elif opcode in (
+                    Opcode.LOAD_CONST, Opcode.LOAD_FIELD, Opcode.STORE_FIELD, Opcode.LOAD_GLOBAL, Opcode.CALL_SELF,
+                    Opcode.CALL_FUNCTION, Opcode.INVOKE, Opcode.CALL_SUPER, Opcode.NEW
+                ):
+                detail = f' ({self.constants[argument]!r})'
+            else:
+                detail = ''
+            lines.append(f'{offset:>4} {opcode.name:<20} {argument}{detail}')
+        return '\n'.join(lines)
+
+
+class ClassCode():
+    """
+    The compiled methods of a class with its fields and their initial values
+    """
+
+    def __init__(
+            self,
+            name: str,
+            superclass: str | None,
+            fields: Dict[str, Any],
+            methods: Dict[str, CodeObject],
+            constructor: CodeObject | None
+        ) -> None:
+        """
+        Args:
+            name: the fully qualified name
+            superclass: the fully qualified name of the class it extends
+            fields: the declared attributes with their initial value, None without one
+            methods: the compiled methods by name
+            constructor: the compiled constructor, None when the class declares none
+        """
+        self.name = name
+        self.superclass = superclass
+        self.fields = fields
+        self.methods = methods
+        self.constructor = constructor
+
+
+def literal(text: str) -> Any:
+    """
+    Returns the value of an attribute initializer as kept by the AST
+    """
+    if len(text) >= 2 and text[0] == text[-1] == '"':
+        return text[1:-1].replace('\\"', '"')
+    if text in ('true', 'false'):
+        return text == 'true'
+    if text == 'null':
+        return None
+    for convert in (int, float):
+        try:
+            return convert(text)
+        except ValueError:
+            pass
+    return text
+
+
+class _MethodCompiler():
+    """
+    Compiles one method body, holds its instructions, constants and local slots
+    """
+
+    def __init__(self, name: str, owner: str, scope: Dict[str, str], fields: Set[str], methods: Set[str]) -> None:
+        self._name = name
+        self._owner = owner
+        self._scope = scope
+        self._fields = fields
+        self._methods = methods
+        self._code = array('i')
+        self._constants: List[Any] = []
+        # constants by type and value, True and 1 are different constants
+        self._constant_indexes: Dict[Tuple[type, Any], int] = {}
+        self._slots: Dict[str, int] = {}
+
+    def compile(self, parameters: List[str], body: List[Node]) -> CodeObject:
+        for parameter in parameters:
+            self._slot(parameter)
+        for statement in body:
+            self._statement(statement)
+        self._emit(Opcode.LOAD_CONST, self._constant(None))
+        self._emit(Opcode.RETURN)
+        return CodeObject(self._name, self._owner, len(parameters), list(self._slots), self._code, self._constants)
+
+    def _emit(self, opcode: Opcode, argument: int = 0) -> int:
+        self._code.append(opcode)
+        self._code.append(argument)
+        return len(self._code) - 2
+
+    def _patch(self, offset: int) -> None:
+        # jumps to the next instruction emitted
+        self._code[offset + 1] = len(self._code)
+
+    def _constant(self, value: Any) -> int:
+        key = (type(value), value)
+        index = self._constant_indexes.get(key)
+        if index is None:
+            index = self._constant_indexes[key] = len(self._constants)
+            self._constants.append(value)
+        return index
+
+    def _slot(self, name: str) -> int:
+        slot = self._slots.get(name)
+        if slot is None:
+            slot = self._slots[name] = len(self._slots)
+        return slot
+
+    def _statement(self, node: Node) -> None:
+        children = node.children or []
+        if node.name == 'expression':
+            self._expression(children[0])
+            self._emit(Opcode.POP)
+        elif node.name == 'variable':
+            # variables live in the method, a declaration in a loop resets them
+            if len(children) > 1:
+                self._expression(children[1])
+            else:
+                self._emit(Opcode.LOAD_CONST, self._constant(None))
+            self._emit(Opcode.STORE_LOCAL, self._slot(str(node.value)))
+        elif node.name == 'assign':
+            self._assign(children[0], children[1])
+        elif node.name == 'if':
+            self._expression(children[0])
+            jump = self._emit(Opcode.JUMP_IF_FALSE)
+            self._block(children[1])
+            if len(children) > 2:
+                end = self._emit(Opcode.JUMP)
+                self._patch(jump)
+                self._block(children[2])
+                self._patch(end)
+            else:
+                self._patch(jump)
+        elif node.name == 'while':
+            start = len(self._code)
+            self._expression(children[0])
+            jump = self._emit(Opcode.JUMP_IF_FALSE)
+            self._block(children[1])
+            self._emit(Opcode.JUMP, start)
+            self._patch(jump)
+        elif node.name == 'for':
+            self._expression(children[0])
+            self._emit(Opcode.GET_ITER)
+            start = self._emit(Opcode.FOR_ITER)
+            self._emit(Opcode.STORE_LOCAL, self._slot(str(node.value)))
+            self._block(children[1])
+            self._emit(Opcode.JUMP, start)
+            self._patch(start)
+        elif node.name == 'return':
+            if children:
+                self._expression(children[0])
+            else:
+                self._emit(Opcode.LOAD_CONST, self._constant(None))
+            self._emit(Opcode.RETURN)
+        else:
+            raise ValueError(f'unknown statement: {node.name}')
+
+    def _block(self, node: Node) -> None:
+        for statement in node.children or []:
+            self._statement(statement)
+
+    def _assign(self, target: Node, value: Node) -> None:
+        target_children = target.children or []
+        if target.name == 'name':
+            name = str(target.value)
+            if name not in self._slots and name in self._fields:
+                self._emit(Opcode.LOAD_THIS)
+                self._expression(value)
+                self._emit(Opcode.STORE_FIELD, self._constant(name))
+            else:
+                # assigning an undeclared name declares a variable
+                self._expression(value)
+                self._emit(Opcode.STORE_LOCAL, self._slot(name))
+        elif target.name == 'member':
+            self._expression(target_children[0])
+            self._expression(value)
+            self._emit(Opcode.STORE_FIELD, self._constant(str(target.value)))
+        else:
+            self._expression(target_children[0])
+            self._expression(target_children[1])
+            self._expression(value)
+            self._emit(Opcode.STORE_INDEX)
+
+    def _expression(self, node: Node) -> None:
+        children = node.children or []
+        if node.name == 'name':
+            name = str(node.value)
+            slot = self._slots.get(name)
+            if slot is not None:
+                self._emit(Opcode.LOAD_LOCAL, slot)
+            elif name == 'this':
+                self._emit(Opcode.LOAD_THIS)
+            elif name in self._fields:
+                self._emit(Opcode.LOAD_THIS)
+                self._emit(Opcode.LOAD_FIELD, self._constant(name))
+            else:
+                self._emit(Opcode.LOAD_GLOBAL, self._constant(name))
+        elif node.name in ('integer', 'decimal', 'string'):
+            self._emit(Opcode.LOAD_CONST, self._constant(node.value))
+        elif node.name == 'boolean':
+            self._emit(Opcode.LOAD_CONST, self._constant(node.value == 'true'))
+        elif node.name == 'null':
+            self._emit(Opcode.LOAD_CONST, self._constant(None))
+        elif node.name == 'binary':
+            self._expression(children[0])
+            if node.value == '&&' or node.value == '||':
+                jump = self._emit(Opcode.JUMP_IF_FALSE_OR_POP if node.value == '&&' else Opcode.JUMP_IF_TRUE_OR_POP)
+                self._expression(children[1])
+                self._patch(jump)
+            else:
+                self._expression(children[1])
+                self._emit(BINARY_OPCODES[str(node.value)])
+        elif node.name == 'unary':
+            self._expression(children[0])
+            self._emit(Opcode.NEGATE if node.value == '-' else Opcode.NOT)
+        elif node.name == 'member':
+            self._expression(children[0])
+            self._emit(Opcode.LOAD_FIELD, self._constant(str(node.value)))
+        elif node.name == 'index':
+            self._expression(children[0])
+            self._expression(children[1])
+            self._emit(Opcode.INDEX)
+        elif node.name == 'slice':
+            self._expression(children[0])
+            bounds = 0
+            for bound in children[1:]:
+                self._expression((bound.children or [])[0])
+                bounds |= 1 if bound.name == 'start' else 2
+            self._emit(Opcode.SLICE, bounds)
+        elif node.name == 'call':
+            name = str(node.value)
+            site = self._arguments(name, children)
+            if name == 'super':
+                self._emit(Opcode.CALL_SUPER, site)
+            elif name in self._methods:
+                self._emit(Opcode.CALL_SELF, site)
+            else:
+                self._emit(Opcode.CALL_FUNCTION, site)
+        elif node.name == 'invoke':
+            self._expression(children[0])
+            self._emit(Opcode.INVOKE, self._arguments(str(node.value), children[1:]))
+        elif node.name == 'new':
+            class_name = qualify_type(str(node.value).split('<')[0], self._scope)
+            self._emit(Opcode.NEW, self._arguments(class_name, children))
+        else:
+            raise ValueError(f'unknown expression: {node.name}')
+
+    def _arguments(self, name: str, arguments: List[Node]) -> int:
+        """
+        Compiles the positional arguments followed by the keyword arguments and
+        returns the index of the call site constant
+        """
+        positional = [argument for argument in arguments if argument.name != 'argument']
+        keywords = [argument for argument in arguments if argument.name == 'argument']
+        for argument in positional:
+            self._expression(argument)
+        for argument in keywords:
+            self._expression((argument.children or [])[0])
+        site: CallSite = (name, len(positional), tuple(str(argument.value) for argument in keywords))
+        return self._constant(site)
+
+
+def _parameters(node: Node) -> List[str]:
+    for child in node.children or []:
+        if child.name == 'parameters':
+            return [str(parameter.value) for parameter in child.children or []]
+    return []
+
+
+def _body(node: Node) -> List[Node]:
+    for child in node.children or []:
+        if child.name == 'body':
+            return child.children or []
+    return []
+
+
+def compile_modules(modules: Dict[str, Node | None], hierarchy: TypeHierarchy | None = None) -> Dict[str, ClassCode]:
+    """
+    Compiles the methods and constructors of every class of parsed modules. A bare
+    name is a parameter or variable, else an attribute of the class or of the
+    classes it extends, else a builtin function or service; a bare call is a method
+    of the class or the classes it extends, else a builtin function
+
+    Args:
+        modules: the unlinked module ASTs by module path, None for invalid modules
+        hierarchy: the classes and interfaces of the same modules, built when not given
+    Returns:
+        Dict[str, ClassCode]: the compiled classes by fully qualified name
+    Raises:
+        ParseError: when a method body does not parse
+    """
+    if hierarchy is None:
+        hierarchy = build_hierarchy(modules)
+    classes: Dict[str, Node] = {}
+    scopes: Dict[str, Dict[str, str]] = {}
+    for file_path, node in modules.items():
+        if node is None:
+            continue
+        scope = module_scope(file_path, node)
+        for child in node.children or []:
+            if child.name == 'class':
+                classes[scope[str(child.value)]] = child
+                scopes[scope[str(child.value)]] = scope
+
+    compiled: Dict[str, ClassCode] = {}
+    for name in sorted(classes):
+        # the attributes and methods of the class and of the classes it extends
+        fields: Set[str] = set()
+        methods: Set[str] = set()
+        for ancestor in hierarchy.ancestors(name):
+            if ancestor not in classes:
+                continue
+            for child in classes[ancestor].children or []:
+                if child.name == 'attribute':
+                    fields.add(str(child.value))
+                elif child.name == 'method':
+                    methods.add(str(child.value))
+        superclass: str | None = None
+        declared_fields: Dict[str, Any] = {}
+        declared_methods: Dict[str, CodeObject] = {}
+        constructor: CodeObject | None = None
+        for child in classes[name].children or []:
+            if child.name == 'extends':
+                superclass = scopes[name].get(str(child.value), str(child.value))
+            elif child.name == 'attribute':
+                initial = [attribute.value for attribute in child.children or [] if attribute.name == 'value']
+                declared_fields[str(child.value)] = literal(str(initial[0])) if initial else None
+            elif child.name == 'method' or child.name == 'constructor':
+                method_name = str(child.value) if child.name == 'method' else 'constructor'
+                code = _MethodCompiler(method_name, name, scopes[name], fields, methods).compile(
+                    _parameters(child), _body(child)
+                )
+                if child.name == 'method':
+                    declared_methods[method_name] = code
+                else:
+                    constructor = code
+        compiled[name] = ClassCode(name, superclass, declared_fields, declared_methods, constructor)
+    return compiled
+
+
+def missing_classes(classes: Dict[str, ClassCode]) -> Dict[str, List[str]]:
+    """
+    Returns the classes compiled code constructs or extends without being compiled
+    themselves, such as type and enumeration declarations and Builtin classes, with
+    the compiled classes and methods using them
+
+    Args:
+        classes: the compiled classes by fully qualified name, see compile_modules
+    Returns:
+        Dict[str, List[str]]: the users of every missing class by fully qualified name, sorted
+    """
+    missing: Dict[str, Set[str]] = {}
+    for name, class_code in classes.items():
+        if class_code.superclass is not None and class_code.superclass not in classes:
+            missing.setdefault(class_code.superclass, set()).add(name)
+        code_objects = list(class_code.methods.values())
+        if class_code.constructor is not None:
+            code_objects.append(class_code.constructor)
+        for code_object in code_objects:
+            for offset in range(0, len(code_object.code), 2):
+                if code_object.code[offset] == Opcode.NEW:
+                    class_name = code_object.constants[code_object.code[offset + 1]][0]
+                    if class_name not in classes:
+                        missing.setdefault(class_name, set()).add(f'{name}.{code_object.name}')
+    return {name: sorted(users) for name, users in sorted(missing.items())}
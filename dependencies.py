@@ -0,0 +1,182 @@
+"""
+Module dependency graph, the imports of every module are scanned from the from
+statements at the top of its file without lexing or parsing the rest of it
+"""
+from os.path import join as path
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from parser import header_imports
+from project import find_modules
+
+
+def scan_imports(full_path: str) -> List[str]:
+    """
+    Returns the module paths imported by a module file, see parser.header_imports,
+    only a prefix of the file is read unless its header is longer
+    """
+    with open(full_path, 'rb') as f:
+        return header_imports(f)
+
+
+def strongly_connected(modules: Iterable[str], edges: Dict[str, List[str]]) -> List[List[str]]:
+    """
+    Returns the strongly connected components of a graph, each sorted, every
+    component after the components it has edges to
+
+    Args:
+        modules: the nodes of the graph
+        edges: the targets of every node, every target is a node
+    """
+    # Tarjan's algorithm with an explicit stack, the components are completed
+    # after every component they import so dependencies come first
+    indexes: Dict[str, int] = {}
+    lowest: Dict[str, int] = {}
+    stack: List[str] = []
+    on_stack = set()
+    components: List[List[str]] = []
+    for root in modules:
+        if root in indexes:
+            continue
+        indexes[root] = lowest[root] = len(indexes)
+        stack.append(root)
+        on_stack.add(root)
+        work: List[Tuple[str, Iterator[str]]] = [(root, iter(edges[root]))]
+        while work:
+            module, imported = work[-1]
+            for target in imported:
+                if target not in indexes:
+                    indexes[target] = lowest[target] = len(indexes)
+                    stack.append(target)
+                    on_stack.add(target)
+                    work.append((target, iter(edges[target])))
+                    break
+                if target in on_stack and indexes[target] < lowest[module]:
+                    lowest[module] = indexes[target]
+            else:
+                work.pop()
+                if work:
+                    importer = work[-1][0]
+                    if lowest[module] < lowest[importer]:
+                        lowest[importer] = lowest[module]
+                if lowest[module] == indexes[module]:
+                    component: List[str] = []
+                    member = ''
+                    while member != module:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                    component.sort()
+                    components.append(component)
+    return components
+
+
+class DependencyGraph():
+    """
+    The imports between the modules of a source folder, with the strongly connected
+    components and a dependency first order computed on first use
+    """
+
+    def __init__(self, imports: Dict[str, List[str]]) -> None:
+        """
+        Args:
+            imports: the imported module paths by module path, imports of modules
+                that are not keys are kept as missing
+        """
+        self._modules = sorted(imports)
+        self._imports: Dict[str, List[str]] = {}
+        self._missing: Dict[str, List[str]] = {}
+        for module in self._modules:
+            targets: List[str] = []
+            for target in imports[module]:
+                if target not in imports:
+                    self._missing.setdefault(module, []).append(target)
+                elif target not in targets:
+                    targets.append(target)
+            self._imports[module] = targets
+        self._components: List[List[str]] | None = None
+
+    @property
+    def modules(self) -> List[str]:
+        """
+        Returns every module path, sorted
+        """
+        return self._modules
+
+    @property
+    def missing(self) -> Dict[str, List[str]]:
+        """
+        Returns the imported module paths without a module by importing module path
+        """
+        return self._missing
+
+    def imports(self, module: str) -> List[str]:
+        """
+        Returns the existing modules a module imports, in import order
+        """
+        return self._imports[module]
+
+    @property
+    def components(self) -> List[List[str]]:
+        """
+        Returns the strongly connected components, every component comes after
+        the components it imports
+        """
+        if self._components is None:
+            self._components = strongly_connected(self._modules, self._imports)
+        return self._components
+
+    @property
+    def cycles(self) -> List[List[str]]:
+        """
+        Returns the components with import cycles, including modules importing themselves
+        """
+        return [
+            component for component in self.components
+            if len(component) > 1 or component[0] in self._imports[component[0]]
+        ]
+
+    @property
+    def order(self) -> List[str]:
+        """
+        Returns every module after the modules it imports, the modules of a cycle
+        are kept together
+        """
+        return [module for component in self.components for module in component]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Returns the graph as a JSON serializable dictionary
+        """
+        return {
+            'modules': {module: self._imports[module] for module in self._modules},
+            'order': self.order,
+            'cycles': self.cycles,
+            'missing': self._missing,
+        }
+
+    def report(self) -> str:
+        """
+        Returns the modules in dependency order with their imports, the cycles and
+        the missing modules
+        """
+        lines = [f'{module}: {", ".join(self._imports[module])}' for module in self.order]
+        for cycle in self.cycles:
+            lines.append(f'cycle: {" -> ".join(cycle + cycle[:1])}')
+        for module, targets in self._missing.items():
+            lines.append(f'missing: {module} imports {", ".join(targets)}')
+        return '\n'.join(lines)
+
+
+def build_graph(src_folder: str, modules: List[str] | None = None) -> DependencyGraph:
+    """
+    Scans the imports of the modules of a source folder
+
+    Args:
+        src_folder: the folder the module paths are relative to
+        modules: the module paths to scan, every module under the source folder when not given
+    Returns:
+        DependencyGraph: the imports between the modules
+    """
+    if modules is None:
+        modules = find_modules(src_folder)
+    return DependencyGraph({module: scan_imports(path(src_folder, module)) for module in modules})
@@ -0,0 +1,165 @@
+"""
+Diagnostics collector, parse messages and errors are stored as structured records
+instead of being printed and written out in one go when the caller decides to
+"""
+from enum import Enum
+from typing import List, TextIO
+
+from errors import Error, ParseError
+
+
+class Severity(Enum):
+    """
+    Severity of a diagnostic, ordered like the logging levels
+    """
+    DEBUG = 10
+    INFO = 20
+    WARNING = 30
+    ERROR = 40
+
+
+class Diagnostic():
+    """
+    A single message about the source code or the parse, the code identifies the
+    kind of message, such as the name of the error class
+    """
+
+    def __init__(
+            self,
+            severity: Severity,
+            code: str,
+            message: str,
+            filename: str = '',
+            line: int | None = None,
+            column: int | None = None
+        ) -> None:
+        self.severity = severity
+        self.code = code
+        self.message = message
+        self.filename = filename
+        self.line = line
+        self.column = column
+
+    def format(self) -> str:
+        """
+        Returns the message in the layout of Error.get_error when it has a location
+        """
+        if not self.filename:
+            return self.message
+        if self.line is None:
+            return f'{self.message} file: {self.filename}'
+        return f'{self.message} file: {self.filename}, line: {self.line}, column: {self.column}'
+
+
+class Diagnostics():
+    """
+    Buffers the diagnostics at or above a severity level, nothing is written until
+    flush is called so parsing is silent by default
+    """
+
+    def __init__(self, level: Severity = Severity.WARNING) -> None:
+        """
+        Args:
+            level: the lowest severity kept, lower severities are dropped when reported
+        """
+        self._level = level
+        self._threshold = level.value
+        self._records: List[Diagnostic] = []
+
+    @property
+    def level(self) -> Severity:
+        """
+        Returns the lowest severity kept
+        """
+        return self._level
+
+    @property
+    def records(self) -> List[Diagnostic]:
+        """
+        Returns the buffered diagnostics in the order they were reported
+        """
+        return self._records
+
+    @property
+    def errors(self) -> List[Diagnostic]:
+        """
+        Returns the buffered diagnostics of error severity
+        """
+        return [record for record in self._records if record.severity is Severity.ERROR]
+
+    def enabled(self, severity: Severity) -> bool:
+        """
+        Returns if diagnostics of a severity are kept, callers check this once
+        before a loop instead of formatting messages that would be dropped
+        """
+        return severity.value >= self._threshold
+
+    def report(
+            self,
+            severity: Severity,
+            code: str,
+            message: str,
+            filename: str = '',
+            line: int | None = None,
+            column: int | None = None
+        ) -> None:
+        """
+        Buffers a diagnostic when its severity is kept
+
+        Args:
+            severity: how serious the diagnostic is
+            code: the kind of diagnostic
+            message: the message without its location
+            filename: the file the diagnostic is about, empty when it is not about a file
+            line: the line the diagnostic is about, None when it has no position
+            column: the column the diagnostic is about
+        """
+        if severity.value >= self._threshold:
+            self._records.append(Diagnostic(severity, code, message, filename, line, column))
+
+    def error(self, error: Error) -> None:
+        """
+        Buffers a source code error, the name of its class is used as the code
+        """
+        self.report(
+            Severity.ERROR,
+            type(error).__name__,
+            error.message,
+            error.filename,
+            error.line,
+            error.column
+        )
+
+    def failure(self, exception: ValueError) -> None:
+        """
+        Buffers the errors of a failed parse
+        """
+        if isinstance(exception, ParseError):
+            for error in exception.errors:
+                self.error(error)
+        else:
+            self.report(Severity.ERROR, type(exception).__name__, str(exception))
+
+    def extend(self, records: List[Diagnostic]) -> None:
+        """
+        Buffers diagnostics collected elsewhere, such as in a worker process
+        """
+        threshold = self._threshold
+        self._records.extend(record for record in records if record.severity.value >= threshold)
+
+    def clear(self) -> None:
+        """
+        Drops the buffered diagnostics
+        """
+        self._records = []
+
+    def flush(self, stream: TextIO) -> None:
+        """
+        Writes the buffered diagnostics in a single write and drops them
+
+        Args:
+            stream: the text stream to write to
+        """
+        if self._records:
+            stream.write(''.join(f'{record.format()}\n' for record in self._records))
+        self.clear()
@@ -2,27 +2,69 @@
 Source code analysis, tokenizing and Parsing errors
 """
 
+import copy
+
 from abc import ABC
+from typing import List
 
 
 class Error(ABC):
     """
     Base error for all errors in the purist parser
     """
-    def __init__(self, message: str, filename: str, line: int, column: int) -> None:
+    def __init__(self, message: str, filename: str, line: int | None, column: int | None) -> None:
         self._message = message
         self._filename = filename
         self._line = line
         self._column = column
 
+    @property
+    def message(self) -> str:
+        """
+        Returns the error message without its location
+        """
+        return self._message
+
+    @property
+    def filename(self) -> str:
+        """
+        Returns the file the error was found in
+        """
+        return self._filename
+
+    @property
+    def line(self) -> int | None:
+        """
+        Returns the line the error was found on, None for errors about a whole module
+        or declaration
+        """
+        return self._line
+
+    @property
+    def column(self) -> int | None:
+        """
+        Returns the column the error was found at, None when the line is
+        """
+        return self._column
+
+    def offset_lines(self, lines: int) -> 'Error':
+        """
+        Returns a copy of the error located the number of lines further down, for
+        errors found in a part of a file
+        """
+        error = copy.copy(self)
+        if error._line is not None:
+            error._line += lines
+        return error
+
     def get_error(self) -> str:
         """
         Returns the error message in a preset layout for error reporting
         """
-        message = self._message
-        message = f'{message} file: {self._filename},'
-        message = f'{message} line: {self._line}, column: {self._column}'
-        return message
+        message = f'{self._message} file: {self._filename}'
+        if self._line is None:
+            return message
+        return f'{message}, line: {self._line}, column: {self._column}'
 
 class InvalidComment(Error):
     """
@@ -85,3 +127,92 @@ class InvalidMethodName(Error):
     def __init__(self, name: str, filename: str, line: int, column: int) -> None:
         message = f'Invalid method name: "{name}"'
         super().__init__(message, filename, line, column)
+
+class UnexpectedEndOfFile(Error):
+    """
+    Error for source code ending in the middle of a statement
+    """
+    def __init__(self, filename: str, line: int, column: int) -> None:
+        super().__init__('Unexpected end of file', filename, line, column)
+
+class MissingMethod(Error):
+    """
+    Error for classes not providing a method of an interface they implement
+    """
+    def __init__(self, type_name: str, method: str, interface: str, filename: str) -> None:
+        message = f'Missing method: "{type_name}" does not implement "{method}" of "{interface}"'
+        super().__init__(message, filename, None, None)
+
+class MismatchedMethod(Error):
+    """
+    Error for methods whose signature differs from the method they implement or override
+    """
+    def __init__(
+            self,
+            type_name: str,
+            method: str,
+            found: str,
+            expected: str,
+            filename: str
+        ) -> None:
+        message = f'Mismatched method: "{type_name}.{method}" is "{found}" expected "{expected}"'
+        super().__init__(message, filename, None, None)
+
+class InvalidSupertype(Error):
+    """
+    Error for classes extending an interface or implementing a class, and for
+    interfaces extending a class
+    """
+    def __init__(self, type_name: str, relation: str, supertype: str, filename: str) -> None:
+        message = f'Invalid supertype: "{type_name}" {relation} "{supertype}"'
+        super().__init__(message, filename, None, None)
+
+class CyclicInheritance(Error):
+    """
+    Error for classes and interfaces that are their own ancestor
+    """
+    def __init__(self, type_name: str, filename: str) -> None:
+        message = f'Cyclic inheritance: "{type_name}"'
+        super().__init__(message, filename, None, None)
+
+class CyclicInjection(Error):
+    """
+    Error for injected attributes depending on each other through a class with an
+    instance per injection, constructing any of them never ends
+    """
+    def __init__(self, type_names: List[str], filename: str) -> None:
+        cycle = ' -> '.join(f'"{name}"' for name in type_names + type_names[:1])
+        message = f'Cyclic injection: {cycle}'
+        super().__init__(message, filename, None, None)
+
+class UnresolvedInjection(Error):
+    """
+    Error for attributes typed with an interface without exactly one class to inject
+    """
+    def __init__(
+            self,
+            type_name: str,
+            attribute: str,
+            interface: str,
+            candidates: List[str],
+            filename: str
+        ) -> None:
+        found = f'{len(candidates)} implementations: {", ".join(candidates)}' if candidates else 'no implementation'
+        message = f'Unresolved injection: "{type_name}.{attribute}" of "{interface}" has {found}'
+        super().__init__(message, filename, None, None)
+
+class ParseError(ValueError):
+    """
+    Raised when source code can not be parsed, holds the errors found
+    """
+    def __init__(self, *errors: Error) -> None:
+        super().__init__('\n'.join(error.get_error() for error in errors))
+        self.errors: List[Error] = list(errors)
+
+    def __reduce__(self):
+        return ParseError, tuple(self.errors)
+
+class ExecutionError(RuntimeError):
+    """
+    Raised when compiled code fails while the virtual machine executes it
+    """
@@ -0,0 +1,326 @@
+"""
+Inheritance and interface conformance checks, the linearized ancestors and the
+merged method table of every class and interface are computed once and reused by
+all of their subtypes instead of walking the hierarchy again for every class
+"""
+from typing import Dict, List, Set, Tuple
+
+from errors import CyclicInheritance, Error, InvalidSupertype, MismatchedMethod, MissingMethod
+from parser import Node
+from symbols import SymbolKind, module_scope, qualify_type
+
+# the declaring type and the signature of every method by method name
+MethodTable = Dict[str, Tuple[str, str]]
+
+_IN_PROGRESS = 1
+_DONE = 2
+
+
+class TypeDeclaration():
+    """
+    A class or interface with its supertypes and method signatures resolved to fully
+    qualified names
+    """
+
+    def __init__(
+            self,
+            name: str,
+            kind: SymbolKind,
+            module: str,
+            superclass: str | None,
+            interfaces: List[str],
+            methods: Dict[str, str]
+        ) -> None:
+        """
+        Args:
+            name: the fully qualified name
+            kind: SymbolKind.CLASS or SymbolKind.INTERFACE
+            module: the path of the declaring module relative to the source folder
+            superclass: the class a class extends, None for interfaces and for
+                classes extending nothing
+            interfaces: the interfaces a class implements or an interface extends
+            methods: the signatures of the methods declared by the type itself by
+                method name, such as (string, integer): integer
+        """
+        self.name = name
+        self.kind = kind
+        self.module = module
+        self.superclass = superclass
+        self.interfaces = interfaces
+        self.methods = methods
+
+    @property
+    def supertypes(self) -> List[str]:
+        """
+        Returns the superclass followed by the interfaces, in declaration order
+        """
+        return ([self.superclass] if self.superclass is not None else []) + self.interfaces
+
+
+def method_signature(node: Node, scope: Dict[str, str]) -> str:
+    """
+    Returns the parameter types and the return type of a method node with the type
+    names qualified, parameter names are not part of the signature
+    """
+    parameters: List[str] = []
+    returns = ''
+    for child in node.children or []:
+        if child.name == 'parameters':
+            parameters = [
+                qualify_type(str(parameter_type.value), scope)
+                for parameter in child.children or []
+                for parameter_type in parameter.children or []
+                if parameter_type.name == 'type'
+            ]
+        elif child.name == 'returns':
+            returns = qualify_type(str(child.value), scope)
+    signature = f'({", ".join(parameters)})'
+    return f'{signature}: {returns}' if returns else signature
+
+
+def type_declarations(file_path: str, node: Node) -> List[TypeDeclaration]:
+    """
+    Returns the classes and interfaces of a module in declaration order
+
+    Args:
+        file_path: the module path relative to the source folder
+        node: the unlinked AST of the module
+    """
+    scope = module_scope(file_path, node)
+    declarations: List[TypeDeclaration] = []
+    for child in node.children or []:
+        if child.name != 'class' and child.name != 'interface':
+            continue
+        superclass: str | None = None
+        interfaces: List[str] = []
+        methods: Dict[str, str] = {}
+        for member in child.children or []:
+            if member.name == 'extends' and child.name == 'class':
+                superclass = scope.get(str(member.value), str(member.value))
+            elif member.name == 'extends' or member.name == 'implements':
+                interfaces.append(scope.get(str(member.value), str(member.value)))
+            elif member.name == 'method':
+                methods[str(member.value)] = method_signature(member, scope)
+        kind = SymbolKind.CLASS if child.name == 'class' else SymbolKind.INTERFACE
+        declarations.append(
+            TypeDeclaration(scope[str(child.value)], kind, file_path, superclass, interfaces, methods)
+        )
+    return declarations
+
+
+class TypeHierarchy():
+    """
+    The classes and interfaces of every added module. The ancestors, the merged
+    method table and the errors of a type are computed once from those of its
+    supertypes, so checking a hierarchy costs time linear in its declarations and
+    the inherited table entries. Types that are not declared by an added module,
+    such as the Builtin ones, have no ancestors or methods of their own
+    """
+
+    def __init__(self) -> None:
+        self._types: Dict[str, TypeDeclaration] = {}
+        self._module_types: Dict[str, List[str]] = {}
+        self._states: Dict[str, int] = {}
+        self._ancestors: Dict[str, Tuple[str, ...]] = {}
+        self._methods: Dict[str, MethodTable] = {}
+        self._errors: Dict[str, List[Error]] = {}
+
+    def update(self, file_path: str, node: Node | None) -> None:
+        """
+        Replaces the types of a module, the computed tables of every type are dropped
+        since subtypes in other modules may depend on them
+
+        Args:
+            file_path: the module path relative to the source folder
+            node: the unlinked AST of the module, None when the module is invalid
+        """
+        self.remove(file_path)
+        declarations = type_declarations(file_path, node) if node is not None else []
+        self._module_types[file_path] = [declaration.name for declaration in declarations]
+        for declaration in declarations:
+            self._types[declaration.name] = declaration
+
+    def remove(self, file_path: str) -> None:
+        """
+        Drops the types of a module
+        """
+        for name in self._module_types.pop(file_path, []):
+            self._types.pop(name, None)
+        self._states.clear()
+        self._ancestors.clear()
+        self._methods.clear()
+        self._errors.clear()
+
+    @property
+    def modules(self) -> List[str]:
+        """
+        Returns the paths of the added modules, sorted
+        """
+        return sorted(self._module_types)
+
+    def declaration(self, name: str) -> TypeDeclaration | None:
+        """
+        Returns a class or interface by fully qualified name, None when not declared
+        """
+        return self._types.get(name)
+
+    def ancestors(self, name: str) -> Tuple[str, ...]:
+        """
+        Returns the type followed by its ancestors, every ancestor once: the ancestors
+        of the superclass, then those of every interface in declaration order
+        """
+        self._resolve(name)
+        return self._ancestors[name]
+
+    def methods(self, name: str) -> MethodTable:
+        """
+        Returns the methods of a type with those it inherits, the declaring type and
+        signature by method name. A class inherits the methods of its superclasses,
+        an interface those of the interfaces it extends
+        """
+        self._resolve(name)
+        return self._methods[name]
+
+    def check(self) -> List[Error]:
+        """
+        Returns the missing and mismatched methods, the invalid supertypes and the
+        inheritance cycles of every type, by module and declaration order
+        """
+        errors: List[Error] = []
+        for file_path in self.modules:
+            for name in self._module_types[file_path]:
+                self._resolve(name)
+                errors.extend(self._errors.get(name, []))
+        return errors
+
+    def _resolve(self, root: str) -> None:
+        # depth first with an explicit stack so deep hierarchies do not recurse, a
+        # type is completed after its supertypes and a supertype still in progress
+        # closes a cycle
+        states = self._states
+        if states.get(root) == _DONE:
+            return
+        stack: List[Tuple[str, bool, str | None]] = [(root, False, None)]
+        while stack:
+            name, expanded, subtype = stack.pop()
+            if expanded:
+                self._complete(name)
+                continue
+            state = states.get(name)
+            if state == _DONE:
+                continue
+            if state == _IN_PROGRESS:
+                if subtype is not None:
+                    self._error(subtype, CyclicInheritance(subtype, self._types[subtype].module))
+                continue
+            declaration = self._types.get(name)
+            if declaration is None:
+                states[name] = _DONE
+                self._ancestors[name] = (name,)
+                self._methods[name] = {}
+                continue
+            states[name] = _IN_PROGRESS
+            stack.append((name, True, subtype))
+            for supertype in reversed(declaration.supertypes):
+                stack.append((supertype, False, name))
+
+    def _complete(self, name: str) -> None:
+        declaration = self._types[name]
+        ancestors: List[str] = [name]
+        methods: MethodTable = {}
+        for supertype in declaration.supertypes:
+            if self._states.get(supertype) != _DONE:
+                # the supertype is part of a cycle already reported
+                continue
+            if not self._valid_supertype(declaration, supertype):
+                continue
+            ancestors.extend(self._ancestors[supertype])
+            if declaration.kind is SymbolKind.INTERFACE or supertype == declaration.superclass:
+                self._inherit(declaration, methods, self._methods[supertype])
+        for method, signature in declaration.methods.items():
+            inherited = methods.get(method)
+            if inherited is not None and inherited[1] != signature:
+                self._mismatched(declaration, method, signature, inherited[1])
+            methods[method] = (name, signature)
+        self._ancestors[name] = tuple(dict.fromkeys(ancestors))
+        self._methods[name] = methods
+        self._states[name] = _DONE
+        if declaration.kind is SymbolKind.CLASS:
+            self._check_interfaces(declaration, methods)
+
+    def _valid_supertype(self, declaration: TypeDeclaration, supertype: str) -> bool:
+        supertype_declaration = self._types.get(supertype)
+        if supertype_declaration is None:
+            return True
+        if declaration.kind is SymbolKind.INTERFACE:
+            expected, relation = SymbolKind.INTERFACE, 'extends'
+        elif supertype == declaration.superclass:
+            expected, relation = SymbolKind.CLASS, 'extends'
+        else:
+            expected, relation = SymbolKind.INTERFACE, 'implements'
+        if supertype_declaration.kind is expected:
+            return True
+        self._error(
+            declaration.name,
+            InvalidSupertype(declaration.name, relation, supertype, declaration.module)
+        )
+        return False
+
+    def _inherit(self, declaration: TypeDeclaration, methods: MethodTable, inherited: MethodTable) -> None:
+        if not methods:
+            methods.update(inherited)
+            return
+        for method, entry in inherited.items():
+            current = methods.get(method)
+            if current is None:
+                methods[method] = entry
+            elif current[1] != entry[1] and method not in declaration.methods:
+                # two extended interfaces disagree and the interface does not settle it
+                self._mismatched(declaration, method, entry[1], current[1])
+
+    def _check_interfaces(self, declaration: TypeDeclaration, methods: MethodTable) -> None:
+        interfaces = [
+            interface for interface in declaration.interfaces
+            if interface in self._types and self._types[interface].kind is SymbolKind.INTERFACE
+        ]
+        # the merged table of a single interface holds every method once, several
+        # interfaces may share the methods of a common ancestor
+        checked: Set[Tuple[str, str]] | None = set() if len(interfaces) > 1 else None
+        for interface in interfaces:
+            for method, entry in self._methods[interface].items():
+                if checked is not None:
+                    if (method, entry[0]) in checked:
+                        continue
+                    checked.add((method, entry[0]))
+                implemented = methods.get(method)
+                if implemented is None:
+                    self._error(
+                        declaration.name,
+                        MissingMethod(declaration.name, method, entry[0], declaration.module)
+                    )
+                elif implemented[1] != entry[1]:
+                    self._mismatched(declaration, method, implemented[1], entry[1])
+
+    def _mismatched(self, declaration: TypeDeclaration, method: str, found: str, expected: str) -> None:
+        self._error(
+            declaration.name,
+            MismatchedMethod(declaration.name, method, found, expected, declaration.module)
+        )
+
+    def _error(self, name: str, error: Error) -> None:
+        self._errors.setdefault(name, []).append(error)
+
+
+def build_hierarchy(modules: Dict[str, Node | None]) -> TypeHierarchy:
+    """
+    Collects the classes and interfaces of parsed modules
+
+    Args:
+        modules: the unlinked module ASTs by module path, None for invalid modules
+    Returns:
+        TypeHierarchy: the types of the modules, checked on demand
+    """
+    hierarchy = TypeHierarchy()
+    for file_path, node in modules.items():
+        hierarchy.update(file_path, node)
+    return hierarchy
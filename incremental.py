@@ -0,0 +1,231 @@
+"""
+Incremental parsing, keeps the tokens and AST of an edited module up to date by
+re-lexing the edited lines and re-parsing only the top level statements around them
+"""
+import re
+
+from bisect import bisect_right
+from typing import List, Tuple
+
+from parser import FileReader, Node, Parser, module_name
+from tokenizer import TokenBuffer, TokenType, Tokenizer
+
+NEWLINE_PATTERN = re.compile(r'\r\n|[\n\r]')
+
+
+class _Statement():
+    """
+    A top level statement, the tokens it was parsed from and the nodes it produced
+    """
+
+    def __init__(self, start: int, end: int, nodes: List[Node]) -> None:
+        self.start = start
+        self.end = end
+        self.nodes = nodes
+
+
+class Document():
+    """
+    An edited module, every edit re-lexes the whole lines around the edit, extended
+    so no top level statement is cut, and re-parses the statements on those lines.
+    The nodes of all other statements are reused as they are. When the edited
+    statements no longer parse on their own, for example after removing the closing
+    bracket of a class, the whole module is parsed again.
+
+    The AST is parsed without following imports, imports are 'import' nodes
+    holding the module path.
+    """
+
+    def __init__(self, file_path: str, text: str, parser: Parser | None = None) -> None:
+        """
+        Args:
+            file_path: the module path relative to the source folder
+            text: the source code of the module
+            parser: parses the statements, a parser without a source folder when not
+                given. Edits replace tokens, so it must not parse method bodies lazily
+        """
+        self._file_path = file_path
+        if parser is None:
+            parser = Parser('', FileReader(), follow_imports=False, lazy_bodies=False)
+        self._parser = parser
+        self._tokenizer = Tokenizer()
+        self._text = ''
+        self._line_starts: List[int] = [0]
+        self._tokens = TokenBuffer()
+        self._statements: List[_Statement] = []
+        self._ast: Node | None = None
+        self._parse(text)
+
+    @property
+    def text(self) -> str:
+        """
+        Returns the current source code
+        """
+        return self._text
+
+    @property
+    def tokens(self) -> TokenBuffer:
+        """
+        Returns the tokens of the current source code, empty when it is invalid
+        """
+        return self._tokens
+
+    @property
+    def ast(self) -> Node | None:
+        """
+        Returns the AST of the current source code, None when it is invalid
+        """
+        return self._ast
+
+    def edit(self, start: int, end: int, text: str) -> Node | None:
+        """
+        Replaces a range of the source code and updates the tokens and the AST
+
+        Args:
+            start: the offset of the first replaced character
+            end: the offset following the last replaced character, start to insert
+            text: the replacing text
+        Returns:
+            Node: the updated AST, None when the source code is invalid
+        """
+        if not 0 <= start <= end <= len(self._text):
+            raise ValueError(f'invalid edit range {start}:{end}')
+        old_text = self._text
+        new_text = old_text[:start] + text + old_text[end:]
+        if self._ast is None or not self._reparse(old_text, new_text, start, end, len(text)):
+            self._parse(new_text)
+        return self._ast
+
+    def _parse(self, text: str) -> None:
+        self._text = text
+        self._line_starts = [0] + [match.end() for match in NEWLINE_PATTERN.finditer(text)]
+        self._tokens = self._tokenizer.tokenize_to_buffer(self._file_path, text)
+        self._statements = []
+        self._ast = None
+        if len(self._tokens) == 0:
+            return
+        try:
+            self._statements = self._parse_statements(self._tokens, len(self._tokens) - 1)
+        except ValueError as e:
+            self._statements = []
+            self._parser.diagnostics.failure(e)
+            return
+        self._ast = Node('source', module_name(self._file_path))
+        self._update_children()
+
+    def _parse_statements(self, tokens: TokenBuffer, end: int) -> List[_Statement]:
+        statements: List[_Statement] = []
+        index = 0
+        self._parser.clear_names()
+        while index < end:
+            nodes, next_index = self._parser.parse_statement(tokens, index)
+            if next_index > end:
+                raise ValueError('Unexpected end of file')
+            statements.append(_Statement(index, next_index, nodes))
+            index = next_index
+        self._parser.check_names()
+        return statements
+
+    def _update_children(self) -> None:
+        if self._ast is not None:
+            children = [node for statement in self._statements for node in statement.nodes]
+            self._ast.children = children if children else None
+
+    def _start_line(self, statement: _Statement) -> int:
+        return self._tokens.line_at(statement.start)
+
+    def _end_line(self, statement: _Statement) -> int:
+        index = statement.end - 1
+        line = self._tokens.line_at(index)
+        if self._tokens.type_at(index) == TokenType.STRING_VALUE:
+            line += str(self._tokens.value_at(index)).count('\n')
+        return line
+
+    def _affected_lines(self, first_line: int, last_line: int) -> Tuple[int, int, int, int]:
+        """
+        Extends the edited lines until no statement is partly on them
+
+        Returns:
+            Tuple[int, int, int, int]: the first and last line and the index of the
+                first affected and of the first following statement
+        """
+        statements = self._statements
+        first = bisect_right(statements, first_line - 1, key=self._end_line)
+        following = bisect_right(statements, last_line, key=self._start_line)
+        if first < following:
+            first_line = min(first_line, self._start_line(statements[first]))
+            last_line = max(last_line, self._end_line(statements[following - 1]))
+        while first > 0 and self._end_line(statements[first - 1]) >= first_line:
+            first -= 1
+            first_line = min(first_line, self._start_line(statements[first]))
+        while following < len(statements) and self._start_line(statements[following]) <= last_line:
+            last_line = max(last_line, self._end_line(statements[following]))
+            following += 1
+        return first_line, last_line, first, following
+
+    def _reparse(self, old_text: str, new_text: str, start: int, end: int, length: int) -> bool:
+        line_starts = self._line_starts
+        first_line, last_line, first, following = self._affected_lines(
+            bisect_right(line_starts, start),
+            bisect_right(line_starts, end)
+        )
+        span_start = line_starts[first_line - 1]
+        span_end = line_starts[last_line] if last_line < len(line_starts) else len(old_text)
+        delta = length - (end - start)
+        region = new_text[span_start:span_end + delta]
+        if span_start > 0 and old_text[span_start - 1] == '\r' and region.startswith('\n'):
+            # the edit joins a line break of the previous line
+            return False
+
+        region_tokens = self._tokenizer.tokenize_to_buffer(self._file_path, region)
+        if len(region_tokens) == 0:
+            return False
+        try:
+            statements = self._parse_statements(region_tokens, len(region_tokens) - 1)
+        except (ValueError, IndexError):
+            return False
+        region_tokens.truncate(len(region_tokens) - 1, keep_trivia=True)
+
+        eof = len(self._tokens) - 1
+        token_start = self._statements[first].start if first < following else (
+            self._statements[following].start if following < len(self._statements) else eof
+        )
+        token_end = self._statements[following].start if following < len(self._statements) else eof
+        region_line_starts = [span_start + match.end() for match in NEWLINE_PATTERN.finditer(region)]
+        line_delta = len(region_line_starts) - (last_line - first_line + 1) + (
+            1 if last_line >= len(line_starts) else 0
+        )
+        token_delta = len(region_tokens) - (token_end - token_start)
+
+        # the EOF token is appended again once the line count is known
+        self._tokens.truncate(eof, keep_trivia=True)
+        if eof == 0:
+            self._tokens.add_file(self._file_path)
+        self._tokens.splice(token_start, token_end, region_tokens, first_line - 1, line_delta, last_line)
+        for statement in statements:
+            statement.start += token_start
+            statement.end += token_start
+        for statement in self._statements[following:]:
+            statement.start += token_delta
+            statement.end += token_delta
+        self._statements[first:following] = statements
+        self._line_starts = line_starts[:first_line] + region_line_starts + [
+            line_start + delta for line_start in line_starts[last_line + 1:]
+        ]
+        self._text = new_text
+        self._append_eof()
+        self._update_children()
+        return True
+
+    def _append_eof(self) -> None:
+        """
+        Appends the EOF token, the lexer puts it on the last line only when blank
+        lines follow the last value
+        """
+        text = self._text
+        line_count = len(self._line_starts) - (1 if not text or text[-1] in '\r\n' else 0)
+        end_line = self._end_line(self._statements[-1]) if self._statements else 0
+        trailing = self._tokens.trivia_at(len(self._tokens))
+        if trailing:
+            end_line = max(end_line, trailing[-1].line)
+        self._tokens.append(TokenType.EOF, line_count if end_line < line_count else 1, 0, None)
@@ -2,21 +2,117 @@
 Purist source code lexer, reads source code and discovers words, numbers, operators, etc
 """
 
-from typing import Tuple
+import re
+from abc import ABC, abstractmethod
+from array import array
+from bisect import bisect_right
+from mmap import mmap
+from sys import maxsize
+from typing import Dict, Iterator, TextIO, Tuple
 
 from errors import DecodeError, Error
 
 VALID_CHARACTERS = 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ_1234567890'
 
+TOKEN_PATTERN = re.compile(r'''[ \t]*(?:
+    (?P<SIMPLE>[A-Za-z][A-Za-z0-9_]*|[\[\]{}(),:=<>.!|+*%&-]|//[^\r\n]*)
+  | (?P<NEWLINE>\r\n|[\n\r])
+  | (?P<STRING>"[^"\\]*(?:\\+[^\\][^"\\]*)*")
+  | (?P<NUMBER>[0-9][0-9.]*)
+  | (?P<DIVIDE>/)
+  | (?P<UNKNOWN>[^ \t])
+)''', re.VERBOSE | re.DOTALL)
+SIMPLE = TOKEN_PATTERN.groupindex['SIMPLE']
+NEWLINE = TOKEN_PATTERN.groupindex['NEWLINE']
+STRING = TOKEN_PATTERN.groupindex['STRING']
+NUMBER = TOKEN_PATTERN.groupindex['NUMBER']
+DIVIDE = TOKEN_PATTERN.groupindex['DIVIDE']
+UNKNOWN = TOKEN_PATTERN.groupindex['UNKNOWN']
 
-class Lexer():
+# the bytes lexer skips line breaks with the white space, lines come from a table
+BYTES_TOKEN_PATTERN = re.compile(rb'''[ \t\r\n]*(?:
+    (?P<WORD>[A-Za-z][A-Za-z0-9_]*|[\[\]{}(),:=<>.!|+*%&-])
+  | (?P<COMMENT>//[^\r\n]*)
+  | (?P<STRING>"[^"\\]*(?:\\+[^\\][^"\\]*)*")
+  | (?P<NUMBER>[0-9][0-9.]*)
+  | (?P<DIVIDE>/)
+  | (?P<UNKNOWN>[^ \t\r\n])
+  | (?P<END>\Z)
+)''', re.VERBOSE | re.DOTALL)
+WORD = BYTES_TOKEN_PATTERN.groupindex['WORD']
+COMMENT = BYTES_TOKEN_PATTERN.groupindex['COMMENT']
+BYTES_STRING = BYTES_TOKEN_PATTERN.groupindex['STRING']
+BYTES_NUMBER = BYTES_TOKEN_PATTERN.groupindex['NUMBER']
+BYTES_DIVIDE = BYTES_TOKEN_PATTERN.groupindex['DIVIDE']
+END = BYTES_TOKEN_PATTERN.groupindex['END']
+BYTES_NEWLINE_PATTERN = re.compile(rb'\r\n|[\n\r]')
+NON_ASCII_PATTERN = re.compile(rb'[\x80-\xff]')
+
+CHUNK_SIZE = 64 * 1024
+
+LexerResult = Tuple[str | None, Error | None, int, int]
+# source code as text, or as UTF-8 encoded bytes for the bytes lexer
+Source = str | bytes | mmap
+
+
+class BaseLexer(ABC):
+    """
+    Base class for the purist lexer backends, every backend emits the same
+    (value, error, line, column) stream. A recovering lexer reports an error and
+    goes on after the character it failed on, otherwise it stops at the error
+    """
+
+    _recover = False
+
+    @classmethod
+    def from_stream(
+            cls,
+            filepath: str,
+            stream: TextIO,
+            chunk_size: int = CHUNK_SIZE
+        ) -> 'BaseLexer':
+        """
+        Creates a lexer reading the source code from a file-like object,
+        backends that can not scan chunks read the whole stream up front
+
+        Args:
+            filepath (str): The source code filepath
+            stream (TextIO): The source code stream
+            chunk_size (int): The number of characters read at a time
+        """
+        return cls(filepath, stream.read())
+
+    @abstractmethod
+    def next(self) -> LexerResult:
+        """
+        Reads the next source code value from the file
+
+        Returns:
+            Tuple[str|None, Error|None, int, int]: (discovered value, error, line, column)
+        """
+
+    def __iter__(self) -> Iterator[LexerResult]:
+        """
+        Iterates over the discovered values, the last result holds either the
+        error or the end of file position and has no value. A recovering lexer
+        yields its errors among the values and ends at the end of file
+        """
+        result = self.next()
+        while result[1] is None and result[0] is not None or result[1] is not None and self._recover:
+            yield result
+            result = self.next()
+        yield result
+
+
+class Lexer(BaseLexer):
     """
     Purist Lexer, reads source code and discovers words, numbers, operators, etc
     """
 
-    def __init__(self, filepath: str, text: str) -> None:
+    def __init__(self, filepath: str, text: str, recover: bool = False) -> None:
         self._filepath = filepath
         self._text = text
+        self._recover = recover
         self._line = 0
         self._column = 0
         self._lines = text.splitlines()
@@ -45,7 +141,7 @@ class Lexer():
                 start_column = self._column
                 if character.isalpha():
                     response, error = self._fetch_word()
-                elif character.isdigit() or character == '-':
+                elif character.isdigit():
                     response, error = self._fetch_number()
                 elif character == '"':
                     response, error = self._fetch_string()
@@ -53,7 +149,7 @@ class Lexer():
                     response, error = self._fetch_comment_or_divide()
                 elif character in [
                     '[', ']', '{', '}', '(', ')', ',',
-                    ':', '=', '<', '>', '.', '!', '|'
+                    ':', '=', '<', '>', '.', '!', '|', '+', '-', '*', '%', '&'
                 ]:
                     self._column += 1
                     response = character
@@ -68,6 +164,9 @@ class Lexer():
                 if self._column >= len(self._lines[self._line]):
                     self._line += 1
                     self._column = 0
+        if error is not None and self._recover:
+            # the errors are found at the character failing, the next value follows it
+            self._column += 1
         return response, error, start_line + 1, start_column + 1
 
     def _fetch_word(self) -> Tuple[str | None, Error | None]:
@@ -83,7 +182,7 @@ class Lexer():
     def _fetch_number(self) -> Tuple[str | None, Error | None]:
         number = ''
         character = self._lines[self._line][self._column]
-        while character in '-1234567890.' and self._column < len(self._lines[self._line]):
+        while character in '1234567890.' and self._column < len(self._lines[self._line]):
             if character == '.':
                 if '.' in number:
                     return None, DecodeError(
@@ -127,3 +226,274 @@ class Lexer():
             self._column += 1
             return '/', None
         return None, DecodeError(first_character, self._filepath, self._line, self._column)
+
+
+class RegexLexer(BaseLexer):
+    """
+    Purist Lexer backed by a single compiled master pattern, it scans the whole
+    text in one pass instead of walking it character by character
+    """
+
+    def __init__(self, filepath: str, text: str, recover: bool = False) -> None:
+        self._filepath = filepath
+        self._recover = recover
+        self._results = self._scan(iter([text]))
+        self._last_result: LexerResult = (None, None, 1, 1)
+
+    @classmethod
+    def from_stream(
+            cls,
+            filepath: str,
+            stream: TextIO,
+            chunk_size: int = CHUNK_SIZE
+        ) -> 'RegexLexer':
+        """
+        Creates a lexer reading the source code from a file-like object in chunks,
+        only the unscanned remainder of the current chunk is kept in memory
+
+        Args:
+            filepath (str): The source code filepath
+            stream (TextIO): The source code stream
+            chunk_size (int): The number of characters read at a time
+        """
+        lexer = cls(filepath, '')
+        lexer._results = lexer._scan(iter(lambda: stream.read(chunk_size), ''))
+        return lexer
+
+    def next(self) -> LexerResult:
+        """
+        Reads the next source code value from the file
+        Returns a tuple of a discovered value and a specific error if encountered
+
+        Returns:
+            Tuple[str|None, Error|None, int, int]: (discovered value, error, line, column)
+        """
+        return next(self._results, self._last_result)
+
+    def __iter__(self) -> Iterator[LexerResult]:
+        return self._results
+
+    def _scan(self, chunks: Iterator[str]) -> Iterator[LexerResult]:
+        filepath = self._filepath
+        text = ''
+        line = 1
+        line_start = 0
+        end_line = 0
+        chunk = next(chunks, '')
+        final = False
+        while not final:
+            following = next(chunks, '')
+            final = following == ''
+            text += chunk
+            chunk = following
+            # only values before the last line break are complete, apart from strings
+            consumed = len(text) if final else text.rfind('\n') + 1
+            position = 0
+            while True:
+                # a recovering lexer scans again from the character following an error
+                resume = -1
+                for match in TOKEN_PATTERN.finditer(text, position, consumed):
+                    group = match.lastindex
+                    if group == SIMPLE:
+                        end_line = line
+                        yield match[SIMPLE], None, line, match.start(SIMPLE) - line_start + 1
+                        continue
+                    if group == NEWLINE:
+                        line += 1
+                        line_start = match.end()
+                        continue
+                    value = match[group]
+                    start = match.start(group)
+                    column = start - line_start + 1
+                    if group == STRING:
+                        start_line = line
+                        if '\n' in value or '\r' in value:
+                            line += value.count('\n') + value.count('\r') - value.count('\r\n')
+                            line_start = start + max(value.rfind('\n'), value.rfind('\r')) + 1
+                            value = value.replace('\r\n', '\n').replace('\r', '\n')
+                        end_line = line
+                        yield value, None, start_line, column
+                        continue
+                    if group == NUMBER and value.count('.') > 1:
+                        second_point = value.index('.', value.index('.') + 1)
+                        error = DecodeError('too many decimal points', filepath, line, column + second_point)
+                        self._last_result = None, error, line, column
+                        yield self._last_result
+                        resume = start + second_point + 1
+                        break
+                    if group == DIVIDE and text[match.end():match.end() + 1] in ('', '\n', '\r'):
+                        # the character lexer reports this position zero based
+                        error = DecodeError(value, filepath, line - 1, column - 1)
+                        self._last_result = None, error, line, column
+                        yield self._last_result
+                        resume = match.end()
+                        break
+                    if group == UNKNOWN and value == '"' and not final:
+                        # the string continues in the next chunk, scan it again with more text
+                        consumed = match.start()
+                        break
+                    if group != NUMBER and group != DIVIDE:
+                        self._last_result = None, DecodeError(value, filepath, line, column), line, column
+                        yield self._last_result
+                        resume = match.end()
+                        break
+                    end_line = line
+                    yield value, None, line, column
+                if resume < 0:
+                    break
+                if not self._recover:
+                    return
+                self._last_result = None, None, 1, 1
+                position = resume
+            text = text[consumed:]
+            line_start -= consumed
+        # the character lexer reports the end of file on the last line only when
+        # blank lines follow the last value
+        line_count = line - (1 if line_start == len(text) else 0)
+        if end_line < line_count:
+            self._last_result = None, None, line_count, 1
+        yield self._last_result
+
+
+def line_starts(data: bytes | mmap) -> array:
+    """
+    Returns the offset of the first byte of every line, the table takes 4 bytes
+    per line, 8 for files of 4GB and more, instead of a copy of the source code
+
+    Args:
+        data: the UTF-8 encoded source code
+    """
+    starts = array('I' if len(data) < 1 << 32 else 'q', [0])
+    if data.find(b'\r') >= 0:
+        starts.extend(match.end() for match in BYTES_NEWLINE_PATTERN.finditer(data))
+        return starts
+    # searching line feeds is much faster than matching the line break pattern
+    find = data.find
+    append = starts.append
+    position = find(b'\n')
+    while position >= 0:
+        position += 1
+        append(position)
+        position = find(b'\n', position)
+    return starts
+
+class BytesLexer(BaseLexer):
+    """
+    Purist Lexer scanning UTF-8 encoded source code, such as a memory mapped file,
+    without decoding it. Only the discovered values are decoded and positions are
+    looked up in a table of line start offsets, columns count characters like the
+    text lexers do
+    """
+
+    def __init__(self, filepath: str, data: bytes | mmap, recover: bool = False) -> None:
+        self._filepath = filepath
+        self._recover = recover
+        self._results = self._scan(data)
+        self._last_result: LexerResult = (None, None, 1, 1)
+
+    def next(self) -> LexerResult:
+        """
+        Reads the next source code value from the file
+        Returns a tuple of a discovered value and a specific error if encountered
+
+        Returns:
+            Tuple[str|None, Error|None, int, int]: (discovered value, error, line, column)
+        """
+        return next(self._results, self._last_result)
+
+    def __iter__(self) -> Iterator[LexerResult]:
+        return self._results
+
+    def _scan(self, data: bytes | mmap) -> Iterator[LexerResult]:
+        filepath = self._filepath
+        starts = line_starts(data)
+        # lines holding multi-byte characters, their columns are counted on the decoded line
+        wide_lines = set()
+        if not isinstance(data, bytes) or not data.isascii():
+            wide_lines = {bisect_right(starts, match.start()) for match in NON_ASCII_PATTERN.finditer(data)}
+        line_count = len(starts)
+        # words and symbols repeat, each distinct one is decoded once
+        words: Dict[bytes, str] = {}
+        line = 1
+        line_start = 0
+        next_line_start = starts[1] if line_count > 1 else maxsize
+        wide = line in wide_lines
+        end = 0
+        position = 0
+        while True:
+            # a recovering lexer scans again from the character following an error
+            resume = -1
+            for match in BYTES_TOKEN_PATTERN.finditer(data, position):
+                group = match.lastindex
+                start = match.start(group)
+                if start >= next_line_start:
+                    line = bisect_right(starts, start, line)
+                    line_start = starts[line - 1]
+                    next_line_start = starts[line] if line < line_count else maxsize
+                    wide = line in wide_lines
+                column = start - line_start + 1
+                if wide:
+                    column = len(data[line_start:start].decode('utf-8')) + 1
+                if group == WORD:
+                    raw = match[WORD]
+                    word = words.get(raw)
+                    if word is None:
+                        word = raw.decode('ascii')
+                        words[raw] = word
+                    yield word, None, line, column
+                    continue
+                if group == END:
+                    # the white space before the end of the file follows the last value
+                    end = match.start()
+                    break
+                if group == BYTES_STRING:
+                    value = match[BYTES_STRING].decode('utf-8')
+                    if '\r' in value:
+                        value = value.replace('\r\n', '\n').replace('\r', '\n')
+                    yield value, None, line, column
+                    continue
+                if group == COMMENT:
+                    yield match[COMMENT].decode('utf-8'), None, line, column
+                    continue
+                if group == BYTES_NUMBER:
+                    value = match[BYTES_NUMBER].decode('ascii')
+                    if value.count('.') > 1:
+                        second_point = value.index('.', value.index('.') + 1)
+                        error = DecodeError('too many decimal points', filepath, line, column + second_point)
+                        self._last_result = None, error, line, column
+                        yield self._last_result
+                        resume = start + second_point + 1
+                        break
+                    yield value, None, line, column
+                    continue
+                if group == BYTES_DIVIDE:
+                    if data[match.end():match.end() + 1] in (b'', b'\n', b'\r'):
+                        # the character lexer reports this position zero based
+                        error = DecodeError('/', filepath, line - 1, column - 1)
+                        self._last_result = None, error, line, column
+                        yield self._last_result
+                        resume = match.end()
+                        break
+                    yield '/', None, line, column
+                    continue
+                character = data[start:start + 4].decode('utf-8', 'replace')[0]
+                self._last_result = None, DecodeError(character, filepath, line, column), line, column
+                yield self._last_result
+                # the whole character is skipped, not only its first byte
+                lead = data[start]
+                resume = start + (1 if lead < 0xc0 else 2 if lead < 0xe0 else 3 if lead < 0xf0 else 4)
+                break
+            if resume < 0:
+                break
+            if not self._recover:
+                return
+            self._last_result = None, None, 1, 1
+            position = resume
+        # the character lexer reports the end of file on the last line only when
+        # blank lines follow the last value
+        end_line = bisect_right(starts, end - 1) if end > 0 else 0
+        if starts[-1] == len(data):
+            line_count -= 1
+        if end_line < line_count:
+            self._last_result = None, None, line_count, 1
+        yield self._last_result
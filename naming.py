@@ -0,0 +1,104 @@
+"""
+Identifier naming validation, names are collected by role and name while parsing
+and checked in a single pass per file, the cost of the pass scales with the
+distinct names of the file and every distinct name is matched once per role
+"""
+import re
+
+from enum import Enum
+from typing import Dict, List, Tuple, Type
+
+from errors import Error, InvalidClassName, InvalidInterfaceName, InvalidMethodName, InvalidVariableName
+
+PASCAL_CASE = r'^[A-Z](([a-zA-Z0-9]+[A-Z]?)*)$'
+CLASS_CASE = PASCAL_CASE
+INTERFACE_CASE = PASCAL_CASE
+CAMEL_CASE = r'^[a-z]|([A-Z0-9])[a-z]*'
+METHOD_CASE = CAMEL_CASE
+VARIABLE_CASE = CAMEL_CASE
+CONSTANT = r'^[A-Z][A-Z0-9_][A-Z]+$'
+
+
+class NameRole(Enum):
+    """
+    What an identifier names, each role has its own naming convention
+    """
+    CLASS = 'CLASS'
+    INTERFACE = 'INTERFACE'
+    METHOD = 'METHOD'
+    VARIABLE = 'VARIABLE'
+
+
+ROLE_PATTERNS: Dict[NameRole, re.Pattern] = {
+    NameRole.CLASS: re.compile(CLASS_CASE),
+    NameRole.INTERFACE: re.compile(INTERFACE_CASE),
+    NameRole.METHOD: re.compile(METHOD_CASE),
+    NameRole.VARIABLE: re.compile(VARIABLE_CASE),
+}
+
+ROLE_ERRORS: Dict[NameRole, Type[Error]] = {
+    NameRole.CLASS: InvalidClassName,
+    NameRole.INTERFACE: InvalidInterfaceName,
+    NameRole.METHOD: InvalidMethodName,
+    NameRole.VARIABLE: InvalidVariableName,
+}
+
+# filename, line and column of an identifier
+NamePosition = Tuple[str, int, int]
+# the positions of the identifiers of a file by role and name
+NameOccurrences = Dict[Tuple[NameRole, str], List[NamePosition]]
+
+
+class NamingValidator():
+    """
+    Checks collected identifiers against the naming convention of their role, the
+    result for every role and name is memoized until the memo holds too many names
+    """
+
+    def __init__(self, max_names: int = 65536) -> None:
+        """
+        Args:
+            max_names: the number of memoized results, the memo is cleared when it is full
+        """
+        self._max_names = max_names
+        self._valid: Dict[Tuple[NameRole, str], bool] = {}
+
+    def is_valid(self, role: NameRole, name: str) -> bool:
+        """
+        Returns if a name follows the naming convention of its role
+
+        Args:
+            role: what the name names
+            name: the identifier
+        """
+        key = (role, name)
+        valid = self._valid.get(key)
+        if valid is None:
+            valid = ROLE_PATTERNS[role].match(name) is not None
+            if len(self._valid) >= self._max_names:
+                self._valid.clear()
+            self._valid[key] = valid
+        return valid
+
+    def validate(self, names: NameOccurrences) -> List[Error]:
+        """
+        Checks the collected identifiers of a file, every distinct name is looked up
+        once and only the names missing from the memo are matched
+
+        Args:
+            names: the positions of the identifiers by role and name
+        Returns:
+            List[Error]: an error for every occurrence of a name breaking its naming
+                convention, in the order of their positions
+        """
+        valid = self._valid
+        errors: List[Error] = []
+        for key, positions in names.items():
+            result = valid.get(key)
+            if result is None:
+                result = self.is_valid(*key)
+            if not result:
+                role, name = key
+                errors.extend(ROLE_ERRORS[role](name, filename, line, column) for filename, line, column in positions)
+        errors.sort(key=lambda error: (error.line, error.column))
+        return errors
@@ -1,8 +1,11 @@
 """
 Purist Parser, entry point to parse the purist source code
 """
+import argparse
+import io
 import json
-import logging
+import mmap
+import os
 import re
 import sys
 
@@ -10,17 +13,87 @@ from os import environ as env
 from os.path import join as path
 
 import time
-from typing import Any, Dict, List, Tuple
-from errors import InvalidClassName, InvalidImportStatement, InvalidInterfaceName, InvalidMethodName, InvalidVariableName, UnexpectedKeyword
-from tokenizer import Token, TokenType, Tokenizer
+from enum import Enum
+from typing import IO, TYPE_CHECKING, Any, Callable, Dict, List, NoReturn, TextIO, Tuple
+from cache import AstCache, CompactNode
+from diagnostics import Diagnostics, Severity
+from errors import Error, ExecutionError, InvalidImportStatement, ParseError, UnexpectedEndOfFile, UnexpectedKeyword
+from lexer import Source
+from profiling import Phase, Profiler
+from naming import NameOccurrences, NameRole, NamingValidator
+from tokenizer import Token, TokenBuffer, TokenSource, TokenStream, TokenType, Tokenizer
 
-PASCAL_CASE = r'^[A-Z](([a-zA-Z0-9]+[A-Z]?)*)$'
-CLASS_CASE = PASCAL_CASE
-INTERFACE_CASE = PASCAL_CASE
-CAMEL_CASE = r'^[a-z]|([A-Z0-9])[a-z]*'
-METHOD_CASE = CAMEL_CASE
-VARIABLE_CASE = CAMEL_CASE
-CONSTANT = r'^[A-Z][A-Z0-9_][A-Z]+$'
+if TYPE_CHECKING:
+    # the symbol index reads the parser's nodes
+    from symbols import SymbolIndex
+
+TYPE_TOKENS = [
+    TokenType.CLASS_IDENTIFIER,
+    TokenType.INTERFACE_IDENTIFIER,
+    TokenType.TYPE_IDENTIFIER,
+    TokenType.ENUMERATION_IDENTIFIER,
+    TokenType.STRING_TYPE,
+    TokenType.BOOLEAN_TYPE,
+    TokenType.DECIMAL_TYPE,
+    TokenType.INTEGER_TYPE,
+    TokenType.IDENTIFIER,
+    TokenType.NULL
+]
+VALUE_TOKENS = [
+    TokenType.STRING_VALUE,
+    TokenType.INTEGER_VALUE,
+    TokenType.DECIMAL_VALUE,
+    TokenType.BOOLEAN_VALUE,
+    TokenType.NULL
+]
+
+# binary operators by precedence, lowest first, as the token types they are written with, the
+# tokens of an operator follow each other without spaces
+BINARY_OPERATORS: List[List[Tuple[Tuple[TokenType, ...], str]]] = [
+    [((TokenType.LOGICAL_OR, TokenType.LOGICAL_OR), '||')],
+    [((TokenType.AMPERSAND, TokenType.AMPERSAND), '&&')],
+    [((TokenType.EQUALS, TokenType.EQUALS), '=='), ((TokenType.NOT, TokenType.EQUALS), '!=')],
+    [
+        ((TokenType.LEFT_ANGLE_BRACKET, TokenType.EQUALS), '<='),
+        ((TokenType.RIGHT_ANGLE_BRACKET, TokenType.EQUALS), '>='),
+        ((TokenType.LEFT_ANGLE_BRACKET,), '<'),
+        ((TokenType.RIGHT_ANGLE_BRACKET,), '>'),
+    ],
+    [((TokenType.PLUS,), '+'), ((TokenType.MINUS,), '-')],
+    [((TokenType.ASTERISK,), '*'), ((TokenType.SLASH,), '/'), ((TokenType.PERCENT,), '%')],
+]
+ASSIGNABLE_NODES = ['name', 'member', 'index']
+# the values and literal nodes a minus sign makes negative
+NUMBER_TOKENS = [TokenType.INTEGER_VALUE, TokenType.DECIMAL_VALUE]
+NUMBER_NODES = ['integer', 'decimal']
+
+# tokens panic mode error recovery synchronizes on
+STATEMENT_TOKENS = [TokenType.CLASS, TokenType.INTERFACE, TokenType.TYPE, TokenType.FROM, TokenType.EOF]
+MEMBER_TOKENS = [TokenType.IDENTIFIER, TokenType.PUBLIC, TokenType.PRIVATE, TokenType.CONSTRUCTOR]
+
+# bump whenever the shape of the AST changes, cached ASTs of other versions are ignored
+PARSER_VERSION = '8'
+CACHE_FOLDER = '__puristcache__'
+# a white space character or a comment between the tokens of a from statement
+HEADER_SEPARATOR = r'(?:[ \t\r\n]|//[^\r\n]*)'
+# a comment or a from statement of the header, matched one after the other from the
+# start of a module instead of lexing every token
+HEADER_STATEMENT = (
+    rf'[ \t\r\n]*(?:from{HEADER_SEPARATOR}+'
+    rf'(?P<MODULE>[A-Za-z][A-Za-z0-9_]*(?:{HEADER_SEPARATOR}*\.{HEADER_SEPARATOR}*[A-Za-z][A-Za-z0-9_]*)*)'
+    rf'{HEADER_SEPARATOR}+require{HEADER_SEPARATOR}*\[[^\]]*\]|//[^\r\n]*)'
+)
+# a complete token that starts neither a from statement nor a comment, the header
+# certainly ends before it
+HEADER_END = r'[ \t\r\n]*(?:(?!from\b)[A-Za-z][A-Za-z0-9_]*[^A-Za-z0-9_]|[^A-Za-z/ \t\r\n])'
+HEADER_STATEMENT_PATTERN = re.compile(HEADER_STATEMENT)
+BYTES_HEADER_STATEMENT_PATTERN = re.compile(HEADER_STATEMENT.encode('ascii'))
+HEADER_END_PATTERN = re.compile(HEADER_END)
+BYTES_HEADER_END_PATTERN = re.compile(HEADER_END.encode('ascii'))
+HEADER_SEPARATOR_PATTERN = re.compile(HEADER_SEPARATOR)
+# the number of characters or bytes read from a stream to scan its header, the
+# rest is read only when the header may go on past them
+HEADER_PREFIX_SIZE = 4096
 
 
 class Node():
@@ -33,6 +106,13 @@ class Node():
         self._value = value
         self._children: 'List[Node]|None' = None
 
+    @property
+    def name(self) -> str:
+        """
+        Returns the name of the node
+        """
+        return self._node_name
+
     @property
     def children(self) -> 'List[Node]|None':
         """
@@ -40,6 +120,10 @@ class Node():
         """
         return self._children
 
+    @children.setter
+    def children(self, children: 'List[Node]|None') -> None:
+        self._children = children
+
     def add_child(self, node: 'Node|None') -> None:
         """
         Adds a child to the parent (current) node
@@ -65,102 +149,661 @@ class Node():
     def value(self, value: str | int | float) -> None:
         self._value = value
 
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Converts the tree into nested dictionaries and lists, walking it once
+        without recursion
+
+        Returns:
+            Dict[str, Any]: the node with 'type', 'value' and 'children' keys, the
+                value and children are left out when not set
+        """
+        root: Dict[str, Any] = {}
+        stack: List[Tuple[Node, Dict[str, Any]]] = [(self, root)]
+        while stack:
+            node, response = stack.pop()
+            response['type'] = node._node_name
+            if node._value is not None:
+                response['value'] = node._value
+            if node._children is not None:
+                children: List[Dict[str, Any]] = [{} for _ in node._children]
+                response['children'] = children
+                stack.extend(zip(node._children, children))
+        return root
+
+    def write_json(self, stream: TextIO, indent: int | None = None) -> None:
+        """
+        Writes the tree as JSON, walking it once without recursion and writing the
+        output in chunks as it is produced
+
+        Args:
+            stream: the text stream to write to
+            indent: the number of spaces per level, the compact form without any
+                whitespace when not given
+        """
+        if indent is None:
+            item_separator, key_separator = ',', ':'
+        else:
+            item_separator, key_separator = ',', ': '
+        dumps = json.dumps
+        pieces: List[str] = []
+        # strings are written as they are, nodes are expanded with their depth
+        stack: List[str | Tuple[Node, int]] = [(self, 0)]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, str):
+                pieces.append(item)
+            else:
+                node, depth = item
+                if indent is None:
+                    newline = closing = child_newline = ''
+                else:
+                    newline = '\n' + ' ' * (indent * (depth + 1))
+                    closing = '\n' + ' ' * (indent * depth)
+                    child_newline = '\n' + ' ' * (indent * (depth + 2))
+                pieces.append(f'{{{newline}"type"{key_separator}{dumps(node._node_name)}')
+                if node._value is not None:
+                    pieces.append(f'{item_separator}{newline}"value"{key_separator}{dumps(node._value)}')
+                children = node._children
+                if children is None:
+                    pieces.append(closing + '}')
+                elif not children:
+                    pieces.append(f'{item_separator}{newline}"children"{key_separator}[]{closing}}}')
+                else:
+                    pieces.append(f'{item_separator}{newline}"children"{key_separator}[{child_newline}')
+                    stack.append(f'{newline}]{closing}}}')
+                    for position in range(len(children) - 1, -1, -1):
+                        stack.append((children[position], depth + 2))
+                        if position > 0:
+                            stack.append(item_separator + child_newline)
+            if len(pieces) >= 1024:
+                stream.write(''.join(pieces))
+                pieces.clear()
+        stream.write(''.join(pieces))
+
     def __repr__(self) -> str:
-        response: Dict[str, Any] = {}
-        response['type'] = self._node_name
-        if self._value is not None:
-            response['value'] = self._value
-        if self._children is not None:
-            children: List[Dict[str, Any]] = []
-            for child in self._children:
-                children.append(json.loads(child.__repr__()))
-            response['children'] = children
-        return json.dumps(response, indent=4)
+        output = io.StringIO()
+        self.write_json(output, indent=4)
+        return output.getvalue()
+
+
+# parses the children of a lazy node from the tokens between the start and end indexes
+NodeParser = Callable[[TokenBuffer, int, int], 'List[Node] | None']
+
+
+class LazyNode(Node):
+    """
+    Node whose children are parsed from a span of tokens the first time they are
+    accessed, until then it only keeps the tokens and the span. The tokens must not
+    be dropped or replaced before the children are parsed
+    """
+
+    def __init__(self, node_name: str, tokens: TokenBuffer, start: int, end: int, parse: NodeParser) -> None:
+        """
+        Args:
+            node_name: the name of the node
+            tokens: the tokens holding the span
+            start: the index of the first token of the span
+            end: the index following the last token of the span
+            parse: parses the children from the span, errors are raised on first access
+        """
+        super().__init__(node_name)
+        self._tokens: TokenBuffer | None = tokens
+        self._generation = tokens.generation
+        self._span = (start, end)
+        self._parse: NodeParser | None = parse
+
+    @property
+    def span(self) -> Tuple[int, int]:
+        """
+        Returns the start and end token indexes the children are parsed from
+        """
+        return self._span
+
+    @property
+    def parsed(self) -> bool:
+        """
+        Returns if the children have been parsed
+        """
+        return self._tokens is None
+
+    # the tree walks read _children directly, here it parses the span first
+    @property  # type: ignore[override]
+    def _children(self) -> 'List[Node]|None':
+        tokens = self._tokens
+        if tokens is not None and self._parse is not None:
+            if tokens.generation != self._generation:
+                raise ValueError(f'the tokens of the lazy {self._node_name} node changed before it was parsed')
+            children = self._parse(tokens, *self._span)
+            self._tokens = None
+            self._parse = None
+            self._lazy_children = children
+        return self._lazy_children
+
+    @_children.setter
+    def _children(self, children: 'List[Node]|None') -> None:
+        self._lazy_children = children
+        self._tokens = None
+
+def module_name(file_path: str) -> str:
+    """
+    Returns the dotted module name of a module path, the value of its 'source' node
+    """
+    return file_path[:-7].replace('/', '.')
+
+
+def module_path(import_expression: str) -> str:
+    """
+    Returns the module path of a dotted import expression, the value of its 'import' node
+    """
+    return path(*import_expression.split('.')) + '.purist'
+
+
+def header_imports(text: Source | IO) -> List[str]:
+    """
+    Returns the module paths imported by the from statements at the top of source
+    code, scanning stops at the first token that is not a comment or part of a from
+    statement. A stream is read HEADER_PREFIX_SIZE characters or bytes at first,
+    and more only while the header may go on past what was read
+
+    Args:
+        text: the source code text, its UTF-8 encoded bytes, a text or a binary stream
+    """
+    if isinstance(text, (str, bytes, mmap.mmap)):
+        return _scan_header(text)[0]
+    header = text.read(HEADER_PREFIX_SIZE)
+    while True:
+        imports, ended = _scan_header(header)
+        more = None if ended else text.read(len(header))
+        if not more:
+            return imports
+        header += more
+
+
+def _scan_header(text: Source) -> Tuple[List[str], bool]:
+    """
+    Returns the module paths imported by the header of a text and whether the text
+    goes on past the header, otherwise the header may be cut short
+    """
+    if isinstance(text, str):
+        match_statement, match_end = HEADER_STATEMENT_PATTERN.match, HEADER_END_PATTERN.match
+    else:
+        match_statement, match_end = BYTES_HEADER_STATEMENT_PATTERN.match, BYTES_HEADER_END_PATTERN.match
+    imports: List[str] = []
+    position = 0
+    match = match_statement(text)
+    while match is not None:
+        module = match['MODULE']
+        if module is not None:
+            if not isinstance(module, str):
+                module = module.decode('ascii')
+            module = HEADER_SEPARATOR_PATTERN.sub('', module)
+            if module.partition('.')[0] != 'Builtin':
+                imports.append(module_path(module))
+        position = match.end()
+        match = match_statement(text, position)
+    return imports, match_end(text, position) is not None
+
+def compact(node: Node) -> CompactNode:
+    """
+    Converts a node tree into nested tuples, which pickle and marshal far smaller
+    than Node objects
+    """
+    children = node.children
+    if children is None:
+        return node.name, node.value, None
+    return node.name, node.value, tuple(compact(child) for child in children)
+
+
+def expand(compact_node: CompactNode) -> Node:
+    """
+    Converts nested tuples created by compact back into a node tree
+    """
+    name, value, children = compact_node
+    node = Node(name, value)
+    if children is not None:
+        for child in children:
+            node.add_child(expand(child))
+    return node
+
+def _count_nodes(ast: Node) -> int:
+    count = 0
+    stack = [ast]
+    while stack:
+        node = stack.pop()
+        count += 1
+        # counting must not parse the lazy bodies
+        if isinstance(node, LazyNode) and not node.parsed:
+            continue
+        if node.children is not None:
+            stack.extend(node.children)
+    return count
 
 class FileReader:
-    def read(self, filename: str) -> str:
+    def read(self, filename: str) -> Source:
         with open(filename, 'r') as f:
             return f.read()
 
+class MmapFileReader(FileReader):
+    """
+    Maps source code files into memory instead of reading and decoding them, the
+    tokenizer scans the mapped bytes and only decodes the values it discovers
+    """
+
+    def read(self, filename: str) -> Source:
+        with open(filename, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                # empty files can not be mapped
+                return b''
+            # the mapping stays valid after the file is closed
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+class ModuleState(Enum):
+    """
+    Parse state of a module within a compilation session
+    """
+    IN_PROGRESS = 'IN_PROGRESS'
+    DONE = 'DONE'
+
+class ModuleRegistry():
+    """
+    Compilation session shared by all nested parses, every module is parsed once
+    and modules still in progress identify cyclic imports
+    """
+
+    def __init__(self) -> None:
+        self._states: Dict[str, ModuleState] = {}
+        self._nodes: Dict[str, Node | None] = {}
+
+    def __contains__(self, file_path: str) -> bool:
+        return file_path in self._states
+
+    def state(self, file_path: str) -> ModuleState | None:
+        """
+        Returns the parse state of a module, None when it was never seen
+
+        Args:
+            file_path: the module path relative to the source folder
+        """
+        return self._states.get(file_path)
+
+    def begin(self, file_path: str) -> None:
+        """
+        Marks a module as being parsed
+
+        Args:
+            file_path: the module path relative to the source folder
+        """
+        self._states[file_path] = ModuleState.IN_PROGRESS
+
+    def finish(self, file_path: str, node: Node | None) -> None:
+        """
+        Marks a module as parsed and stores its AST, None when the module is invalid
+
+        Args:
+            file_path: the module path relative to the source folder
+            node: the root node of the module
+        """
+        self._states[file_path] = ModuleState.DONE
+        self._nodes[file_path] = node
+
+    def discard(self, file_path: str) -> None:
+        """
+        Forgets a module so it is parsed again the next time it is required
+
+        Args:
+            file_path: the module path relative to the source folder
+        """
+        self._states.pop(file_path, None)
+        self._nodes.pop(file_path, None)
+
+    def node(self, file_path: str) -> Node | None:
+        """
+        Returns the AST of a parsed module
+
+        Args:
+            file_path: the module path relative to the source folder
+        """
+        return self._nodes.get(file_path)
+
+    @property
+    def modules(self) -> Dict[str, Node | None]:
+        """
+        Returns the ASTs of all parsed modules by module path
+        """
+        return self._nodes
+
 class Parser():
     """
     Purist Parser, once it has tokens it checks if the tokens can form a valid AST
     """
 
-    def __init__(self, src_folder: str, file_reader: FileReader) -> None:
-        self._tokenizer = Tokenizer()
+    def __init__(
+            self,
+            src_folder: str,
+            file_reader: FileReader,
+            registry: ModuleRegistry | None = None,
+            follow_imports: bool = True,
+            cache_folder: str | None = None,
+            profiler: Profiler | None = None,
+            diagnostics: Diagnostics | None = None,
+            recover: bool = False,
+            lazy_bodies: bool = False,
+            symbols: 'SymbolIndex | None' = None
+        ) -> None:
+        """
+        Args:
+            src_folder: the folder the module paths are relative to
+            file_reader: reads the source code files
+            registry: the compilation session, a new one when not given
+            follow_imports: parse imported modules in place, otherwise imports
+                are left as 'import' nodes holding the module path for later linking
+            cache_folder: the persistent AST cache folder, no cache when not given
+            profiler: measures every parsed module per phase, no measurements when not given
+            diagnostics: collects the messages and errors, a silent collector when not given
+            recover: keep parsing after syntax errors, the modules keep the statements
+                and class members that parsed and every error is reported
+            lazy_bodies: parse method bodies the first time their children are
+                accessed, their syntax errors are then raised on that access. The
+                bodies are parsed right away when recovering, so their errors are
+                reported with the others. Cached modules are still read, but modules
+                with lazy bodies are not stored as storing would parse every body
+            symbols: indexes the declarations and references of every parsed module,
+                no index when not given
+        """
+        self._diagnostics = diagnostics if diagnostics is not None else Diagnostics()
+        # the level checks are done once, not for every module and class
+        self._verbose = self._diagnostics.enabled(Severity.INFO)
+        self._trace = self._diagnostics.enabled(Severity.DEBUG)
+        self._profiler = profiler
+        self._tokenizer = Tokenizer(profiler=profiler, diagnostics=self._diagnostics)
         self._src_folder = src_folder
         self._file_reader = file_reader
-        self._parsed_files: List[str] = []
-        self._parsed_file_nodes: Dict[str, Node] = {}
+        self._registry = registry if registry is not None else ModuleRegistry()
+        self._follow_imports = follow_imports
+        self._names: NameOccurrences = {}
+        self._naming = NamingValidator()
+        self._recover = recover
+        self._lazy_bodies = lazy_bodies and not recover
+        self._symbols = symbols
+        self._errors: List[Error] | None = None
+        self._member_start = 0
+        self._module_errors: Dict[str, List[Error]] = {}
+        self._cache: AstCache | None = None
+        if cache_folder is not None:
+            self._cache = AstCache(cache_folder, PARSER_VERSION)
+
+    @property
+    def registry(self) -> ModuleRegistry:
+        """
+        Returns the compilation session shared by all nested parses
+        """
+        return self._registry
+
+    @property
+    def diagnostics(self) -> Diagnostics:
+        """
+        Returns the collector of the parse messages and errors
+        """
+        return self._diagnostics
+
+    @property
+    def errors(self) -> Dict[str, List[Error]]:
+        """
+        Returns the errors found in every module with errors, only collected when recovering
+        """
+        return self._module_errors
+
+    @property
+    def cache(self) -> AstCache | None:
+        """
+        Returns the persistent AST cache, None when caching is disabled
+        """
+        return self._cache
 
     def parse(self, file_path: str) -> Node | None:
         """
-        Parse a file and return a root Node of the AST
+        Parse a file and return a root Node of the AST, when recovering the AST
+        holds what parsed and the errors are kept in errors
 
         Args:
             file_path: path to the file to parse
         Returns:
             Node: an abstract syntax tree root node
         """
-        if file_path in self._parsed_files:
-            if file_path in self._parsed_file_nodes:
-                print(f'parsing {file_path} from cache')
-                return self._parsed_file_nodes[file_path]
-            print("cyclic dependency detected")
+        state = self._registry.state(file_path)
+        if state is ModuleState.DONE:
+            if self._trace:
+                self._diagnostics.report(Severity.DEBUG, 'ModuleFromRegistry', f'parsing {file_path} from cache')
+            return self._registry.node(file_path)
+        if state is ModuleState.IN_PROGRESS:
+            self._diagnostics.report(Severity.ERROR, 'CyclicDependency', 'cyclic dependency detected', file_path)
             return None
         full_path = path(self._src_folder, file_path)
-        print(f'parsing {full_path}')
+        if self._verbose:
+            self._diagnostics.report(Severity.INFO, 'ParsingModule', f'parsing {full_path}')
+        self._registry.begin(file_path)
+        profiler = self._profiler
+        if profiler is not None:
+            profiler.enter(file_path)
+        errors: List[Error] | None = [] if self._recover else None
         try:
-            self._parsed_files.append(file_path)
             text = self._file_reader.read(full_path)
-            tokens = self._tokenizer.tokenize(file_path, text)
-            ast = self._parse_tokens(tokens, file_path)
-            self._parsed_file_nodes[file_path] = ast
+            if profiler is not None:
+                profiler.lap(Phase.READ)
+            ast = self._load_cached(file_path, text)
+            if ast is None:
+                if profiler is not None:
+                    profiler.lap(Phase.CACHE)
+                tokens = self._tokenizer.tokenize_to_buffer(file_path, text, errors=errors)
+                if profiler is not None:
+                    # the tokenizer records the lex and tokenize phases itself
+                    profiler.mark()
+                ast = self._parse_tokens(tokens, file_path, errors)
+                if profiler is not None:
+                    profiler.lap(Phase.PARSE)
+                    profiler.count(file_path, nodes=_count_nodes(ast))
+                    profiler.mark()
+                if errors:
+                    self._module_errors[file_path] = errors
+                    for error in errors:
+                        self._diagnostics.error(error)
+                elif not self._lazy_bodies:
+                    self._store_cached(file_path, text, ast)
+            if profiler is not None:
+                profiler.lap(Phase.CACHE)
+            if self._symbols is not None:
+                self._symbols.update(file_path, ast)
+            self._link_imports(ast, file_path)
+            if profiler is not None:
+                profiler.lap(Phase.LINK)
+            self._registry.finish(file_path, ast)
             return ast
         except FileNotFoundError:
-            print(f'File not found: {full_path}')
+            self._registry.finish(file_path, None)
+            self._diagnostics.report(Severity.ERROR, 'FileNotFound', f'File not found: {full_path}')
             error = InvalidImportStatement(full_path, 0, 0)
-            raise ValueError(error.get_error())
+            raise ParseError(error)
         except RecursionError:
-            print('Recursion error')
+            self._registry.finish(file_path, None)
+            self._diagnostics.report(Severity.ERROR, 'RecursionError', 'Recursion error', full_path)
             error = InvalidImportStatement(full_path, 0, 0)
-            raise ValueError(error.get_error())
+            raise ParseError(error)
         except ValueError as e:
-            print(e)
+            self._registry.finish(file_path, None)
+            if self._symbols is not None:
+                self._symbols.update(file_path, None)
+            self._diagnostics.failure(e)
             return None
+        finally:
+            if profiler is not None:
+                profiler.exit()
+
+    def parse_stream(self, file_path: str, stream: TextIO) -> Node | None:
+        """
+        Parse source code read lazily from a file-like object, the tokens are
+        consumed through a small lookahead buffer instead of a full token list,
+        only the tokens of the method body being parsed are held together
 
-    def _parse_tokens(self, tokens: List[Token], filename: str) -> Node:
+        Args:
+            file_path: path of the file being parsed, relative to the source folder
+            stream: the source code stream
+        Returns:
+            Node: an abstract syntax tree root node
+        """
+        self._registry.begin(file_path)
+        try:
+            tokens = TokenStream(self._tokenizer.iter_tokens(file_path, stream))
+            ast = self._parse_tokens(tokens, file_path)
+            if self._symbols is not None:
+                self._symbols.update(file_path, ast)
+            self._link_imports(ast, file_path)
+            self._registry.finish(file_path, ast)
+            return ast
+        except ValueError as e:
+            self._registry.finish(file_path, None)
+            if self._symbols is not None:
+                self._symbols.update(file_path, None)
+            self._diagnostics.failure(e)
+            return None
+
+    def _load_cached(self, file_path: str, text: Source) -> Node | None:
+        if self._cache is None:
+            return None
+        compact_node = self._cache.load(self._cache.key(file_path, text))
+        if compact_node is None:
+            return None
+        if self._verbose:
+            self._diagnostics.report(Severity.INFO, 'ModuleFromDiskCache', f'parsing {file_path} from disk cache')
+        return expand(compact_node)
+
+    def _store_cached(self, file_path: str, text: Source, ast: Node) -> None:
+        if self._cache is not None:
+            self._cache.store(self._cache.key(file_path, text), compact(ast))
+
+    def _link_imports(self, ast: Node, file_path: str) -> None:
+        """
+        Replaces the 'import' nodes of a module by the imported modules, the modules
+        are cached with their imports unresolved so a change to an imported module
+        does not invalidate the modules importing it. When recovering a missing
+        module is left out and its error kept with the importing module
+        """
+        if not self._follow_imports or ast.children is None:
+            return
+        children: List[Node] = []
+        for child in ast.children:
+            if child.name == 'import':
+                try:
+                    linked = self.parse(str(child.value))
+                except ParseError as e:
+                    if not self._recover:
+                        raise
+                    self._module_errors.setdefault(file_path, []).extend(e.errors)
+                    for error in e.errors:
+                        self._diagnostics.error(error)
+                    continue
+                if linked is not None:
+                    children.append(linked)
+            else:
+                children.append(child)
+        ast.children = children if children else None
+
+    def _parse_tokens(
+            self,
+            tokens: TokenSource,
+            filename: str,
+            errors: List[Error] | None = None
+        ) -> Node:
+        """
+        Parses the tokens of a module, when an error list is given the statements and
+        class members failing to parse are skipped and their errors collected in it,
+        otherwise the first error is raised
+        """
         token_index = 0
-        filename = filename[:-7]
-        filename = filename.replace('/', '.')
-        root_node: Node = Node('source', filename)
-        while token_index < len(tokens):
-            token = tokens[token_index]
-            if token.type == TokenType.FROM:
-                nodes, token_index = self._parse_import_statements(tokens, token_index)
+        root_node: Node = Node('source', module_name(filename))
+        self.clear_names()
+        self._errors = errors
+        try:
+            while tokens.has(token_index):
+                try:
+                    nodes, token_index = self.parse_statement(tokens, token_index)
+                except ParseError as e:
+                    if errors is None:
+                        raise
+                    errors.extend(e.errors)
+                    nodes, token_index = [], self._synchronize_statement(tokens, token_index)
                 for node in nodes:
                     root_node.add_child(node)
-            elif token.type == TokenType.CLASS:
-                node, token_index = self._parse_class(tokens, token_index)
-                root_node.add_child(node)
-            else:
-                token_index += 1
+        finally:
+            self._errors = None
+        if errors is None:
+            self.check_names()
+        else:
+            errors.extend(self._naming.validate(self._names))
+            self.clear_names()
+            errors.sort(key=lambda error: (error.line, error.column))
         return root_node
 
-    def _parse_class_identifier(self, tokens: List[Token], index: int) -> Tuple[Node, int]:
+    def parse_statement(self, tokens: TokenSource, index: int) -> Tuple[List[Node], int]:
+        """
+        Parses the top level statement starting at the index, statements only read
+        their own tokens so they can be parsed independently of each other. The
+        identifiers are collected for check_names
+
+        Args:
+            tokens: the tokens of the module
+            index: the index of the first token of the statement
+        Returns:
+            Tuple[List[Node], int]: the statement nodes, none for tokens outside of
+                a statement, and the index of the token following the statement
+        """
+        token_type = tokens.type_at(index)
+        if token_type == TokenType.FROM:
+            import_node, index = self._parse_import_statement(tokens, index)
+            return [import_node] if import_node is not None else [], index
+        if token_type == TokenType.CLASS:
+            class_node, index = self._parse_class(tokens, index)
+            return [class_node], index
+        if token_type == TokenType.PUBLIC and self._is_token_one_of(tokens, index + 1, [TokenType.INTERFACE]):
+            # interfaces are public, the keyword is optional
+            index += 1
+            token_type = TokenType.INTERFACE
+        if token_type == TokenType.INTERFACE:
+            interface_node, index = self._parse_interface(tokens, index)
+            return [interface_node], index
+        if token_type == TokenType.TYPE:
+            type_node, index = self._parse_type_definition(tokens, index)
+            return [type_node], index
+        return [], index + 1
+
+    def _add_name(self, role: NameRole, token: Token) -> None:
+        self._names.setdefault((role, str(token.value)), []).append((token.filename, token.line, token.column))
+
+    def clear_names(self) -> None:
+        """
+        Discards the identifiers collected since the last check, such as those of a
+        statement which failed to parse
+        """
+        self._names = {}
+
+    def check_names(self) -> None:
+        """
+        Validates the identifiers collected since the last check against the naming
+        conventions, every violation in the file is reported together
+
+        Raises:
+            ParseError: when identifiers break their naming convention
+        """
+        names, self._names = self._names, {}
+        errors = self._naming.validate(names)
+        if errors:
+            raise ParseError(*errors)
+
+    def _parse_class_identifier(self, tokens: TokenSource, index: int) -> Tuple[Node, int]:
         current_token = tokens[index]
         if current_token.type == TokenType.IDENTIFIER:
-            class_name = str(current_token.value)
-            if re.match(CLASS_CASE, class_name) is None:
-                error = InvalidClassName(
-                    class_name,
-                    current_token.filename,
-                    current_token.line,
-                    current_token.column
-                )
-                raise ValueError(error.get_error())
-            return Node('class', class_name), index + 1
+            self._add_name(NameRole.CLASS, current_token)
+            return Node('class', str(current_token.value)), index + 1
         error = UnexpectedKeyword(
             'Identifier',
             str(current_token.type.name),
@@ -168,33 +811,22 @@ class Parser():
             current_token.line,
             current_token.column
         )
-        raise ValueError(error.get_error())
+        raise ParseError(error)
 
-    def _parse_class_extends(self, tokens: List[Token], index: int) -> Tuple[Node|None, int]:
+    def _parse_class_extends(self, tokens: TokenSource, index: int) -> Tuple[Node|None, int]:
         token = tokens[index]
         if token.type == TokenType.EXTENDS:
             token, index = self._expected_next_token(tokens, index, TokenType.IDENTIFIER)
-            if re.match(CLASS_CASE, str(token.value)) is None:
-                error = InvalidClassName(
-                    str(token.value),
-                    token.filename,
-                    token.line,
-                    token.column
-                )
-                raise ValueError(error.get_error())
+            self._add_name(NameRole.CLASS, token)
             return Node('extends', str(token.value)), index + 1
         return None, index
 
-    def _is_token_one_of(self, tokens: List[Token], index: int, types: List[TokenType]) -> bool:
-        if index < len(tokens):
-            current_token = tokens[index]
-            if current_token.type in types:
-                return True
-        return False
+    def _is_token_one_of(self, tokens: TokenSource, index: int, types: List[TokenType]) -> bool:
+        return tokens.has(index) and tokens.type_at(index) in types
 
     def _parse_class_implements(
             self,
-            tokens: List[Token],
+            tokens: TokenSource,
             index: int
         ) -> Tuple[List[Node], int]:
         response: List[Node] = []
@@ -208,230 +840,676 @@ class Parser():
                     TokenType.COMMA
             ]):
                 if token.type == TokenType.IDENTIFIER:
-                    if re.match(INTERFACE_CASE, str(token.value)) is not None:
-                        response.append(Node('implements', str(token.value)))
-                    else:
-                        error = InvalidInterfaceName(
-                            str(token.value),
-                            token.filename,
-                            token.line,
-                            token.column
-                        )
-                        raise ValueError(error.get_error())
+                    self._add_name(NameRole.INTERFACE, token)
+                    response.append(Node('implements', str(token.value)))
                 token, index = self._next_token(tokens, index)
         return response, index
 
-    def _parse_class_attributes(self, tokens: List[Token], index: int) -> Tuple[List[Node], int]:
-        response: List[Node] = []
-        token = tokens[index]
-        if token.type != TokenType.IDENTIFIER:
-            return response, index
-        while token.type == TokenType.IDENTIFIER and tokens[index+1].type == TokenType.COLON:
-            attribute_name = str(token.value)
-            if re.match(VARIABLE_CASE, attribute_name) is None:
-                error = InvalidVariableName(
-                    attribute_name,
-                    token.filename,
-                    token.line,
-                    token.column
-                )
-                raise ValueError(error.get_error())
-            token, index = self._expected_next_token(tokens, index, TokenType.COLON)
-            attribute_type, index = self._expect_next_one_of_token(
-                tokens,
-                index,
-                [
-                    TokenType.CLASS_IDENTIFIER,
-                    TokenType.INTERFACE_IDENTIFIER,
-                    TokenType.TYPE_IDENTIFIER,
-                    TokenType.ENUMERATION_IDENTIFIER,
-                    TokenType.STRING_TYPE,
-                    TokenType.BOOLEAN_TYPE,
-                    TokenType.DECIMAL_TYPE,
-                    TokenType.INTEGER_TYPE,
-                    TokenType.IDENTIFIER
-                ])
-            attribute_node = Node('attribute', attribute_name)
-            attribute_type_node = Node(str(attribute_type))
-            attribute_node.add_child(attribute_type_node)
-            response.append(attribute_node)
-            token, index = self._next_token(tokens, index)
-        return response, index
+    def _parse_type(self, tokens: TokenSource, index: int) -> Tuple[str, int]:
+        """
+        Parses a type following the token at the index, such as integer,
+        List<String> or String|null
+
+        Returns:
+            Tuple[str, int]: the type as written without whitespace and the index of
+                the token following the type
+        """
+        token, index = self._expect_next_one_of_token(tokens, index, TYPE_TOKENS)
+        type_name = str(token.value)
+        index += 1
+        if self._is_token_one_of(tokens, index, [TokenType.LEFT_ANGLE_BRACKET]):
+            arguments: List[str] = []
+            argument, index = self._parse_type(tokens, index)
+            arguments.append(argument)
+            while self._is_token_one_of(tokens, index, [TokenType.COMMA]):
+                argument, index = self._parse_type(tokens, index)
+                arguments.append(argument)
+            token, index = self._expected_current_token(tokens, index, TokenType.RIGHT_ANGLE_BRACKET)
+            type_name = f'{type_name}<{",".join(arguments)}>'
+        while self._is_token_one_of(tokens, index, [TokenType.LOGICAL_OR]):
+            alternative, index = self._parse_type(tokens, index)
+            type_name = f'{type_name}|{alternative}'
+        return type_name, index
+
+    def _parse_class_attributes(self, tokens: TokenSource, index: int, class_node: Node) -> int:
+        while self._is_token_one_of(tokens, index, [TokenType.IDENTIFIER]) \
+                and self._is_token_one_of(tokens, index + 1, [TokenType.COLON]):
+            self._member_start = index
+            token = tokens[index]
+            self._add_name(NameRole.VARIABLE, token)
+            attribute_node = Node('attribute', str(token.value))
+            attribute_type, index = self._parse_type(tokens, index + 1)
+            attribute_node.add_child(Node('type', attribute_type))
+            if self._is_token_one_of(tokens, index, [TokenType.EQUALS]):
+                value_node, index = self._parse_value(tokens, index)
+                attribute_node.add_child(value_node)
+            class_node.add_child(attribute_node)
+        return index
 
-    def _parse_method_parameters(self, tokens: List[Token], index: int) -> Tuple[Node, int]:
+    def _parse_value(self, tokens: TokenSource, index: int) -> Tuple[Node, int]:
+        """
+        Parses the literal value following the token at the index, a minus sign
+        makes the number following it negative
+
+        Returns:
+            Tuple[Node, int]: the value node and the index following the value
+        """
+        if self._is_token_one_of(tokens, index + 1, [TokenType.MINUS]):
+            token, index = self._expect_next_one_of_token(tokens, index + 1, NUMBER_TOKENS)
+            return Node('value', -token.value), index + 1  # type: ignore[operator]
+        token, index = self._expect_next_one_of_token(tokens, index, VALUE_TOKENS)
+        return Node('value', token.value), index + 1
+
+    def _parse_method_parameters(self, tokens: TokenSource, index: int) -> Tuple[Node, int]:
+        """
+        Parses the parameters starting at the left bracket at the index
+
+        Returns:
+            Tuple[Node, int]: the parameters node and the index following the right bracket
+        """
         parameters = Node('parameters')
-        token, index = self._next_token(tokens, index)
-        while token.type != TokenType.RIGHT_BRACKET:
-            if token.type != TokenType.IDENTIFIER:
-                return response, index
-            while token.type == TokenType.IDENTIFIER and tokens[index+1].type == TokenType.COLON:
-                attribute_name = str(token.value)
-                if re.match(VARIABLE_CASE, attribute_name) is None:
-                    error = InvalidVariableName(
-                        attribute_name,
-                        token.filename,
-                        token.line,
-                        token.column
-                    )
-                    raise ValueError(error.get_error())
-                token, index = self._expected_next_token(tokens, index, TokenType.COLON)
-                attribute_type, index = self._expect_next_one_of_token(
-                    tokens,
-                    index,
-                    [
-                        TokenType.CLASS_IDENTIFIER,
-                        TokenType.INTERFACE_IDENTIFIER,
-                        TokenType.TYPE_IDENTIFIER,
-                        TokenType.ENUMERATION_IDENTIFIER,
-                        TokenType.STRING_TYPE,
-                        TokenType.BOOLEAN_TYPE,
-                        TokenType.DECIMAL_TYPE,
-                        TokenType.INTEGER_TYPE,
-                        TokenType.IDENTIFIER
-                    ])
-                parameter = Node('attribute', attribute_name)
-                parameter_type = Node(str(attribute_type))
-                parameter.add_child(parameter_type)
-                parameters.add_child(parameter)
-                token, index = self._next_token(tokens, index)
-            if token.type == TokenType.COMMA:
-                token, index = self._next_token(tokens, index)
+        index += 1
+        while not self._is_token_one_of(tokens, index, [TokenType.RIGHT_BRACKET]):
+            token, index = self._expected_current_token(tokens, index, TokenType.IDENTIFIER)
+            self._add_name(NameRole.VARIABLE, token)
+            parameter = Node('parameter', str(token.value))
+            _, index = self._expected_current_token(tokens, index, TokenType.COLON)
+            parameter_type, index = self._parse_type(tokens, index - 1)
+            parameter.add_child(Node('type', parameter_type))
+            parameters.add_child(parameter)
+            if self._is_token_one_of(tokens, index, [TokenType.COMMA]):
+                index += 1
+            elif not self._is_token_one_of(tokens, index, [TokenType.RIGHT_BRACKET]):
+                token, index = self._expected_current_token(tokens, index, TokenType.RIGHT_BRACKET)
+                break
         return parameters, index + 1
 
-    def _parse_method_body(self, tokens: List[Token], index: int) -> Tuple[Node, int]:
+    def _parse_method_body(self, tokens: TokenSource, index: int) -> Tuple[Node, int]:
+        """
+        Parses the body starting at the left curly bracket at the index, the end of
+        a body in a token buffer is looked up in its bracket pairs and the body is
+        parsed lazily when enabled
+
+        Returns:
+            Tuple[Node, int]: the body node and the index following the body
+        """
+        if not isinstance(tokens, TokenBuffer):
+            return self._parse_streamed_method_body(tokens, index)
+        end = tokens.matching_bracket(index)
+        if end < 0:
+            self._unexpected_end_of_file(tokens, len(tokens))
+        if self._lazy_bodies:
+            return LazyNode('body', tokens, index + 1, end, self._parse_body), end + 1
         body_node = Node('body')
-        token, index = self._next_token(tokens, index)
-        while token.type != TokenType.RIGHT_CURLY_BRACKET:
+        body_node.children = self._parse_body(tokens, index + 1, end)
+        return body_node, end + 1
+
+    def _parse_streamed_method_body(self, tokens: TokenSource, index: int) -> Tuple[Node, int]:
+        """
+        Parses the body starting at the left curly bracket at the index, streamed
+        tokens can not be revisited so the tokens of the body up to the matching right
+        curly bracket are copied into a token buffer of their own and parsed from it
+
+        Returns:
+            Tuple[Node, int]: the body node and the index following the body
+        """
+        body_tokens = TokenBuffer()
+        body_tokens.add_file(tokens[index].filename)
+        depth = 1
+        while depth > 0:
             token, index = self._next_token(tokens, index)
+            if token.type == TokenType.LEFT_CURLY_BRACKET:
+                depth += 1
+            elif token.type == TokenType.RIGHT_CURLY_BRACKET:
+                depth -= 1
+            body_tokens.append(token.type, token.line, token.column, token.value)
+        # the statements look past their last token, like at the end of a module
+        end = len(body_tokens) - 1
+        body_tokens.append(TokenType.EOF, token.line, token.column, None)
+        if self._lazy_bodies:
+            return LazyNode('body', body_tokens, 0, end, self._parse_body), index + 1
+        body_node = Node('body')
+        body_node.children = self._parse_body(body_tokens, 0, end)
         return body_node, index + 1
 
-    def _parse_class_constructors(self, tokens: List[Token], index: int) -> Tuple[List[Node], int]:
-        constructors: List[Node] = []
+    def _parse_body(self, tokens: TokenBuffer, start: int, end: int) -> List[Node] | None:
+        """
+        Parses the statements of a method body from the tokens between its curly
+        brackets, the names a lazily parsed body declares are checked right away
+        as the names of its module were checked already
+
+        Returns:
+            List[Node]|None: the statement nodes, None for empty bodies
+        """
+        if not self._lazy_bodies:
+            return self._parse_statements(tokens, start, end) or None
+        names, self._names = self._names, {}
+        try:
+            statements = self._parse_statements(tokens, start, end)
+            self.check_names()
+        finally:
+            self._names = names
+        return statements or None
+
+    def _parse_statements(self, tokens: TokenBuffer, index: int, end: int) -> List[Node]:
+        statements: List[Node] = []
+        while index < end:
+            statement, index = self._parse_body_statement(tokens, index)
+            statements.append(statement)
+        return statements
+
+    def _parse_block(self, tokens: TokenBuffer, index: int) -> Tuple[Node, int]:
+        """
+        Parses the statements between the curly brackets starting at the index
+
+        Returns:
+            Tuple[Node, int]: the block node and the index following the block
+        """
+        token, index = self._expected_current_token(tokens, index, TokenType.LEFT_CURLY_BRACKET)
+        end = tokens.matching_bracket(index - 1)
+        if end < 0:
+            self._unexpected_end_of_file(tokens, len(tokens))
+        block = Node('block')
+        for statement in self._parse_statements(tokens, index, end):
+            block.add_child(statement)
+        return block, end + 1
+
+    def _parse_body_statement(self, tokens: TokenBuffer, index: int) -> Tuple[Node, int]:
+        """
+        Parses a statement of a method body: a variable declaration, an assignment,
+        an expression such as a call, if, while, for or return. Statements are not
+        separated, an expression ends at the first token that can not continue it
+
+        Returns:
+            Tuple[Node, int]: the statement node and the index following it
+        """
+        token_type = tokens.type_at(index)
+        if token_type == TokenType.IF:
+            return self._parse_if(tokens, index)
+        if token_type == TokenType.WHILE:
+            condition, index = self._parse_expression(tokens, index + 1)
+            block, index = self._parse_block(tokens, index)
+            node = Node('while')
+            node.add_child(condition)
+            node.add_child(block)
+            return node, index
+        if token_type == TokenType.FOR:
+            token, index = self._expected_next_token(tokens, index, TokenType.IDENTIFIER)
+            self._add_name(NameRole.VARIABLE, token)
+            node = Node('for', str(token.value))
+            self._expected_next_token(tokens, index, TokenType.IN)
+            iterable, index = self._parse_expression(tokens, index + 2)
+            block, index = self._parse_block(tokens, index)
+            node.add_child(iterable)
+            node.add_child(block)
+            return node, index
+        if token_type == TokenType.RETURN:
+            node = Node('return')
+            # the returned value starts on the line of the return keyword
+            if tokens.type_at(index + 1) != TokenType.RIGHT_CURLY_BRACKET \
+                    and tokens.line_at(index + 1) == tokens.line_at(index):
+                value, index = self._parse_expression(tokens, index + 1)
+                node.add_child(value)
+                return node, index
+            return node, index + 1
+        if token_type == TokenType.IDENTIFIER and tokens.type_at(index + 1) == TokenType.COLON:
+            self._add_name(NameRole.VARIABLE, tokens[index])
+            node = Node('variable', str(tokens.value_at(index)))
+            variable_type, index = self._parse_type(tokens, index + 1)
+            node.add_child(Node('type', variable_type))
+            if tokens.type_at(index) == TokenType.EQUALS:
+                value, index = self._parse_expression(tokens, index + 1)
+                node.add_child(value)
+            return node, index
+        expression, index = self._parse_expression(tokens, index)
+        if tokens.type_at(index) != TokenType.EQUALS:
+            node = Node('expression')
+            node.add_child(expression)
+            return node, index
+        if expression.name not in ASSIGNABLE_NODES:
+            self._expected_current_token(tokens, index, TokenType.IDENTIFIER)
+        value, index = self._parse_expression(tokens, index + 1)
+        node = Node('assign')
+        node.add_child(expression)
+        node.add_child(value)
+        return node, index
+
+    def _parse_if(self, tokens: TokenBuffer, index: int) -> Tuple[Node, int]:
+        """
+        Parses an if statement starting at the if keyword, an else if is kept as the
+        only statement of the else block
+
+        Returns:
+            Tuple[Node, int]: the if node and the index following it
+        """
+        node = Node('if')
+        condition, index = self._parse_expression(tokens, index + 1)
+        block, index = self._parse_block(tokens, index)
+        node.add_child(condition)
+        node.add_child(block)
+        if tokens.type_at(index) == TokenType.ELSE:
+            if tokens.type_at(index + 1) == TokenType.IF:
+                nested, index = self._parse_if(tokens, index + 1)
+                block = Node('block')
+                block.add_child(nested)
+            else:
+                block, index = self._parse_block(tokens, index + 1)
+            node.add_child(block)
+        return node, index
+
+    def _parse_expression(self, tokens: TokenBuffer, index: int, level: int = 0) -> Tuple[Node, int]:
+        """
+        Parses the binary operators of a precedence level and above, see BINARY_OPERATORS
+
+        Returns:
+            Tuple[Node, int]: the expression node and the index following it
+        """
+        if level == len(BINARY_OPERATORS):
+            return self._parse_unary(tokens, index)
+        left, index = self._parse_expression(tokens, index, level + 1)
+        while True:
+            operator, length = self._binary_operator(tokens, index, level)
+            if operator is None:
+                return left, index
+            right, index = self._parse_expression(tokens, index + length, level + 1)
+            node = Node('binary', operator)
+            node.add_child(left)
+            node.add_child(right)
+            left = node
+
+    def _binary_operator(self, tokens: TokenBuffer, index: int, level: int) -> Tuple[str | None, int]:
+        for token_types, operator in BINARY_OPERATORS[level]:
+            if all(tokens.type_at(index + offset) == token_type for offset, token_type in enumerate(token_types)) \
+                    and all(self._adjacent(tokens, index + offset) for offset in range(len(token_types) - 1)):
+                return operator, len(token_types)
+        return None, 0
+
+    def _adjacent(self, tokens: TokenBuffer, index: int) -> bool:
+        # the operators written with two tokens such as == have nothing between them
+        return tokens.line_at(index + 1) == tokens.line_at(index) \
+            and tokens.column_at(index + 1) == tokens.column_at(index) + 1
+
+    def _parse_unary(self, tokens: TokenBuffer, index: int) -> Tuple[Node, int]:
+        token_type = tokens.type_at(index)
+        if token_type == TokenType.NOT or token_type == TokenType.MINUS:
+            node = Node('unary', str(tokens.value_at(index)))
+            operand, index = self._parse_unary(tokens, index + 1)
+            if token_type == TokenType.MINUS and operand.name in NUMBER_NODES:
+                # a negative number is a literal, not the negation of one
+                return Node(operand.name, -operand.value), index  # type: ignore[operator]
+            node.add_child(operand)
+            return node, index
+        return self._parse_postfix(tokens, index)
+
+    def _parse_postfix(self, tokens: TokenBuffer, index: int) -> Tuple[Node, int]:
+        """
+        Parses an operand followed by member accesses, method calls and subscripts,
+        the brackets of calls and subscripts are on the line of the operand
+
+        Returns:
+            Tuple[Node, int]: the expression node and the index following it
+        """
+        node, index = self._parse_primary(tokens, index)
+        while True:
+            token_type = tokens.type_at(index)
+            same_line = tokens.line_at(index) == tokens.line_at(index - 1)
+            if token_type == TokenType.FULL_STOP:
+                token, index = self._expected_next_token(tokens, index, TokenType.IDENTIFIER)
+                index += 1
+                if tokens.type_at(index) == TokenType.LEFT_BRACKET and tokens.line_at(index) == token.line:
+                    call = Node('invoke', str(token.value))
+                    call.add_child(node)
+                    index = self._parse_arguments(tokens, index, call)
+                else:
+                    call = Node('member', str(token.value))
+                    call.add_child(node)
+                node = call
+            elif token_type == TokenType.LEFT_BRACKET and same_line and node.name == 'name':
+                # a method of the class or a builtin function
+                call = Node('call', node.value)
+                index = self._parse_arguments(tokens, index, call)
+                node = call
+            elif token_type == TokenType.LEFT_SQUARE_BRACKET and same_line:
+                node, index = self._parse_subscript(tokens, index, node)
+            else:
+                return node, index
+
+    def _parse_subscript(self, tokens: TokenBuffer, index: int, target: Node) -> Tuple[Node, int]:
+        """
+        Parses an index such as items[0] or a slice such as items[1:count] starting
+        at the left square bracket, either end of a slice is optional
+        """
+        start: Node | None = None
+        index += 1
+        if tokens.type_at(index) != TokenType.COLON:
+            start, index = self._parse_expression(tokens, index)
+        if tokens.type_at(index) != TokenType.COLON:
+            token, index = self._expected_current_token(tokens, index, TokenType.RIGHT_SQUARE_BRACKET)
+            node = Node('index')
+            node.add_child(target)
+            node.add_child(start)
+            return node, index
+        node = Node('slice')
+        node.add_child(target)
+        if start is not None:
+            bound = Node('start')
+            bound.add_child(start)
+            node.add_child(bound)
+        index += 1
+        if tokens.type_at(index) != TokenType.RIGHT_SQUARE_BRACKET:
+            end, index = self._parse_expression(tokens, index)
+            bound = Node('end')
+            bound.add_child(end)
+            node.add_child(bound)
+        token, index = self._expected_current_token(tokens, index, TokenType.RIGHT_SQUARE_BRACKET)
+        return node, index
+
+    def _parse_arguments(self, tokens: TokenBuffer, index: int, call: Node) -> int:
+        """
+        Parses the arguments starting at the left bracket at the index into the call
+        node, named arguments such as name="value" are kept as argument nodes
+
+        Returns:
+            int: the index following the right bracket
+        """
+        index += 1
+        while tokens.type_at(index) != TokenType.RIGHT_BRACKET:
+            if tokens.type_at(index) == TokenType.IDENTIFIER and tokens.type_at(index + 1) == TokenType.EQUALS \
+                    and not (tokens.type_at(index + 2) == TokenType.EQUALS and self._adjacent(tokens, index + 1)):
+                argument = Node('argument', str(tokens.value_at(index)))
+                value, index = self._parse_expression(tokens, index + 2)
+                argument.add_child(value)
+                call.add_child(argument)
+            else:
+                value, index = self._parse_expression(tokens, index)
+                call.add_child(value)
+            if tokens.type_at(index) == TokenType.COMMA:
+                index += 1
+            elif tokens.type_at(index) != TokenType.RIGHT_BRACKET:
+                self._expected_current_token(tokens, index, TokenType.RIGHT_BRACKET)
+        return index + 1
+
+    def _parse_primary(self, tokens: TokenBuffer, index: int) -> Tuple[Node, int]:
+        """
+        Parses a literal, a name, a bracketed expression or a new expression
+        """
+        token = tokens[index]
+        if token.type == TokenType.INTEGER_VALUE:
+            return Node('integer', token.value), index + 1
+        if token.type == TokenType.DECIMAL_VALUE:
+            return Node('decimal', token.value), index + 1
+        if token.type == TokenType.STRING_VALUE:
+            return Node('string', str(token.value)[1:-1].replace('\\"', '"')), index + 1
+        if token.type == TokenType.BOOLEAN_VALUE:
+            return Node('boolean', token.value), index + 1
+        if token.type == TokenType.NULL:
+            return Node('null'), index + 1
+        if token.type == TokenType.IDENTIFIER:
+            return Node('name', token.value), index + 1
+        if token.type == TokenType.LEFT_BRACKET:
+            node, index = self._parse_expression(tokens, index + 1)
+            token, index = self._expected_current_token(tokens, index, TokenType.RIGHT_BRACKET)
+            return node, index
+        if token.type == TokenType.NEW:
+            class_type, index = self._parse_type(tokens, index)
+            node = Node('new', class_type)
+            if tokens.type_at(index) == TokenType.LEFT_BRACKET:
+                index = self._parse_arguments(tokens, index, node)
+            return node, index
+        if token.type == TokenType.EOF:
+            self._unexpected_end_of_file(tokens, index)
+        raise ParseError(UnexpectedKeyword('expression', str(token.value), token.filename, token.line, token.column))
+
+    def _parse_method_head(self, tokens: TokenSource, index: int, method: Node) -> int:
+        """
+        Parses the parameters and the optional return type of a method, the index is
+        at the left bracket
+        """
+        parameters, index = self._parse_method_parameters(tokens, index)
+        method.add_child(parameters)
+        if self._is_token_one_of(tokens, index, [TokenType.COLON]):
+            return_type, index = self._parse_type(tokens, index)
+            method.add_child(Node('returns', return_type))
+        return index
+
+    def _parse_method_signature(self, tokens: TokenSource, index: int, method: Node) -> int:
+        """
+        Parses the parameters, the optional return type and the body of a method or
+        constructor, the index is at the left bracket
+        """
+        index = self._parse_method_head(tokens, index, method)
+        token, index = self._expected_current_token(tokens, index, TokenType.LEFT_CURLY_BRACKET)
+        body, index = self._parse_method_body(tokens, index - 1)
+        method.add_child(body)
+        return index
+
+    def _parse_class_constructors(self, tokens: TokenSource, index: int, class_node: Node) -> int:
+        while self._is_token_one_of(tokens, index, [TokenType.CONSTRUCTOR]):
+            self._member_start = index
+            constructor = Node('constructor', str(tokens[index].value))
+            class_node.add_child(constructor)
+            token, index = self._expected_next_token(tokens, index, TokenType.LEFT_BRACKET)
+            index = self._parse_method_signature(tokens, index, constructor)
+        return index
+
+    def _parse_method_name(self, tokens: TokenSource, index: int) -> Tuple[Node, int]:
+        """
+        Parses the optional visibility and the name of a method
+
+        Returns:
+            Tuple[Node, int]: the method node and the index of its left bracket
+        """
+        visibility_node = Node('private')
+        if tokens.type_at(index) == TokenType.PUBLIC:
+            visibility_node = Node('public')
+            index += 1
+        elif tokens.type_at(index) == TokenType.PRIVATE:
+            index += 1
+        token, index = self._expected_current_token(tokens, index, TokenType.IDENTIFIER)
+        self._add_name(NameRole.METHOD, token)
+        method = Node('method', str(token.value))
+        method.add_child(visibility_node)
+        token, index = self._expected_current_token(tokens, index, TokenType.LEFT_BRACKET)
+        return method, index - 1
+
+    def _parse_class_methods(self, tokens: TokenSource, index: int, class_node: Node) -> int:
         while self._is_token_one_of(tokens, index, [
-                TokenType.CONSTRUCTOR
+                TokenType.PUBLIC,
+                TokenType.PRIVATE,
+                TokenType.IDENTIFIER
             ]):
-                constructor = Node('constructor', str(tokens[index].value))
-                constructors.append(constructor)
+            self._member_start = index
+            method, index = self._parse_method_name(tokens, index)
+            class_node.add_child(method)
+            index = self._parse_method_signature(tokens, index, method)
+        return index
+
+    def _parse_interface(self, tokens: TokenSource, index: int) -> Tuple[Node, int]:
+        """
+        Parses an interface starting at the interface keyword, the interface lists
+        the methods without bodies and may extend other interfaces
+
+        Returns:
+            Tuple[Node, int]: the interface node and the index following it
+        """
+        token, index = self._expected_next_token(tokens, index, TokenType.IDENTIFIER)
+        self._add_name(NameRole.INTERFACE, token)
+        interface_node = Node('interface', str(token.value))
+        token, index = self._next_token(tokens, index)
+        if token.type == TokenType.EXTENDS:
+            token, index = self._expected_next_token(tokens, index, TokenType.IDENTIFIER)
+            while self._is_token_one_of(tokens, index, [TokenType.IDENTIFIER, TokenType.COMMA]):
+                if token.type == TokenType.IDENTIFIER:
+                    self._add_name(NameRole.INTERFACE, token)
+                    interface_node.add_child(Node('extends', str(token.value)))
                 token, index = self._next_token(tokens, index)
-                if self._expected_next_token(tokens, index, TokenType.LEFT_BRACKET):
-                    parameters, index = self._parse_method_parameters(tokens, index)
-                    constructor.add_child(parameters)
-                    if self._expected_next_token(tokens, index, TokenType.RIGHT_BRACKET):
-                        token, index = self._next_token(tokens, index)
-                        if self._expected_next_token(tokens, index, TokenType.LEFT_CURLY_BRACKET):
-                            body, index = self._parse_method_body(tokens, index)
-                            constructor.add_child(body)
-                            token, index = self._next_token(tokens, index)
-                            if self._expected_next_token(
-                                    tokens, index, TokenType.RIGHT_CURLY_BRACKET
-                            ):
-                                token, index = self._next_token(tokens, index)
-        return constructors, index
-
-    def _parse_class_methods(self, tokens: List[Token], index: int) -> Tuple[List[Node], int]:
-        methods: List[Node] = []
+        token, index = self._expected_current_token(tokens, index, TokenType.LEFT_CURLY_BRACKET)
         while self._is_token_one_of(tokens, index, [
                 TokenType.PUBLIC,
                 TokenType.PRIVATE,
                 TokenType.IDENTIFIER
             ]):
-            visibility_node: Node | None = None
-            if tokens[index].type == TokenType.PUBLIC:
-                visibility_node = Node('public')
-                token, index = self._next_token(tokens, index)
-            elif tokens[index].type == TokenType.PRIVATE:
-                visibility_node = Node('private')
+            method, index = self._parse_method_name(tokens, index)
+            interface_node.add_child(method)
+            index = self._parse_method_head(tokens, index, method)
+        token, index = self._expected_current_token(tokens, index, TokenType.RIGHT_CURLY_BRACKET)
+        return interface_node, index
+
+    def _parse_type_definition(self, tokens: TokenSource, index: int) -> Tuple[Node, int]:
+        """
+        Parses a type starting at the type keyword, a type lists typed fields such as
+        name: String("", "[A-Z][a-z]*") | null = null, the bracketed constraint
+        values follow the first type of a field
+
+        Returns:
+            Tuple[Node, int]: the type definition node and the index following it
+        """
+        token, index = self._expected_next_token(tokens, index, TokenType.IDENTIFIER)
+        self._add_name(NameRole.CLASS, token)
+        type_node = Node('type_definition', str(token.value))
+        index += 1
+        if self._is_token_one_of(tokens, index, [TokenType.LEFT_ANGLE_BRACKET]):
+            token, index = self._expected_next_token(tokens, index, TokenType.IDENTIFIER)
+            while self._is_token_one_of(tokens, index, [TokenType.IDENTIFIER, TokenType.COMMA]):
+                if token.type == TokenType.IDENTIFIER:
+                    type_node.add_child(Node('type_parameter', str(token.value)))
                 token, index = self._next_token(tokens, index)
-            if tokens[index].type == TokenType.IDENTIFIER:
-                if re.match(METHOD_CASE, str(tokens[index].value)) is None:
-                    error = InvalidMethodName(
-                        str(tokens[index].value),
-                        tokens[index].filename,
-                        tokens[index].line,
-                        tokens[index].column
-                    )
-                    raise ValueError(error.get_error())
-                method = Node('method', str(tokens[index].value))
-                if not visibility_node:
-                    method.add_child(Node('private'))
+            token, index = self._expected_current_token(tokens, index, TokenType.RIGHT_ANGLE_BRACKET)
+        token, index = self._expected_current_token(tokens, index, TokenType.LEFT_CURLY_BRACKET)
+        while self._is_token_one_of(tokens, index, [TokenType.IDENTIFIER]):
+            token = tokens[index]
+            self._add_name(NameRole.VARIABLE, token)
+            field_node = Node('field', str(token.value))
+            _, index = self._expected_next_token(tokens, index, TokenType.COLON)
+            field_type, index = self._parse_type(tokens, index)
+            constraint_node = None
+            if self._is_token_one_of(tokens, index, [TokenType.LEFT_BRACKET]):
+                constraint_node = Node('constraint')
+                if self._is_token_one_of(tokens, index + 1, [TokenType.RIGHT_BRACKET]):
+                    index += 1
                 else:
-                    method.add_child(visibility_node)
-                methods.append(method)
-                token, index = self._next_token(tokens, index)
-                if self._expected_next_token(tokens, index, TokenType.LEFT_BRACKET):
-                    parameters, index = self._parse_method_parameters(tokens, index)
-                    me.add_child(parameters)
-                    if self._expected_next_token(tokens, index, TokenType.RIGHT_BRACKET):
-                        token, index = self._next_token(tokens, index)
-                        if self._expected_next_token(tokens, index, TokenType.LEFT_CURLY_BRACKET):
-                            body, index = self._parse_method_body(tokens, index)
-                            method.add_child(body)
-                            token, index = self._next_token(tokens, index)
-                            if self._expected_next_token(
-                                    tokens, index, TokenType.RIGHT_CURLY_BRACKET
-                            ):
-                                token, index = self._next_token(tokens, index)
-        return methods, index
-
-    def _parse_class(self, tokens: List[Token], index: int) -> Tuple[Node, int]:
+                    value_node, index = self._parse_value(tokens, index)
+                    constraint_node.add_child(value_node)
+                    while self._is_token_one_of(tokens, index, [TokenType.COMMA]):
+                        value_node, index = self._parse_value(tokens, index)
+                        constraint_node.add_child(value_node)
+                _, index = self._expected_current_token(tokens, index, TokenType.RIGHT_BRACKET)
+                if self._is_token_one_of(tokens, index, [TokenType.LOGICAL_OR]):
+                    alternative, index = self._parse_type(tokens, index)
+                    field_type = f'{field_type}|{alternative}'
+            field_node.add_child(Node('type', field_type))
+            if constraint_node is not None:
+                field_node.add_child(constraint_node)
+            if self._is_token_one_of(tokens, index, [TokenType.EQUALS]):
+                value_node, index = self._parse_value(tokens, index)
+                field_node.add_child(value_node)
+            type_node.add_child(field_node)
+        token, index = self._expected_current_token(tokens, index, TokenType.RIGHT_CURLY_BRACKET)
+        return type_node, index
+
+    def _parse_class(self, tokens: TokenSource, index: int) -> Tuple[Node, int]:
         index += 1
-        logging.debug('Parsing class')
-        logging.debug('checking for class identifier')
         class_node, index = self._parse_class_identifier(tokens, index)
-        logging.debug('checking for class extends')
+        if self._trace:
+            token = tokens[index - 1]
+            self._diagnostics.report(
+                Severity.DEBUG,
+                'ParsingClass',
+                f'parsing class {class_node.value}',
+                token.filename,
+                token.line,
+                token.column
+            )
         extends_node, index = self._parse_class_extends(tokens, index)
         if extends_node is not None:
             class_node.add_child(extends_node)
-        logging.debug('checking for class implements')
         implements_nodes, index = self._parse_class_implements(tokens, index)
         if len(implements_nodes) > 0:
             for implements_node in implements_nodes:
                 class_node.add_child(implements_node)
-        logging.debug('checking for class body start "{"')
         token, index = self._expected_current_token(tokens, index, TokenType.LEFT_CURLY_BRACKET)
-        logging.debug('parsing class attributes')
-        attributes, index = self._parse_class_attributes(tokens, index)
-        for attribute in attributes:
-            class_node.add_child(attribute)
-        logging.debug('parsing class constructors')
-        constructors, index = self._parse_class_constructors(tokens, index)
-        for constructor in constructors:
-            class_node.add_child(constructor)
-        logging.debug('parsing class methods')
-        methods, index = self._parse_class_methods(tokens, index)
-        for method in methods:
-            class_node.add_child(method)
-        logging.debug('checking for class body end "}"')
+        while True:
+            try:
+                return class_node, self._parse_class_body(tokens, index, class_node)
+            except ParseError as e:
+                if self._errors is None:
+                    raise
+                self._errors.extend(e.errors)
+            index = self._synchronize_member(tokens, self._member_start)
+            if not tokens.has(index) or tokens.type_at(index) in STATEMENT_TOKENS:
+                return class_node, index
+            if tokens.type_at(index) == TokenType.RIGHT_CURLY_BRACKET:
+                return class_node, index + 1
+
+    def _parse_class_body(self, tokens: TokenSource, index: int, class_node: Node) -> int:
+        index = self._parse_class_attributes(tokens, index, class_node)
+        index = self._parse_class_constructors(tokens, index, class_node)
+        index = self._parse_class_methods(tokens, index, class_node)
+        self._member_start = index
         token, index = self._expected_current_token(tokens, index, TokenType.RIGHT_CURLY_BRACKET)
-        return class_node, index
+        return index
 
-    def _parse_import_statements(self, tokens: List[Token], index: int) -> Tuple[List[Node], int]:
-        response: List[Node] = []
-        current_token = tokens[index]
-        while current_token.type == TokenType.FROM:
-            node, index = self._parse_import_statement(tokens, index)
-            if node is not None:
-                response.append(node)
-            current_token = tokens[index]
-        return response, index
+    def _synchronize_member(self, tokens: TokenSource, index: int) -> int:
+        """
+        Skips the tokens of a class member which failed to parse, panic mode stops at
+        the end of the member body, at the first token of a line starting another
+        member, at the end of the class or at the next top level statement
+
+        Returns:
+            int: the index to continue parsing the class body at
+        """
+        depth = 0
+        index += 1
+        while tokens.has(index):
+            token_type = tokens.type_at(index)
+            if depth == 0:
+                if token_type in STATEMENT_TOKENS or token_type == TokenType.RIGHT_CURLY_BRACKET:
+                    return index
+                if token_type in MEMBER_TOKENS and tokens[index].line != tokens[index - 1].line:
+                    return index
+            if token_type == TokenType.LEFT_CURLY_BRACKET:
+                depth += 1
+            elif token_type == TokenType.RIGHT_CURLY_BRACKET:
+                depth -= 1
+                if depth == 0:
+                    return index + 1
+            index += 1
+        return index
 
-    def _next_token(self, tokens: List[Token], index: int) -> Tuple[Token, int]:
+    def _synchronize_statement(self, tokens: TokenSource, index: int) -> int:
+        """
+        Skips the tokens of a top level statement which failed to parse, panic mode
+        stops at the next class or import statement
+        """
         index += 1
-        if index >= len(tokens):
-            raise ValueError('Unexpected end of file')
+        while tokens.has(index) and tokens.type_at(index) not in STATEMENT_TOKENS:
+            index += 1
+        return index
+
+    def _next_token(self, tokens: TokenSource, index: int) -> Tuple[Token, int]:
+        index += 1
+        if not tokens.has(index):
+            self._unexpected_end_of_file(tokens, index)
         return tokens[index], index
 
-    def _current_token(self, tokens: List[Token], index: int) -> Tuple[Token, int]:
+    def _unexpected_end_of_file(self, tokens: TokenSource, index: int) -> NoReturn:
+        last_token = tokens[index - 1]
+        raise ParseError(UnexpectedEndOfFile(last_token.filename, last_token.line, last_token.column))
+
+    def _current_token(self, tokens: TokenSource, index: int) -> Tuple[Token, int]:
         return tokens[index], index + 1
 
     def _expected_next_token(
             self,
-            tokens: List[Token],
+            tokens: TokenSource,
             index: int,
             token_type: TokenType
         ) -> Tuple[Token, int]:
-        current_token, index = self._next_token(tokens, index)
-        if current_token.type != token_type:
+        index += 1
+        if not tokens.has(index):
+            self._unexpected_end_of_file(tokens, index)
+        if tokens.type_at(index) != token_type:
+            current_token = tokens[index]
             error = UnexpectedKeyword(
                 str(token_type.value),
                 str(current_token.value),
@@ -439,51 +1517,53 @@ class Parser():
                 current_token.line,
                 current_token.column
             )
-            raise ValueError(error.get_error())
-        return current_token, index
+            raise ParseError(error)
+        return tokens[index], index
 
     def _expected_current_token(
             self,
-            tokens: List[Token],
+            tokens: TokenSource,
             index: int,
             token_type: TokenType
         ) -> Tuple[Token, int]:
-        current_token = tokens[index]
-        if current_token.type != token_type:
-            if current_token.type is not TokenType.COMMENT:
-                error = UnexpectedKeyword(
-                    str(token_type.name),
-                    str(current_token.value),
-                    current_token.filename,
-                    current_token.line,
-                    current_token.column
-                )
-                raise ValueError(error.get_error())
-            return self._expected_current_token(tokens, index + 1, token_type)
-        return current_token, index + 1
+        current_type = tokens.type_at(index)
+        if current_type != token_type:
+            if current_type is TokenType.EOF:
+                self._unexpected_end_of_file(tokens, index)
+            current_token = tokens[index]
+            error = UnexpectedKeyword(
+                str(token_type.name),
+                str(current_token.value),
+                current_token.filename,
+                current_token.line,
+                current_token.column
+            )
+            raise ParseError(error)
+        return tokens[index], index + 1
 
     def _expect_next_one_of_token(
             self,
-            tokens: List[Token],
+            tokens: TokenSource,
             index: int,
             expected_tokens: List[TokenType]
         ) -> Tuple[Token, int]:
-        current_token, index = self._next_token(tokens, index)
-        if current_token.type not in expected_tokens:
-            if current_token.type is not TokenType.COMMENT:
-                error = UnexpectedKeyword(
-                    ' or '.join([str(t.name) for t in expected_tokens]),
-                    str(current_token.value),
-                    current_token.filename,
-                    current_token.line,
-                    current_token.column
-                )
-                raise ValueError(error.get_error())
-            current_token, index = self._next_token(tokens, index)
-            return self._expect_next_one_of_token(tokens, index, expected_tokens)
-        return current_token, index
-
-    def _parse_import_statement(self, tokens: List[Token], index: int) -> Tuple[Node | None, int]:
+        index += 1
+        if not tokens.has(index):
+            self._unexpected_end_of_file(tokens, index)
+        current_type = tokens.type_at(index)
+        if current_type not in expected_tokens:
+            current_token = tokens[index]
+            error = UnexpectedKeyword(
+                ' or '.join([str(t.name) for t in expected_tokens]),
+                str(current_token.value),
+                current_token.filename,
+                current_token.line,
+                current_token.column
+            )
+            raise ParseError(error)
+        return tokens[index], index
+
+    def _parse_import_statement(self, tokens: TokenSource, index: int) -> Tuple[Node | None, int]:
         import_expression: str | None = None
         token, index = self._expect_next_one_of_token(
             tokens,
@@ -514,38 +1594,440 @@ class Parser():
                 token.line,
                 token.column
             )
-            raise ValueError(error.get_error())
+            raise ParseError(error)
         if import_expression == 'BUILTIN':
-            return Node('builtin'), index
+            import_node = Node('builtin')
         else:
-            packages = import_expression.split('.')
-            file_path = path(*packages)
-            file_path += '.purist'
-            parser = Parser(self._src_folder, self._file_reader)
-            return parser.parse(file_path), index
+            import_node = Node('import', module_path(import_expression))
+        import_node.add_child(Node('require', str(token.value)))
+        separators = [TokenType.COMMA, TokenType.RIGHT_SQUARE_BRACKET]
+        token, index = self._expect_next_one_of_token(tokens, index, separators)
+        while token.type == TokenType.COMMA:
+            token, index = self._expected_next_token(tokens, index, TokenType.IDENTIFIER)
+            import_node.add_child(Node('require', str(token.value)))
+            token, index = self._expect_next_one_of_token(tokens, index, separators)
+        return import_node, index + 1
 
-def main(filename: str) -> None:
+def main(
+        filename: str,
+        src_folder: str = 'purist-src',
+        cache_folder: str | None = None,
+        output_path: str | None = None,
+        indent: int | None = 4,
+        output_format: str = 'json',
+        profiler: Profiler | None = None,
+        profile_path: str | None = None,
+        diagnostics: Diagnostics | None = None,
+        recover: bool = False,
+        memory_map: bool = False,
+        prefetch: int = 0
+    ) -> None:
     """
-    Entry point to the parser
+    Entry point to the parser, with a profiler the per file measurements are
+    printed and written as JSON to the profile path when given. The diagnostics
+    are written to stderr at the end. With prefetch the imported files are read
+    in the background ahead of the parser, holding at most that many files at a time
     """
-    parser = Parser('purist-src', FileReader())
+    diagnostics = diagnostics if diagnostics is not None else Diagnostics()
+    file_reader = MmapFileReader() if memory_map else FileReader()
+    prefetching = None
+    if prefetch > 0:
+        from prefetch import PrefetchingFileReader
+
+        prefetching = PrefetchingFileReader(src_folder, file_reader, prefetch)
+        file_reader = prefetching
+    parser = Parser(
+        src_folder,
+        file_reader,
+        cache_folder=cache_folder,
+        profiler=profiler,
+        diagnostics=diagnostics,
+        recover=recover
+    )
     start = time.time()
-    ast = parser.parse(filename)
+    try:
+        ast = parser.parse(filename)
+    finally:
+        if prefetching is not None:
+            prefetching.close()
     end = time.time()
+    if profiler is not None:
+        profiler.enter(filename)
     if ast is not None:
-        print(ast)
+        if output_format == 'binary':
+            from binary_ast import write_binary
+
+            with open(str(output_path), 'wb') as binary_output:
+                write_binary(binary_output, {filename: ast})
+        elif output_path is None:
+            ast.write_json(sys.stdout, indent)
+            sys.stdout.write('\n')
+        else:
+            with open(output_path, 'w') as output:
+                ast.write_json(output, indent)
+                output.write('\n')
+    print(f'Parsed in {end - start} seconds')
+    if prefetching is not None:
+        print(prefetching.stats.report())
+    if profiler is not None:
+        profiler.lap(Phase.SERIALIZE)
+        profiler.exit()
+        print(profiler.report())
+        if profile_path is not None:
+            with open(profile_path, 'w') as profile_output:
+                profiler.write_json(profile_output)
+    diagnostics.flush(sys.stderr)
+    if parser.cache is not None:
+        parser.cache.prune()
+
+
+def main_project(
+        src_folder: str,
+        workers: int | None,
+        cache_folder: str | None = None,
+        output_path: str | None = None,
+        diagnostics: Diagnostics | None = None,
+        recover: bool = False,
+        memory_map: bool = False
+    ) -> None:
+    """
+    Entry point to the project mode, parses every module under the source folder,
+    the modules are written in the binary AST format when an output path is given
+    """
+    from project import parse_project
+
+    diagnostics = diagnostics if diagnostics is not None else Diagnostics()
+    start = time.time()
+    registry = parse_project(src_folder, workers, cache_folder, diagnostics, recover, memory_map)
+    end = time.time()
+    diagnostics.flush(sys.stderr)
+    invalid = [module for module, node in registry.modules.items() if node is None]
+    print(f'Parsed {len(registry.modules)} modules, {len(invalid)} invalid')
+    for module in invalid:
+        print(f'invalid module: {module}')
     print(f'Parsed in {end - start} seconds')
+    if output_path is not None:
+        from binary_ast import write_binary
+
+        with open(output_path, 'wb') as output:
+            write_binary(output, registry.modules)
+    if cache_folder is not None:
+        AstCache(cache_folder, PARSER_VERSION).prune()
+
+
+def main_deps(src_folder: str, output_path: str | None = None) -> None:
+    """
+    Entry point to the dependency mode, scans the imports of every module under the
+    source folder and prints them in dependency order with the import cycles, the
+    graph is written as JSON when an output path is given
+    """
+    from dependencies import build_graph
+
+    start = time.time()
+    graph = build_graph(src_folder)
+    end = time.time()
+    if output_path is None:
+        print(graph.report())
+    else:
+        with open(output_path, 'w') as output:
+            json.dump(graph.to_dict(), output, indent=4)
+            output.write('\n')
+    print(f'Scanned {len(graph.modules)} modules in {end - start} seconds')
+
+
+def main_check(
+        src_folder: str,
+        workers: int | None,
+        cache_folder: str | None = None,
+        diagnostics: Diagnostics | None = None
+    ) -> None:
+    """
+    Entry point to the check mode, parses every module under the source folder and
+    reports the classes missing or mismatching the methods of their supertypes
+    """
+    from hierarchy import build_hierarchy
+    from project import find_modules, parse_modules
+
+    diagnostics = diagnostics if diagnostics is not None else Diagnostics()
+    start = time.time()
+    # the check only reads the method heads, the bodies are never parsed
+    hierarchy = build_hierarchy(
+        parse_modules(src_folder, find_modules(src_folder), workers, cache_folder, diagnostics, lazy_bodies=True)
+    )
+    errors = hierarchy.check()
+    end = time.time()
+    for error in errors:
+        diagnostics.error(error)
+    diagnostics.flush(sys.stderr)
+    print(f'Checked {len(hierarchy.modules)} modules, {len(errors)} errors')
+    print(f'Checked in {end - start} seconds')
+
+
+def main_wiring(
+        src_folder: str,
+        workers: int | None,
+        cache_folder: str | None = None,
+        output_path: str | None = None,
+        diagnostics: Diagnostics | None = None
+    ) -> None:
+    """
+    Entry point to the wiring mode, plans the injected attributes of every class
+    under the source folder and prints the plan, the plan is written as JSON when
+    an output path is given
+    """
+    from project import find_modules, parse_modules
+    from wiring import plan_wiring
+
+    diagnostics = diagnostics if diagnostics is not None else Diagnostics()
+    start = time.time()
+    # the plan only reads the attributes and constructor parameters, the bodies are never parsed
+    plan = plan_wiring(
+        parse_modules(src_folder, find_modules(src_folder), workers, cache_folder, diagnostics, lazy_bodies=True)
+    )
+    end = time.time()
+    for error in plan.errors:
+        diagnostics.error(error)
+    diagnostics.flush(sys.stderr)
+    if output_path is None:
+        print(plan.report())
+    else:
+        with open(output_path, 'w') as output:
+            json.dump(plan.to_dict(), output, indent=4)
+            output.write('\n')
+    print(f'Planned {len(plan.classes)} classes, {len(plan.errors)} errors')
+    print(f'Planned in {end - start} seconds')
+
+
+def main_run(
+        src_folder: str,
+        entry_class: str,
+        arguments: List[str],
+        workers: int | None,
+        cache_folder: str | None = None,
+        diagnostics: Diagnostics | None = None
+    ) -> None:
+    """
+    Entry point to the run mode, compiles every class under the source folder and
+    runs the EntryPoint class with the arguments, the Builtin Logger writes to stdout.
+    Nothing runs when compiled code constructs or extends a declaration that is not
+    a compiled class, such as a type or enumeration
+    """
+    from compiler import compile_modules, missing_classes
+    from project import find_modules, parse_modules
+    from symbols import BUILTIN_MODULE
+    from vm import ConsoleLogger, VirtualMachine
+    from wiring import plan_wiring
+
+    diagnostics = diagnostics if diagnostics is not None else Diagnostics()
+    start = time.time()
+    modules = parse_modules(src_folder, find_modules(src_folder), workers, cache_folder, diagnostics)
+    try:
+        classes = compile_modules(modules)
+    except ParseError as error:
+        for body_error in error.errors:
+            diagnostics.error(body_error)
+        diagnostics.flush(sys.stderr)
+        sys.exit(1)
+    plan = plan_wiring(modules)
+    for error in plan.errors:
+        diagnostics.error(error)
+    # constructing a declaration that is not a compiled class would fail mid-run
+    missing = missing_classes(classes)
+    for name, users in missing.items():
+        diagnostics.report(
+            Severity.ERROR,
+            'UnsupportedDeclaration',
+            f'{name} is not a compiled class, used by {", ".join(users)}'
+        )
+    end = time.time()
+    diagnostics.flush(sys.stderr)
+    if missing:
+        sys.exit(1)
+    print(f'Compiled {len(classes)} classes in {end - start} seconds')
+    machine = VirtualMachine(classes, {f'{BUILTIN_MODULE}.Logger': ConsoleLogger(sys.stdout)}, plan=plan)
+    start = time.time()
+    try:
+        result = machine.run(entry_class, arguments)
+    except ExecutionError as error:
+        print(f'Execution failed: {error}')
+        sys.exit(1)
+    end = time.time()
+    if result is not None:
+        print(result)
+    print(f'Ran in {end - start} seconds')
+
+
+def main_watch(
+        src_folder: str,
+        cache_folder: str | None = None,
+        diagnostics: Diagnostics | None = None
+    ) -> None:
+    """
+    Entry point to the watch mode, re-parses modules as they change until interrupted
+    """
+    from watch import Watcher
+
+    try:
+        Watcher(src_folder, cache_folder, diagnostics).run()
+    except KeyboardInterrupt:
+        pass
 
 
 if __name__ == '__main__':
-    if len(sys.argv) < 2:
+    arguments = argparse.ArgumentParser(description='Purist parser')
+    arguments.add_argument('filename', nargs='?', help='the entry file, relative to the source folder')
+    arguments.add_argument('--src', default='purist-src', help='the source code folder')
+    arguments.add_argument(
+        '--project',
+        action='store_true',
+        help='parse every module under the source folder in parallel'
+    )
+    arguments.add_argument(
+        '--watch',
+        action='store_true',
+        help='keep the modules in memory and re-parse the ones changed on disk'
+    )
+    arguments.add_argument(
+        '--deps',
+        action='store_true',
+        help='print the imports of every module in dependency order and the import cycles'
+    )
+    arguments.add_argument(
+        '--check',
+        action='store_true',
+        help='check that every class provides the methods of its superclass and interfaces'
+    )
+    arguments.add_argument(
+        '--wiring',
+        action='store_true',
+        help='print the injected attributes and lifetimes of every class in construction order'
+    )
+    arguments.add_argument(
+        '--run',
+        default=None,
+        metavar='CLASS',
+        help='compile every class and run the EntryPoint class of a fully qualified name, such as entry.MyEntryPoint'
+    )
+    arguments.add_argument('--args', nargs='*', default=[], help='the arguments of the EntryPoint in run mode')
+    arguments.add_argument(
+        '--workers',
+        type=int,
+        default=None,
+        help='the number of worker processes in project mode, defaults to the CPU count'
+    )
+    arguments.add_argument(
+        '--cache-dir',
+        default=None,
+        help=f'the persistent AST cache folder, defaults to {CACHE_FOLDER} in the source folder'
+    )
+    arguments.add_argument('--no-cache', action='store_true', help='disable the persistent AST cache')
+    arguments.add_argument('--output', default=None, help='write the AST to a file instead of stdout')
+    arguments.add_argument('--compact', action='store_true', help='write the AST without indentation')
+    arguments.add_argument(
+        '--format',
+        choices=['json', 'binary'],
+        default='json',
+        help='the AST output format, binary requires --output and is always used in project mode'
+    )
+    arguments.add_argument(
+        '--profile',
+        action='store_true',
+        help='print per file and per phase timings, token and node counts'
+    )
+    arguments.add_argument('--profile-json', default=None, help='also write the profile as JSON to a file')
+    arguments.add_argument(
+        '--profile-memory',
+        action='store_true',
+        help='include the peak memory per file in the profile, slows parsing down'
+    )
+    arguments.add_argument(
+        '--recover',
+        action='store_true',
+        help='keep parsing after syntax errors and report every error in one pass'
+    )
+    arguments.add_argument(
+        '--mmap',
+        action='store_true',
+        help='scan memory mapped source files, only the discovered values are decoded'
+    )
+    arguments.add_argument(
+        '--prefetch',
+        type=int,
+        default=0,
+        metavar='N',
+        help='read imported files in the background ahead of the parser, holding up to N at a time'
+    )
+    arguments.add_argument(
+        '--log-level',
+        choices=[severity.name for severity in Severity],
+        default=env.get('LOGGING_LEVEL', Severity.WARNING.name).upper(),
+        help='the lowest severity of the diagnostics written to stderr, defaults to LOGGING_LEVEL or WARNING'
+    )
+    options = arguments.parse_args()
+    # the modes working on the whole source folder instead of an entry file
+    folder_modes = [options.project, options.watch, options.check, options.wiring, options.run]
+    if options.filename is None and not any(folder_modes) and not options.deps:
         print('Usage: python parser.py <filename>')
         print('the source code paths is currently relative to the purity-src folder')
         print('example usage: python parser.py entry.purist')
+        print('project mode: python parser.py --project [--workers N]')
+        print('watch mode: python parser.py --watch')
+        print('dependencies: python parser.py --deps')
+        print('type checks: python parser.py --check [--workers N]')
+        print('injection plan: python parser.py --wiring [--output plan.json]')
+        print('run: python parser.py --run entry.MyEntryPoint [--args a b]')
         sys.exit(1)
-    logging.basicConfig(
-        format='%(asctime)s [%(levelname)-8s] [%(pathname)s:%(lineno)d] %(message)s',
-        level=env.get('LOGGING_LEVEL', logging.DEBUG)
-    )
+    if options.filename is not None and (any(folder_modes) or options.deps):
+        print(f'the folder modes read every module under --src, the filename {options.filename} is not used')
+        print('example usage: python parser.py --check --src /some/folder')
+        sys.exit(1)
+    if options.format == 'binary' and options.output is None:
+        print('the binary format requires --output')
+        sys.exit(1)
+    profile = options.profile or options.profile_json is not None or options.profile_memory
+    if profile and any(folder_modes):
+        print('profiling is only available for a single entry file')
+        sys.exit(1)
+    if options.prefetch and any(folder_modes):
+        print('prefetching is only available for a single entry file')
+        sys.exit(1)
+    diagnostics = Diagnostics(Severity[options.log_level])
 
-    main(sys.argv[1])
+    cache_folder = None
+    if not options.no_cache:
+        cache_folder = options.cache_dir or path(options.src, CACHE_FOLDER)
+    if options.deps:
+        main_deps(options.src, options.output)
+    elif options.check:
+        main_check(options.src, options.workers, cache_folder, diagnostics)
+    elif options.wiring:
+        main_wiring(options.src, options.workers, cache_folder, options.output, diagnostics)
+    elif options.run:
+        main_run(options.src, options.run, options.args, options.workers, cache_folder, diagnostics)
+    elif options.watch:
+        main_watch(options.src, cache_folder, diagnostics)
+    elif options.project:
+        main_project(
+            options.src,
+            options.workers,
+            cache_folder,
+            options.output,
+            diagnostics,
+            options.recover,
+            options.mmap
+        )
+    else:
+        main(
+            options.filename,
+            options.src,
+            cache_folder,
+            options.output,
+            None if options.compact else 4,
+            options.format,
+            Profiler(options.profile_memory) if profile else None,
+            options.profile_json,
+            diagnostics,
+            options.recover,
+            options.mmap,
+            options.prefetch
+        )
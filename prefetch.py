@@ -0,0 +1,148 @@
+"""
+Prefetching file reader, as soon as a file is read its from statements are scanned
+and the imported files are read in background threads so they are in memory when
+the parser reaches them
+"""
+from concurrent.futures import Future, ThreadPoolExecutor
+from os.path import join as path
+from threading import Lock
+from typing import Any, Dict, Set
+
+from lexer import Source
+from parser import FileReader, header_imports
+
+MAX_IN_FLIGHT = 8
+
+
+class PrefetchStats():
+    """
+    Counts how the reads of a prefetching reader were served
+    """
+
+    def __init__(self) -> None:
+        self.requested = 0
+        self.hits = 0
+        self.waits = 0
+        self.misses = 0
+        self.unused = 0
+        self.skipped = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Returns the counts as a JSON serializable dictionary
+        """
+        return dict(vars(self))
+
+    def report(self) -> str:
+        """
+        Returns the counts as a single line
+        """
+        return (
+            f'prefetch: {self.requested} requested, {self.hits} hits '
+            f'({self.waits} still in flight), {self.misses} misses, {self.unused} unused, '
+            f'{self.skipped} skipped'
+        )
+
+
+class PrefetchingFileReader(FileReader):
+    """
+    Reads the imports of every file read in a thread pool ahead of the parser, every
+    file is prefetched at most once. At most max_in_flight files are held, read or
+    being read, until the parser reads them, further announced files are skipped.
+    A read of a file that was not prefetched, or whose background read has not
+    started yet, is served synchronously by the wrapped reader
+    """
+
+    def __init__(
+            self,
+            src_folder: str,
+            reader: FileReader | None = None,
+            max_in_flight: int = MAX_IN_FLIGHT
+        ) -> None:
+        """
+        Args:
+            src_folder: the folder the imported module paths are relative to
+            reader: reads the files, a plain FileReader when not given
+            max_in_flight: the number of prefetched files held at the same time, read
+                or being read, further announced files are skipped
+        """
+        self._src_folder = src_folder
+        self._reader = reader if reader is not None else FileReader()
+        self._max_in_flight = max(1, max_in_flight)
+        self._executor = ThreadPoolExecutor(max_workers=self._max_in_flight, thread_name_prefix='prefetch')
+        self._lock = Lock()
+        self._futures: Dict[str, Future] = {}
+        self._requested: Set[str] = set()
+        self._stats = PrefetchStats()
+        self._closed = False
+
+    @property
+    def stats(self) -> PrefetchStats:
+        """
+        Returns the hit and miss counts
+        """
+        return self._stats
+
+    def prefetch(self, filename: str) -> None:
+        """
+        Starts reading a file in the background, files read or requested before are ignored,
+        and so are files announced while max_in_flight files are held or once closed
+
+        Args:
+            filename: the path of the file the parser is going to read
+        """
+        with self._lock:
+            # a background read still running after close announces its imports too
+            if self._closed or filename in self._requested:
+                return
+            # skipped files are not requested, a later announcement can still prefetch them
+            if len(self._futures) >= self._max_in_flight:
+                self._stats.skipped += 1
+                return
+            self._requested.add(filename)
+            self._stats.requested += 1
+            self._futures[filename] = self._executor.submit(self._fetch, filename)
+
+    def read(self, filename: str) -> Source:
+        """
+        Returns the content of a file, from the prefetched files when it was announced,
+        read errors of a prefetched file are raised here
+        """
+        with self._lock:
+            self._requested.add(filename)
+            future = self._futures.pop(filename, None)
+            # a read still waiting for a thread is not waited for
+            if future is None or future.cancel():
+                self._stats.misses += 1
+                future = None
+            else:
+                self._stats.hits += 1
+                if not future.done():
+                    self._stats.waits += 1
+        if future is None:
+            return self._fetch(filename)
+        return future.result()
+
+    def _fetch(self, filename: str) -> Source:
+        text = self._reader.read(filename)
+        for imported in header_imports(text):
+            self.prefetch(path(self._src_folder, imported))
+        return text
+
+    def close(self) -> None:
+        """
+        Stops the background reads, the files prefetched but never read are counted as unused
+        """
+        with self._lock:
+            self._closed = True
+            self._stats.unused += len(self._futures)
+            for future in self._futures.values():
+                future.cancel()
+            self._futures.clear()
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self) -> 'PrefetchingFileReader':
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        self.close()
@@ -0,0 +1,219 @@
+"""
+Per file and per phase instrumentation of the parser, a profiler is only consulted
+through a None check per file and phase so parsing without one costs nothing extra
+"""
+import json
+import tracemalloc
+
+from enum import Enum
+from time import perf_counter_ns
+from typing import Any, Dict, List, TextIO
+
+
+class Phase(Enum):
+    """
+    The phases a module goes through, in order
+    """
+    READ = 'read'
+    CACHE = 'cache'
+    LEX = 'lex'
+    TOKENIZE = 'tokenize'
+    PARSE = 'parse'
+    LINK = 'link'
+    SERIALIZE = 'serialize'
+
+
+class FileProfile():
+    """
+    Measurements of a single module
+    """
+
+    def __init__(self, file_path: str) -> None:
+        self.file_path = file_path
+        self.timings: Dict[Phase, int] = {}
+        self.tokens = 0
+        self.nodes = 0
+        self.peak_memory: int | None = None
+
+    @property
+    def total_ns(self) -> int:
+        """
+        Returns the time spent in the phases of this module, excluding imported modules
+        """
+        return sum(self.timings.values())
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Returns the measurements as a JSON serializable dictionary
+        """
+        return {
+            'file': self.file_path,
+            'total_ns': self.total_ns,
+            'timings_ns': {phase.value: elapsed for phase, elapsed in self.timings.items()},
+            'tokens': self.tokens,
+            'nodes': self.nodes,
+            'peak_memory': self.peak_memory,
+        }
+
+
+class _Frame():
+    """
+    A module being parsed, imported modules are parsed while their importer is open
+    """
+
+    def __init__(self, profile: FileProfile, memory: int) -> None:
+        self.profile = profile
+        self.memory = memory
+        self.started_ns = perf_counter_ns()
+        self.mark_ns = self.started_ns
+        self.nested_ns = 0
+
+
+class Profiler():
+    """
+    Collects per phase timings, token and node counts and optionally the peak
+    memory of every parsed module
+    """
+
+    def __init__(self, trace_memory: bool = False) -> None:
+        """
+        Args:
+            trace_memory: measure the peak memory of every module with tracemalloc,
+                which slows parsing down considerably
+        """
+        self._trace_memory = trace_memory
+        self._profiles: Dict[str, FileProfile] = {}
+        self._frames: List[_Frame] = []
+        self._started_tracing = False
+
+    @property
+    def profiles(self) -> List[FileProfile]:
+        """
+        Returns the measurements of every module in the order they were first entered
+        """
+        return list(self._profiles.values())
+
+    def profile(self, file_path: str) -> FileProfile:
+        """
+        Returns the measurements of a module, created when it has none yet
+        """
+        profile = self._profiles.get(file_path)
+        if profile is None:
+            profile = FileProfile(file_path)
+            self._profiles[file_path] = profile
+        return profile
+
+    def enter(self, file_path: str) -> None:
+        """
+        Marks the start of parsing a module, until the matching exit the time spent
+        in nested modules is not charged to it
+        """
+        memory = 0
+        if self._trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+            current, peak = tracemalloc.get_traced_memory()
+            if self._frames:
+                self._update_peak(self._frames[-1], peak)
+            tracemalloc.reset_peak()
+            memory = current
+        self._frames.append(_Frame(self.profile(file_path), memory))
+
+    def exit(self) -> None:
+        """
+        Marks the end of parsing the innermost module
+        """
+        frame = self._frames.pop()
+        if self._frames:
+            self._frames[-1].nested_ns += perf_counter_ns() - frame.started_ns
+        if self._trace_memory:
+            self._update_peak(frame, tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+            if not self._frames and self._started_tracing:
+                tracemalloc.stop()
+                self._started_tracing = False
+
+    def mark(self) -> None:
+        """
+        Starts the next lap of the innermost module without recording the current one
+        """
+        frame = self._frames[-1]
+        frame.mark_ns = perf_counter_ns()
+        frame.nested_ns = 0
+
+    def lap(self, phase: Phase) -> None:
+        """
+        Records the time since the previous lap of the innermost module as a phase,
+        the time spent in nested modules meanwhile is left out
+        """
+        frame = self._frames[-1]
+        now = perf_counter_ns()
+        self.record(frame.profile.file_path, phase, now - frame.mark_ns - frame.nested_ns)
+        frame.mark_ns = now
+        frame.nested_ns = 0
+
+    def record(self, file_path: str, phase: Phase, elapsed_ns: int) -> None:
+        """
+        Adds the time spent in a phase of a module
+        """
+        timings = self.profile(file_path).timings
+        timings[phase] = timings.get(phase, 0) + elapsed_ns
+
+    def count(self, file_path: str, tokens: int = 0, nodes: int = 0) -> None:
+        """
+        Adds tokens and nodes produced for a module
+        """
+        profile = self.profile(file_path)
+        profile.tokens += tokens
+        profile.nodes += nodes
+
+    def _update_peak(self, frame: _Frame, peak: int) -> None:
+        used = max(0, peak - frame.memory)
+        profile = frame.profile
+        profile.peak_memory = used if profile.peak_memory is None else max(profile.peak_memory, used)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Returns the measurements of every module, slowest first, as a JSON serializable dictionary
+        """
+        profiles = sorted(self._profiles.values(), key=lambda profile: profile.total_ns, reverse=True)
+        return {
+            'total_ns': sum(profile.total_ns for profile in profiles),
+            'files': [profile.to_dict() for profile in profiles],
+        }
+
+    def write_json(self, stream: TextIO) -> None:
+        """
+        Writes the measurements as JSON
+        """
+        json.dump(self.to_dict(), stream, indent=4)
+
+    def report(self) -> str:
+        """
+        Returns a table of the measurements of every module, slowest first, times in milliseconds
+        """
+        phases = [phase for phase in Phase]
+        header = f'{"file":<40} {"total":>9}' + ''.join(f' {phase.value:>9}' for phase in phases)
+        header += f' {"tokens":>8} {"nodes":>8}'
+        trace_memory = any(profile.peak_memory is not None for profile in self._profiles.values())
+        if trace_memory:
+            header += f' {"peak KiB":>9}'
+        lines = [header]
+        totals: Dict[Phase, int] = {}
+        for entry in self.to_dict()['files']:
+            profile = self._profiles[entry['file']]
+            line = f'{profile.file_path:<40} {profile.total_ns / 1e6:>9.3f}'
+            for phase in phases:
+                elapsed = profile.timings.get(phase)
+                totals[phase] = totals.get(phase, 0) + (elapsed or 0)
+                line += f' {elapsed / 1e6:>9.3f}' if elapsed is not None else f' {"-":>9}'
+            line += f' {profile.tokens:>8} {profile.nodes:>8}'
+            if trace_memory:
+                peak = profile.peak_memory
+                line += f' {peak / 1024:>9.1f}' if peak is not None else f' {"-":>9}'
+            lines.append(line)
+        line = f'{"total":<40} {sum(totals.values()) / 1e6:>9.3f}'
+        line += ''.join(f' {totals.get(phase, 0) / 1e6:>9.3f}' for phase in phases)
+        lines.append(line)
+        return '\n'.join(lines)
@@ -0,0 +1,273 @@
+"""
+Purist project mode, parses every module under a source folder in a process pool
+and links the imports once all modules are parsed
+"""
+import os
+
+from concurrent.futures import ProcessPoolExecutor
+from os.path import join as path
+from typing import Dict, List, Tuple
+
+from cache import CompactNode
+from diagnostics import Diagnostic, Diagnostics, Severity
+from parser import FileReader, MmapFileReader, ModuleRegistry, ModuleState, Node, Parser, compact, expand
+from symbols import SymbolIndex
+
+SOURCE_EXTENSION = '.purist'
+
+
+def find_modules(src_folder: str) -> List[str]:
+    """
+    Finds every purist module under the source folder
+
+    Args:
+        src_folder: the folder to search
+    Returns:
+        List[str]: the module paths relative to the source folder, sorted
+    """
+    modules: List[str] = []
+    for folder, _, filenames in os.walk(src_folder):
+        relative_folder = os.path.relpath(folder, src_folder)
+        for filename in filenames:
+            if filename.endswith(SOURCE_EXTENSION):
+                if relative_folder == os.curdir:
+                    modules.append(filename)
+                else:
+                    modules.append(path(relative_folder, filename))
+    modules.sort()
+    return modules
+
+
+def _parse_module(
+        src_folder: str,
+        file_path: str,
+        cache_folder: str | None = None,
+        level: Severity = Severity.WARNING,
+        recover: bool = False,
+        memory_map: bool = False
+    ) -> Tuple[str, CompactNode | None, List[Diagnostic]]:
+    diagnostics = Diagnostics(level)
+    parser = Parser(
+        src_folder,
+        MmapFileReader() if memory_map else FileReader(),
+        follow_imports=False,
+        cache_folder=cache_folder,
+        diagnostics=diagnostics,
+        recover=recover
+    )
+    ast = parser.parse(file_path)
+    return file_path, compact(ast) if ast is not None else None, diagnostics.records
+
+
+class _LinkFrame():
+    """
+    A module whose import nodes are being replaced by the imported modules
+    """
+
+    def __init__(self, file_path: str, node: Node | None) -> None:
+        self.file_path = file_path
+        self.node = node
+        self.children: List[Node] = []
+        self.position = 0
+        self.pending: str | None = None
+        self.missing = False
+
+
+def link_modules(
+        src_folder: str,
+        parsed: Dict[str, Node | None],
+        registry: ModuleRegistry | None = None,
+        diagnostics: Diagnostics | None = None,
+        recover: bool = False
+    ) -> ModuleRegistry:
+    """
+    Replaces the 'import' nodes of modules parsed without following imports by the
+    imported modules, the result matches parsing each module with imports followed
+
+    Args:
+        src_folder: the folder the module paths are relative to
+        parsed: the module ASTs by module path, None for invalid modules
+        registry: the compilation session to fill, a new one when not given
+        diagnostics: collects missing and cyclic imports, a silent collector when not given
+        recover: leave missing modules out instead of invalidating the modules importing them
+    Returns:
+        ModuleRegistry: the compilation session holding the linked modules
+    """
+    if registry is None:
+        registry = ModuleRegistry()
+    if diagnostics is None:
+        diagnostics = Diagnostics()
+    for root in parsed:
+        if root in registry:
+            continue
+        registry.begin(root)
+        stack = [_LinkFrame(root, parsed[root])]
+        while stack:
+            frame = stack[-1]
+            if frame.pending is not None:
+                linked = registry.node(frame.pending)
+                if linked is not None:
+                    frame.children.append(linked)
+                frame.pending = None
+            source_children = frame.node.children if frame.node is not None else None
+            while source_children is not None and frame.position < len(source_children):
+                child = source_children[frame.position]
+                frame.position += 1
+                if child.name != 'import':
+                    frame.children.append(child)
+                    continue
+                target = str(child.value)
+                if target not in parsed:
+                    diagnostics.report(
+                        Severity.ERROR,
+                        'FileNotFound',
+                        f'File not found: {path(src_folder, target)}'
+                    )
+                    if recover:
+                        continue
+                    frame.missing = True
+                    break
+                state = registry.state(target)
+                if state is ModuleState.DONE:
+                    linked = registry.node(target)
+                    if linked is not None:
+                        frame.children.append(linked)
+                    continue
+                if state is ModuleState.IN_PROGRESS:
+                    diagnostics.report(
+                        Severity.ERROR,
+                        'CyclicDependency',
+                        'cyclic dependency detected',
+                        target
+                    )
+                    continue
+                registry.begin(target)
+                frame.pending = target
+                stack.append(_LinkFrame(target, parsed[target]))
+                break
+            if frame.pending is not None:
+                continue
+            node: Node | None = None
+            if frame.node is not None and not frame.missing:
+                node = Node(frame.node.name, frame.node.value)
+                for child in frame.children:
+                    node.add_child(child)
+            registry.finish(frame.file_path, node)
+            stack.pop()
+    return registry
+
+
+def parse_modules(
+        src_folder: str,
+        modules: List[str],
+        workers: int | None = None,
+        cache_folder: str | None = None,
+        diagnostics: Diagnostics | None = None,
+        recover: bool = False,
+        memory_map: bool = False,
+        lazy_bodies: bool = False
+    ) -> Dict[str, Node | None]:
+    """
+    Parses modules without following their imports, in a process pool unless a
+    single worker or lazy bodies are requested
+
+    Args:
+        src_folder: the folder the module paths are relative to
+        modules: the module paths to parse
+        workers: the number of worker processes, the CPU count when not given,
+            1 parses in the current process
+        cache_folder: the persistent AST cache folder shared by the workers, no
+            cache when not given
+        diagnostics: collects the messages and errors of every module, a silent
+            collector when not given
+        recover: keep parsing modules after syntax errors, see Parser
+        memory_map: scan memory mapped source files instead of decoded copies
+        lazy_bodies: parse method bodies the first time they are accessed, for
+            callers only reading the shape of the classes. The modules are parsed in
+            the current process, sending them back from a worker parses every body,
+            and the syntax errors of the bodies are not reported
+    Returns:
+        Dict[str, Node|None]: the module ASTs by module path, None for invalid modules
+    """
+    if diagnostics is None:
+        diagnostics = Diagnostics()
+    level = diagnostics.level
+    parsed: Dict[str, Node | None] = {}
+    if lazy_bodies:
+        parser = Parser(
+            src_folder,
+            MmapFileReader() if memory_map else FileReader(),
+            follow_imports=False,
+            cache_folder=cache_folder,
+            diagnostics=diagnostics,
+            recover=recover,
+            lazy_bodies=True
+        )
+        for module in modules:
+            parsed[module] = parser.parse(module)
+        return parsed
+    if workers == 1:
+        for module in modules:
+            file_path, compact_node, records = _parse_module(
+                src_folder, module, cache_folder, level, recover, memory_map
+            )
+            parsed[file_path] = expand(compact_node) if compact_node is not None else None
+            diagnostics.extend(records)
+        return parsed
+    worker_count = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=worker_count) as executor:
+        chunk_size = max(1, len(modules) // (worker_count * 4))
+        results = executor.map(
+            _parse_module,
+            [src_folder] * len(modules),
+            modules,
+            [cache_folder] * len(modules),
+            [level] * len(modules),
+            [recover] * len(modules),
+            [memory_map] * len(modules),
+            chunksize=chunk_size
+        )
+        for file_path, compact_node, records in results:
+            parsed[file_path] = expand(compact_node) if compact_node is not None else None
+            diagnostics.extend(records)
+    return parsed
+
+
+def parse_project(
+        src_folder: str,
+        workers: int | None = None,
+        cache_folder: str | None = None,
+        diagnostics: Diagnostics | None = None,
+        recover: bool = False,
+        memory_map: bool = False,
+        symbols: SymbolIndex | None = None
+    ) -> ModuleRegistry:
+    """
+    Parses every module under the source folder, independent modules are tokenized
+    and parsed in a process pool and their imports are linked afterwards
+
+    Args:
+        src_folder: the folder holding the modules
+        workers: the number of worker processes, the CPU count when not given,
+            1 parses in the current process
+        cache_folder: the persistent AST cache folder shared by the workers, no
+            cache when not given
+        diagnostics: collects the messages and errors, a silent collector when not given
+        recover: keep parsing after syntax errors so every error of the project is
+            reported in one pass, the modules keep what parsed
+        memory_map: scan memory mapped source files instead of decoded copies
+        symbols: indexes the declarations and references of every module once
+            parsed, no index when not given
+    Returns:
+        ModuleRegistry: the compilation session holding every module
+    """
+    if diagnostics is None:
+        diagnostics = Diagnostics()
+    parsed = parse_modules(
+        src_folder, find_modules(src_folder), workers, cache_folder, diagnostics, recover, memory_map
+    )
+    if symbols is not None:
+        # linking replaces the import nodes the required names are kept in
+        for file_path, node in parsed.items():
+            symbols.update(file_path, node)
+    return link_modules(src_folder, parsed, diagnostics=diagnostics, recover=recover)
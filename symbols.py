@@ -0,0 +1,317 @@
+"""
+Project wide symbol index, maps fully qualified names such as
+business.sampleBusiness.SampleBusiness to where they are declared and to every
+reference to them. The entries are kept per module so a module parsed again only
+replaces its own entries
+"""
+import re
+
+from enum import Enum
+from typing import Any, Dict, List, Set
+
+from parser import Node, module_name
+from tokenizer import FIXED_TOKEN_TYPES
+
+BUILTIN_MODULE = 'Builtin'
+# the names within a type such as List<MyType> or MyType|null
+TYPE_NAME = re.compile(r'[A-Za-z_][A-Za-z0-9_]*')
+
+
+class SymbolKind(Enum):
+    """
+    The kinds of declared symbols
+    """
+    CLASS = 'class'
+    INTERFACE = 'interface'
+    TYPE = 'type'
+    ATTRIBUTE = 'attribute'
+    FIELD = 'field'
+    CONSTRUCTOR = 'constructor'
+    METHOD = 'method'
+
+
+class ReferenceKind(Enum):
+    """
+    The ways a module refers to a symbol
+    """
+    REQUIRE = 'require'
+    EXTENDS = 'extends'
+    IMPLEMENTS = 'implements'
+    # the type of an attribute or of a field of a type
+    ATTRIBUTE_TYPE = 'attribute_type'
+
+
+class Declaration():
+    """
+    Where a symbol is declared
+    """
+
+    def __init__(self, name: str, kind: SymbolKind, module: str, container: str) -> None:
+        """
+        Args:
+            name: the fully qualified name
+            kind: what is declared
+            module: the path of the declaring module relative to the source folder
+            container: the fully qualified name of the declaring class, interface or
+                type, the module name for classes, interfaces and types
+        """
+        self.name = name
+        self.kind = kind
+        self.module = module
+        self.container = container
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Returns the declaration as a JSON serializable dictionary
+        """
+        return {'name': self.name, 'kind': self.kind.value, 'module': self.module, 'container': self.container}
+
+    def __repr__(self) -> str:
+        return f'{self.kind.value} {self.name} in {self.module}'
+
+
+class Reference():
+    """
+    A reference from a module to a symbol
+    """
+
+    def __init__(self, target: str, kind: ReferenceKind, module: str, source: str) -> None:
+        """
+        Args:
+            target: the fully qualified name referred to, the name as written when
+                the module neither declares nor requires it
+            kind: how the symbol is referred to
+            module: the path of the referring module relative to the source folder
+            source: the fully qualified name of the referring declaration, the
+                module name for requires
+        """
+        self.target = target
+        self.kind = kind
+        self.module = module
+        self.source = source
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Returns the reference as a JSON serializable dictionary
+        """
+        return {'target': self.target, 'kind': self.kind.value, 'module': self.module, 'source': self.source}
+
+    def __repr__(self) -> str:
+        return f'{self.kind.value} {self.target} from {self.source}'
+
+
+class SymbolIndex():
+    """
+    Declarations and references of every indexed module in hash maps, lookups by
+    fully qualified name do not depend on the number of modules. The module ASTs
+    are indexed before linking, while their import nodes are in place
+    """
+
+    def __init__(self) -> None:
+        self._declarations: Dict[str, Declaration] = {}
+        self._qualified_names: Dict[str, Set[str]] = {}
+        # references by target, then by referring module so a module is dropped in one step
+        self._references: Dict[str, Dict[str, List[Reference]]] = {}
+        self._module_declarations: Dict[str, List[Declaration]] = {}
+        self._module_targets: Dict[str, Set[str]] = {}
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._declarations
+
+    @property
+    def modules(self) -> List[str]:
+        """
+        Returns the paths of the indexed modules, sorted
+        """
+        return sorted(self._module_declarations)
+
+    def declaration(self, name: str) -> Declaration | None:
+        """
+        Returns where a symbol is declared, None when no indexed module declares it
+
+        Args:
+            name: the fully qualified name
+        """
+        return self._declarations.get(name)
+
+    def references(self, name: str) -> List[Reference]:
+        """
+        Returns the references to a symbol, grouped by referring module
+
+        Args:
+            name: the fully qualified name, or the name as written for symbols
+                neither declared nor required by the referring module
+        """
+        by_module = self._references.get(name)
+        if by_module is None:
+            return []
+        return [reference for references in by_module.values() for reference in references]
+
+    def qualified_names(self, name: str) -> List[str]:
+        """
+        Returns the fully qualified names of the declarations with a simple name, sorted
+
+        Args:
+            name: the last part of the fully qualified names, such as SampleBusiness
+        """
+        return sorted(self._qualified_names.get(name, ()))
+
+    def declarations(self, file_path: str) -> List[Declaration]:
+        """
+        Returns the declarations of a module in source order
+        """
+        return self._module_declarations.get(file_path, [])
+
+    def update(self, file_path: str, node: Node | None) -> None:
+        """
+        Replaces the entries of a module by those of its AST
+
+        Args:
+            file_path: the module path relative to the source folder
+            node: the unlinked AST of the module, None when the module is invalid
+                and only its previous entries are dropped
+        """
+        self.remove(file_path)
+        self._module_declarations[file_path] = []
+        self._module_targets[file_path] = set()
+        if node is None or node.children is None:
+            return
+        module = module_name(file_path)
+        scope = module_scope(file_path, node)
+        for child in node.children:
+            if child.name == 'import' or child.name == 'builtin':
+                imported = BUILTIN_MODULE if child.name == 'builtin' else module_name(str(child.value))
+                for required in child.children or []:
+                    target = f'{imported}.{required.value}'
+                    self._add_reference(Reference(target, ReferenceKind.REQUIRE, file_path, module))
+            elif child.name == 'class' or child.name == 'interface':
+                self._index_declaration(file_path, module, child, scope)
+            elif child.name == 'type_definition':
+                self._index_type_definition(file_path, module, child, scope)
+
+    def remove(self, file_path: str) -> None:
+        """
+        Drops the entries of a module, such as a deleted module
+        """
+        for declaration in self._module_declarations.pop(file_path, []):
+            if self._declarations.get(declaration.name) is declaration:
+                del self._declarations[declaration.name]
+                simple_name = declaration.name.rsplit('.', 1)[-1]
+                qualified_names = self._qualified_names[simple_name]
+                qualified_names.discard(declaration.name)
+                if not qualified_names:
+                    del self._qualified_names[simple_name]
+        for target in self._module_targets.pop(file_path, set()):
+            by_module = self._references[target]
+            del by_module[file_path]
+            if not by_module:
+                del self._references[target]
+
+    def _index_declaration(self, file_path: str, module: str, node: Node, scope: Dict[str, str]) -> None:
+        class_name = scope[str(node.value)]
+        kind = SymbolKind.CLASS if node.name == 'class' else SymbolKind.INTERFACE
+        self._add_declaration(Declaration(class_name, kind, file_path, module))
+        for child in node.children or []:
+            if child.name == 'extends':
+                target = scope.get(str(child.value), str(child.value))
+                self._add_reference(Reference(target, ReferenceKind.EXTENDS, file_path, class_name))
+            elif child.name == 'implements':
+                target = scope.get(str(child.value), str(child.value))
+                self._add_reference(Reference(target, ReferenceKind.IMPLEMENTS, file_path, class_name))
+            elif child.name == 'attribute':
+                attribute_name = f'{class_name}.{child.value}'
+                self._add_declaration(Declaration(attribute_name, SymbolKind.ATTRIBUTE, file_path, class_name))
+                for attribute_child in child.children or []:
+                    if attribute_child.name == 'type':
+                        self._index_type(file_path, str(attribute_child.value), attribute_name, scope)
+            elif child.name == 'constructor' or child.name == 'method':
+                kind = SymbolKind.CONSTRUCTOR if child.name == 'constructor' else SymbolKind.METHOD
+                self._add_declaration(Declaration(f'{class_name}.{child.value}', kind, file_path, class_name))
+
+    def _index_type_definition(self, file_path: str, module: str, node: Node, scope: Dict[str, str]) -> None:
+        type_name = scope[str(node.value)]
+        self._add_declaration(Declaration(type_name, SymbolKind.TYPE, file_path, module))
+        for child in node.children or []:
+            if child.name == 'field':
+                field_name = f'{type_name}.{child.value}'
+                self._add_declaration(Declaration(field_name, SymbolKind.FIELD, file_path, type_name))
+                for field_child in child.children or []:
+                    if field_child.name == 'type':
+                        self._index_type(file_path, str(field_child.value), field_name, scope)
+
+    def _index_type(self, file_path: str, type_name: str, source: str, scope: Dict[str, str]) -> None:
+        for name in TYPE_NAME.findall(type_name):
+            # the primitive types and null are keywords, not symbols
+            if name not in FIXED_TOKEN_TYPES:
+                target = scope.get(name, name)
+                self._add_reference(Reference(target, ReferenceKind.ATTRIBUTE_TYPE, file_path, source))
+
+    def _add_declaration(self, declaration: Declaration) -> None:
+        self._declarations[declaration.name] = declaration
+        self._qualified_names.setdefault(declaration.name.rsplit('.', 1)[-1], set()).add(declaration.name)
+        self._module_declarations[declaration.module].append(declaration)
+
+    def _add_reference(self, reference: Reference) -> None:
+        self._references.setdefault(reference.target, {}).setdefault(reference.module, []).append(reference)
+        self._module_targets[reference.module].add(reference.target)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Returns the declarations and references of every module as a JSON serializable dictionary
+        """
+        return {
+            'declarations': {
+                module: [declaration.to_dict() for declaration in self._module_declarations[module]]
+                for module in self.modules
+            },
+            'references': {
+                target: [reference.to_dict() for reference in self.references(target)]
+                for target in sorted(self._references)
+            },
+        }
+
+
+def module_scope(file_path: str, node: Node) -> Dict[str, str]:
+    """
+    Returns the fully qualified names of the classes, interfaces and types a module
+    declares or requires by the name they are used under, declarations shadow
+    required names
+
+    Args:
+        file_path: the module path relative to the source folder
+        node: the unlinked AST of the module
+    """
+    module = module_name(file_path)
+    scope: Dict[str, str] = {}
+    for child in node.children or []:
+        if child.name == 'class' or child.name == 'interface' or child.name == 'type_definition':
+            scope[str(child.value)] = f'{module}.{child.value}'
+    for child in node.children or []:
+        if child.name == 'import' or child.name == 'builtin':
+            imported = BUILTIN_MODULE if child.name == 'builtin' else module_name(str(child.value))
+            for required in child.children or []:
+                scope.setdefault(str(required.value), f'{imported}.{required.value}')
+    return scope
+
+
+def qualify_type(type_name: str, scope: Dict[str, str]) -> str:
+    """
+    Returns a type as written with the names in scope replaced by their fully
+    qualified names, such as List<sampleType.MyCustomType>|null
+    """
+    return TYPE_NAME.sub(lambda match: scope.get(match[0], match[0]), type_name)
+
+
+def build_index(modules: Dict[str, Node | None]) -> SymbolIndex:
+    """
+    Indexes parsed modules
+
+    Args:
+        modules: the unlinked module ASTs by module path, None for invalid modules
+    Returns:
+        SymbolIndex: the declarations and references of the modules
+    """
+    index = SymbolIndex()
+    for file_path, node in modules.items():
+        index.update(file_path, node)
+    return index
@@ -0,0 +1,23 @@
+"""
+Parses modules held in memory for the tests of the passes that run on parsed ASTs
+"""
+from typing import Dict
+from unittest import mock
+
+from parser import Node, Parser
+
+
+def parse_sources(sources: Dict[str, str], **options) -> Dict[str, Node | None]:
+    """
+    Parses every module without following its imports, method bodies included
+
+    Args:
+        sources: the code of the modules by path relative to the source folder
+        options: further Parser keyword arguments, such as symbols
+    Returns:
+        the unlinked AST of every module by path, None for invalid modules
+    """
+    file_reader = mock.MagicMock()
+    file_reader.read.side_effect = lambda full_path: sources[full_path[len('test/'):]]
+    parser = Parser('test', file_reader, follow_imports=False, **options)
+    return {file_path: parser.parse(file_path) for file_path in sources}
@@ -0,0 +1,115 @@
+import io
+import os
+import tempfile
+from unittest import TestCase
+
+from binary_ast import BinaryAst, write_binary
+from parser import Node
+
+
+class TestBinaryAst(TestCase):
+    def _tree(self) -> Node:
+        root = Node('source', 'business.sample')
+        class_node = Node('class', 'Sample')
+        class_node.add_child(Node('extends', 'Base'))
+        attribute = Node('attribute', 'naïve')
+        attribute.add_child(Node('type', 'integer'))
+        class_node.add_child(attribute)
+        root.add_child(class_node)
+        root.add_child(Node('constant', 1.25))
+        root.add_child(Node('constant', -42))
+        root.add_child(Node('constant', 2 ** 70))
+        root.add_child(Node('builtin'))
+        return root
+
+    def _write(self, folder: str, modules: dict) -> str:
+        file_path = os.path.join(folder, 'project.past')
+        with open(file_path, 'wb') as f:
+            write_binary(f, modules)
+        return file_path
+
+    def test_round_trip(self):
+        # given
+        root = self._tree()
+
+        # when
+        with tempfile.TemporaryDirectory() as folder:
+            with BinaryAst(self._write(folder, {'business/sample.purist': root})) as ast:
+                modules = ast.modules
+                view = ast.root('business/sample.purist')
+                restored = view.to_node() if view is not None else None
+
+        # then
+        self.assertEqual(['business/sample.purist'], modules)
+        self.assertEqual(repr(root), repr(restored))
+
+    def test_lazy_view(self):
+        # given
+        root = self._tree()
+
+        # when
+        with tempfile.TemporaryDirectory() as folder:
+            with BinaryAst(self._write(folder, {'sample.purist': root})) as ast:
+                view = ast.root('sample.purist')
+                assert view is not None
+                children = view.children
+                assert children is not None
+                class_view = children[0]
+                class_value = class_view.value
+                names = [child.name for child in class_view.children or []]
+                values = [child.value for child in children[1:4]]
+                leaf_children = children[4].children
+                child_count = view.child_count
+
+        # then
+        self.assertEqual('Sample', class_value)
+        self.assertEqual(['extends', 'attribute'], names)
+        self.assertEqual([1.25, -42, 2 ** 70], values)
+        self.assertIsNone(leaf_children)
+        self.assertEqual(5, child_count)
+
+    def test_shared_modules_are_written_once(self):
+        # given
+        imported = Node('source', 'b')
+        imported.add_child(Node('class', 'B'))
+        importer = Node('source', 'a')
+        importer.add_child(imported)
+        importer.add_child(Node('class', 'A'))
+        modules = {'a.purist': importer, 'b.purist': imported, 'c.purist': None}
+
+        # when
+        with tempfile.TemporaryDirectory() as folder:
+            with BinaryAst(self._write(folder, modules)) as ast:
+                node_count = ast.node_count
+                a_view = ast.root('a.purist')
+                restored = a_view.to_node() if a_view is not None else None
+                b_view = ast.root('b.purist')
+                b_value = b_view.value if b_view is not None else None
+                invalid = ast.root('c.purist')
+
+        # then
+        self.assertEqual(4, node_count)
+        self.assertEqual(repr(importer), repr(restored))
+        self.assertEqual('b', b_value)
+        self.assertIsNone(invalid)
+
+    def test_invalid_file(self):
+        # given
+        with tempfile.TemporaryDirectory() as folder:
+            file_path = os.path.join(folder, 'invalid.past')
+            with open(file_path, 'wb') as f:
+                f.write(b'{"type": "source"}' * 4)
+
+            # then
+            with self.assertRaises(ValueError):
+                BinaryAst(file_path)
+
+    def test_write_to_stream(self):
+        # given
+        output = io.BytesIO()
+
+        # when
+        write_binary(output, {'sample.purist': self._tree()})
+
+        # then
+        self.assertTrue(output.getvalue().startswith(b'PAST'))
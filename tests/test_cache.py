@@ -0,0 +1,157 @@
+import os
+import tempfile
+from unittest import TestCase, mock
+
+from cache import AstCache
+from parser import PARSER_VERSION, Parser
+
+
+class TestAstCache(TestCase):
+    def test_store_and_load(self):
+        # given
+        with tempfile.TemporaryDirectory() as folder:
+            cache = AstCache(folder, '1')
+            key = cache.key('a.purist', 'class A {\n}')
+            compact_node = ('source', 'a', (('class', 'A', None),))
+
+            # when
+            missing = cache.load(key)
+            cache.store(key, compact_node)
+            loaded = cache.load(key)
+            entries = os.listdir(cache.folder)
+
+        # then
+        self.assertIsNone(missing)
+        self.assertEqual(compact_node, loaded)
+        self.assertEqual([key + '.ast'], entries)
+
+    def test_key_depends_on_module_path_and_source(self):
+        # given
+        cache = AstCache('unused', '1')
+
+        # when
+        key = cache.key('a.purist', 'class A {\n}')
+
+        # then
+        self.assertEqual(key, cache.key('a.purist', 'class A {\n}'))
+        self.assertNotEqual(key, cache.key('b.purist', 'class A {\n}'))
+        self.assertNotEqual(key, cache.key('a.purist', 'class B {\n}'))
+
+    def test_other_versions_are_not_read(self):
+        # given
+        with tempfile.TemporaryDirectory() as folder:
+            old_cache = AstCache(folder, '1')
+            key = old_cache.key('a.purist', 'class A {\n}')
+            old_cache.store(key, ('source', 'a', None))
+            cache = AstCache(folder, '2')
+
+            # when
+            loaded = cache.load(key)
+            evicted = cache.prune()
+            remaining = os.listdir(folder)
+
+        # then
+        self.assertIsNone(loaded)
+        self.assertEqual(1, evicted)
+        self.assertEqual([], remaining)
+
+    def test_prune_keeps_folders_that_are_not_cache_folders(self):
+        # given
+        with tempfile.TemporaryDirectory() as folder:
+            for name, file_name in [('business', 'a.purist'), ('0-m4', 'notes.txt'), ('2-m4', 'b.ast')]:
+                os.makedirs(os.path.join(folder, name))
+                with open(os.path.join(folder, name, file_name), 'w') as f:
+                    f.write('class A {\n}')
+            cache = AstCache(folder, '1')
+
+            # when
+            evicted = cache.prune()
+            remaining = sorted(os.listdir(folder))
+
+        # then
+        self.assertEqual(1, evicted)
+        self.assertEqual(['0-m4', 'business'], remaining)
+
+    def test_prune_evicts_least_recently_used_entries(self):
+        # given
+        with tempfile.TemporaryDirectory() as folder:
+            cache = AstCache(folder, '1', max_entries=2)
+            keys = [cache.key(f'{name}.purist', '') for name in 'abc']
+            for age, key in enumerate(keys):
+                cache.store(key, ('source', key, None))
+                entry_path = os.path.join(cache.folder, key + '.ast')
+                os.utime(entry_path, (1000 + age, 1000 + age))
+
+            # when
+            evicted = cache.prune()
+            loaded = [cache.load(key) for key in keys]
+
+        # then
+        self.assertEqual(1, evicted)
+        self.assertIsNone(loaded[0])
+        self.assertIsNotNone(loaded[1])
+        self.assertIsNotNone(loaded[2])
+
+    def test_prune_keeps_entries_loaded_since_they_were_written(self):
+        # given
+        with tempfile.TemporaryDirectory() as folder:
+            cache = AstCache(folder, '1', max_entries=2)
+            keys = [cache.key(f'{name}.purist', '') for name in 'abc']
+            for age, key in enumerate(keys):
+                cache.store(key, ('source', key, None))
+                entry_path = os.path.join(cache.folder, key + '.ast')
+                os.utime(entry_path, (1000 + age, 1000 + age))
+            cache.load(keys[0])
+
+            # when
+            evicted = cache.prune()
+            loaded = [cache.load(key) for key in keys]
+
+        # then
+        self.assertEqual(1, evicted)
+        self.assertIsNotNone(loaded[0])
+        self.assertIsNone(loaded[1])
+        self.assertIsNotNone(loaded[2])
+
+    def test_corrupt_entry_is_a_miss(self):
+        # given
+        with tempfile.TemporaryDirectory() as folder:
+            cache = AstCache(folder, '1')
+            key = cache.key('a.purist', '')
+            os.makedirs(cache.folder)
+            with open(os.path.join(cache.folder, key + '.ast'), 'wb') as f:
+                f.write(b'\xff\x00')
+
+            # when
+            loaded = cache.load(key)
+
+        # then
+        self.assertIsNone(loaded)
+
+    def test_parser_reuses_cached_ast(self):
+        # given
+        sources = {
+            'test/a.purist': 'from b require [B]\nclass A {\n}',
+            'test/b.purist': 'class B extends C {\n}',
+        }
+        file_reader = mock.MagicMock()
+        file_reader.read.side_effect = lambda filename: sources[filename]
+        with tempfile.TemporaryDirectory() as folder:
+            first = Parser('test', file_reader, cache_folder=folder).parse('a.purist')
+            sources['test/b.purist'] = 'class B extends D {\n}'
+
+            # when
+            parser = Parser('test', file_reader, cache_folder=folder)
+            with mock.patch.object(parser, '_parse_tokens', wraps=parser._parse_tokens) as parse_tokens:
+                second = parser.parse('a.purist')
+            versions = os.listdir(folder)
+            entries = os.listdir(os.path.join(folder, versions[0]))
+
+        # then
+        self.assertIsNotNone(first)
+        self.assertIsNotNone(second)
+        self.assertEqual(1, parse_tokens.call_count)
+        self.assertEqual(3, len(entries))
+        self.assertNotEqual(repr(first), repr(second))
+        self.assertEqual(repr(first).replace('"C"', '"D"'), repr(second))
+        self.assertTrue(versions[0].startswith(PARSER_VERSION))
@@ -0,0 +1,149 @@
+from unittest import TestCase
+
+from compiler import Opcode, compile_modules, literal, missing_classes
+from sources import parse_sources
+
+
+def compile_sources(sources):
+    return compile_modules(parse_sources(sources))
+
+
+def opcodes(code_object):
+    return [Opcode(code_object.code[offset]) for offset in range(0, len(code_object.code), 2)]
+
+
+class TestCompiler(TestCase):
+    def test_names_resolve_to_slots_fields_and_globals(self):
+        # given
+        sources = {
+            'counter.purist': (
+                'class Counter {\n'
+                '    count: integer = 0\n'
+                '    add(items: List<integer>): integer {\n'
+                '        size: integer = len(items)\n'
+                '        count = count + size\n'
+                '        return count\n'
+                '    }\n'
+                '}\n'
+            ),
+        }
+
+        # when
+        classes = compile_sources(sources)
+
+        # then
+        counter = classes['counter.Counter']
+        self.assertEqual({'count': 0}, counter.fields)
+        self.assertIsNone(counter.constructor)
+        add = counter.methods['add']
+        self.assertEqual(1, add.parameters)
+        self.assertEqual(['items', 'size'], add.local_names)
+        self.assertEqual(
+            [
+                Opcode.LOAD_LOCAL, Opcode.CALL_FUNCTION, Opcode.STORE_LOCAL,
+                Opcode.LOAD_THIS, Opcode.LOAD_THIS, Opcode.LOAD_FIELD, Opcode.LOAD_LOCAL, Opcode.ADD, Opcode.STORE_FIELD,
+                Opcode.LOAD_THIS, Opcode.LOAD_FIELD, Opcode.RETURN,
+                Opcode.LOAD_CONST, Opcode.RETURN,
+            ],
+            opcodes(add)
+        )
+        self.assertEqual([('len', 1, ()), 'count', None], add.constants)
+
+    def test_inherited_members_and_calls(self):
+        # given
+        sources = {
+            'base.purist': 'class Base {\n    name: string = "base"\n    describe(): string {\n        return name\n    }\n}\n',
+            'derived.purist': (
+                'from base require [Base]\n'
+                'class Derived extends Base {\n'
+                '    constructor(value: string) {\n'
+                '        super()\n'
+                '        name = value\n'
+                '    }\n'
+                '    describe(): string {\n'
+                '        return new Base(name=describe()).name\n'
+                '    }\n'
+                '}\n'
+            ),
+        }
+
+        # when
+        classes = compile_sources(sources)
+
+        # then
+        derived = classes['derived.Derived']
+        self.assertEqual('base.Base', derived.superclass)
+        self.assertEqual({}, derived.fields)
+        self.assertEqual({'name': 'base'}, classes['base.Base'].fields)
+        self.assertEqual(
+            [Opcode.CALL_SUPER, Opcode.POP, Opcode.LOAD_THIS, Opcode.LOAD_LOCAL, Opcode.STORE_FIELD],
+            opcodes(derived.constructor)[:5]
+        )
+        describe = derived.methods['describe']
+        self.assertEqual([Opcode.CALL_SELF, Opcode.NEW, Opcode.LOAD_FIELD, Opcode.RETURN], opcodes(describe)[:4])
+        self.assertIn(('base.Base', 0, ('name',)), describe.constants)
+        self.assertIn('CALL_SELF', describe.disassemble())
+
+    def test_jumps_target_instructions(self):
+        # given
+        sources = {
+            'loop.purist': (
+                'class Loop {\n'
+                '    run(limit: integer): integer {\n'
+                '        i: integer = 0\n'
+                '        while i < limit && true {\n'
+                '            i = i + 1\n'
+                '        }\n'
+                '        return i\n'
+                '    }\n'
+                '}\n'
+            ),
+        }
+
+        # when
+        run = compile_sources(sources)['loop.Loop'].methods['run']
+
+        # then
+        instructions = [(Opcode(run.code[offset]), run.code[offset + 1]) for offset in range(0, len(run.code), 2)]
+        start = 4
+        self.assertEqual((Opcode.LOAD_LOCAL, 1), instructions[start // 2])
+        self.assertEqual((Opcode.JUMP_IF_FALSE_OR_POP, 14), instructions[5])
+        self.assertEqual((Opcode.JUMP_IF_FALSE, 26), instructions[7])
+        self.assertEqual((Opcode.JUMP, start), instructions[12])
+        self.assertEqual((Opcode.LOAD_LOCAL, 1), instructions[13])
+
+    def test_missing_classes(self):
+        # given
+        sources = {
+            'shapes.purist': (
+                'from Builtin require [Strategy]\n'
+                'from sampleType require [MyCustomType]\n'
+                'class Shape extends Strategy {\n'
+                '    constructor() {\n'
+                '        value = new MyCustomType(name="a")\n'
+                '    }\n'
+                '    copy(): Shape {\n'
+                '        return new Shape()\n'
+                '    }\n'
+                '}\n'
+            ),
+        }
+
+        # when
+        missing = missing_classes(compile_sources(sources))
+
+        # then
+        self.assertEqual(
+            {'Builtin.Strategy': ['shapes.Shape'], 'sampleType.MyCustomType': ['shapes.Shape.constructor']},
+            missing
+        )
+
+    def test_attribute_initializers(self):
+        # given
+        initializers = ['"abc"', '12', '1.5', 'true', 'null', 'other']
+
+        # when
+        values = [literal(text) for text in initializers]
+
+        # then
+        self.assertEqual(['abc', 12, 1.5, True, None, 'other'], values)
@@ -0,0 +1,115 @@
+import io
+import os
+import tempfile
+from unittest import TestCase
+
+from dependencies import DependencyGraph, build_graph
+from parser import HEADER_PREFIX_SIZE, header_imports
+
+
+class TestHeaderImports(TestCase):
+    def test_reads_the_from_statements_only(self):
+        # given
+        code = (
+            b'// header comment\n'
+            b'from Builtin require [Logger]\n\n'
+            b'from a.b require [\n    B,\n    C\n]\n'
+            b'from c require [C] // trailing comment\n'
+            b'class D {\n}\n'
+            b'from e require [E]\n'
+        )
+
+        # when
+        imports = header_imports(io.BytesIO(code))
+
+        # then
+        self.assertEqual([os.path.join('a', 'b.purist'), 'c.purist'], imports)
+
+    def test_stops_reading_at_the_end_of_the_header(self):
+        # given
+        body = b'class D {\n' + b'    a: integer\n' * 100000 + b'}\n'
+        stream = io.BytesIO(b'from c require [C]\n' + body)
+
+        # when
+        imports = header_imports(stream)
+
+        # then
+        self.assertEqual(['c.purist'], imports)
+        self.assertFalse(stream.closed)
+        self.assertLess(stream.tell(), len(body) // 10)
+
+
+    def test_reads_on_while_the_header_may_go_on(self):
+        # given
+        comment = b'// ' + b'x' * (HEADER_PREFIX_SIZE - 4) + b' from z require [Z]\n'
+        code = comment + b'from a\n    .b require [B]\n' * 400 + b'class D {\n}\nfrom e require [E]\n'
+
+        # when
+        imports = header_imports(io.BytesIO(code))
+
+        # then
+        self.assertEqual([os.path.join('a', 'b.purist')] * 400, imports)
+
+class TestDependencyGraph(TestCase):
+    def test_order_puts_imported_modules_first(self):
+        # given
+        graph = DependencyGraph({
+            'a.purist': ['b.purist', 'c.purist'],
+            'b.purist': ['c.purist'],
+            'c.purist': [],
+        })
+
+        # when
+        order = graph.order
+
+        # then
+        self.assertEqual(['c.purist', 'b.purist', 'a.purist'], order)
+        self.assertEqual([], graph.cycles)
+
+    def test_cycles_and_missing_imports(self):
+        # given
+        graph = DependencyGraph({
+            'a.purist': ['b.purist', 'missing.purist'],
+            'b.purist': ['c.purist'],
+            'c.purist': ['a.purist', 'd.purist'],
+            'd.purist': [],
+            'e.purist': ['e.purist'],
+        })
+
+        # when
+        components = graph.components
+
+        # then
+        self.assertEqual([['d.purist'], ['a.purist', 'b.purist', 'c.purist'], ['e.purist']], components)
+        self.assertEqual([['a.purist', 'b.purist', 'c.purist'], ['e.purist']], graph.cycles)
+        self.assertEqual({'a.purist': ['missing.purist']}, graph.missing)
+
+    def test_long_cycles_do_not_recurse(self):
+        # given
+        count = 50000
+        graph = DependencyGraph({f'm{index}': [f'm{(index + 1) % count}'] for index in range(count)})
+
+        # when
+        cycles = graph.cycles
+
+        # then
+        self.assertEqual(1, len(cycles))
+        self.assertEqual(count, len(cycles[0]))
+
+    def test_build_graph_scans_the_source_folder(self):
+        # given
+        with tempfile.TemporaryDirectory() as folder:
+            os.makedirs(os.path.join(folder, 'lib'))
+            with open(os.path.join(folder, 'a.purist'), 'w') as f:
+                f.write('from lib.b require [B]\nclass A {\n}')
+            with open(os.path.join(folder, 'lib', 'b.purist'), 'w') as f:
+                f.write('class B {\n}')
+
+            # when
+            graph = build_graph(folder)
+
+        # then
+        b = os.path.join('lib', 'b.purist')
+        self.assertEqual(['a.purist', b], graph.modules)
+        self.assertEqual([b], graph.imports('a.purist'))
+        self.assertEqual([b, 'a.purist'], graph.order)
@@ -0,0 +1,121 @@
+import contextlib
+import io
+import pickle
+from unittest import TestCase, mock
+
+from diagnostics import Diagnostics, Severity
+from errors import CyclicInheritance, InvalidClassName, ParseError
+from parser import Parser
+from tokenizer import Tokenizer
+
+
+class CountingStream(io.StringIO):
+    def __init__(self) -> None:
+        super().__init__()
+        self.writes = 0
+
+    def write(self, text: str) -> int:
+        self.writes += 1
+        return super().write(text)
+
+
+class TestDiagnostics(TestCase):
+    def test_level_filters_records(self):
+        # given
+        diagnostics = Diagnostics(Severity.INFO)
+
+        # when
+        diagnostics.report(Severity.DEBUG, 'ParsingClass', 'parsing class A')
+        diagnostics.report(Severity.INFO, 'ParsingModule', 'parsing a.purist')
+        diagnostics.error(InvalidClassName('a', 'a.purist', 1, 7))
+
+        # then
+        self.assertFalse(diagnostics.enabled(Severity.DEBUG))
+        self.assertEqual(['ParsingModule', 'InvalidClassName'], [record.code for record in diagnostics.records])
+        self.assertEqual(1, len(diagnostics.errors))
+
+    def test_flush_writes_once(self):
+        # given
+        diagnostics = Diagnostics()
+        diagnostics.failure(ParseError(
+            InvalidClassName('a', 'a.purist', 1, 7),
+            InvalidClassName('b', 'a.purist', 4, 7)
+        ))
+        stream = CountingStream()
+
+        # when
+        diagnostics.flush(stream)
+
+        # then
+        self.assertEqual(1, stream.writes)
+        self.assertEqual(
+            'Invalid class name: "a" file: a.purist, line: 1, column: 7\n'
+            'Invalid class name: "b" file: a.purist, line: 4, column: 7\n',
+            stream.getvalue()
+        )
+        self.assertEqual([], diagnostics.records)
+
+    def test_parse_is_silent(self):
+        # given
+        file_reader = mock.MagicMock()
+        file_reader.read.return_value = 'class A {\n    logging: Logger\n}\nclass b {\n}'
+        service = Parser('test', file_reader)
+
+        # when
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            ast = service.parse('a.purist')
+
+        # then
+        self.assertIsNone(ast)
+        self.assertEqual('', output.getvalue())
+        self.assertEqual(['InvalidClassName'], [record.code for record in service.diagnostics.records])
+
+    def test_tokenizer_errors_are_collected(self):
+        # given
+        tokenizer = Tokenizer()
+
+        # when
+        tokens = tokenizer.tokenize('a.purist', 'class _A')
+
+        # then
+        self.assertEqual([], tokens)
+        self.assertEqual(['DecodeError'], [record.code for record in tokenizer.diagnostics.errors])
+
+    def test_parse_error_pickles(self):
+        # given
+        error = ParseError(InvalidClassName('a', 'a.purist', 1, 7))
+
+        # when
+        restored = pickle.loads(pickle.dumps(error))
+
+        # then
+        self.assertEqual(str(error), str(restored))
+        self.assertEqual('a.purist', restored.errors[0].filename)
+
+    def test_errors_without_a_position_are_formatted_without_one(self):
+        # given
+        diagnostics = Diagnostics()
+
+        # when
+        diagnostics.error(InvalidClassName('a', 'a.purist', 2, 7))
+        diagnostics.error(CyclicInheritance('a.A', 'a.purist'))
+
+        # then
+        self.assertEqual(
+            ['Invalid class name: "a" file: a.purist, line: 2, column: 7', 'Cyclic inheritance: "a.A" file: a.purist'],
+            [record.format() for record in diagnostics.errors]
+        )
+
+    def test_errors_on_line_zero_keep_their_position(self):
+        # given
+        diagnostics = Diagnostics()
+
+        # when
+        Tokenizer(diagnostics=diagnostics).tokenize('f.purist', 'a /\nb')
+
+        # then
+        self.assertEqual(
+            ['Unexpected character: "/" file: f.purist, line: 0, column: 2'],
+            [record.format() for record in diagnostics.errors]
+        )
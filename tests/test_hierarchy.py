@@ -0,0 +1,174 @@
+from unittest import TestCase
+
+from errors import CyclicInheritance, InvalidSupertype, MismatchedMethod, MissingMethod
+from hierarchy import build_hierarchy
+from sources import parse_sources
+
+SOURCES = {
+    'sampleType.purist': 'class MyCustomType {\n    name: string\n}\n',
+    'strategies/sampleStrategy.purist': (
+        'from sampleType require [MyCustomType]\n'
+        'interface Named {\n'
+        '    name(): string\n'
+        '}\n'
+        'public interface SampleStrategy extends Named {\n'
+        '    public process(value: MyCustomType): void\n'
+        '}\n'
+    ),
+    'strategies/sampleInstanceStrategy.purist': (
+        'from Builtin require [Strategy, Stateless]\n'
+        'from strategies.sampleStrategy require [SampleStrategy]\n'
+        'from sampleType require [MyCustomType]\n'
+        'class BaseStrategy extends Strategy {\n'
+        '    name(): string {\n'
+        '        return "base"\n'
+        '    }\n'
+        '}\n'
+        'class SampleInstanceStrategy extends BaseStrategy implements SampleStrategy, Stateless {\n'
+        '    process(item: MyCustomType): void {\n'
+        '    }\n'
+        '}\n'
+    ),
+}
+
+
+class TestTypeHierarchy(TestCase):
+    def _hierarchy(self, sources):
+        return build_hierarchy(parse_sources(sources))
+
+    def test_inherited_methods_implement_interfaces(self):
+        # given
+        hierarchy = self._hierarchy(SOURCES)
+
+        # when
+        errors = hierarchy.check()
+
+        # then
+        self.assertEqual([], errors)
+        name = 'strategies.sampleInstanceStrategy.SampleInstanceStrategy'
+        self.assertEqual(
+            (
+                name,
+                'strategies.sampleInstanceStrategy.BaseStrategy',
+                'Builtin.Strategy',
+                'strategies.sampleStrategy.SampleStrategy',
+                'strategies.sampleStrategy.Named',
+                'Builtin.Stateless',
+            ),
+            hierarchy.ancestors(name)
+        )
+        self.assertEqual(
+            {
+                'name': ('strategies.sampleInstanceStrategy.BaseStrategy', '(): string'),
+                'process': (name, '(sampleType.MyCustomType): void'),
+            },
+            hierarchy.methods(name)
+        )
+
+    def test_missing_and_mismatched_methods(self):
+        # given
+        sources = dict(SOURCES)
+        sources['strategies/sampleInstanceStrategy.purist'] = (
+            'from strategies.sampleStrategy require [SampleStrategy]\n'
+            'class SampleInstanceStrategy implements SampleStrategy {\n'
+            '    process(value: string): void {\n'
+            '    }\n'
+            '}\n'
+        )
+        hierarchy = self._hierarchy(sources)
+
+        # when
+        errors = hierarchy.check()
+
+        # then
+        self.assertEqual([MissingMethod, MismatchedMethod], [type(error) for error in errors])
+        self.assertEqual(
+            'Mismatched method: "strategies.sampleInstanceStrategy.SampleInstanceStrategy.process" '
+            'is "(string): void" expected "(sampleType.MyCustomType): void"',
+            errors[1].message
+        )
+        self.assertEqual(
+            'Missing method: "strategies.sampleInstanceStrategy.SampleInstanceStrategy" does not implement '
+            '"name" of "strategies.sampleStrategy.Named"',
+            errors[0].message
+        )
+        self.assertEqual('strategies/sampleInstanceStrategy.purist', errors[0].filename)
+        self.assertTrue(errors[0].get_error().endswith(' file: strategies/sampleInstanceStrategy.purist'))
+
+    def test_overrides_keep_the_signature(self):
+        # given
+        code = (
+            'class A {\n'
+            '    run(count: integer): void {\n'
+            '    }\n'
+            '}\n'
+            'class B extends A {\n'
+            '    run(count: string): void {\n'
+            '    }\n'
+            '}\n'
+        )
+        hierarchy = self._hierarchy({'a.purist': code})
+
+        # when
+        errors = hierarchy.check()
+
+        # then
+        self.assertEqual(['Mismatched method: "a.B.run" is "(string): void" expected "(integer): void"'], [error.message for error in errors])
+
+    def test_invalid_supertypes_and_cycles(self):
+        # given
+        code = (
+            'interface I {\n'
+            '}\n'
+            'class A extends I {\n'
+            '}\n'
+            'class B implements A {\n'
+            '}\n'
+            'class C extends D {\n'
+            '}\n'
+            'class D extends C {\n'
+            '}\n'
+        )
+        hierarchy = self._hierarchy({'a.purist': code})
+
+        # when
+        errors = hierarchy.check()
+
+        # then
+        self.assertEqual([InvalidSupertype, InvalidSupertype, CyclicInheritance], [type(error) for error in errors])
+        self.assertEqual('Invalid supertype: "a.B" implements "a.A"', errors[1].message)
+        self.assertEqual(('a.C', 'a.D'), hierarchy.ancestors('a.C'))
+
+    def test_deep_hierarchies_do_not_recurse(self):
+        # given
+        depth = 5000
+        code = 'interface I0 {\n    run(): void\n}\n' + ''.join(
+            f'interface I{index} extends I{index - 1} {{\n}}\n' for index in range(1, depth)
+        ) + f'class A implements I{depth - 1} {{\n}}\n'
+        hierarchy = self._hierarchy({'a.purist': code})
+
+        # when
+        errors = hierarchy.check()
+
+        # then
+        self.assertEqual(['Missing method: "a.A" does not implement "run" of "a.I0"'], [error.message for error in errors])
+        self.assertEqual(depth + 1, len(hierarchy.ancestors('a.A')))
+
+    def test_update_replaces_the_types_of_a_module(self):
+        # given
+        hierarchy = self._hierarchy(SOURCES)
+        hierarchy.check()
+
+        # when
+        modules = parse_sources({
+            'strategies/sampleStrategy.purist': 'interface SampleStrategy {\n    reset(): void\n}\n',
+        })
+        hierarchy.update('strategies/sampleStrategy.purist', modules['strategies/sampleStrategy.purist'])
+        errors = hierarchy.check()
+
+        # then
+        self.assertIsNone(hierarchy.declaration('strategies.sampleStrategy.Named'))
+        self.assertEqual(['reset'], [error.message.split('"')[3] for error in errors])
+        hierarchy.remove('strategies/sampleStrategy.purist')
+        self.assertEqual([], hierarchy.check())
+        self.assertEqual(['sampleType.purist', 'strategies/sampleInstanceStrategy.purist'], hierarchy.modules)
@@ -0,0 +1,118 @@
+import contextlib
+import io
+from unittest import TestCase
+
+from incremental import Document
+from tokenizer import TokenBuffer
+
+CODE = '''from Builtin require [Logger]
+
+// first class
+class Alpha extends Beta {
+    logging: Logger
+}
+
+class Gamma {
+    count: integer
+}
+'''
+
+
+def token_fields(tokens: TokenBuffer) -> list:
+    return [
+        (tokens.type_at(index), tokens.line_at(index), tokens.column_at(index), tokens.value_at(index))
+        for index in range(len(tokens))
+    ]
+
+
+class TestDocument(TestCase):
+    def _assert_matches_full_parse(self, document: Document) -> None:
+        expected = Document('sample.purist', document.text)
+        self.assertEqual(repr(expected.ast), repr(document.ast))
+        self.assertEqual(token_fields(expected.tokens), token_fields(document.tokens))
+        self.assertEqual(
+            [(index, repr(token), token.value) for index, token in expected.tokens.trivia()],
+            [(index, repr(token), token.value) for index, token in document.tokens.trivia()]
+        )
+
+    def test_edit_inside_class_reuses_other_statements(self):
+        # given
+        document = Document('sample.purist', CODE)
+        assert document.ast is not None and document.ast.children is not None
+        alpha, gamma = document.ast.children[1], document.ast.children[2]
+        offset = CODE.index('count') + len('count')
+
+        # when
+        ast = document.edit(offset, offset, 'er')
+
+        # then
+        self.assertIsNotNone(ast)
+        if ast is not None and ast.children is not None:
+            self.assertIs(alpha, ast.children[1])
+            self.assertIsNot(gamma, ast.children[2])
+            self.assertEqual('counter', ast.children[2].children[0].value)
+        self._assert_matches_full_parse(document)
+
+    def test_edit_adding_lines_moves_following_tokens(self):
+        # given
+        document = Document('sample.purist', CODE)
+        offset = CODE.index('    logging')
+
+        # when
+        document.edit(offset, offset, '    name: string\n    size: integer\n')
+
+        # then
+        self.assertEqual(CODE[:offset] + '    name: string\n    size: integer\n' + CODE[offset:], document.text)
+        self._assert_matches_full_parse(document)
+
+    def test_edit_adding_class(self):
+        # given
+        document = Document('sample.purist', CODE)
+
+        # when
+        document.edit(len(CODE), len(CODE), '\nclass Delta {\n}')
+
+        # then
+        self.assertIsNotNone(document.ast)
+        if document.ast is not None and document.ast.children is not None:
+            self.assertEqual('Delta', document.ast.children[-1].value)
+        self._assert_matches_full_parse(document)
+
+    def test_edit_keeps_comments_around_the_edited_lines(self):
+        # given
+        code = CODE.replace('    count: integer\n', '    // counted\n    count: integer // total\n') + '// end\n'
+        document = Document('sample.purist', code)
+        offset = code.index('count:')
+
+        # when
+        document.edit(offset, offset + len('count'), 'total')
+        document.edit(offset, offset, '// renamed\n    ')
+        document.edit(len(document.text), len(document.text), '\n// appended\n')
+
+        # then
+        self.assertIn('// renamed\n    total: integer // total\n', document.text)
+        self._assert_matches_full_parse(document)
+
+    def test_edit_breaking_class_parses_whole_module(self):
+        # given
+        document = Document('sample.purist', CODE)
+        offset = CODE.index('}')
+
+        # when
+        with contextlib.redirect_stdout(io.StringIO()):
+            broken = document.edit(offset, offset + 1, '')
+            restored = document.edit(offset, offset, '}')
+
+        # then
+        self.assertIsNone(broken)
+        self.assertIsNotNone(restored)
+        self.assertEqual(CODE, document.text)
+        self._assert_matches_full_parse(document)
+
+    def test_invalid_edit_range(self):
+        # given
+        document = Document('sample.purist', CODE)
+
+        # then
+        with self.assertRaises(ValueError):
+            document.edit(10, 5, '')
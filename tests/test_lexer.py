@@ -1,8 +1,9 @@
+import io
 from typing import List
 from unittest import TestCase
 
 from errors import Error
-from lexer import Lexer
+from lexer import BytesLexer, Lexer, RegexLexer, line_starts
 
 
 class TestLexer(TestCase):
@@ -40,13 +41,17 @@ class TestLexer(TestCase):
         service = Lexer('test', text)
 
         # when
+        sign, sign_error, _, sign_column = service.next()
         number, error, line, column = service.next()
 
         # then
-        self.assertEqual(number, '-123')
+        self.assertEqual(sign, '-')
+        self.assertIsNone(sign_error)
+        self.assertEqual(sign_column, 1, 'column should be 1')
+        self.assertEqual(number, '123')
         self.assertIsNone(error)
         self.assertEqual(line, 1, 'line should be 1')
-        self.assertEqual(column, 1, 'column should be 1')
+        self.assertEqual(column, 2, 'column should be 2')
 
     def test_decimal_detection(self):
         # given
@@ -68,13 +73,17 @@ class TestLexer(TestCase):
         service = Lexer('test', text)
 
         # when
+        sign, sign_error, _, sign_column = service.next()
         number, error, line, column = service.next()
 
         # then
-        self.assertEqual(number, '-123.456')
+        self.assertEqual(sign, '-')
+        self.assertIsNone(sign_error)
+        self.assertEqual(sign_column, 1, 'column should be 1')
+        self.assertEqual(number, '123.456')
         self.assertIsNone(error)
         self.assertEqual(line, 1, 'line should be 1')
-        self.assertEqual(column, 1, 'column should be 1')
+        self.assertEqual(column, 2, 'column should be 2')
 
     def test_detect_quoted_string(self):
         # given
@@ -460,3 +469,144 @@ class SampleInstanceStrategy extends Strategy implements SampleStrategy, Statele
         # then
         # 'from'
         self.assertEqual(strings[0], 'from')
+
+
+class TestRegexLexer(TestCase):
+    def _collect(self, service) -> List[tuple]:
+        results: List[tuple] = []
+        value: str | None = ''
+        while value is not None:
+            value, error, line, column = service.next()
+            results.append((value, error.get_error() if error else None, line, column))
+            if error is not None:
+                break
+        return results
+
+    def test_same_stream_as_character_lexer(self):
+        # given
+        texts = [
+            'from b require [B]\n// comment\n\nclass A implements B{\n}',
+            'class A {\n    name: string = "multi\nline \\" string"\n    value: number = -1.5\n}\n\n',
+            'a / b',
+            'total = a + b * c % 2 - 1 && !d',
+            'x = 5-3-1.5 - -2',
+            '123.456.789 other stuff',
+            '$$$',
+        ]
+
+        for text in texts:
+            # when
+            expected = self._collect(Lexer('test', text))
+            actual = self._collect(RegexLexer('test', text))
+
+            # then
+            self.assertEqual(expected, actual)
+
+    def test_multi_line_string_positions(self):
+        # given
+        text = '"Hello\nWorld" after'
+        service = RegexLexer('test', text)
+
+        # when
+        string, error, line, column = service.next()
+        word, _, word_line, word_column = service.next()
+
+        # then
+        self.assertEqual(string, '"Hello\nWorld"')
+        self.assertIsNone(error)
+        self.assertEqual((line, column), (1, 1))
+        self.assertEqual(word, 'after')
+        self.assertEqual((word_line, word_column), (2, 8))
+
+    def test_trailing_whitespace(self):
+        # given
+        text = 'class A {   \n}   \n'
+        service = RegexLexer('test', text)
+
+        # when
+        results = self._collect(service)
+
+        # then
+        self.assertEqual(['class', 'A', '{', '}', None], [result[0] for result in results])
+
+    def test_end_of_file_is_repeated(self):
+        # given
+        service = RegexLexer('test', 'word')
+
+        # when
+        service.next()
+        first = service.next()
+        second = service.next()
+
+        # then
+        self.assertEqual(first, second)
+        self.assertIsNone(first[0])
+
+    def test_stream_chunks_match_whole_text(self):
+        # given
+        text = 'class A {\n    name: string = "multi\nline \\" string"\n    // comment\n    value: number = -1.5\n}\n'
+        expected = self._collect(RegexLexer('test', text))
+
+        for chunk_size in [1, 2, 3, 7, 64]:
+            # when
+            actual = self._collect(RegexLexer.from_stream('test', io.StringIO(text), chunk_size))
+
+            # then
+            self.assertEqual(expected, actual)
+
+
+class TestBytesLexer(TestCase):
+    def _collect(self, service) -> List[tuple]:
+        return [
+            (value, error.get_error() if error else None, line, column)
+            for value, error, line, column in service
+        ]
+
+    def test_same_stream_as_regex_lexer(self):
+        # given
+        texts = [
+            'from b require [B]\n// comment\n\nclass A implements B{\n}',
+            'class A {\n    name: string = "multi\nline \\" string"\n    value: number = -1.5\n}\n\n',
+            'class A {\r\n    name: string = "windows\r\nline"\r\n}\r\n',
+            'a / b',
+            'total = a + b * c % 2 - 1 && !d',
+            'x = 5-3-1.5 - -2',
+            'a /\nb',
+            '123.456.789 other stuff',
+            'a "unterminated',
+            '$$$',
+            '',
+            'a  \t\n\n  ',
+        ]
+
+        for text in texts:
+            # when
+            expected = self._collect(RegexLexer('test', text))
+            actual = self._collect(BytesLexer('test', text.encode('utf-8')))
+
+            # then
+            self.assertEqual(expected, actual, text)
+
+    def test_columns_count_characters(self):
+        # given
+        text = 'a "é ü" b\n// ç\nc ñ'
+        service = BytesLexer('test', text.encode('utf-8'))
+
+        # when
+        results = self._collect(service)
+
+        # then
+        self.assertEqual(('"é ü"', None, 1, 3), results[1])
+        self.assertEqual(('b', None, 1, 9), results[2])
+        self.assertEqual(('// ç', None, 2, 1), results[3])
+        self.assertEqual((None, 'Unexpected character: "ñ" file: test, line: 3, column: 3', 3, 3), results[-1])
+
+    def test_line_starts(self):
+        # given
+        data = b'a\nbc\r\n\rd'
+
+        # when
+        starts = line_starts(data)
+
+        # then
+        self.assertEqual([0, 2, 6, 7], list(starts))
@@ -0,0 +1,63 @@
+from unittest import TestCase, mock
+
+from errors import InvalidClassName, InvalidVariableName
+from naming import NameRole, NamingValidator
+
+
+class TestNamingValidator(TestCase):
+    def test_is_valid(self):
+        # given
+        validator = NamingValidator()
+
+        # then
+        self.assertTrue(validator.is_valid(NameRole.CLASS, 'SampleClass'))
+        self.assertFalse(validator.is_valid(NameRole.CLASS, 'sampleClass'))
+        self.assertTrue(validator.is_valid(NameRole.METHOD, 'process'))
+        self.assertFalse(validator.is_valid(NameRole.INTERFACE, 'stateless'))
+
+    def test_validate_reports_every_violation(self):
+        # given
+        validator = NamingValidator()
+        occurrences = {
+            (NameRole.VARIABLE, '_value'): [('a.purist', 3, 5)],
+            (NameRole.CLASS, 'sample'): [('a.purist', 1, 7)],
+            (NameRole.CLASS, 'Sample'): [('a.purist', 2, 7)],
+        }
+
+        # when
+        errors = validator.validate(occurrences)
+
+        # then
+        self.assertEqual([InvalidClassName, InvalidVariableName], [type(error) for error in errors])
+        self.assertEqual(
+            'Invalid class name: "sample" file: a.purist, line: 1, column: 7',
+            errors[0].get_error()
+        )
+
+    def test_results_are_memoized(self):
+        # given
+        validator = NamingValidator()
+        occurrences = {(NameRole.CLASS, 'sample'): [('a.purist', line, 1) for line in range(100)]}
+
+        # when
+        with mock.patch.object(validator, 'is_valid', wraps=validator.is_valid) as is_valid:
+            errors = validator.validate(occurrences)
+            validator.validate(occurrences)
+
+        # then
+        self.assertEqual(100, len(errors))
+        self.assertEqual(1, is_valid.call_count)
+        self.assertEqual({(NameRole.CLASS, 'sample'): False}, validator._valid)
+
+    def test_memo_is_bounded(self):
+        # given
+        validator = NamingValidator(max_names=10)
+        occurrences = {(NameRole.VARIABLE, f'value{index}'): [('a.purist', index, 1)] for index in range(25)}
+
+        # when
+        errors = validator.validate(occurrences)
+
+        # then
+        self.assertEqual([], errors)
+        self.assertEqual(5, len(validator._valid))
+        self.assertTrue(validator.is_valid(NameRole.VARIABLE, 'value0'))
@@ -1,6 +1,77 @@
+import io
+import json
+import os
+import tempfile
 from unittest import TestCase, mock
 
-from parser import Parser
+from errors import ParseError
+from naming import NameRole
+from parser import FileReader, LazyNode, MmapFileReader, ModuleState, Node, Parser, header_imports
+
+
+class TestNode(TestCase):
+    def _tree(self) -> Node:
+        root = Node('source', 'sample')
+        class_node = Node('class', 'A')
+        class_node.add_child(Node('extends', 'B'))
+        class_node.add_child(Node('public'))
+        root.add_child(class_node)
+        root.add_child(Node('constant', 1.5))
+        return root
+
+    def test_to_dict(self):
+        # given
+        root = self._tree()
+
+        # when
+        response = root.to_dict()
+
+        # then
+        self.assertEqual({
+            'type': 'source',
+            'value': 'sample',
+            'children': [
+                {'type': 'class', 'value': 'A', 'children': [
+                    {'type': 'extends', 'value': 'B'},
+                    {'type': 'public'},
+                ]},
+                {'type': 'constant', 'value': 1.5},
+            ]
+        }, response)
+
+    def test_write_json_compact_and_indented(self):
+        # given
+        root = self._tree()
+        compact = io.StringIO()
+        indented = io.StringIO()
+
+        # when
+        root.write_json(compact)
+        root.write_json(indented, indent=2)
+
+        # then
+        self.assertEqual(json.dumps(root.to_dict(), separators=(',', ':')), compact.getvalue())
+        self.assertEqual(json.dumps(root.to_dict(), indent=2), indented.getvalue())
+        self.assertEqual(json.dumps(root.to_dict(), indent=4), repr(root))
+
+    def test_write_json_deep_tree(self):
+        # given
+        root = Node('source', 'deep')
+        node = root
+        for level in range(5000):
+            child = Node('class', f'Level{level}')
+            node.add_child(child)
+            node = child
+        output = io.StringIO()
+
+        # when
+        root.write_json(output)
+        response = root.to_dict()
+
+        # then
+        self.assertEqual(5001, output.getvalue().count('"type"'))
+        self.assertTrue(output.getvalue().endswith('"Level4999"}' + ']}' * 5000))
+        self.assertEqual('Level0', response['children'][0]['value'])
 
 
 class TestParser(TestCase):
@@ -47,3 +118,534 @@ class TestParser(TestCase):
             self.assertIsNotNone(ast.children)
         if ast is not None and ast.children is not None:
             self.assertEqual(1, len(ast.children))
+
+    def test_parse_stream(self):
+        # given
+        code = '// comment\nclass A extends B {\n}\nclass C {\n}'
+        file_reader = mock.MagicMock()
+        service = Parser('test', file_reader)
+
+        # when
+        ast = service.parse_stream('test3.purist', io.StringIO(code))
+
+        # then
+        file_reader.read.assert_not_called()
+        self.assertIsNotNone(ast)
+        if ast is not None and ast.children is not None:
+            self.assertEqual(['A', 'C'], [child.value for child in ast.children])
+
+    def test_parse_stream_parses_method_bodies(self):
+        # given
+        code = (
+            'class A {\n'
+            '    run(count: integer): integer {\n'
+            '        total: integer = 0\n'
+            '        while total < count {\n'
+            '            total = total + items[1:2].size() // step\n'
+            '        }\n'
+            '        return total - 1\n'
+            '    }\n'
+            '}\n'
+        )
+        file_reader = mock.MagicMock()
+        file_reader.read.return_value = code
+        service = Parser('', file_reader)
+
+        # when
+        ast = service.parse('test.purist')
+        streamed = service.parse_stream('streamed.purist', io.StringIO(code))
+
+        # then
+        self.assertIsNotNone(streamed)
+        self.assertEqual(repr(ast), repr(streamed).replace('streamed', 'test'))
+        if streamed is not None and streamed.children is not None:
+            body = streamed.children[0].children[0].children[-1]
+            self.assertEqual(['variable', 'while', 'return'], [statement.name for statement in body.children])
+
+    def test_parse_stream_reports_body_syntax_errors(self):
+        # given
+        code = 'class A {\n    run() {\n        return 1 +\n    }\n}\n'
+        service = Parser('', mock.MagicMock())
+
+        # when
+        ast = service.parse_stream('streamed.purist', io.StringIO(code))
+
+        # then
+        self.assertIsNone(ast)
+
+    def test_comment_blocks_do_not_nest_calls(self):
+        # given
+        comments = '// note\n' * 2000
+        code = f'{comments}class A {comments}{{\n{comments}    a: {comments}integer\n{comments}}}\n'
+        file_reader = mock.MagicMock()
+        file_reader.read.return_value = code
+        service = Parser('', file_reader)
+
+        # when
+        ast = service.parse('test.purist')
+        streamed = service.parse_stream('streamed.purist', io.StringIO(code))
+
+        # then
+        self.assertIsNotNone(ast)
+        self.assertEqual(repr(ast), repr(streamed).replace('streamed', 'test'))
+        if ast is not None and ast.children is not None:
+            self.assertEqual('integer', ast.children[0].children[0].children[0].value)
+
+    def test_memory_mapped_files_parse_like_text(self):
+        # given
+        sources = {
+            'a.purist': 'from b require [B]\n// comment\nclass A extends B {\n    name: string = "é"\n}\n',
+            'b.purist': 'class B {\n    public run(count: integer): integer {\n        return 1\n    }\n}\n',
+            'empty.purist': '',
+        }
+        with tempfile.TemporaryDirectory() as src_folder:
+            for filename, code in sources.items():
+                with open(os.path.join(src_folder, filename), 'w', encoding='utf-8') as f:
+                    f.write(code)
+
+            for filename in ['a.purist', 'empty.purist']:
+                # when
+                expected = Parser(src_folder, FileReader()).parse(filename)
+                actual = Parser(src_folder, MmapFileReader()).parse(filename)
+
+                # then
+                self.assertIsNotNone(actual)
+                if expected is not None and actual is not None:
+                    self.assertEqual(expected.to_dict(), actual.to_dict())
+
+    def test_header_imports(self):
+        # given
+        code = '// imports\nfrom Builtin require [Logger]\nfrom a.b require [B]\nclass C {\n}\nfrom d require [D]\n'
+
+        for text in [code, code.encode('utf-8')]:
+            # when
+            imports = header_imports(text)
+
+            # then
+            self.assertEqual([os.path.join('a', 'b.purist')], imports)
+
+    def test_method_bodies_are_parsed_on_first_access(self):
+        # given
+        code = 'class A {\n    a(): integer {\n        if b { return 1 }\n        return 2\n    }\n    c() {\n    }\n}'
+        file_reader = mock.MagicMock()
+        file_reader.read.return_value = code
+        spans = []
+
+        def parse_body(tokens, start, end):
+            spans.append((start, end))
+            return [Node('statements', end - start)]
+
+        service = Parser('test', file_reader, lazy_bodies=True)
+        service._parse_body = parse_body
+
+        # when
+        ast = service.parse('lazy.purist')
+        bodies = [method.children[-1] for method in ast.children[0].children]
+        parsed_before = [body.parsed for body in bodies]
+        first = bodies[0].children
+        first_again = bodies[0].children
+
+        # then
+        self.assertTrue(all(isinstance(body, LazyNode) for body in bodies))
+        self.assertEqual([False, False], parsed_before)
+        self.assertEqual([bodies[0].span], spans)
+        self.assertIs(first, first_again)
+        self.assertEqual(8, first[0].value)
+        self.assertEqual({'type': 'body', 'children': [{'type': 'statements', 'value': 0}]}, bodies[1].to_dict())
+        self.assertEqual(2, len(spans))
+
+    def test_method_body_statements(self):
+        # given
+        code = (
+            'class A {\n'
+            '    a(items: List<integer>): integer {\n'
+            '        total: integer = -1\n'
+            '        this.count = total + items[1:] * 2\n'
+            '        if total != 0 || !done { return } else if n -1 >= 0 {\n'
+            '            log.info(name="a", total)\n'
+            '        }\n'
+            '        return new B<integer>()\n'
+            '    }\n'
+            '}'
+        )
+        file_reader = mock.MagicMock()
+        file_reader.read.return_value = code
+        service = Parser('test', file_reader)
+
+        # when
+        ast = service.parse('body.purist')
+        body = ast.to_dict()['children'][0]['children'][0]['children'][-1]
+
+        # then
+        statements = body['children']
+        self.assertEqual(['variable', 'assign', 'if', 'return'], [statement['type'] for statement in statements])
+        self.assertEqual(
+            [{'type': 'type', 'value': 'integer'}, {'type': 'integer', 'value': -1}],
+            statements[0]['children']
+        )
+        target, value = statements[1]['children']
+        self.assertEqual({'type': 'member', 'value': 'count', 'children': [{'type': 'name', 'value': 'this'}]}, target)
+        self.assertEqual(('binary', '+'), (value['type'], value['value']))
+        self.assertEqual(('binary', '*'), (value['children'][1]['type'], value['children'][1]['value']))
+        self.assertEqual('slice', value['children'][1]['children'][0]['type'])
+        condition, then_block, else_block = statements[2]['children']
+        self.assertEqual(('binary', '||'), (condition['type'], condition['value']))
+        self.assertEqual([{'type': 'return'}], then_block['children'])
+        nested = else_block['children'][0]
+        self.assertEqual(
+            {
+                'type': 'binary',
+                'value': '>=',
+                'children': [
+                    {
+                        'type': 'binary',
+                        'value': '-',
+                        'children': [{'type': 'name', 'value': 'n'}, {'type': 'integer', 'value': 1}]
+                    },
+                    {'type': 'integer', 'value': 0},
+                ]
+            },
+            nested['children'][0]
+        )
+        call = nested['children'][1]['children'][0]['children'][0]
+        self.assertEqual(('invoke', 'info'), (call['type'], call['value']))
+        self.assertEqual(['name', 'argument', 'name'], [child['type'] for child in call['children']])
+        self.assertEqual({'type': 'new', 'value': 'B<integer>'}, statements[3]['children'][0])
+
+    def test_minus_signs(self):
+        # given
+        code = 'class A {\n    a: number = -1.5\n    b() {\n        x = a -1[0]\n        y = -c - -2\n    }\n}'
+        file_reader = mock.MagicMock()
+        file_reader.read.return_value = code
+        service = Parser('test', file_reader)
+
+        # when
+        members = service.parse('minus.purist').to_dict()['children'][0]['children']
+
+        # then
+        self.assertEqual({'type': 'value', 'value': -1.5}, members[0]['children'][1])
+        first, second = [statement['children'][1] for statement in members[1]['children'][-1]['children']]
+        self.assertEqual(('binary', '-'), (first['type'], first['value']))
+        self.assertEqual('index', first['children'][1]['type'])
+        self.assertEqual(
+            [{'type': 'unary', 'value': '-', 'children': [{'type': 'name', 'value': 'c'}]}, {'type': 'integer', 'value': -2}],
+            second['children']
+        )
+
+    def test_minus_sign_without_operand_is_rejected(self):
+        # given
+        file_reader = mock.MagicMock()
+        file_reader.read.return_value = 'class A {\n    a() {\n        x = a -.\n    }\n}'
+        service = Parser('test', file_reader)
+
+        # when
+        ast = service.parse('minus.purist')
+
+        # then
+        self.assertIsNone(ast)
+        self.assertEqual(['UnexpectedKeyword'], [record.code for record in service.diagnostics.errors])
+
+    def test_separated_operator_tokens_are_rejected(self):
+        # given
+        bodies = ['x = = 1', 'a | | b', 'a & & b', 'a ! = b', 'a < = b', 'a >\n= b']
+        file_reader = mock.MagicMock()
+
+        for number, body in enumerate(bodies):
+            file_reader.read.return_value = f'class A {{\n    a() {{\n        {body}\n    }}\n}}'
+            service = Parser('test', file_reader)
+
+            # when
+            ast = service.parse(f'separated{number}.purist')
+
+            # then
+            self.assertIsNone(ast, msg=body)
+            self.assertEqual(['UnexpectedKeyword'], [record.code for record in service.diagnostics.errors], msg=body)
+
+    def test_body_errors_do_not_depend_on_the_cache(self):
+        # given
+        file_reader = mock.MagicMock()
+        file_reader.read.return_value = 'class A {\n    f(): integer {\n        return )\n    }\n}'
+
+        with tempfile.TemporaryDirectory() as folder:
+            services = [Parser('test', file_reader), Parser('test', file_reader, cache_folder=folder)]
+            lazy_services = [
+                Parser('test', file_reader, lazy_bodies=True),
+                Parser('test', file_reader, cache_folder=folder, lazy_bodies=True),
+            ]
+
+            # when
+            asts = [service.parse('broken.purist') for service in services]
+            lazy_asts = [service.parse('broken.purist') for service in lazy_services]
+            entries = os.listdir(folder)
+
+        # then
+        self.assertEqual([None, None], asts)
+        errors = [[record.format() for record in service.diagnostics.errors] for service in services]
+        self.assertEqual(1, len(errors[0]))
+        self.assertEqual(errors[0], errors[1])
+        for service, ast in zip(lazy_services, lazy_asts):
+            self.assertEqual([], service.diagnostics.errors)
+            with self.assertRaises(ParseError):
+                ast.to_dict()
+        self.assertEqual([], entries)
+
+    def test_class_members(self):
+        # given
+        code = (
+            'class A {\n'
+            '    logging: Logger // injected\n'
+            '    items: List<String>|null = null\n'
+            '    constructor(size: integer) {\n'
+            '    }\n'
+            '    public process(name: string, count: integer): void {\n'
+            '        if count > 0 {\n'
+            '            log(name)\n'
+            '        }\n'
+            '    }\n'
+            '    reset() {\n'
+            '    }\n'
+            '}'
+        )
+        service = Parser('test', mock.MagicMock())
+
+        # when
+        ast = service.parse_stream('test4.purist', io.StringIO(code))
+
+        # then
+        self.assertIsNotNone(ast)
+        class_node = ast.to_dict()['children'][0] if ast is not None else {}
+        self.assertEqual(
+            [
+                ('attribute', 'logging'),
+                ('attribute', 'items'),
+                ('constructor', 'constructor'),
+                ('method', 'process'),
+                ('method', 'reset'),
+            ],
+            [(child['type'], child['value']) for child in class_node['children']]
+        )
+        self.assertEqual(
+            [{'type': 'type', 'value': 'List<String>|null'}, {'type': 'value', 'value': 'null'}],
+            class_node['children'][1]['children']
+        )
+        process = class_node['children'][3]['children']
+        self.assertEqual(['public', 'parameters', 'returns', 'body'], [child['type'] for child in process])
+        self.assertEqual(['name', 'count'], [child['value'] for child in process[1]['children']])
+        self.assertEqual('private', class_node['children'][4]['children'][0]['type'])
+
+    def test_type_definition(self):
+        # given
+        code = 'type MyCustomType {\n    name: String("", "[A-Z]") | null = null\n    age: integer = -1\n}'
+        file_reader = mock.MagicMock()
+        file_reader.read.return_value = code
+        service = Parser('test', file_reader)
+
+        # when
+        ast = service.parse('sampleType.purist')
+
+        # then
+        self.assertEqual(
+            {'type': 'type_definition', 'value': 'MyCustomType', 'children': [
+                {'type': 'field', 'value': 'name', 'children': [
+                    {'type': 'type', 'value': 'String|null'},
+                    {'type': 'constraint', 'children': [
+                        {'type': 'value', 'value': '""'},
+                        {'type': 'value', 'value': '"[A-Z]"'},
+                    ]},
+                    {'type': 'value', 'value': 'null'},
+                ]},
+                {'type': 'field', 'value': 'age', 'children': [
+                    {'type': 'type', 'value': 'integer'},
+                    {'type': 'value', 'value': -1},
+                ]},
+            ]},
+            ast.to_dict()['children'][0]
+        )
+
+    def test_interface_methods_have_no_body(self):
+        # given
+        code = (
+            'public interface Strategy extends Named, Stateless {\n'
+            '    public process(value: MyCustomType): void\n'
+            '    name(): string\n'
+            '}\n'
+            'interface Named {\n'
+            '}'
+        )
+        service = Parser('test', mock.MagicMock())
+
+        # when
+        ast = service.parse_stream('test5.purist', io.StringIO(code))
+
+        # then
+        self.assertIsNotNone(ast)
+        interfaces = ast.to_dict()['children'] if ast is not None else []
+        self.assertEqual([('interface', 'Strategy'), ('interface', 'Named')], [(node['type'], node['value']) for node in interfaces])
+        self.assertEqual(
+            [('extends', 'Named'), ('extends', 'Stateless'), ('method', 'process'), ('method', 'name')],
+            [(child['type'], child['value']) for child in interfaces[0]['children']]
+        )
+        self.assertEqual(
+            ['public', 'parameters', 'returns'],
+            [child['type'] for child in interfaces[0]['children'][2]['children']]
+        )
+        self.assertEqual('private', interfaces[0]['children'][3]['children'][0]['type'])
+
+    def test_invalid_names_are_reported_together(self):
+        # given
+        code = 'class a implements b {\n    process(value: integer) {\n    }\n}\nclass c {\n}'
+        service = Parser('test', mock.MagicMock())
+
+        # when
+        ast = service.parse_stream('test5.purist', io.StringIO(code))
+
+        # then
+        self.assertIsNone(ast)
+        self.assertEqual(
+            [
+                'Invalid class name: "a" file: test5.purist, line: 1, column: 7',
+                'Invalid interface name: "b" file: test5.purist, line: 1, column: 20',
+                'Invalid class name: "c" file: test5.purist, line: 5, column: 7',
+            ],
+            [record.format() for record in service.diagnostics.errors]
+        )
+        self.assertEqual(
+            ['InvalidClassName', 'InvalidInterfaceName', 'InvalidClassName'],
+            [record.code for record in service.diagnostics.errors]
+        )
+
+    def test_names_declared_in_bodies_are_checked(self):
+        # given
+        code = (
+            'class A {\n'
+            '    a(items: List<integer>) {\n'
+            '        total: integer = 0\n'
+            '        for item in items {\n'
+            '            total = total + item\n'
+            '        }\n'
+            '    }\n'
+            '}\n'
+        )
+        file_reader = mock.MagicMock()
+        file_reader.read.return_value = code
+        checked = []
+        for lazy_bodies in [False, True]:
+            service = Parser('test', file_reader, lazy_bodies=lazy_bodies)
+            with mock.patch.object(service._naming, 'validate', wraps=service._naming.validate) as validate:
+
+                # when
+                ast = service.parse('names.purist')
+                ast.children[0].children[0].children[-1].children
+
+            checked.append([
+                (role, name) for call in validate.call_args_list for role, name in call.args[0]
+                if role is NameRole.VARIABLE
+            ])
+
+        # then
+        expected = [(NameRole.VARIABLE, 'items'), (NameRole.VARIABLE, 'total'), (NameRole.VARIABLE, 'item')]
+        self.assertEqual([expected, expected], checked)
+
+    def test_recovery_reports_every_error(self):
+        # given
+        code = (
+            'from Builtin require [Logger]\n'
+            'class Broken extends {\n'
+            '}\n'
+            'class Good {\n'
+            '    logging: Logger\n'
+            '    count: integer = ?\n'
+            '    process(value integer) {\n'
+            '    }\n'
+            '    reset() {\n'
+            '    }\n'
+            '}\n'
+            'class lower {\n'
+        )
+        file_reader = mock.MagicMock()
+        file_reader.read.return_value = code
+        service = Parser('test', file_reader, recover=True)
+
+        # when
+        ast = service.parse('test6.purist')
+
+        # then
+        self.assertIsNotNone(ast)
+        classes = [child for child in ast.children or [] if child.name == 'class'] if ast is not None else []
+        self.assertEqual(['Good', 'lower'], [class_node.value for class_node in classes])
+        self.assertEqual(
+            ['logging', 'process', 'reset'],
+            [member.value for member in classes[0].children or []]
+        )
+        self.assertEqual(
+            [
+                ('UnexpectedKeyword', 2),
+                ('DecodeError', 6),
+                ('UnexpectedKeyword', 7),
+                ('UnexpectedKeyword', 7),
+                ('InvalidClassName', 12),
+                ('UnexpectedEndOfFile', 12),
+            ],
+            [(type(error).__name__, error.line) for error in service.errors['test6.purist']]
+        )
+        self.assertEqual(6, len(service.diagnostics.errors))
+
+    def test_recovery_keeps_modules_with_missing_imports(self):
+        # given
+        def read(filename: str) -> str:
+            if filename != 'test/a.purist':
+                raise FileNotFoundError(filename)
+            return 'from b require [B]\nclass A {\n}'
+        file_reader = mock.MagicMock()
+        file_reader.read.side_effect = read
+        service = Parser('test', file_reader, recover=True)
+
+        # when
+        ast = service.parse('a.purist')
+
+        # then
+        self.assertIsNotNone(ast)
+        self.assertEqual(['InvalidImportStatement'], [type(error).__name__ for error in service.errors['a.purist']])
+
+    def test_diamond_imports_are_parsed_once(self):
+        # given
+        sources = {
+            'test/a.purist': 'from b require [B]\nfrom c require [C]\nclass A {\n}',
+            'test/b.purist': 'from d require [D]\nclass B {\n}',
+            'test/c.purist': 'from d require [D]\nclass C {\n}',
+            'test/d.purist': 'class D {\n}',
+        }
+        file_reader = mock.MagicMock()
+        file_reader.read.side_effect = lambda filename: sources[filename]
+        service = Parser('test', file_reader)
+
+        # when
+        ast = service.parse('a.purist')
+
+        # then
+        self.assertIsNotNone(ast)
+        self.assertEqual(
+            ['test/a.purist', 'test/b.purist', 'test/d.purist', 'test/c.purist'],
+            [call.args[0] for call in file_reader.read.call_args_list]
+        )
+        self.assertEqual(ModuleState.DONE, service.registry.state('d.purist'))
+        self.assertIs(service.registry.node('d.purist'), service.parse('d.purist'))
+
+    def test_cyclic_imports_are_detected(self):
+        # given
+        sources = {
+            'test/a.purist': 'from b require [B]\nclass A {\n}',
+            'test/b.purist': 'from a require [A]\nclass B {\n}',
+        }
+        file_reader = mock.MagicMock()
+        file_reader.read.side_effect = lambda filename: sources[filename]
+        service = Parser('test', file_reader)
+
+        # when
+        ast = service.parse('a.purist')
+
+        # then
+        self.assertIsNotNone(ast)
+        self.assertEqual(2, file_reader.read.call_count)
+        self.assertEqual(ModuleState.DONE, service.registry.state('a.purist'))
+        self.assertEqual(ModuleState.DONE, service.registry.state('b.purist'))
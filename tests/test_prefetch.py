@@ -0,0 +1,145 @@
+import tempfile
+import threading
+import time
+from typing import Dict, List
+from unittest import TestCase, mock
+
+from errors import ParseError
+from parser import FileReader, Parser, main
+from prefetch import PrefetchingFileReader
+
+
+class DictReader(FileReader):
+    def __init__(self, sources: Dict[str, str], blocked: Dict[str, threading.Event] | None = None) -> None:
+        self.sources = sources
+        self.blocked = blocked or {}
+        self.reads: List[str] = []
+
+    def read(self, filename: str) -> str:
+        event = self.blocked.get(filename)
+        if event is not None:
+            event.wait(5)
+        self.reads.append(filename)
+        if filename not in self.sources:
+            raise FileNotFoundError(filename)
+        return self.sources[filename]
+
+
+class TestPrefetchingFileReader(TestCase):
+    def test_imports_are_read_ahead_of_the_parser(self):
+        # given
+        sources = {
+            'test/a.purist': 'from Builtin require [Logger]\nfrom b require [B]\nfrom c.d require [D]\nclass A {\n}',
+            'test/b.purist': 'from c.d require [D]\nclass B {\n}',
+            'test/c/d.purist': 'class D {\n}',
+        }
+        inner = DictReader(sources)
+
+        # when
+        with PrefetchingFileReader('test', inner) as reader:
+            ast = Parser('test', reader).parse('a.purist')
+
+        # then
+        self.assertIsNotNone(ast)
+        self.assertEqual(sorted(sources), sorted(inner.reads))
+        self.assertEqual(2, reader.stats.requested)
+        self.assertEqual(2, reader.stats.hits)
+        self.assertEqual(1, reader.stats.misses)
+        self.assertEqual(0, reader.stats.unused)
+
+    def test_files_announced_past_the_bound_are_read_directly(self):
+        # given
+        release = threading.Event()
+        inner = DictReader({'b': 'class B {\n}', 'c': 'class C {\n}'}, {'b': release})
+        reader = PrefetchingFileReader('', inner, max_in_flight=1)
+        reader.prefetch('b')
+        reader.prefetch('c')
+
+        # when
+        c = reader.read('c')
+        release.set()
+        b = reader.read('b')
+        reader.close()
+
+        # then
+        self.assertEqual('class C {\n}', c)
+        self.assertEqual('class B {\n}', b)
+        self.assertEqual(['c', 'b'], inner.reads)
+        self.assertEqual(1, reader.stats.requested)
+        self.assertEqual(1, reader.stats.skipped)
+        self.assertEqual(1, reader.stats.hits)
+        self.assertEqual(1, reader.stats.misses)
+
+    def test_held_files_never_exceed_the_bound(self):
+        # given
+        modules = [f'm{index}' for index in range(20)]
+        sources = {
+            'test/a.purist': ''.join(f'from {module} require [M]\n' for module in modules) + 'class A {\n}',
+            **{f'test/{module}.purist': 'from a require [A]\nclass M {\n}' for module in modules},
+        }
+        held: List[int] = []
+
+        class CountingReader(DictReader):
+            def read(self, filename: str) -> str:
+                held.append(len(reader._futures))
+                return super().read(filename)
+
+        reader = PrefetchingFileReader('test', CountingReader(sources), max_in_flight=3)
+
+        # when
+        with reader:
+            ast = Parser('test', reader).parse('a.purist')
+
+        # then
+        self.assertIsNotNone(ast)
+        self.assertLessEqual(max(held), 3)
+        self.assertGreater(reader.stats.skipped, 0)
+        self.assertEqual(len(sources), reader.stats.hits + reader.stats.misses)
+
+    def test_reads_running_after_close_do_not_prefetch(self):
+        # given
+        release = threading.Event()
+        inner = DictReader({'a': 'from b require [B]\nclass A {\n}', 'b': 'class B {\n}'}, {'a': release})
+        reader = PrefetchingFileReader('', inner)
+        reader.prefetch('a')
+        future = reader._futures['a']
+        closing = threading.Thread(target=reader.close)
+
+        # when
+        closing.start()
+        # the read of a is released once close has started waiting for it
+        while closing.is_alive() and not reader._closed:
+            time.sleep(0.001)
+        release.set()
+        closing.join(5)
+
+        # then
+        self.assertEqual('from b require [B]\nclass A {\n}', future.result())
+        self.assertEqual(['a'], inner.reads)
+        self.assertEqual(0, reader.stats.skipped)
+        self.assertEqual('class B {\n}', reader.read('b'))
+
+    def test_read_errors_are_raised_by_read(self):
+        # given
+        reader = PrefetchingFileReader('', DictReader({}))
+        reader.prefetch('missing')
+
+        # when
+        with self.assertRaises(FileNotFoundError):
+            reader.read('missing')
+        reader.close()
+
+        # then
+        self.assertEqual(1, reader.stats.hits)
+
+    def test_main_closes_the_reader_when_the_parse_fails(self):
+        # given
+        with tempfile.TemporaryDirectory() as folder, \
+                mock.patch.object(PrefetchingFileReader, 'close', autospec=True) as close:
+
+            # when
+            with self.assertRaises(ParseError):
+                main('missing.purist', folder, prefetch=2)
+
+        # then
+        self.assertEqual(1, close.call_count)
@@ -0,0 +1,87 @@
+import contextlib
+import io
+import json
+import time
+from unittest import TestCase, mock
+
+from parser import Parser
+from profiling import Phase, Profiler
+from tokenizer import Tokenizer
+
+
+class TestProfiler(TestCase):
+    def _parse(self, profiler: Profiler) -> None:
+        sources = {
+            'test/a.purist': 'from b require [B]\nclass A {\n    logging: Logger\n}',
+            'test/b.purist': 'class B {\n}',
+        }
+        file_reader = mock.MagicMock()
+        file_reader.read.side_effect = lambda filename: sources[filename]
+        with contextlib.redirect_stdout(io.StringIO()):
+            Parser('test', file_reader, profiler=profiler).parse('a.purist')
+
+    def test_parse_is_measured_per_file_and_phase(self):
+        # given
+        profiler = Profiler()
+
+        # when
+        self._parse(profiler)
+
+        # then
+        profiles = {profile.file_path: profile for profile in profiler.profiles}
+        self.assertEqual(['a.purist', 'b.purist'], list(profiles))
+        self.assertEqual(
+            {Phase.READ, Phase.CACHE, Phase.LEX, Phase.TOKENIZE, Phase.PARSE, Phase.LINK},
+            set(profiles['a.purist'].timings)
+        )
+        self.assertEqual(14, profiles['a.purist'].tokens)
+        self.assertEqual(5, profiles['b.purist'].tokens)
+        self.assertEqual(6, profiles['a.purist'].nodes)
+        self.assertEqual(2, profiles['b.purist'].nodes)
+        self.assertIsNone(profiles['a.purist'].peak_memory)
+
+    def test_nested_modules_are_not_charged_to_the_importer(self):
+        # given
+        profiler = Profiler()
+
+        # when
+        profiler.enter('a.purist')
+        profiler.enter('b.purist')
+        time.sleep(0.05)
+        profiler.lap(Phase.PARSE)
+        profiler.exit()
+        profiler.lap(Phase.LINK)
+        profiler.exit()
+
+        # then
+        profiles = {profile.file_path: profile for profile in profiler.profiles}
+        self.assertGreaterEqual(profiles['b.purist'].timings[Phase.PARSE], 50_000_000)
+        self.assertLess(profiles['a.purist'].timings[Phase.LINK], 25_000_000)
+
+    def test_peak_memory_and_json(self):
+        # given
+        profiler = Profiler(trace_memory=True)
+
+        # when
+        self._parse(profiler)
+        output = io.StringIO()
+        profiler.write_json(output)
+
+        # then
+        profile = json.loads(output.getvalue())
+        self.assertEqual(2, len(profile['files']))
+        self.assertGreater(profile['files'][0]['peak_memory'], 0)
+        self.assertIn('parse', profile['files'][0]['timings_ns'])
+        self.assertIn('a.purist', profiler.report())
+
+    def test_tokenizer_without_profiler(self):
+        # given
+        profiler = Profiler()
+
+        # when
+        plain = Tokenizer().tokenize('a.purist', 'class A {\n}')
+        profiled = Tokenizer(profiler=profiler).tokenize('a.purist', 'class A {\n}')
+
+        # then
+        self.assertEqual([repr(token) for token in plain], [repr(token) for token in profiled])
+        self.assertEqual(5, profiler.profiles[0].tokens)
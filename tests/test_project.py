@@ -0,0 +1,150 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from diagnostics import Diagnostics
+from parser import FileReader, LazyNode, Node, Parser
+from project import compact, expand, find_modules, link_modules, parse_modules, parse_project
+
+
+class TestProject(TestCase):
+    def _write_project(self, folder: str, sources: dict) -> None:
+        for file_path, code in sources.items():
+            full_path = os.path.join(folder, file_path)
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            with open(full_path, 'w') as f:
+                f.write(code)
+
+    def test_find_modules(self):
+        # given
+        with tempfile.TemporaryDirectory() as folder:
+            self._write_project(folder, {
+                'entry.purist': 'class A {\n}',
+                'business/b.purist': 'class B {\n}',
+                'notes.txt': 'not a module',
+            })
+
+            # when
+            modules = find_modules(folder)
+
+        # then
+        self.assertEqual([os.path.join('business', 'b.purist'), 'entry.purist'], modules)
+
+    def test_compact_round_trip(self):
+        # given
+        root = Node('source', 'a')
+        class_node = Node('class', 'A')
+        class_node.add_child(Node('extends', 'B'))
+        root.add_child(class_node)
+
+        # when
+        restored = expand(compact(root))
+
+        # then
+        self.assertEqual(repr(root), repr(restored))
+
+    def test_link_modules(self):
+        # given
+        def module(name: str, *imports: str) -> Node:
+            node = Node('source', name)
+            for imported in imports:
+                node.add_child(Node('import', imported))
+            node.add_child(Node('class', name.upper()))
+            return node
+        parsed = {
+            'a.purist': module('a', 'b.purist', 'c.purist'),
+            'b.purist': module('b', 'a.purist'),
+            'c.purist': module('c', 'missing.purist'),
+            'd.purist': None,
+        }
+
+        # when
+        registry = link_modules('test', parsed)
+
+        # then
+        a = registry.node('a.purist')
+        self.assertIsNotNone(a)
+        if a is not None and a.children is not None:
+            self.assertEqual(['source', 'class'], [child.name for child in a.children])
+            self.assertIs(registry.node('b.purist'), a.children[0])
+        self.assertIsNone(registry.node('c.purist'))
+        self.assertIsNone(registry.node('d.purist'))
+
+    def test_parse_project_matches_serial_parse(self):
+        # given
+        sources = {
+            'entry.purist': 'from business.b require [B]\nfrom c require [C]\nclass A extends B {\n}',
+            'business/b.purist': 'from c require [C]\nclass B {\n}',
+            'c.purist': 'class C implements D, E {\n}',
+        }
+        with tempfile.TemporaryDirectory() as folder:
+            self._write_project(folder, sources)
+            expected = repr(Parser(folder, FileReader()).parse('entry.purist'))
+
+            for workers in [1, 2]:
+                # when
+                registry = parse_project(folder, workers)
+
+                # then
+                self.assertEqual(3, len(registry.modules))
+                self.assertEqual(expected, repr(registry.node('entry.purist')))
+
+    def test_parse_project_recovering(self):
+        # given
+        sources = {
+            'entry.purist': 'from missing require [M]\nclass A {\n    a: # 1\n}',
+            'b.purist': 'class B {\n    b: integer =\n}\nclass c {\n}',
+        }
+        diagnostics = Diagnostics()
+        with tempfile.TemporaryDirectory() as folder:
+            self._write_project(folder, sources)
+
+            # when
+            registry = parse_project(folder, 2, diagnostics=diagnostics, recover=True)
+
+        # then
+        self.assertIsNotNone(registry.node('entry.purist'))
+        self.assertIsNotNone(registry.node('b.purist'))
+        self.assertEqual(
+            ['UnexpectedKeyword', 'InvalidClassName', 'DecodeError', 'UnexpectedKeyword', 'FileNotFound'],
+            [record.code for record in diagnostics.errors]
+        )
+
+    def test_body_syntax_errors_make_modules_invalid(self):
+        # given
+        sources = {
+            'a.purist': 'class A {\n    run(): void {\n        x = )\n    }\n}\n',
+            'b.purist': 'class B {\n    run(): void {\n        x = 1\n    }\n}\n',
+        }
+        with tempfile.TemporaryDirectory() as folder:
+            self._write_project(folder, sources)
+
+            for workers in [1, 2]:
+                diagnostics = Diagnostics()
+
+                # when
+                modules = parse_modules(folder, ['a.purist', 'b.purist'], workers, diagnostics=diagnostics)
+
+                # then
+                self.assertIsNone(modules['a.purist'])
+                self.assertIsNotNone(modules['b.purist'])
+                self.assertEqual(['UnexpectedKeyword'], [record.code for record in diagnostics.errors])
+
+    def test_lazy_bodies_are_parsed_in_process_on_access(self):
+        # given
+        sources = {
+            'a.purist': 'class A {\n    run(): void {\n        x = )\n    }\n}\n',
+            'b.purist': 'class B {\n    run(): void {\n        x = 1\n    }\n}\n',
+        }
+        with tempfile.TemporaryDirectory() as folder:
+            self._write_project(folder, sources)
+            diagnostics = Diagnostics()
+
+            # when
+            modules = parse_modules(folder, ['a.purist', 'b.purist'], 2, diagnostics=diagnostics, lazy_bodies=True)
+
+        # then
+        bodies = [modules[module].children[0].children[0].children[-1] for module in ['a.purist', 'b.purist']]
+        self.assertEqual([LazyNode, LazyNode], [type(body) for body in bodies])
+        self.assertEqual([], diagnostics.errors)
+        self.assertEqual('assign', bodies[1].children[0].name)
@@ -0,0 +1,113 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from project import parse_project
+from sources import parse_sources
+from symbols import ReferenceKind, SymbolIndex, SymbolKind
+
+SOURCES = {
+    'sampleType.purist': 'type MyCustomType {\n    name: String("", "[A-Z][a-z]*") | null\n}\n',
+    'business/sampleBusiness.purist': (
+        'from Builtin require [Logger, Stateless]\n'
+        'from sampleType require [MyCustomType]\n'
+        'class SampleBusiness implements Stateless {\n'
+        '    logging: Logger\n'
+        '    types: List<MyCustomType>|null\n'
+        '    public process(value: string): integer {\n'
+        '        return 0\n'
+        '    }\n'
+        '}\n'
+        'class SpecialBusiness extends SampleBusiness {\n'
+        '}\n'
+    ),
+}
+
+
+class TestSymbolIndex(TestCase):
+    def test_declarations_and_references(self):
+        # given
+        symbols = SymbolIndex()
+
+        # when
+        parse_sources(SOURCES, symbols=symbols)
+
+        # then
+        self.assertEqual(['business/sampleBusiness.purist', 'sampleType.purist'], symbols.modules)
+        business = symbols.declaration('business.sampleBusiness.SampleBusiness')
+        self.assertIsNotNone(business)
+        if business is not None:
+            self.assertEqual(SymbolKind.CLASS, business.kind)
+            self.assertEqual('business/sampleBusiness.purist', business.module)
+            self.assertEqual('business.sampleBusiness', business.container)
+        method = symbols.declaration('business.sampleBusiness.SampleBusiness.process')
+        self.assertEqual(SymbolKind.METHOD, method.kind if method is not None else None)
+        custom_type = symbols.declaration('sampleType.MyCustomType')
+        self.assertEqual(SymbolKind.TYPE, custom_type.kind if custom_type is not None else None)
+        field = symbols.declaration('sampleType.MyCustomType.name')
+        self.assertEqual(SymbolKind.FIELD, field.kind if field is not None else None)
+        self.assertEqual(
+            [(ReferenceKind.ATTRIBUTE_TYPE, 'sampleType.MyCustomType.name')],
+            [(reference.kind, reference.source) for reference in symbols.references('String')]
+        )
+        self.assertEqual(['sampleType.MyCustomType'], symbols.qualified_names('MyCustomType'))
+        self.assertEqual(
+            [
+                (ReferenceKind.REQUIRE, 'business.sampleBusiness'),
+                (ReferenceKind.ATTRIBUTE_TYPE, 'business.sampleBusiness.SampleBusiness.types'),
+            ],
+            [(reference.kind, reference.source) for reference in symbols.references('sampleType.MyCustomType')]
+        )
+        self.assertEqual(
+            [ReferenceKind.REQUIRE, ReferenceKind.IMPLEMENTS],
+            [reference.kind for reference in symbols.references('Builtin.Stateless')]
+        )
+        self.assertEqual(
+            [(ReferenceKind.EXTENDS, 'business.sampleBusiness.SpecialBusiness')],
+            [(reference.kind, reference.source) for reference in symbols.references('business.sampleBusiness.SampleBusiness')]
+        )
+        # names neither declared nor required are kept as written, keywords are not symbols
+        self.assertEqual(1, len(symbols.references('List')))
+        self.assertEqual([], symbols.references('null'))
+
+    def test_update_replaces_the_entries_of_a_module(self):
+        # given
+        symbols = SymbolIndex()
+        parse_sources(SOURCES, symbols=symbols)
+
+        # when
+        parse_sources({'sampleType.purist': 'class OtherType {\n}\n'}, symbols=symbols)
+        symbols.remove('business/sampleBusiness.purist')
+
+        # then
+        self.assertNotIn('sampleType.MyCustomType', symbols)
+        self.assertNotIn('sampleType.MyCustomType.name', symbols)
+        self.assertEqual([], symbols.qualified_names('MyCustomType'))
+        self.assertEqual(['sampleType.OtherType'], symbols.qualified_names('OtherType'))
+        self.assertEqual([], symbols.references('sampleType.MyCustomType'))
+        self.assertEqual([], symbols.declarations('business/sampleBusiness.purist'))
+        self.assertEqual(
+            {'declarations': {'sampleType.purist': [{
+                'name': 'sampleType.OtherType',
+                'kind': 'class',
+                'module': 'sampleType.purist',
+                'container': 'sampleType'
+            }]}, 'references': {}},
+            symbols.to_dict()
+        )
+
+    def test_parse_project_indexes_every_module(self):
+        # given
+        symbols = SymbolIndex()
+        with tempfile.TemporaryDirectory() as folder:
+            os.makedirs(os.path.join(folder, 'business'))
+            for file_path, code in SOURCES.items():
+                with open(os.path.join(folder, file_path), 'w') as f:
+                    f.write(code)
+
+            # when
+            parse_project(folder, workers=1, symbols=symbols)
+
+        # then
+        self.assertEqual(['business/sampleBusiness.purist', 'sampleType.purist'], symbols.modules)
+        self.assertEqual(2, len(symbols.references('sampleType.MyCustomType')))
@@ -1,6 +1,8 @@
+import io
 from unittest import TestCase
 
-from tokenizer import TokenType, Tokenizer
+from lexer import Lexer
+from tokenizer import TokenBuffer, TokenStream, TokenType, Tokenizer
 
 
 class TestTokenizer(TestCase):
@@ -47,11 +49,13 @@ class TestTokenizer(TestCase):
 
         # then
         self.assertIsNotNone(tokens)
-        self.assertEqual(2, len(tokens))
+        self.assertEqual(3, len(tokens))
         token = tokens[0]
-        self.assertEqual(TokenType.INTEGER_VALUE, token.type)
-        self.assertEqual(-123, token.value)
+        self.assertEqual(TokenType.MINUS, token.type)
         token = tokens[1]
+        self.assertEqual(TokenType.INTEGER_VALUE, token.type)
+        self.assertEqual(123, token.value)
+        token = tokens[2]
         self.assertEqual(TokenType.EOF, token.type)
         self.assertIsNone(token.value)
 
@@ -115,11 +119,13 @@ class TestTokenizer(TestCase):
 
         # then
         self.assertIsNotNone(tokens)
-        self.assertEqual(2, len(tokens))
+        self.assertEqual(3, len(tokens))
         token = tokens[0]
-        self.assertEqual(TokenType.DECIMAL_VALUE, token.type)
-        self.assertEqual(-1.2, token.value)
+        self.assertEqual(TokenType.MINUS, token.type)
         token = tokens[1]
+        self.assertEqual(TokenType.DECIMAL_VALUE, token.type)
+        self.assertEqual(1.2, token.value)
+        token = tokens[2]
         self.assertEqual(TokenType.EOF, token.type)
         self.assertIsNone(token.value)
 
@@ -564,3 +570,272 @@ class TestTokenizer(TestCase):
         token = tokens[12]
         self.assertEqual(TokenType.EOF, token.type)
         self.assertIsNone(token.value)
+
+    def test_selectable_lexer_backend(self):
+        # given
+        code = 'from b require [B]\n\nclass A implements B{\n}'
+
+        # when
+        expected = Tokenizer(Lexer).tokenize('unittest', code)
+        tokens = Tokenizer().tokenize('unittest', code)
+
+        # then
+        self.assertEqual(
+            [(t.type, t.value, t.line, t.column) for t in expected],
+            [(t.type, t.value, t.line, t.column) for t in tokens]
+        )
+
+    def test_iter_tokens_over_chunks(self):
+        # given
+        tokenizer = Tokenizer()
+        code = 'from b require [B]\n\nclass A implements B{\n    text: string = "a\nb"\n}'
+
+        # when
+        expected = tokenizer.tokenize('unittest', code)
+        tokens = list(tokenizer.iter_tokens('unittest', io.StringIO(code), 4))
+
+        # then
+        self.assertEqual(
+            [(t.type, t.value, t.line, t.column) for t in expected],
+            [(t.type, t.value, t.line, t.column) for t in tokens]
+        )
+
+    def test_iter_tokens_stops_on_error(self):
+        # given
+        tokenizer = Tokenizer()
+
+        # when
+        tokens = list(tokenizer.iter_tokens('unittest', io.StringIO('class A $')))
+
+        # then
+        self.assertEqual([TokenType.CLASS, TokenType.IDENTIFIER], [t.type for t in tokens])
+
+    def test_lexing_recovers_after_the_bad_character(self):
+        # given
+        tokenizer = Tokenizer()
+        errors = []
+
+        # when
+        tokens = tokenizer.tokenize('unittest', 'class A {\n    a: # 1\n    b: $\n}\n', errors)
+
+        # then
+        self.assertEqual(
+            [('Unexpected character: "#"', 2, 8), ('Unexpected character: "$"', 3, 8)],
+            [(error.message, error.line, error.column) for error in errors]
+        )
+        self.assertEqual(
+            [('class', 1), ('A', 1), ('{', 1), ('a', 2), (':', 2), (1, 2), ('b', 3), (':', 3), ('}', 4), (None, 4)],
+            [(token.value, token.line) for token in tokens]
+        )
+        self.assertEqual([], tokenizer.diagnostics.records)
+
+    def test_every_lexer_recovers_alike(self):
+        # given
+        code = 'class A {\n    n: 1.2.3 x $ y\n    d = a /\n    e: 2\n}\n'
+        results = []
+
+        # when
+        for tokenizer, text in [(Tokenizer(Lexer), code), (Tokenizer(), code), (Tokenizer(), code.encode())]:
+            errors = []
+            tokens = tokenizer.tokenize('unittest', text, errors)
+            results.append((
+                [(error.message, error.line, error.column) for error in errors],
+                [(token.value, token.line, token.column) for token in tokens]
+            ))
+
+        # then
+        self.assertEqual(
+            [
+                ('Unexpected character: "too many decimal points"', 2, 11),
+                ('Unexpected character: "$"', 2, 16),
+                ('Unexpected character: "/"', 2, 10),
+            ],
+            results[0][0]
+        )
+        self.assertEqual(
+            [(3, 2, 12), ('x', 2, 14), ('y', 2, 18), ('d', 3, 5)],
+            results[0][1][5:9]
+        )
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(results[0], results[2])
+
+    def test_token_stream_lookahead_window(self):
+        # given
+        tokenizer = Tokenizer()
+        code = ' '.join(f'word{index}' for index in range(100))
+        stream = TokenStream(tokenizer.iter_tokens('unittest', io.StringIO(code)), window=4)
+
+        # when
+        first = stream[0]
+        far = stream[50]
+        behind = stream[47]
+
+        # then
+        self.assertEqual('word0', first.value)
+        self.assertEqual('word50', far.value)
+        self.assertEqual('word47', behind.value)
+        self.assertEqual(TokenType.EOF, stream[100].type)
+        with self.assertRaises(IndexError):
+            stream[0]
+        with self.assertRaises(IndexError):
+            stream[101]
+
+    def test_statement_keywords_as_tokens(self):
+        # given
+        tokenizer = Tokenizer()
+        code = 'public private new while if else return for in'
+
+        # when
+        tokens = tokenizer.tokenize('unittest', code)
+
+        # then
+        self.assertEqual(
+            [
+                TokenType.PUBLIC,
+                TokenType.PRIVATE,
+                TokenType.NEW,
+                TokenType.WHILE,
+                TokenType.IF,
+                TokenType.ELSE,
+                TokenType.RETURN,
+                TokenType.FOR,
+                TokenType.IN,
+                TokenType.EOF
+            ],
+            [token.type for token in tokens]
+        )
+
+    def test_number_like_values_as_tokens(self):
+        # given
+        tokenizer = Tokenizer()
+
+        # when
+        tokens = tokenizer.tokenize('unittest', '1. -.5 - 1-2 007')
+
+        # then
+        self.assertEqual(
+            [
+                (TokenType.DECIMAL_VALUE, 1.0),
+                (TokenType.MINUS, '-'),
+                (TokenType.FULL_STOP, '.'),
+                (TokenType.INTEGER_VALUE, 5),
+                (TokenType.MINUS, '-'),
+                (TokenType.INTEGER_VALUE, 1),
+                (TokenType.MINUS, '-'),
+                (TokenType.INTEGER_VALUE, 2),
+                (TokenType.INTEGER_VALUE, 7),
+                (TokenType.EOF, None)
+            ],
+            [(token.type, token.value) for token in tokens]
+        )
+
+    def test_tokenize_to_buffer(self):
+        # given
+        tokenizer = Tokenizer()
+        code = 'class A {\n    a: integer = 1\n    b: number = 1.0\n}'
+
+        # when
+        expected = tokenizer.tokenize('unittest', code)
+        buffer = tokenizer.tokenize_to_buffer('unittest', code)
+
+        # then
+        self.assertEqual(len(expected), len(buffer))
+        for index, token in enumerate(expected):
+            self.assertEqual(token.type, buffer.type_at(index))
+            self.assertEqual(token.value, buffer.value_at(index))
+            self.assertIs(type(token.value), type(buffer.value_at(index)))
+            self.assertEqual(token.line, buffer.line_at(index))
+            self.assertEqual(token.column, buffer.column_at(index))
+            self.assertEqual('unittest', buffer.filename_at(index))
+            self.assertEqual(repr(token), repr(buffer[index]))
+        self.assertTrue(buffer.has(len(expected) - 1))
+        self.assertFalse(buffer.has(len(expected)))
+
+    def test_token_buffer_keeps_comments_as_trivia(self):
+        # given
+        tokenizer = Tokenizer()
+        code = '// header\n// second\nclass A { // opened\n}\n// trailing\n'
+
+        # when
+        buffer = tokenizer.tokenize_to_buffer('unittest', code)
+        tokenizer.tokenize_to_buffer('broken', '// dropped\nclass $', buffer)
+
+        # then
+        self.assertEqual(
+            [TokenType.CLASS, TokenType.IDENTIFIER, TokenType.LEFT_CURLY_BRACKET,
+             TokenType.RIGHT_CURLY_BRACKET, TokenType.EOF],
+            [buffer.type_at(index) for index in range(len(buffer))]
+        )
+        self.assertEqual(['// header', '// second'], [token.value for token in buffer.trivia_at(0)])
+        self.assertEqual((2, 1), (buffer.trivia_at(0)[1].line, buffer.trivia_at(0)[1].column))
+        self.assertEqual([], buffer.trivia_at(1))
+        self.assertEqual(['// opened'], [token.value for token in buffer.trivia_at(3)])
+        self.assertEqual(
+            [(0, '// header'), (0, '// second'), (3, '// opened'), (4, '// trailing')],
+            [(index, token.value) for index, token in buffer.trivia()]
+        )
+        self.assertEqual('unittest', buffer.trivia_at(4)[0].filename)
+
+    def test_token_stream_keeps_comments_as_trivia(self):
+        # given
+        tokenizer = Tokenizer()
+        code = 'class A {\n// first\n// second\n}'
+        stream = TokenStream(tokenizer.iter_tokens('unittest', io.StringIO(code)))
+
+        # when
+        closing = stream[3]
+
+        # then
+        self.assertEqual(TokenType.RIGHT_CURLY_BRACKET, closing.type)
+        self.assertEqual(['// first', '// second'], [token.value for token in stream.trivia_at(3)])
+        self.assertEqual(TokenType.EOF, stream[4].type)
+
+    def test_token_buffer_shares_files_and_drops_invalid_files(self):
+        # given
+        tokenizer = Tokenizer()
+        buffer = TokenBuffer()
+
+        # when
+        tokenizer.tokenize_to_buffer('first', 'class A', buffer)
+        tokenizer.tokenize_to_buffer('broken', 'class $', buffer)
+        tokenizer.tokenize_to_buffer('second', 'class B', buffer)
+
+        # then
+        self.assertEqual(6, len(buffer))
+        self.assertEqual('first', buffer.filename_at(2))
+        self.assertEqual('second', buffer.filename_at(3))
+        self.assertEqual('B', buffer.value_at(4))
+
+    def test_token_buffer_matching_bracket(self):
+        # given
+        tokenizer = Tokenizer()
+        buffer = tokenizer.tokenize_to_buffer('unittest', 'class A {\n    a() {\n        if b { }\n    }\n}\n{')
+
+        # when
+        pairs = {index: buffer.matching_bracket(index) for index in [2, 6, 9, 13]}
+        generation = buffer.generation
+        buffer.splice(3, 12, TokenBuffer())
+
+        # then
+        self.assertEqual({2: 12, 6: 11, 9: 10, 13: -1}, pairs)
+        self.assertEqual(-1, buffer.matching_bracket(0))
+        self.assertEqual(3, buffer.matching_bracket(2))
+        self.assertNotEqual(generation, buffer.generation)
+
+    def test_token_buffer_splice(self):
+        # given
+        tokenizer = Tokenizer()
+        buffer = tokenizer.tokenize_to_buffer('unittest', 'class A {\n}\nclass B {\n}')
+        replacement = tokenizer.tokenize_to_buffer('unittest', 'class C {\n    c: integer\n}')
+        replacement.truncate(len(replacement) - 1)
+
+        # when
+        buffer.splice(0, 4, replacement, 0, 1)
+
+        # then
+        expected = tokenizer.tokenize_to_buffer('unittest', 'class C {\n    c: integer\n}\nclass B {\n}')
+        self.assertEqual(len(expected), len(buffer))
+        # the EOF token line is not a plain shift, the incremental parser replaces it
+        for index in range(len(expected) - 1):
+            self.assertEqual(repr(expected[index]), repr(buffer[index]))
+            self.assertEqual('unittest', buffer.filename_at(index))
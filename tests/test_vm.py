@@ -0,0 +1,223 @@
+from unittest import TestCase, mock
+
+from compiler import compile_modules
+from errors import ExecutionError
+from sources import parse_sources
+from vm import Instance, VirtualMachine
+from wiring import plan_wiring
+
+
+MATHS = (
+    'class Maths {\n'
+    '    fib(n: integer): integer {\n'
+    '        if n < 2 {\n'
+    '            return n\n'
+    '        }\n'
+    '        return fib(n -1) + fib(n - 2)\n'
+    '    }\n'
+    '    total(items: List<integer>): integer {\n'
+    '        sum: integer = 0\n'
+    '        for item in items[1:] {\n'
+    '            if item % 2 == 0 || item > 4 {\n'
+    '                sum = sum + item\n'
+    '            } else if !(item == 3) {\n'
+    '                sum = sum - 100\n'
+    '            }\n'
+    '        }\n'
+    '        return sum * 10 / 3\n'
+    '    }\n'
+    '}\n'
+)
+
+SHAPES = (
+    'class Shape {\n'
+    '    name: string = "shape"\n'
+    '    sides: integer\n'
+    '    constructor(sides: integer) {\n'
+    '        this.sides = sides\n'
+    '    }\n'
+    '    describe(): string {\n'
+    '        return name + " " + str(sides) + " " + kind()\n'
+    '    }\n'
+    '    kind(): string {\n'
+    '        return "plain"\n'
+    '    }\n'
+    '}\n'
+    'class Square extends Shape {\n'
+    '    constructor() {\n'
+    '        super(4)\n'
+    '    }\n'
+    '    kind(): string {\n'
+    '        return "regular"\n'
+    '    }\n'
+    '}\n'
+    'class Factory {\n'
+    '    make(): string {\n'
+    '        return new Square(name="square").describe() + ", " + new Shape(3).describe()\n'
+    '    }\n'
+    '}\n'
+)
+
+
+class TestVirtualMachine(TestCase):
+    def test_recursion_loops_and_operators(self):
+        # given
+        machine = VirtualMachine(compile_modules(parse_sources({'maths.purist': MATHS})))
+        maths = machine.instantiate('maths.Maths')
+
+        # when
+        fib = machine.call(maths, 'fib', 20)
+        total = machine.call(maths, 'total', [9, 1, 2, 3, 5])
+
+        # then
+        self.assertEqual(6765, fib)
+        # 1 - 100 + 2 + 5, integer division
+        self.assertEqual(-310, total)
+
+    def test_subtraction_without_spaces(self):
+        # given
+        sources = {'numbers.purist': 'class Numbers {\n    difference(): integer {\n        return 5-3-1\n    }\n}\n'}
+        machine = VirtualMachine(compile_modules(parse_sources(sources)))
+
+        # when
+        difference = machine.call(machine.instantiate('numbers.Numbers'), 'difference')
+
+        # then
+        self.assertEqual(1, difference)
+
+    def test_subtraction_of_zero(self):
+        # given
+        sources = {
+            'numbers.purist': (
+                'class Numbers {\n'
+                '    successor(): integer {\n'
+                '        return 5-0 + 1\n'
+                '    }\n'
+                '    shifted(x: decimal): decimal {\n'
+                '        return x -0.0 + 1.5\n'
+                '    }\n'
+                '}\n'
+            )
+        }
+        machine = VirtualMachine(compile_modules(parse_sources(sources)))
+        numbers = machine.instantiate('numbers.Numbers')
+
+        # when
+        successor = machine.call(numbers, 'successor')
+        shifted = machine.call(numbers, 'shifted', 2.0)
+
+        # then
+        self.assertEqual(6, successor)
+        self.assertEqual(3.5, shifted)
+
+    def test_construction_and_dispatch(self):
+        # given
+        machine = VirtualMachine(compile_modules(parse_sources({'shapes.purist': SHAPES})))
+
+        # when
+        result = machine.call(machine.instantiate('shapes.Factory'), 'make')
+
+        # then
+        self.assertEqual('square 4 regular, shape 3 plain', result)
+
+    def test_entry_point_with_injections(self):
+        # given
+        sources = {
+            'entry.purist': (
+                'from Builtin require [EntryPoint, Logger, Stateless]\n'
+                'class Greeter implements Stateless {\n'
+                '    logging: Logger\n'
+                '    greet(name: string) {\n'
+                '        logging.info("hello " + name)\n'
+                '    }\n'
+                '}\n'
+                'class Main implements EntryPoint {\n'
+                '    greeter: Greeter\n'
+                '    public run(args: List<string>): void {\n'
+                '        for arg in args {\n'
+                '            greeter.greet(arg)\n'
+                '        }\n'
+                '    }\n'
+                '}\n'
+            ),
+        }
+        modules = parse_sources(sources)
+        logger = mock.MagicMock()
+        machine = VirtualMachine(compile_modules(modules), {'Builtin.Logger': logger}, plan=plan_wiring(modules))
+
+        # when
+        result = machine.run('entry.Main', ['a', 'b'])
+        greeter = machine.instantiate('entry.Main').fields['greeter']
+
+        # then
+        self.assertIsNone(result)
+        self.assertEqual([mock.call('hello a'), mock.call('hello b')], logger.info.call_args_list)
+        self.assertIsInstance(greeter, Instance)
+        self.assertIs(greeter, machine.instantiate('entry.Main').fields['greeter'])
+
+    def test_runtime_errors(self):
+        # given
+        sources = {
+            'broken.purist': (
+                'class Broken {\n'
+                '    divide(value: integer): integer {\n'
+                '        return value / 0\n'
+                '    }\n'
+                '    missing(): void {\n'
+                '        unknown(1)\n'
+                '    }\n'
+                '    forever(value: integer): integer {\n'
+                '        return forever(value)\n'
+                '    }\n'
+                '}\n'
+            ),
+        }
+        machine = VirtualMachine(compile_modules(parse_sources(sources)))
+        broken = machine.instantiate('broken.Broken')
+
+        # when
+        with self.assertRaises(ExecutionError) as division:
+            machine.call(broken, 'divide', 1)
+        with self.assertRaises(ExecutionError) as missing:
+            machine.call(broken, 'missing')
+        with self.assertRaises(ExecutionError) as recursion:
+            machine.call(broken, 'forever', 1)
+
+        # then
+        self.assertEqual('division by zero', str(division.exception))
+        self.assertEqual('unknown function unknown in broken.Broken.missing', str(missing.exception))
+        self.assertIn('maximum call depth exceeded', str(recursion.exception))
+
+    def test_argument_count_must_match(self):
+        # given
+        sources = {
+            'calls.purist': (
+                'class Calls {\n'
+                '    add(left: integer, right: integer): integer {\n'
+                '        return left + right\n'
+                '    }\n'
+                '    missing(): integer {\n'
+                '        return add(1)\n'
+                '    }\n'
+                '    extra(): integer {\n'
+                '        return this.add(1, 2, 3)\n'
+                '    }\n'
+                '}\n'
+            ),
+        }
+        machine = VirtualMachine(compile_modules(parse_sources(sources)))
+        calls = machine.instantiate('calls.Calls')
+
+        # when
+        with self.assertRaises(ExecutionError) as missing:
+            machine.call(calls, 'missing')
+        with self.assertRaises(ExecutionError) as extra:
+            machine.call(calls, 'extra')
+        with self.assertRaises(ExecutionError) as twice:
+            machine.call(calls, 'add', 1, left=2)
+
+        # then
+        self.assertEqual('calls.Calls.add takes 2 arguments, 1 given', str(missing.exception))
+        self.assertEqual('calls.Calls.add takes 2 arguments, 3 given', str(extra.exception))
+        self.assertEqual('calls.Calls.add got left twice', str(twice.exception))
+        self.assertEqual(3, machine.call(calls, 'add', 1, right=2))
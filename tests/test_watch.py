@@ -0,0 +1,77 @@
+import contextlib
+import io
+import os
+import tempfile
+from unittest import TestCase
+
+from watch import Watcher
+
+
+class TestWatcher(TestCase):
+    def _write(self, folder: str, file_path: str, code: str, mtime: int) -> None:
+        full_path = os.path.join(folder, file_path)
+        with open(full_path, 'w') as f:
+            f.write(code)
+        os.utime(full_path, ns=(mtime, mtime))
+
+    def _start(self, folder: str) -> Watcher:
+        self._write(folder, 'a.purist', 'from b require [B]\nclass A {\n}', 1)
+        self._write(folder, 'b.purist', 'from c require [C]\nclass B {\n}', 1)
+        self._write(folder, 'c.purist', 'class C {\n}', 1)
+        self._write(folder, 'd.purist', 'class D {\n}', 1)
+        watcher = Watcher(folder)
+        with contextlib.redirect_stdout(io.StringIO()):
+            watcher.start()
+        return watcher
+
+    def test_change_updates_dependents_only(self):
+        # given
+        with tempfile.TemporaryDirectory() as folder:
+            watcher = self._start(folder)
+            unchanged = watcher.registry.node('d.purist')
+            self._write(folder, 'c.purist', 'class C extends E {\n}', 2)
+
+            # when
+            with contextlib.redirect_stdout(io.StringIO()):
+                changed = watcher.poll()
+                affected = watcher.update(changed)
+
+        # then
+        self.assertEqual({'c.purist'}, changed)
+        self.assertEqual({'a.purist', 'b.purist', 'c.purist'}, affected)
+        self.assertIs(unchanged, watcher.registry.node('d.purist'))
+        self.assertIn('"E"', repr(watcher.registry.node('a.purist')))
+        self.assertEqual(['c.C'], [reference.source for reference in watcher.symbols.references('E')])
+        self.assertEqual(['b'], [reference.source for reference in watcher.symbols.references('c.C')])
+
+    def test_no_change(self):
+        # given
+        with tempfile.TemporaryDirectory() as folder:
+            watcher = self._start(folder)
+
+            # when
+            changed = watcher.poll()
+
+        # then
+        self.assertEqual(set(), changed)
+
+    def test_removed_and_added_modules(self):
+        # given
+        with tempfile.TemporaryDirectory() as folder:
+            watcher = self._start(folder)
+            os.remove(os.path.join(folder, 'c.purist'))
+
+            # when
+            removed = watcher.update(watcher.poll())
+            codes = [record.code for record in watcher.diagnostics.errors]
+            invalid = watcher.registry.node('b.purist')
+            self._write(folder, 'c.purist', 'class C {\n}', 3)
+            with contextlib.redirect_stdout(io.StringIO()):
+                added = watcher.update(watcher.poll())
+
+        # then
+        self.assertEqual({'a.purist', 'b.purist', 'c.purist'}, removed)
+        self.assertIn('FileNotFound', codes)
+        self.assertIsNone(invalid)
+        self.assertEqual({'a.purist', 'b.purist', 'c.purist'}, added)
+        self.assertIsNotNone(watcher.registry.node('b.purist'))
@@ -0,0 +1,117 @@
+from unittest import TestCase
+
+from errors import CyclicInjection, UnresolvedInjection
+from sources import parse_sources
+from wiring import Lifetime, plan_wiring
+
+SOURCES = {
+    'sampleType.purist': 'class MyCustomType {\n    constructor(name: string) {\n    }\n}\n',
+    'strategies/sampleStrategy.purist': 'interface SampleStrategy {\n}\n',
+    'strategies/sampleInstanceStrategy.purist': (
+        'from Builtin require [Logger, Stateless]\n'
+        'from strategies.sampleStrategy require [SampleStrategy]\n'
+        'class SampleInstanceStrategy implements SampleStrategy, Stateless {\n'
+        '    logging: Logger\n'
+        '}\n'
+    ),
+    'business/sampleBusiness.purist': (
+        'from Builtin require [Logger]\n'
+        'from sampleType require [MyCustomType]\n'
+        'from strategies.sampleStrategy require [SampleStrategy]\n'
+        'class SampleBusiness {\n'
+        '    logging: Logger      // auto injected\n'
+        '    myType: MyCustomType // not auto injected\n'
+        '    strategy: SampleStrategy\n'
+        '    optional: SampleStrategy|null\n'
+        '    name: string = "business"\n'
+        '    constructor() {\n'
+        '    }\n'
+        '}\n'
+    ),
+}
+
+
+class TestWiringPlan(TestCase):
+    def test_injections_and_lifetimes(self):
+        # given
+        modules = parse_sources(SOURCES)
+
+        # when
+        plan = plan_wiring(modules)
+
+        # then
+        self.assertEqual([], plan.errors)
+        self.assertEqual(
+            ['business.sampleBusiness.SampleBusiness', 'strategies.sampleInstanceStrategy.SampleInstanceStrategy'],
+            plan.classes
+        )
+        self.assertEqual(Lifetime.INSTANCE, plan.lifetime('business.sampleBusiness.SampleBusiness'))
+        self.assertEqual(Lifetime.SINGLETON, plan.lifetime('strategies.sampleInstanceStrategy.SampleInstanceStrategy'))
+        self.assertIsNone(plan.lifetime('sampleType.MyCustomType'))
+        self.assertEqual(
+            [
+                {'attribute': 'logging', 'dependency': 'Builtin.Logger', 'lifetime': 'external'},
+                {
+                    'attribute': 'strategy',
+                    'dependency': 'strategies.sampleInstanceStrategy.SampleInstanceStrategy',
+                    'lifetime': 'singleton'
+                },
+            ],
+            [injection.to_dict() for injection in plan.injections('business.sampleBusiness.SampleBusiness')]
+        )
+        plan_dict = plan.to_dict()
+        self.assertEqual(
+            ['strategies.sampleInstanceStrategy.SampleInstanceStrategy', 'business.sampleBusiness.SampleBusiness'],
+            plan_dict['order']
+        )
+        self.assertEqual(['strategies.sampleInstanceStrategy.SampleInstanceStrategy'], plan_dict['singletons'])
+        self.assertEqual(['Builtin.Logger'], plan_dict['externals'])
+
+    def test_unresolved_interfaces(self):
+        # given
+        sources = dict(SOURCES)
+        sources['strategies/otherStrategy.purist'] = (
+            'from strategies.sampleStrategy require [SampleStrategy]\n'
+            'class OtherStrategy implements SampleStrategy {\n'
+            '}\n'
+        )
+
+        # when
+        plan = plan_wiring(parse_sources(sources))
+
+        # then
+        self.assertEqual([UnresolvedInjection], [type(error) for error in plan.errors])
+        self.assertEqual(
+            'Unresolved injection: "business.sampleBusiness.SampleBusiness.strategy" of '
+            '"strategies.sampleStrategy.SampleStrategy" has 2 implementations: '
+            'strategies.otherStrategy.OtherStrategy, strategies.sampleInstanceStrategy.SampleInstanceStrategy',
+            plan.errors[0].message
+        )
+        self.assertEqual(['logging'], [injection.attribute for injection in plan.injections('business.sampleBusiness.SampleBusiness')])
+
+    def test_cycles_through_instances_are_errors(self):
+        # given
+        code = (
+            'from Builtin require [Stateless]\n'
+            'class A implements Stateless {\n'
+            '    b: B\n'
+            '}\n'
+            'class B implements Stateless {\n'
+            '    a: A\n'
+            '}\n'
+            'class C {\n'
+            '    d: D\n'
+            '}\n'
+            'class D implements Stateless {\n'
+            '    c: C\n'
+            '}\n'
+        )
+
+        # when
+        plan = plan_wiring(parse_sources({'a.purist': code}))
+
+        # then
+        self.assertEqual([['a.A', 'a.B'], ['a.C', 'a.D']], plan.cycles)
+        self.assertEqual([CyclicInjection], [type(error) for error in plan.errors])
+        self.assertEqual('Cyclic injection: "a.C" -> "a.D" -> "a.C"', plan.errors[0].message)
+        self.assertEqual('a.purist', plan.errors[0].filename)
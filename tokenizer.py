@@ -2,10 +2,17 @@
 Purist Lexer, converts discovered source code values into tokens
 """
 
+import re
+from array import array
+from bisect import bisect_left, bisect_right
 from enum import Enum
-from typing import List
+from time import perf_counter_ns
+from typing import Dict, Iterable, Iterator, List, TextIO, Tuple, Type
 
-from lexer import Lexer
+from diagnostics import Diagnostics
+from errors import Error
+from lexer import CHUNK_SIZE, BaseLexer, BytesLexer, LexerResult, RegexLexer, Source
+from profiling import Phase, Profiler
 
 class TokenType(Enum):
     """
@@ -69,9 +76,87 @@ class TokenType(Enum):
     FALSE = 'FALSE'
     NULL = 'NULL'
     LOGICAL_OR = 'LOGICAL_OR'
+    AMPERSAND = 'AMPERSAND'
+    PLUS = 'PLUS'
+    MINUS = 'MINUS'
+    ASTERISK = 'ASTERISK'
+    SLASH = 'SLASH'
+    PERCENT = 'PERCENT'
     COMMENT = 'COMMENT'
     EOF = "EOF"
 
+KEYWORDS: Dict[str, TokenType] = {
+    'from': TokenType.FROM,
+    'Builtin': TokenType.BUILTIN,
+    'require': TokenType.REQUIRE,
+    'class': TokenType.CLASS,
+    'interface': TokenType.INTERFACE,
+    'type': TokenType.TYPE,
+    'enumeration': TokenType.ENUMERATION,
+    'extends': TokenType.EXTENDS,
+    'implements': TokenType.IMPLEMENTS,
+    'string': TokenType.STRING_TYPE,
+    'boolean': TokenType.BOOLEAN_TYPE,
+    'integer': TokenType.INTEGER_TYPE,
+    'number': TokenType.DECIMAL_TYPE,
+    'true': TokenType.BOOLEAN_VALUE,
+    'false': TokenType.BOOLEAN_VALUE,
+    'null': TokenType.NULL,
+    'constructor': TokenType.CONSTRUCTOR,
+    'destructor': TokenType.DESTRUCTOR,
+    'public': TokenType.PUBLIC,
+    'private': TokenType.PRIVATE,
+    'new': TokenType.NEW,
+    'while': TokenType.WHILE,
+    'if': TokenType.IF,
+    'else': TokenType.ELSE,
+    'return': TokenType.RETURN,
+    'for': TokenType.FOR,
+    'in': TokenType.IN,
+}
+
+PUNCTUATION: Dict[str, TokenType] = {
+    ',': TokenType.COMMA,
+    '[': TokenType.LEFT_SQUARE_BRACKET,
+    ']': TokenType.RIGHT_SQUARE_BRACKET,
+    '(': TokenType.LEFT_BRACKET,
+    ')': TokenType.RIGHT_BRACKET,
+    '{': TokenType.LEFT_CURLY_BRACKET,
+    '}': TokenType.RIGHT_CURLY_BRACKET,
+    ':': TokenType.COLON,
+    '=': TokenType.EQUALS,
+    '<': TokenType.LEFT_ANGLE_BRACKET,
+    '>': TokenType.RIGHT_ANGLE_BRACKET,
+    '.': TokenType.FULL_STOP,
+    '!': TokenType.NOT,
+    '|': TokenType.LOGICAL_OR,
+    '&': TokenType.AMPERSAND,
+    '+': TokenType.PLUS,
+    # the parser decides between a negative number and a subtraction
+    '-': TokenType.MINUS,
+    '*': TokenType.ASTERISK,
+    '/': TokenType.SLASH,
+    '%': TokenType.PERCENT,
+}
+
+FIXED_TOKEN_TYPES: Dict[str, TokenType] = {**KEYWORDS, **PUNCTUATION}
+
+NUMBER_START = frozenset('0123456789')
+NUMBER_PATTERN = re.compile(r'[0-9]+(?:\.[0-9]*)?')
+
+TOKEN_TYPES: Tuple[TokenType, ...] = tuple(TokenType)
+TOKEN_TYPE_INDEXES: Dict[TokenType, int] = {
+    token_type: index for index, token_type in enumerate(TOKEN_TYPES)
+}
+LEFT_CURLY_BRACKET_INDEX = TOKEN_TYPE_INDEXES[TokenType.LEFT_CURLY_BRACKET]
+# matches the curly bracket type codes in the token type array
+CURLY_BRACKETS_PATTERN = re.compile(
+    b'[' + re.escape(bytes([LEFT_CURLY_BRACKET_INDEX, TOKEN_TYPE_INDEXES[TokenType.RIGHT_CURLY_BRACKET]])) + b']'
+)
+
+TokenValue = str | int | float | None
+TokenFields = Tuple[TokenType, int, int, TokenValue]
+
 class Token():
     """
     Purist Token, simple model class representing the parsers tokens
@@ -146,123 +231,555 @@ class Token():
         else:
             return f'({self._type.__repr__()}[{self._line}:{self._column}])'
 
+class TokenStream():
+    """
+    Lookahead buffer over lazily produced tokens, supports the parsers indexed
+    access while only keeping a small window of tokens around the current position.
+    Comments are moved to a side table keyed by the index of the token they precede
+    """
+    def __init__(self, tokens: Iterator[Token], window: int = 16) -> None:
+        """
+        Args:
+            tokens (Iterator[Token]): The lazily produced tokens
+            window (int): The number of already read tokens kept for looking back
+        """
+        self._tokens = tokens
+        self._window = window
+        self._buffer: List[Token] = []
+        self._offset = 0
+        self._trivia: Dict[int, List[Token]] = {}
+
+    def __getitem__(self, index: int) -> Token:
+        """
+        Returns the token at the index, reading more tokens when required
+
+        Raises:
+            IndexError: when the stream ends before the index or the token already left the window
+        """
+        position = index - self._offset
+        if position < 0:
+            raise IndexError(f'token {index} is no longer buffered')
+        while position >= len(self._buffer):
+            token = next(self._tokens, None)
+            if token is None:
+                raise IndexError(f'token {index} is past the end of the stream')
+            if token.type is TokenType.COMMENT:
+                self._trivia.setdefault(self._offset + len(self._buffer), []).append(token)
+                continue
+            self._buffer.append(token)
+        if position > 2 * self._window:
+            dropped = position - self._window
+            del self._buffer[:dropped]
+            self._offset += dropped
+            if self._trivia:
+                for owner in [owner for owner in self._trivia if owner < self._offset]:
+                    del self._trivia[owner]
+        return self._buffer[index - self._offset]
+
+    def trivia_at(self, index: int) -> List[Token]:
+        """
+        Returns the comments preceding the token at the index, only read tokens
+        still in the window have their comments
+        """
+        return self._trivia.get(index, [])
+
+    def has(self, index: int) -> bool:
+        """
+        Returns if a token exists at the index, reading more tokens when required
+        """
+        try:
+            self[index]
+        except IndexError:
+            return False
+        return True
+
+    def type_at(self, index: int) -> TokenType:
+        """
+        Returns the type of the token at the index
+        """
+        return self[index].type
+
+
+class TokenBuffer():
+    """
+    Columnar token storage, keeps the token types, lines, columns and value
+    indexes in arrays with a single filename table and an interned value table.
+    Comments are trivia, they are kept in a side table keyed by the index of the
+    token they precede so the parser only sees significant tokens
+    """
+    def __init__(self) -> None:
+        self._types = array('B')
+        self._lines = array('I')
+        self._columns = array('I')
+        self._values = array('I')
+        self._value_table: List[TokenValue] = [None]
+        self._value_indexes: Dict[Tuple[type, TokenValue], int] = {}
+        self._filenames: List[str] = []
+        self._file_starts = array('I')
+        self._generation = 0
+        self._bracket_pairs: Dict[int, int] = {}
+        self._bracket_pairs_length = 0
+        self._bracket_pairs_generation = 0
+        self._trivia_owners = array('I')
+        self._trivia_lines = array('I')
+        self._trivia_columns = array('I')
+        self._trivia_values: List[str] = []
+
+    @property
+    def generation(self) -> int:
+        """
+        Returns a counter increased whenever tokens are dropped or replaced, token
+        indexes taken before stay valid as long as it does not change
+        """
+        return self._generation
+
+    def add_file(self, filename: str) -> None:
+        """
+        Starts a new file, the tokens appended afterwards belong to it
+
+        Args:
+            filename (str): The filename of the following tokens
+        """
+        self._filenames.append(filename)
+        self._file_starts.append(len(self._types))
+
+    def append(self, token_type: TokenType, line: int, column: int, value: TokenValue) -> None:
+        """
+        Appends a token to the current file, comments go to the trivia of the next token
+
+        Args:
+            token_type (TokenType): The type of the token
+            line (int): The line number of the token
+            column (int): The column number of the token
+            value (str|int|float|None): The value of the token
+        """
+        if token_type is TokenType.COMMENT:
+            self._trivia_owners.append(len(self._types))
+            self._trivia_lines.append(line)
+            self._trivia_columns.append(column)
+            self._trivia_values.append(str(value))
+            return
+        value_index = 0
+        if value is not None:
+            # keyed by type so 1 and 1.0 are stored separately
+            key = (value.__class__, value)
+            value_index = self._value_indexes.get(key, 0)
+            if value_index == 0:
+                value_index = len(self._value_table)
+                self._value_indexes[key] = value_index
+                self._value_table.append(value)
+        self._types.append(TOKEN_TYPE_INDEXES[token_type])
+        self._lines.append(line)
+        self._columns.append(column)
+        self._values.append(value_index)
+
+    def truncate(self, length: int, keep_trivia: bool = False) -> None:
+        """
+        Drops the tokens from the index onwards together with the comments preceding
+        them, interned values are kept
+
+        Args:
+            length (int): The number of tokens to keep
+            keep_trivia (bool): Keeps the comments preceding the first dropped token,
+                they precede the token appended or spliced in next
+        """
+        if length < len(self._types):
+            self._generation += 1
+        del self._types[length:]
+        del self._lines[length:]
+        del self._columns[length:]
+        del self._values[length:]
+        kept = bisect_right(self._trivia_owners, length) if keep_trivia else bisect_left(self._trivia_owners, length)
+        del self._trivia_owners[kept:]
+        del self._trivia_lines[kept:]
+        del self._trivia_columns[kept:]
+        del self._trivia_values[kept:]
+        while self._file_starts and self._file_starts[-1] >= length:
+            self._file_starts.pop()
+            self._filenames.pop()
+
+    def splice(
+            self,
+            start: int,
+            end: int,
+            tokens: 'TokenBuffer',
+            line_offset: int = 0,
+            line_delta: int = 0,
+            last_line: int | None = None
+        ) -> None:
+        """
+        Replaces the tokens from start up to end by the tokens of another buffer,
+        the replacing tokens keep the filename of the token at start
+
+        Args:
+            start (int): The index of the first replaced token
+            end (int): The index following the last replaced token
+            tokens (TokenBuffer): The replacing tokens
+            line_offset (int): Added to the line numbers of the replacing tokens
+            line_delta (int): Added to the line numbers of the tokens following end
+            last_line (int|None): The last replaced line, the comments from the line
+                following line_offset up to it are replaced by the comments of the
+                replacing tokens. The comments of the replaced tokens when not given
+        """
+        values = array('I')
+        for index in range(len(tokens)):
+            value = tokens.value_at(index)
+            value_index = 0
+            if value is not None:
+                key = (value.__class__, value)
+                value_index = self._value_indexes.get(key, 0)
+                if value_index == 0:
+                    value_index = len(self._value_table)
+                    self._value_indexes[key] = value_index
+                    self._value_table.append(value)
+            values.append(value_index)
+        lines = array('I', [line + line_offset for line in tokens._lines])
+        if line_delta:
+            lines.extend([line + line_delta for line in self._lines[end:]])
+        else:
+            lines.extend(self._lines[end:])
+        self._types[start:end] = tokens._types
+        self._lines[start:] = lines
+        self._columns[start:end] = tokens._columns
+        self._values[start:end] = values
+        self._generation += 1
+        shift = len(tokens) - (end - start)
+        for file_index, file_start in enumerate(self._file_starts):
+            if file_start > start:
+                self._file_starts[file_index] = max(file_start + shift, start)
+        if self._trivia_owners or tokens._trivia_owners:
+            self._splice_trivia(start, end, tokens, line_offset, line_delta, last_line)
+
+    def _splice_trivia(
+            self,
+            start: int,
+            end: int,
+            tokens: 'TokenBuffer',
+            line_offset: int,
+            line_delta: int,
+            last_line: int | None
+        ) -> None:
+        shift = len(tokens) - (end - start)
+        trivia: List[Tuple[int, int, int, str]] = []
+        for owner, line, column, value in zip(
+                self._trivia_owners, self._trivia_lines, self._trivia_columns, self._trivia_values
+        ):
+            if owner < start:
+                pass
+            elif last_line is None:
+                if owner < end:
+                    continue
+                owner += shift
+                line += line_delta
+            elif line <= line_offset:
+                # precedes the replaced lines and so the replacing tokens
+                owner = start
+            elif line <= last_line:
+                continue
+            else:
+                owner += shift
+                line += line_delta
+            trivia.append((owner, line, column, value))
+        trivia.extend(
+            (owner + start, line + line_offset, column, value)
+            for owner, line, column, value in zip(
+                tokens._trivia_owners, tokens._trivia_lines, tokens._trivia_columns, tokens._trivia_values
+            )
+        )
+        trivia.sort(key=lambda comment: comment[:3])
+        self._trivia_owners = array('I', [comment[0] for comment in trivia])
+        self._trivia_lines = array('I', [comment[1] for comment in trivia])
+        self._trivia_columns = array('I', [comment[2] for comment in trivia])
+        self._trivia_values = [comment[3] for comment in trivia]
+
+    def trivia_at(self, index: int) -> List[Token]:
+        """
+        Returns the comments preceding the token at the index, in source order
+        """
+        first = bisect_left(self._trivia_owners, index)
+        last = bisect_right(self._trivia_owners, index, first)
+        if first == last:
+            return []
+        filename = self.filename_at(index)
+        return [
+            Token(
+                TokenType.COMMENT,
+                filename,
+                self._trivia_lines[position],
+                self._trivia_columns[position],
+                self._trivia_values[position]
+            )
+            for position in range(first, last)
+        ]
+
+    def trivia(self) -> List[Tuple[int, Token]]:
+        """
+        Returns every comment with the index of the token it precedes, in source order
+        """
+        return [
+            (owner, Token(TokenType.COMMENT, self.filename_at(owner), line, column, value))
+            for owner, line, column, value in zip(
+                self._trivia_owners, self._trivia_lines, self._trivia_columns, self._trivia_values
+            )
+        ]
+
+    def matching_bracket(self, index: int) -> int:
+        """
+        Returns the index of the right curly bracket closing the left curly bracket
+        at the index, the pairs of the whole buffer are found in one pass on first use
+
+        Args:
+            index (int): The index of a left curly bracket
+
+        Returns:
+            int: The index of the closing bracket, -1 when the bracket is not closed
+        """
+        types = self._types
+        if self._bracket_pairs_length != len(types) or self._bracket_pairs_generation != self._generation:
+            pairs: Dict[int, int] = {}
+            opened: List[int] = []
+            for match in CURLY_BRACKETS_PATTERN.finditer(types):
+                position = match.start()
+                if types[position] == LEFT_CURLY_BRACKET_INDEX:
+                    opened.append(position)
+                elif opened:
+                    pairs[opened.pop()] = position
+            self._bracket_pairs = pairs
+            self._bracket_pairs_length = len(types)
+            self._bracket_pairs_generation = self._generation
+        return self._bracket_pairs.get(index, -1)
+
+    def __len__(self) -> int:
+        return len(self._types)
+
+    def __getitem__(self, index: int) -> Token:
+        """
+        Returns the token at the index as a Token object
+        """
+        return Token(
+            TOKEN_TYPES[self._types[index]],
+            self.filename_at(index),
+            self._lines[index],
+            self._columns[index],
+            self._value_table[self._values[index]]
+        )
+
+    def has(self, index: int) -> bool:
+        """
+        Returns if a token exists at the index
+        """
+        return 0 <= index < len(self._types)
+
+    def type_at(self, index: int) -> TokenType:
+        """
+        Returns the type of the token at the index
+        """
+        return TOKEN_TYPES[self._types[index]]
+
+    def value_at(self, index: int) -> TokenValue:
+        """
+        Returns the value of the token at the index
+        """
+        return self._value_table[self._values[index]]
+
+    def line_at(self, index: int) -> int:
+        """
+        Returns the line number of the token at the index
+        """
+        return self._lines[index]
+
+    def column_at(self, index: int) -> int:
+        """
+        Returns the column number of the token at the index
+        """
+        return self._columns[index]
+
+    def filename_at(self, index: int) -> str:
+        """
+        Returns the filename of the token at the index
+        """
+        return self._filenames[bisect_right(self._file_starts, index) - 1]
+
+
+TokenSource = TokenBuffer | TokenStream
+
+
 class Tokenizer():
     """
     Purist Tokenizer, converts discovered source code values into tokens
     """
-    def tokenize(self, filepath: str, text: str) -> List[Token]:
+    def __init__(
+            self,
+            lexer_type: Type[BaseLexer] = RegexLexer,
+            profiler: Profiler | None = None,
+            diagnostics: Diagnostics | None = None
+        ) -> None:
+        """
+        Args:
+            lexer_type (Type[BaseLexer]): The lexer backend used to discover the source code values,
+                source code given as bytes is always scanned by the bytes lexer
+            profiler (Profiler|None): Measures lexing and classification per file, when given
+            diagnostics (Diagnostics|None): Collects the lexing errors not collected in an
+                error list, a silent collector when not given
+        """
+        self._lexer_type = lexer_type
+        self._profiler = profiler
+        self._diagnostics = diagnostics if diagnostics is not None else Diagnostics()
+
+    @property
+    def diagnostics(self) -> Diagnostics:
+        """
+        Returns the collector of the lexing errors
+        """
+        return self._diagnostics
+
+    def tokenize(self, filepath: str, text: Source, errors: List[Error] | None = None) -> List[Token]:
         """
         Converts discovered source code values into tokens
 
         Args:
             filepath (str): The source code filepath
-            text (str): The source code text
+            text (Source): The source code text, or its UTF-8 encoded bytes
+            errors (List[Error]|None): Collects the lexing errors and lexing continues on
+                the line after each error, the first error ends the tokens when not given
 
         Returns:
             List[Token]: The list of tokens
         """
-        response: List[Token] = []
-        lexer: Lexer = Lexer(filepath, text)
-        next_value, error, line, column = lexer.next()
-        while next_value is not None and error is None:
-            if next_value == 'from':
-                response.append(Token(TokenType.FROM, filepath, line, column, next_value))
-            elif next_value == 'Builtin':
-                response.append(Token(TokenType.BUILTIN, filepath, line, column, next_value))
-            elif next_value == 'require':
-                response.append(Token(TokenType.REQUIRE, filepath, line, column, next_value))
-            elif next_value == 'class':
-                response.append(Token(TokenType.CLASS, filepath, line, column, next_value))
-            elif next_value == 'interface':
-                response.append(Token(TokenType.INTERFACE, filepath, line, column, next_value))
-            elif next_value == 'type':
-                response.append(Token(TokenType.TYPE, filepath, line, column, next_value))
-            elif next_value == 'enumeration':
-                response.append(Token(TokenType.ENUMERATION, filepath, line, column, next_value))
-            elif next_value == 'extends':
-                response.append(Token(TokenType.EXTENDS, filepath, line, column, next_value))
-            elif next_value == 'implements':
-                response.append(Token(TokenType.IMPLEMENTS, filepath, line, column, next_value))
-            elif next_value == 'string':
-                response.append(Token(TokenType.STRING_TYPE, filepath, line, column, next_value))
-            elif next_value == 'boolean':
-                response.append(Token(TokenType.BOOLEAN_TYPE, filepath, line, column, next_value))
-            elif next_value == 'integer':
-                response.append(Token(TokenType.INTEGER_TYPE, filepath, line, column, next_value))
-            elif next_value == 'number':
-                response.append(Token(TokenType.DECIMAL_TYPE, filepath, line, column, next_value))
-            elif next_value == 'false' or next_value == 'true':
-                response.append(Token(TokenType.BOOLEAN_VALUE, filepath, line, column, next_value))
-            elif next_value == 'null':
-                response.append(Token(TokenType.NULL, filepath, line, column, next_value))
-            elif next_value.startswith('"'):
-                response.append(Token(TokenType.STRING_VALUE, filepath, line, column, next_value))
-            elif next_value == ',':
-                response.append(Token(TokenType.COMMA, filepath, line, column, next_value))
-            elif next_value == '[':
-                response.append(Token(TokenType.LEFT_SQUARE_BRACKET, filepath, line, column, next_value))
-            elif next_value == ']':
-                response.append(Token(TokenType.RIGHT_SQUARE_BRACKET, filepath, line, column, next_value))
-            elif next_value == '(':
-                response.append(Token(TokenType.LEFT_BRACKET, filepath, line, column, next_value))
-            elif next_value == ')':
-                response.append(Token(TokenType.RIGHT_BRACKET, filepath, line, column, next_value))
-            elif next_value == '{':
-                response.append(Token(TokenType.LEFT_CURLY_BRACKET, filepath, line, column, next_value))
-            elif next_value == '}':
-                response.append(Token(TokenType.RIGHT_CURLY_BRACKET, filepath, line, column, next_value))
-            elif next_value == ':':
-                response.append(Token(TokenType.COLON, filepath, line, column, next_value))
-            elif next_value == '=':
-                response.append(Token(TokenType.EQUALS, filepath, line, column, next_value))
-            elif next_value == '<':
-                response.append(Token(TokenType.LEFT_ANGLE_BRACKET, filepath, line, column, next_value))
-            elif next_value == '>':
-                response.append(Token(TokenType.RIGHT_ANGLE_BRACKET, filepath, line, column, next_value))
-            elif next_value == '.':
-                response.append(Token(TokenType.FULL_STOP, filepath, line, column, next_value))
-            elif next_value == '!':
-                response.append(Token(TokenType.NOT, filepath, line, column, next_value))
-            elif next_value == 'constructor':
-                response.append(Token(TokenType.CONSTRUCTOR, filepath, line, column, next_value))
-            elif next_value == 'destructor':
-                response.append(Token(TokenType.DESTRUCTOR, filepath, line, column, next_value))
-            elif next_value == '|':
-                response.append(Token(TokenType.LOGICAL_OR, filepath, line, column, next_value))
-            elif next_value.startswith('//'):
-                response.append(Token(TokenType.COMMENT, filepath, line, column, next_value))
-            elif self._is_integer(next_value):
-                response.append(
-                    Token(TokenType.INTEGER_VALUE, filepath, line, column, int(next_value))
-                )
-            elif self._is_float(next_value) and next_value.count('.') == 1:
-                response.append(
-                    Token(TokenType.DECIMAL_VALUE, filepath, line, column, float(next_value))
-                )
-            else:
-                response.append(Token(TokenType.IDENTIFIER, filepath, line, column, next_value))
-            next_value, error, line, column = lexer.next()
-        if error is not None:
-            print(error.get_error())
+        response = [
+            Token(token_type, filepath, line, column, value)
+            for token_type, line, column, value
+            in self._fields(filepath, text, errors)
+        ]
+        if not response or response[-1].type != TokenType.EOF:
             return []
-
-        response.append(Token(TokenType.EOF, filepath, line, 0))
         return response
 
-    def _is_float(self, value: str) -> bool:
-        if value[0] not in ['-', '0', '1', '2', '3', '4', '5', '6', '7', '8', '9']:
-            return False
-        try:
-            float(value)
-            return True
-        except ValueError:
-            return False
+    def tokenize_to_buffer(
+            self,
+            filepath: str,
+            text: Source,
+            buffer: 'TokenBuffer | None' = None,
+            errors: List[Error] | None = None
+        ) -> 'TokenBuffer':
+        """
+        Converts discovered source code values into columnar token storage,
+        the comments are kept as trivia and the tokens of an invalid file are not kept
 
-    def _is_integer(self, value: str) -> bool:
-        if value[0] not in ['-', '0', '1', '2', '3', '4', '5', '6', '7', '8', '9']:
-            return False
-        try:
-            int(value)
-            return True
-        except ValueError:
-            return False
+        Args:
+            filepath (str): The source code filepath
+            text (Source): The source code text, or its UTF-8 encoded bytes
+            buffer (TokenBuffer|None): The buffer to append to, a new buffer when not given
+            errors (List[Error]|None): Collects the lexing errors and lexing continues on
+                the line after each error, the first error ends the tokens when not given
+
+        Returns:
+            TokenBuffer: The buffer holding the tokens
+        """
+        if buffer is None:
+            buffer = TokenBuffer()
+        start = len(buffer)
+        buffer.add_file(filepath)
+        append = buffer.append
+        token_type = None
+        for token_type, line, column, value in self._fields(filepath, text, errors):
+            append(token_type, line, column, value)
+        if token_type != TokenType.EOF:
+            buffer.truncate(start)
+        return buffer
+
+    def iter_tokens(
+            self,
+            filepath: str,
+            stream: TextIO,
+            chunk_size: int = CHUNK_SIZE
+        ) -> Iterator[Token]:
+        """
+        Lazily converts source code read from a file-like object into tokens,
+        the stream is read in chunks so memory use does not grow with the file size.
+        The tokens stop without an EOF token when the source code is invalid
+
+        Args:
+            filepath (str): The source code filepath
+            stream (TextIO): The source code stream
+            chunk_size (int): The number of characters read at a time
+
+        Yields:
+            Token: The next token
+        """
+        lexer = self._lexer_type.from_stream(filepath, stream, chunk_size)
+        for token_type, line, column, value in self._classify(lexer):
+            yield Token(token_type, filepath, line, column, value)
+
+    def _fields(self, filepath: str, text: Source, errors: List[Error] | None = None) -> Iterable[TokenFields]:
+        if self._profiler is None:
+            return self._classify(self._lex(filepath, text, errors))
+        return self._profiled_fields(self._profiler, filepath, text, errors)
+
+    def _lex(self, filepath: str, text: Source, errors: List[Error] | None) -> Iterable[LexerResult]:
+        if errors is None:
+            return self._lexer_for(text)(filepath, text)
+        return self._recovering_lex(filepath, text, errors)
+
+    def _lexer_for(self, text: Source) -> Type[BaseLexer]:
+        return self._lexer_type if isinstance(text, str) else BytesLexer
+
+    def _recovering_lex(self, filepath: str, text: Source, errors: List[Error]) -> Iterator[LexerResult]:
+        """
+        Lexes past errors, the errors are collected and the lexer goes on after the
+        character it failed on
+        """
+        last_line = 1
+        for value, error, line, column in self._lexer_for(text)(filepath, text, recover=True):
+            if error is not None:
+                errors.append(error)
+            elif value is not None:
+                last_line = line
+                yield value, None, line, column
+            else:
+                # the end of file line of the lexer is only meaningful when it follows the last value
+                yield None, None, max(line, last_line), column
+
+    def _profiled_fields(
+            self,
+            profiler: Profiler,
+            filepath: str,
+            text: Source,
+            errors: List[Error] | None = None
+        ) -> List[TokenFields]:
+        # lexing and classification are interleaved, when profiling they run one
+        # after the other so each gets its own timing
+        started = perf_counter_ns()
+        results = list(self._lex(filepath, text, errors))
+        lexed = perf_counter_ns()
+        fields = list(self._classify(results))
+        profiler.record(filepath, Phase.LEX, lexed - started)
+        profiler.record(filepath, Phase.TOKENIZE, perf_counter_ns() - lexed)
+        profiler.count(filepath, tokens=len(fields))
+        return fields
+
+    def _classify(self, lexer: Iterable[LexerResult]) -> Iterator[TokenFields]:
+        for next_value, error, line, column in lexer:
+            if next_value is None:
+                break
+            token_type = FIXED_TOKEN_TYPES.get(next_value)
+            if token_type is not None:
+                yield token_type, line, column, next_value
+                continue
+            first_character = next_value[0]
+            if first_character == '"':
+                yield TokenType.STRING_VALUE, line, column, next_value
+            elif first_character == '/' and next_value.startswith('//'):
+                yield TokenType.COMMENT, line, column, next_value
+            elif first_character in NUMBER_START and NUMBER_PATTERN.fullmatch(next_value):
+                if '.' in next_value:
+                    yield TokenType.DECIMAL_VALUE, line, column, float(next_value)
+                else:
+                    yield TokenType.INTEGER_VALUE, line, column, int(next_value)
+            else:
+                yield TokenType.IDENTIFIER, line, column, next_value
+        if error is not None:
+            self._diagnostics.error(error)
+            return
+
+        yield TokenType.EOF, line, 0, None
@@ -0,0 +1,442 @@
+"""
+Stack virtual machine executing the code objects of the bytecode compiler, see
+compiler.py. The method tables and fields of every class are merged with those of
+the classes it extends once, so a call looks its code object up in a single
+dictionary and a frame is a list of local slots and an operand stack
+"""
+from typing import Any, Callable, Dict, List, TextIO, Tuple
+
+from compiler import ClassCode, CodeObject, Opcode
+from errors import ExecutionError
+from wiring import Lifetime, WiringPlan
+
+# the functions bare calls and names fall back to
+BUILTIN_FUNCTIONS: Dict[str, Callable[..., Any]] = {
+    'len': len,
+    'abs': abs,
+    'min': min,
+    'max': max,
+    'str': str,
+}
+
+# nested calls, every call takes two frames of the Python interpreter
+MAX_DEPTH = 400
+
+_LOAD_CONST = int(Opcode.LOAD_CONST)
+_LOAD_LOCAL = int(Opcode.LOAD_LOCAL)
+_STORE_LOCAL = int(Opcode.STORE_LOCAL)
+_LOAD_THIS = int(Opcode.LOAD_THIS)
+_LOAD_FIELD = int(Opcode.LOAD_FIELD)
+_STORE_FIELD = int(Opcode.STORE_FIELD)
+_LOAD_GLOBAL = int(Opcode.LOAD_GLOBAL)
+_POP = int(Opcode.POP)
+_ADD = int(Opcode.ADD)
+_SUBTRACT = int(Opcode.SUBTRACT)
+_MULTIPLY = int(Opcode.MULTIPLY)
+_DIVIDE = int(Opcode.DIVIDE)
+_MODULO = int(Opcode.MODULO)
+_EQUAL = int(Opcode.EQUAL)
+_NOT_EQUAL = int(Opcode.NOT_EQUAL)
+_LESS = int(Opcode.LESS)
+_LESS_EQUAL = int(Opcode.LESS_EQUAL)
+_GREATER = int(Opcode.GREATER)
+_GREATER_EQUAL = int(Opcode.GREATER_EQUAL)
+_NEGATE = int(Opcode.NEGATE)
+_NOT = int(Opcode.NOT)
+_JUMP = int(Opcode.JUMP)
+_JUMP_IF_FALSE = int(Opcode.JUMP_IF_FALSE)
+_JUMP_IF_FALSE_OR_POP = int(Opcode.JUMP_IF_FALSE_OR_POP)
+_JUMP_IF_TRUE_OR_POP = int(Opcode.JUMP_IF_TRUE_OR_POP)
+_INDEX = int(Opcode.INDEX)
+_STORE_INDEX = int(Opcode.STORE_INDEX)
+_SLICE = int(Opcode.SLICE)
+_CALL_SELF = int(Opcode.CALL_SELF)
+_CALL_FUNCTION = int(Opcode.CALL_FUNCTION)
+_INVOKE = int(Opcode.INVOKE)
+_CALL_SUPER = int(Opcode.CALL_SUPER)
+_NEW = int(Opcode.NEW)
+_GET_ITER = int(Opcode.GET_ITER)
+_FOR_ITER = int(Opcode.FOR_ITER)
+_RETURN = int(Opcode.RETURN)
+
+
+class Instance():
+    """
+    An instance of a compiled class
+    """
+    __slots__ = ('type', 'fields')
+
+    def __init__(self, type_name: str, fields: Dict[str, Any]) -> None:
+        self.type = type_name
+        self.fields = fields
+
+    def __repr__(self) -> str:
+        return f'<{self.type}>'
+
+
+class ConsoleLogger():
+    """
+    A Builtin Logger service writing every message to a stream
+    """
+
+    def __init__(self, stream: TextIO) -> None:
+        self._stream = stream
+
+    def _write(self, level: str, message: Any) -> None:
+        self._stream.write(f'{level}: {message}\n')
+
+    def debug(self, message: Any) -> None:
+        self._write('DEBUG', message)
+
+    def info(self, message: Any) -> None:
+        self._write('INFO', message)
+
+    def warning(self, message: Any) -> None:
+        self._write('WARNING', message)
+
+    def error(self, message: Any) -> None:
+        self._write('ERROR', message)
+
+
+def _divide(left: Any, right: Any) -> Any:
+    if right == 0:
+        raise ExecutionError('division by zero')
+    if isinstance(left, int) and isinstance(right, int):
+        return left // right
+    return left / right
+
+
+class VirtualMachine():
+    """
+    Executes compiled classes. Names the code does not resolve to a local or a
+    field are builtin functions or the services of the host, and the instances of
+    classes with a wiring plan get their injected attributes set on construction
+    """
+
+    def __init__(
+            self,
+            classes: Dict[str, ClassCode],
+            services: Dict[str, Any] | None = None,
+            functions: Dict[str, Callable[..., Any]] | None = None,
+            plan: WiringPlan | None = None
+        ) -> None:
+        """
+        Args:
+            classes: the compiled classes by fully qualified name, see compiler.compile_modules
+            services: the Builtin services such as Builtin.Logger by fully qualified
+                name, injected into the attributes typed with them
+            functions: the functions bare calls and names resolve to, BUILTIN_FUNCTIONS
+                when not given
+            plan: the injections of every class, nothing is injected when not given
+        """
+        self._classes = classes
+        self._services = services or {}
+        self._functions = dict(BUILTIN_FUNCTIONS if functions is None else functions)
+        self._plan = plan
+        self._singletons: Dict[str, Instance] = {}
+        self._depth = 0
+        # the methods, fields and constructor of every class merged with those it extends
+        self._methods: Dict[str, Dict[str, CodeObject]] = {}
+        self._fields: Dict[str, Dict[str, Any]] = {}
+        self._constructors: Dict[str, CodeObject | None] = {}
+        for name in classes:
+            self._merge(name, ())
+
+    def _merge(self, name: str, visiting: Tuple[str, ...]) -> None:
+        if name in self._methods:
+            return
+        if name in visiting:
+            raise ExecutionError(f'cyclic inheritance: {name}')
+        class_code = self._classes[name]
+        methods: Dict[str, CodeObject] = {}
+        fields: Dict[str, Any] = {}
+        constructor: CodeObject | None = None
+        if class_code.superclass is not None and class_code.superclass in self._classes:
+            self._merge(class_code.superclass, visiting + (name,))
+            methods.update(self._methods[class_code.superclass])
+            fields.update(self._fields[class_code.superclass])
+            constructor = self._constructors[class_code.superclass]
+        methods.update(class_code.methods)
+        fields.update(class_code.fields)
+        self._methods[name] = methods
+        self._fields[name] = fields
+        self._constructors[name] = class_code.constructor or constructor
+
+    def instantiate(self, name: str, /, *arguments: Any, **keywords: Any) -> Instance:
+        """
+        Constructs an instance of a class: its fields get their initial value then
+        its injections, the keyword arguments naming no constructor parameter set
+        fields and the constructor runs with the other arguments
+
+        Raises:
+            ExecutionError: when the class is not compiled or the arguments do not
+                match the constructor
+        """
+        if name not in self._classes:
+            raise ExecutionError(f'unknown class: {name}')
+        instance = Instance(name, dict(self._fields[name]))
+        if self._plan is not None:
+            for injection in self._plan.injections(name):
+                instance.fields[injection.attribute] = self._injected(injection.dependency, injection.lifetime)
+        constructor = self._constructors[name]
+        if constructor is None:
+            if arguments:
+                raise ExecutionError(f'{name} has no constructor taking {len(arguments)} arguments')
+            instance.fields.update(keywords)
+            return instance
+        parameters = constructor.local_names[:constructor.parameters]
+        for keyword in list(keywords):
+            if keyword not in parameters:
+                instance.fields[keyword] = keywords.pop(keyword)
+        self._execute(constructor, instance, self._bind(constructor, arguments, keywords))
+        return instance
+
+    def _injected(self, dependency: str, lifetime: Lifetime) -> Any:
+        if lifetime is Lifetime.EXTERNAL:
+            return self._services.get(dependency)
+        if lifetime is Lifetime.INSTANCE:
+            return self.instantiate(dependency)
+        singleton = self._singletons.get(dependency)
+        if singleton is None:
+            singleton = self._singletons[dependency] = Instance(dependency, dict(self._fields[dependency]))
+            # the singletons of a cycle see each other once all of them exist
+            for injection in self._plan.injections(dependency) if self._plan is not None else []:
+                singleton.fields[injection.attribute] = self._injected(injection.dependency, injection.lifetime)
+            constructor = self._constructors[dependency]
+            if constructor is not None:
+                self._execute(constructor, singleton, self._bind(constructor, (), {}))
+        return singleton
+
+    def call(self, instance: Instance, method: str, /, *arguments: Any, **keywords: Any) -> Any:
+        """
+        Calls a method of an instance and returns its result
+
+        Raises:
+            ExecutionError: when the instance has no such method or the code fails
+        """
+        code = self._methods[instance.type].get(method)
+        if code is None:
+            raise ExecutionError(f'{instance.type} has no method {method}')
+        return self._execute(code, instance, self._bind(code, arguments, keywords))
+
+    def run(self, name: str, arguments: List[str] | None = None) -> Any:
+        """
+        Constructs an EntryPoint class and calls its run method with the arguments
+        """
+        return self.call(self.instantiate(name), 'run', list(arguments or []))
+
+    def _bind(self, code: CodeObject, arguments: Tuple[Any, ...] | List[Any], keywords: Dict[str, Any]) -> List[Any]:
+        """
+        Returns the local slots of a frame, the parameters set from the arguments,
+        every parameter is given exactly once
+        """
+        if len(arguments) + len(keywords) != code.parameters:
+            raise ExecutionError(
+                f'{code.owner}.{code.name} takes {code.parameters} arguments, '
+                f'{len(arguments) + len(keywords)} given'
+            )
+        slots: List[Any] = list(arguments)
+        slots.extend([None] * (code.locals - len(slots)))
+        for keyword, value in keywords.items():
+            try:
+                slot = code.local_names.index(keyword, 0, code.parameters)
+            except ValueError:
+                raise ExecutionError(f'{code.owner}.{code.name} has no parameter {keyword}') from None
+            if slot < len(arguments):
+                raise ExecutionError(f'{code.owner}.{code.name} got {keyword} twice')
+            slots[slot] = value
+        return slots
+
+    def _call_site(
+            self,
+            site: Tuple[str, int, Tuple[str, ...]],
+            stack: List[Any]
+        ) -> Tuple[List[Any], Dict[str, Any]]:
+        # pops the arguments of a call site off the operand stack
+        name, positional, keywords = site
+        count = positional + len(keywords)
+        values = stack[len(stack) - count:] if count else []
+        del stack[len(stack) - count:]
+        return values[:positional], dict(zip(keywords, values[positional:]))
+
+    def _invoke(self, target: Any, name: str, arguments: List[Any], keywords: Dict[str, Any]) -> Any:
+        if isinstance(target, Instance):
+            code = self._methods[target.type].get(name)
+            if code is None:
+                raise ExecutionError(f'{target.type} has no method {name}')
+            return self._execute(code, target, self._bind(code, arguments, keywords))
+        method = getattr(target, name, None)
+        if method is None:
+            raise ExecutionError(f'{type(target).__name__} has no method {name}')
+        return method(*arguments, **keywords)
+
+    def _execute(self, code_object: CodeObject, this: Instance, slots: List[Any]) -> Any:
+        """
+        Runs a code object in a new frame until it returns
+        """
+        if self._depth >= MAX_DEPTH:
+            raise ExecutionError(f'maximum call depth exceeded in {code_object.owner}.{code_object.name}')
+        self._depth += 1
+        code = code_object.code
+        constants = code_object.constants
+        stack: List[Any] = []
+        push = stack.append
+        pop = stack.pop
+        pc = 0
+        try:
+            while True:
+                opcode = code[pc]
+                argument = code[pc + 1]
+                pc += 2
+                if opcode == _LOAD_LOCAL:
+                    push(slots[argument])
+                elif opcode == _LOAD_CONST:
+                    push(constants[argument])
+                elif opcode == _STORE_LOCAL:
+                    slots[argument] = pop()
+                elif opcode == _LOAD_THIS:
+                    push(this)
+                elif opcode == _LOAD_FIELD:
+                    target = pop()
+                    name = constants[argument]
+                    if isinstance(target, Instance):
+                        if name not in target.fields:
+                            raise ExecutionError(f'{target.type} has no field {name}')
+                        push(target.fields[name])
+                    elif target is None:
+                        raise ExecutionError(f'null has no field {name}')
+                    else:
+                        push(getattr(target, name))
+                elif opcode == _JUMP_IF_FALSE:
+                    if not pop():
+                        pc = argument
+                elif opcode == _JUMP:
+                    pc = argument
+                elif opcode == _RETURN:
+                    return pop()
+                elif opcode == _EQUAL:
+                    right = pop()
+                    stack[-1] = stack[-1] == right
+                elif opcode == _NOT_EQUAL:
+                    right = pop()
+                    stack[-1] = stack[-1] != right
+                elif opcode == _LESS:
+                    right = pop()
+                    stack[-1] = stack[-1] < right
+                elif opcode == _LESS_EQUAL:
+                    right = pop()
+                    stack[-1] = stack[-1] <= right
+                elif opcode == _GREATER:
+                    right = pop()
+                    stack[-1] = stack[-1] > right
+                elif opcode == _GREATER_EQUAL:
+                    right = pop()
+                    stack[-1] = stack[-1] >= right
+                elif opcode == _ADD:
+                    right = pop()
+                    stack[-1] = stack[-1] + right
+                elif opcode == _SUBTRACT:
+                    right = pop()
+                    stack[-1] = stack[-1] - right
+                elif opcode == _MULTIPLY:
+                    right = pop()
+                    stack[-1] = stack[-1] * right
+                elif opcode == _DIVIDE:
+                    right = pop()
+                    stack[-1] = _divide(stack[-1], right)
+                elif opcode == _MODULO:
+                    right = pop()
+                    if right == 0:
+                        raise ExecutionError('division by zero')
+                    stack[-1] = stack[-1] % right
+                elif opcode == _CALL_SELF or opcode == _INVOKE:
+                    name, count, keywords = constants[argument]
+                    target = this if opcode == _CALL_SELF else stack[-count - 1]
+                    callee = self._methods[target.type].get(name) if isinstance(target, Instance) else None
+                    if callee is not None and not keywords and count == callee.parameters:
+                        # the arguments become the first local slots of the frame
+                        frame = stack[len(stack) - count:]
+                        del stack[len(stack) - count:]
+                        frame.extend([None] * (callee.locals - count))
+                        if opcode == _INVOKE:
+                            pop()
+                        push(self._execute(callee, target, frame))
+                    else:
+                        arguments, keyword_arguments = self._call_site(constants[argument], stack)
+                        if opcode == _INVOKE:
+                            pop()
+                        push(self._invoke(target, name, arguments, keyword_arguments))
+                elif opcode == _STORE_FIELD:
+                    value = pop()
+                    target = pop()
+                    if not isinstance(target, Instance):
+                        raise ExecutionError(f'can not set field {constants[argument]} of {target!r}')
+                    target.fields[constants[argument]] = value
+                elif opcode == _POP:
+                    pop()
+                elif opcode == _INDEX:
+                    index = pop()
+                    stack[-1] = stack[-1][index]
+                elif opcode == _SLICE:
+                    end = pop() if argument & 2 else None
+                    start = pop() if argument & 1 else None
+                    stack[-1] = stack[-1][start:end]
+                elif opcode == _STORE_INDEX:
+                    value = pop()
+                    index = pop()
+                    pop()[index] = value
+                elif opcode == _NOT:
+                    stack[-1] = not stack[-1]
+                elif opcode == _NEGATE:
+                    stack[-1] = -stack[-1]
+                elif opcode == _JUMP_IF_FALSE_OR_POP:
+                    if stack[-1]:
+                        pop()
+                    else:
+                        pc = argument
+                elif opcode == _JUMP_IF_TRUE_OR_POP:
+                    if stack[-1]:
+                        pc = argument
+                    else:
+                        pop()
+                elif opcode == _FOR_ITER:
+                    try:
+                        push(next(stack[-1]))
+                    except StopIteration:
+                        pop()
+                        pc = argument
+                elif opcode == _GET_ITER:
+                    stack[-1] = iter(stack[-1])
+                elif opcode == _LOAD_GLOBAL:
+                    name = constants[argument]
+                    if name in self._functions:
+                        push(self._functions[name])
+                    elif name in self._services:
+                        push(self._services[name])
+                    else:
+                        raise ExecutionError(f'unknown name {name} in {code_object.owner}.{code_object.name}')
+                elif opcode == _CALL_FUNCTION:
+                    site = constants[argument]
+                    arguments, keywords = self._call_site(site, stack)
+                    function = self._functions.get(site[0])
+                    if function is None:
+                        raise ExecutionError(f'unknown function {site[0]} in {code_object.owner}.{code_object.name}')
+                    push(function(*arguments, **keywords))
+                elif opcode == _NEW:
+                    site = constants[argument]
+                    arguments, keywords = self._call_site(site, stack)
+                    push(self.instantiate(site[0], *arguments, **keywords))
+                elif opcode == _CALL_SUPER:
+                    site = constants[argument]
+                    arguments, keywords = self._call_site(site, stack)
+                    superclass = self._classes[code_object.owner].superclass
+                    constructor = self._constructors.get(superclass) if superclass is not None else None
+                    if constructor is not None:
+                        self._execute(constructor, this, self._bind(constructor, arguments, keywords))
+                    push(None)
+                else:
+                    raise ExecutionError(f'unknown opcode {opcode}')
+        except (TypeError, IndexError, KeyError, AttributeError) as error:
+            raise ExecutionError(f'{code_object.owner}.{code_object.name}: {error}') from error
+        finally:
+            self._depth -= 1
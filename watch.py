@@ -0,0 +1,175 @@
+"""
+Purist watch mode, keeps the parsed module graph in memory and re-parses only the
+modules that changed on disk, relinking the modules that depend on them
+"""
+import os
+import sys
+import time
+
+from os.path import join as path
+from typing import Dict, List, Set, Tuple
+
+from diagnostics import Diagnostics
+from parser import ModuleRegistry, Node
+from project import find_modules, link_modules, parse_modules
+from symbols import SymbolIndex
+
+POLL_INTERVAL = 0.05
+
+
+def _imports(node: Node | None) -> Set[str]:
+    if node is None or node.children is None:
+        return set()
+    return {str(child.value) for child in node.children if child.name == 'import'}
+
+
+class Watcher():
+    """
+    Watches the modules under a source folder by polling their modification times,
+    a changed module is parsed again and every module importing it, directly or
+    through other modules, is linked again. The symbol index follows the changes
+    """
+
+    def __init__(
+            self,
+            src_folder: str,
+            cache_folder: str | None = None,
+            diagnostics: Diagnostics | None = None
+        ) -> None:
+        """
+        Args:
+            src_folder: the folder holding the modules
+            cache_folder: the persistent AST cache folder, no cache when not given
+            diagnostics: collects the messages and errors, written after every update
+                when running, a silent collector when not given
+        """
+        self._src_folder = src_folder
+        self._cache_folder = cache_folder
+        self._diagnostics = diagnostics if diagnostics is not None else Diagnostics()
+        self._stamps: Dict[str, Tuple[int, int]] = {}
+        self._parsed: Dict[str, Node | None] = {}
+        self._imports: Dict[str, Set[str]] = {}
+        self._dependents: Dict[str, Set[str]] = {}
+        self._registry = ModuleRegistry()
+        self._symbols = SymbolIndex()
+
+    @property
+    def registry(self) -> ModuleRegistry:
+        """
+        Returns the compilation session holding the linked modules
+        """
+        return self._registry
+
+    @property
+    def symbols(self) -> SymbolIndex:
+        """
+        Returns the declarations and references of the watched modules
+        """
+        return self._symbols
+
+    @property
+    def diagnostics(self) -> Diagnostics:
+        """
+        Returns the collector of the messages and errors
+        """
+        return self._diagnostics
+
+    def start(self) -> None:
+        """
+        Parses and links every module under the source folder
+        """
+        self._stamps = self._scan()
+        self._update_modules(set(self._stamps))
+        link_modules(self._src_folder, self._parsed, self._registry, self._diagnostics)
+
+    def poll(self) -> Set[str]:
+        """
+        Returns the modules added, modified or removed since the last poll
+        """
+        stamps = self._scan()
+        changed = {
+            module for module, stamp in stamps.items()
+            if self._stamps.get(module) != stamp
+        }
+        changed.update(module for module in self._stamps if module not in stamps)
+        self._stamps = stamps
+        return changed
+
+    def update(self, changed: Set[str]) -> Set[str]:
+        """
+        Parses the changed modules again and relinks them and their dependents
+
+        Args:
+            changed: the changed module paths
+        Returns:
+            Set[str]: every module that was parsed or linked again
+        """
+        self._update_modules(changed)
+        affected = set(changed)
+        pending = list(changed)
+        while pending:
+            for dependent in self._dependents.get(pending.pop(), ()):
+                if dependent not in affected:
+                    affected.add(dependent)
+                    pending.append(dependent)
+        for module in affected:
+            self._registry.discard(module)
+        link_modules(self._src_folder, self._parsed, self._registry, self._diagnostics)
+        return affected
+
+    def run(self, interval: float = POLL_INTERVAL) -> None:
+        """
+        Starts watching, runs until interrupted
+
+        Args:
+            interval: the number of seconds between polls
+        """
+        start = time.perf_counter()
+        self.start()
+        self._report(set(self._parsed), time.perf_counter() - start)
+        while True:
+            time.sleep(interval)
+            changed = self.poll()
+            if not changed:
+                continue
+            start = time.perf_counter()
+            for module in sorted(changed):
+                print(f'changed: {path(self._src_folder, module)}')
+            affected = self.update(changed)
+            self._report(affected, time.perf_counter() - start)
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        stamps: Dict[str, Tuple[int, int]] = {}
+        for module in find_modules(self._src_folder):
+            try:
+                stat = os.stat(path(self._src_folder, module))
+            except OSError:
+                continue
+            stamps[module] = (stat.st_mtime_ns, stat.st_size)
+        return stamps
+
+    def _update_modules(self, modules: Set[str]) -> None:
+        present = [module for module in sorted(modules) if module in self._stamps]
+        parsed = parse_modules(self._src_folder, present, 1, self._cache_folder, self._diagnostics)
+        for module in modules:
+            for imported in self._imports.pop(module, set()):
+                self._dependents[imported].discard(module)
+            if module not in parsed:
+                self._parsed.pop(module, None)
+                self._symbols.remove(module)
+                continue
+            self._parsed[module] = parsed[module]
+            self._symbols.update(module, parsed[module])
+            self._imports[module] = _imports(parsed[module])
+            for imported in self._imports[module]:
+                self._dependents.setdefault(imported, set()).add(module)
+
+    def _report(self, modules: Set[str], elapsed: float) -> None:
+        self._diagnostics.flush(sys.stderr)
+        invalid: List[str] = sorted(
+            module for module in modules
+            if module in self._parsed and self._registry.node(module) is None
+        )
+        for module in invalid:
+            print(f'invalid module: {module}')
+        print(f'Updated {len(modules)} modules, {len(invalid)} invalid, in {elapsed * 1000:.1f} ms')
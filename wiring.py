@@ -0,0 +1,273 @@
+"""
+Dependency injection wiring, the attributes the runtime injects are resolved for
+every class ahead of time into a plan, so constructing an instance looks its
+injections up in a table instead of inspecting the class on every construction
+"""
+from enum import Enum
+from typing import Any, Dict, List
+
+from dependencies import strongly_connected
+from errors import CyclicInjection, Error, UnresolvedInjection
+from hierarchy import TypeHierarchy, build_hierarchy
+from parser import Node
+from symbols import BUILTIN_MODULE, TYPE_NAME, SymbolKind, module_scope
+
+# the samples implement Stateless without requiring it from Builtin
+STATELESS = (f'{BUILTIN_MODULE}.Stateless', 'Stateless')
+
+
+class Lifetime(Enum):
+    """
+    How long an injected instance lives
+    """
+    # one instance shared by every injection, the Stateless classes
+    SINGLETON = 'singleton'
+    # a new instance for every injected attribute
+    INSTANCE = 'instance'
+    # provided by the runtime, the Builtin services such as Logger
+    EXTERNAL = 'external'
+
+
+class Injection():
+    """
+    An attribute the runtime injects when constructing a class
+    """
+
+    def __init__(self, attribute: str, dependency: str, lifetime: Lifetime) -> None:
+        """
+        Args:
+            attribute: the attribute name
+            dependency: the fully qualified name of the injected class or Builtin
+                service, the implementing class for attributes typed with an interface
+            lifetime: how long the injected instance lives
+        """
+        self.attribute = attribute
+        self.dependency = dependency
+        self.lifetime = lifetime
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Returns the injection as a JSON serializable dictionary
+        """
+        return {'attribute': self.attribute, 'dependency': self.dependency, 'lifetime': self.lifetime.value}
+
+    def __repr__(self) -> str:
+        return f'{self.attribute} <- {self.dependency} ({self.lifetime.value})'
+
+
+class WiringPlan():
+    """
+    The injections of every constructible class with its lifetime and a dependency
+    first construction order. The runtime creates the singletons in that order,
+    the singletons of a cycle are all created before their attributes are set, then
+    constructs any class by setting every injection of its table entry: the shared
+    instance of a singleton or external service, or a new instance built the same way
+    """
+
+    def __init__(
+            self,
+            lifetimes: Dict[str, Lifetime],
+            injections: Dict[str, List[Injection]],
+            errors: List[Error]
+        ) -> None:
+        """
+        Args:
+            lifetimes: the lifetime of every constructible class by fully qualified name
+            injections: the injections of every constructible class in attribute order
+            errors: the attributes typed with an interface without exactly one class to inject
+        """
+        self._lifetimes = lifetimes
+        self._injections = injections
+        self._errors = list(errors)
+        edges = {
+            name: sorted({
+                injection.dependency for injection in class_injections
+                if injection.lifetime is not Lifetime.EXTERNAL
+            })
+            for name, class_injections in injections.items()
+        }
+        self._components = strongly_connected(sorted(injections), edges)
+        self._cycles = [
+            component for component in self._components
+            if len(component) > 1 or component[0] in edges[component[0]]
+        ]
+
+    @property
+    def classes(self) -> List[str]:
+        """
+        Returns the fully qualified names of the constructible classes, sorted
+        """
+        return sorted(self._injections)
+
+    @property
+    def errors(self) -> List[Error]:
+        """
+        Returns the cycles through classes with an instance per injection and the
+        attributes typed with an interface without exactly one implementing class
+        """
+        return self._errors
+
+    @property
+    def cycles(self) -> List[List[str]]:
+        """
+        Returns the classes injected into each other, including singleton cycles
+        """
+        return self._cycles
+
+    @property
+    def order(self) -> List[str]:
+        """
+        Returns every constructible class after the classes injected into it, the
+        classes of a cycle are kept together
+        """
+        return [name for component in self._components for name in component]
+
+    def lifetime(self, name: str) -> Lifetime | None:
+        """
+        Returns the lifetime of a class, None when the class is not constructible
+        """
+        return self._lifetimes.get(name)
+
+    def injections(self, name: str) -> List[Injection]:
+        """
+        Returns the injections of a class in attribute order
+        """
+        return self._injections.get(name, [])
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Returns the plan as a JSON serializable dictionary
+        """
+        return {
+            'classes': {
+                name: {
+                    'lifetime': self._lifetimes[name].value,
+                    'injections': [injection.to_dict() for injection in self._injections[name]],
+                }
+                for name in self.classes
+            },
+            'order': self.order,
+            'singletons': [name for name in self.order if self._lifetimes[name] is Lifetime.SINGLETON],
+            'externals': sorted({
+                injection.dependency for class_injections in self._injections.values()
+                for injection in class_injections if injection.lifetime is Lifetime.EXTERNAL
+            }),
+            'cycles': self._cycles,
+        }
+
+    def report(self) -> str:
+        """
+        Returns the classes in construction order with their lifetime and injections
+        """
+        lines: List[str] = []
+        for name in self.order:
+            injections = ', '.join(repr(injection) for injection in self._injections[name])
+            lines.append(f'{name} ({self._lifetimes[name].value}): {injections}')
+        for cycle in self._cycles:
+            lines.append(f'cycle: {" -> ".join(cycle + cycle[:1])}')
+        return '\n'.join(lines)
+
+
+def injected_type(node: Node, scope: Dict[str, str]) -> str | None:
+    """
+    Returns the fully qualified type of an attribute the runtime may inject, None
+    for attributes with a value, nullable, generic or primitive types and types
+    neither declared nor required by the module
+
+    Args:
+        node: the attribute node
+        scope: the names in scope of the module, see symbols.module_scope
+    """
+    type_name: str | None = None
+    for child in node.children or []:
+        if child.name == 'value':
+            return None
+        if child.name == 'type':
+            type_name = str(child.value)
+    if type_name is None or TYPE_NAME.fullmatch(type_name) is None:
+        return None
+    return scope.get(type_name)
+
+
+def _constructible(node: Node) -> bool:
+    # classes with constructor parameters are constructed by the code using them
+    for child in node.children or []:
+        if child.name == 'constructor':
+            for constructor_child in child.children or []:
+                if constructor_child.name == 'parameters' and constructor_child.children:
+                    return False
+    return True
+
+
+def plan_wiring(modules: Dict[str, Node | None], hierarchy: TypeHierarchy | None = None) -> WiringPlan:
+    """
+    Resolves the injected attributes of every class of parsed modules. Attributes
+    typed with a Builtin service are external, those typed with a constructible
+    class inject it and those typed with an interface inject its single
+    constructible implementing class. Classes implementing Stateless are singletons
+
+    Args:
+        modules: the unlinked module ASTs by module path, None for invalid modules
+        hierarchy: the classes and interfaces of the same modules, built when not given
+    Returns:
+        WiringPlan: the injections, lifetimes and construction order of every class
+    """
+    if hierarchy is None:
+        hierarchy = build_hierarchy(modules)
+    classes: Dict[str, Node] = {}
+    scopes: Dict[str, Dict[str, str]] = {}
+    class_modules: Dict[str, str] = {}
+    for file_path, node in modules.items():
+        if node is None:
+            continue
+        scope = module_scope(file_path, node)
+        for child in node.children or []:
+            if child.name == 'class' and _constructible(child):
+                name = scope[str(child.value)]
+                classes[name] = child
+                scopes[name] = scope
+                class_modules[name] = file_path
+
+    lifetimes: Dict[str, Lifetime] = {}
+    implementations: Dict[str, List[str]] = {}
+    for name in sorted(classes):
+        ancestors = hierarchy.ancestors(name)
+        stateless = any(stateless_name in ancestors for stateless_name in STATELESS)
+        lifetimes[name] = Lifetime.SINGLETON if stateless else Lifetime.INSTANCE
+        for ancestor in ancestors[1:]:
+            declaration = hierarchy.declaration(ancestor)
+            if declaration is not None and declaration.kind is SymbolKind.INTERFACE:
+                implementations.setdefault(ancestor, []).append(name)
+
+    injections: Dict[str, List[Injection]] = {}
+    errors: List[Error] = []
+    for name in sorted(classes):
+        class_injections: List[Injection] = []
+        for child in classes[name].children or []:
+            if child.name != 'attribute':
+                continue
+            dependency = injected_type(child, scopes[name])
+            if dependency is None:
+                continue
+            if dependency.startswith(f'{BUILTIN_MODULE}.'):
+                class_injections.append(Injection(str(child.value), dependency, Lifetime.EXTERNAL))
+                continue
+            declaration = hierarchy.declaration(dependency)
+            if declaration is not None and declaration.kind is SymbolKind.INTERFACE:
+                candidates = implementations.get(dependency, [])
+                if len(candidates) != 1:
+                    errors.append(UnresolvedInjection(
+                        name, str(child.value), dependency, candidates, class_modules[name]
+                    ))
+                    continue
+                dependency = candidates[0]
+            # data types and classes with constructor parameters are not injected
+            if dependency in classes:
+                class_injections.append(Injection(str(child.value), dependency, lifetimes[dependency]))
+        injections[name] = class_injections
+    plan = WiringPlan(lifetimes, injections, errors)
+    for cycle in plan.cycles:
+        # singletons injected into each other are wired once all of them exist
+        if any(lifetimes[name] is Lifetime.INSTANCE for name in cycle):
+            plan.errors.append(CyclicInjection(cycle, class_modules[cycle[0]]))
+    return plan